@@ -0,0 +1,11 @@
+from fastapi import HTTPException
+
+from db.repository import MeetingRepository, RepositoryUnavailable, get_repository
+
+async def meeting_repository() -> MeetingRepository:
+    """The meetings store for a request; 503 when it cannot be opened."""
+    try:
+        return await get_repository()
+    except RepositoryUnavailable as e:
+        print(f"Meetings store not available: {e}")
+        raise HTTPException(status_code=503, detail="Database not available")
@@ -0,0 +1,123 @@
+"""
+HTTP caching and compression for the API.
+
+ETags are strong validators built from what identifies a response's content (record ID,
+analysis version, last update, request options), so they can be checked with a tiny
+database read before the payload itself is fetched or rendered. `CompressionMiddleware`
+compresses JSON responses above a size threshold with brotli when the `brotli` package is
+installed and the client accepts it, otherwise gzip.
+"""
+
+import gzip
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Browsers may keep a copy but must revalidate it (a cheap 304) before every use
+CACHE_CONTROL_REVALIDATE = "private, no-cache"
+COMPRESSION_MINIMUM_SIZE = 1024 # Bytes; smaller bodies are not worth the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the values that determine a response's content."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers `etag` (weak comparison, as RFC 9110 asks)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_strip_encoding_suffix(candidate.strip().removeprefix("W/")) == etag for candidate in header.split(","))
+
+def _strip_encoding_suffix(etag: str) -> str:
+    """Undoes the "-gzip"/"-br" suffix `CompressionMiddleware` gives compressed representations."""
+    for suffix in ('-gzip"', '-br"'):
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+def cache_headers(etag: str, cache_control: str = CACHE_CONTROL_REVALIDATE) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+def not_modified(etag: str, cache_control: str = CACHE_CONTROL_REVALIDATE) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {token.split(";")[0].strip().lower() for token in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+class CompressionMiddleware:
+    """Compresses `application/json` responses of at least `minimum_size` bytes.
+
+    Responses that already carry a Content-Encoding (e.g. bundle sections served as stored)
+    and non-JSON responses (PDF streams) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body_parts = []
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not headers.get("content-type", "").startswith("application/json"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message # Held until the body size is known
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(body_parts)
+            headers = MutableHeaders(raw=start_message["headers"])
+            if len(body) >= self.minimum_size:
+                if encoding == "br":
+                    body = brotli.compress(body, quality=BROTLI_QUALITY)
+                else:
+                    body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and etag.endswith('"'):
+                    # A strong ETag must differ between the compressed and identity bytes
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+import os
+import re
+import zlib
+
+from services.analysis_bundle import ANALYSIS_DATA_ROOT, bundle_path, component_for_filename, read_component_compressed
+
+router = APIRouter(
+    prefix="/analysis-data",
+    tags=["Analysis Data"],
+)
+
+_SAFE_NAME = re.compile(r'^[A-Za-z0-9._-]+$')
+
+@router.get("/{meeting_id}/{filename}", summary="Serve a per-component JSON file (legacy path)")
+async def get_component_file(meeting_id: str, filename: str, request: Request):
+    """Serves `/analysis-data/<id>/<component>-<id>.json` from the meeting's component bundle.
+
+    Meetings analysed before bundles still have the plain files, which are returned as-is.
+    The stored section is zlib, i.e. HTTP `deflate`, so clients that accept it get the
+    bytes without a decompress/recompress round trip.
+    """
+    if not _SAFE_NAME.match(meeting_id) or not _SAFE_NAME.match(filename) or '..' in meeting_id:
+        raise HTTPException(status_code=400, detail="Invalid meeting ID or file name.")
+
+    meeting_dir = os.path.join(ANALYSIS_DATA_ROOT, meeting_id)
+    component = component_for_filename(meeting_id, filename)
+    if component is not None:
+        try:
+            section = await run_in_threadpool(read_component_compressed, bundle_path(meeting_dir, meeting_id), component)
+        except Exception as e:
+            print(f"Error reading component '{component}' for meeting {meeting_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to read analysis component.")
+        if section is not None:
+            if "deflate" in request.headers.get("accept-encoding", ""):
+                return Response(
+                    content=section,
+                    media_type="application/json",
+                    headers={"Content-Encoding": "deflate", "Vary": "Accept-Encoding"}
+                )
+            return Response(content=zlib.decompress(section), media_type="application/json",
+                            headers={"Vary": "Accept-Encoding"})
+
+    legacy_path = os.path.join(meeting_dir, filename)
+    if filename.endswith(".json") and os.path.isfile(legacy_path):
+        return FileResponse(legacy_path, media_type="application/json")
+    raise HTTPException(status_code=404, detail=f"No analysis file '{filename}' for meeting {meeting_id}.")
@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing_extensions import Annotated
+
+from api.dependencies import meeting_repository
+from db.repository import MeetingRepository
+from services.analytics import meeting_trend, speaker_talk_time
+from services.serialization import JSONBytesResponse
+
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["Analytics"],
+)
+
+def _day(value: Optional[date]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+@router.get("/trends", summary="Meeting metrics per day, week or month")
+async def get_trends(
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    period: str = Query("week", pattern="^(day|week|month)$", description="Length of each point of the trend"),
+    date_from: Optional[date] = Query(None, description="First meeting day included"),
+    date_to: Optional[date] = Query(None, description="Last meeting day included"),
+    platform: Optional[str] = Query(None, description="Only meetings from this platform"),
+    group_by: Optional[str] = Query(None, pattern="^platform$", description="Split each period by platform")
+):
+    """Meetings and average duration, engagement, overall sentiment and participants per
+    period, answered from the daily rollups without reading any analysis."""
+    try:
+        rows = await repository.list_daily_rollups(_day(date_from), _day(date_to), platform)
+    except Exception as db_error:
+        print(f"Error reading daily rollups: {db_error}")
+        raise HTTPException(status_code=500, detail=f"Database error: {db_error}")
+    return JSONBytesResponse(content={
+        "period": period,
+        "trend": meeting_trend(rows, period, by_platform=group_by == "platform")
+    })
+
+@router.get("/speakers", summary="Speakers' talk time and share over a date range")
+async def get_speaker_talk_time(
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    date_from: Optional[date] = Query(None, description="First meeting day included"),
+    date_to: Optional[date] = Query(None, description="Last meeting day included"),
+    speaker: Optional[str] = Query(None, description="Only this speaker"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Each speaker's speaking time, share of all speaking time in the range, meetings and
+    average sentiment, most talkative first; answered from the speaker rollups, summed,
+    filtered and limited by the store. A speaker's share stays relative to everyone's
+    speaking time in the range."""
+    try:
+        totals = await repository.sum_speaker_rollups(_day(date_from), _day(date_to), speaker, limit)
+    except Exception as db_error:
+        print(f"Error reading speaker rollups: {db_error}")
+        raise HTTPException(status_code=500, detail=f"Database error: {db_error}")
+    return JSONBytesResponse(content=speaker_talk_time(totals))
@@ -1,15 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from typing_extensions import Annotated
 from typing import Dict, Union, Optional
 import os
 import uuid
 from datetime import datetime
 
-from models.meeting import MeetingAnalysisJSON
-from services.analysis_pipeline import run_full_analysis_pipeline # Import shared pipeline
-from db.supabase_client import get_supabase_client
-from supabase import Client
+from services.analysis_jobs import DATASET_ANALYSIS, enqueue_analysis_job # Durable analysis queue
+from services.serialization import JSONBytesResponse
+from db.repository import MeetingRepository
+from api.dependencies import meeting_repository
 
 router = APIRouter(
     prefix="/api/datasets",
@@ -85,67 +85,20 @@ def get_file_paths_for_dataset(dataset_id: str) -> Dict[str, Optional[str]]:
 
     return {"main": main_full_path, "chat": chat_full_path}
 
-# --- Analysis Task (to run in background) ---
-# NOTE: Needs to be synchronous to work easily with BackgroundTasks unless run_in_threadpool is used
-# If pipeline functions were truly async, would need a different background execution method (e.g., Celery)
-def run_analysis_and_save(
-    file_path: str, 
-    file_type: str, 
-    chat_file_path: Optional[str], # Add chat file path
-    meeting_id: uuid.UUID, # Pass meeting ID to update the record
-    supabase_dep: Client # Pass Supabase client dependency
-):
-    """The actual analysis and saving logic, run as a background task."""
-    print(f"[Background Task {meeting_id}] Starting analysis for file: {file_path}")
-    analysis_result = None
-    analysis_status = "FAILED"
-    error_detail = None
-    try:
-        # Run the pipeline (ensure it's callable synchronously or handle async appropriately)
-        # Assuming run_full_analysis_pipeline can be awaited if needed, but BackgroundTasks expects sync funcs
-        # For simplicity, let's assume pipeline functions are effectively sync or handle their own async execution within.
-        # If run_full_analysis_pipeline itself needs `await`, BackgroundTasks isn't the ideal tool.
-        # Call the actual (now synchronous) pipeline function
-        analysis_result: MeetingAnalysisJSON = run_full_analysis_pipeline(file_path, file_type, chat_file_path)
-        print(f"[Background Task {meeting_id}] Analysis finished. Result snippet: {str(analysis_result.model_dump(exclude_unset=True))[:200]}...")
-        analysis_status = "COMPLETE"
-        
-    except Exception as pipeline_error:
-        print(f"[Background Task {meeting_id}] Pipeline error: {pipeline_error}")
-        error_detail = str(pipeline_error)
-        # analysis_result remains None
-
-    # Update Supabase record
-    update_payload = {
-        "analysis_json": analysis_result.model_dump(exclude_unset=True) if analysis_result else None,
-        "status": analysis_status, # Add a status column to your meetings table
-        "error_detail": error_detail # Add an error_detail column to your meetings table
-    }
-    try:
-        print(f"[Background Task {meeting_id}] Updating Supabase record...")
-        update_response = supabase_dep.table("meetings").update(update_payload).eq("id", str(meeting_id)).execute()
-        if update_response.data:
-            print(f"[Background Task {meeting_id}] Supabase record updated successfully.")
-        else:
-             print(f"[Background Task {meeting_id}] Failed to update Supabase record. Error: {update_response.error}")
-             # Log error, but task completion is noted
-    except Exception as db_error:
-        print(f"[Background Task {meeting_id}] DB update error: {db_error}")
-        # Log error
-
 @router.post("/{dataset_id}/analyze", 
               summary="Analyze a predefined dataset (Async)", 
               status_code=202 # Return 202 Accepted
              )
 async def analyze_dataset_async(
     dataset_id: str,
-    background_tasks: BackgroundTasks, # Inject BackgroundTasks
-    supabase: Annotated[Union[Client, None], Depends(get_supabase_client)]
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    priority: int = Query(0, description="Higher runs first")
 ):
-    """Accepts dataset analysis request, starts background task, returns meeting ID."""
-    if supabase is None:
-        raise HTTPException(status_code=503, detail="Supabase client not available")
+    """Accepts dataset analysis request, queues the analysis job, returns meeting and job IDs.
 
+    The job is persisted before this returns, so it survives API restarts; job workers
+    (`python -m services.job_worker`) run it.
+    """
     try:
         # 1. Get the file paths
         file_paths = get_file_paths_for_dataset(dataset_id)
@@ -170,34 +123,32 @@ async def analyze_dataset_async(
             # analysis_json is initially null
         }
         print(f"Creating initial meeting record for dataset {dataset_id} with ID {meeting_id}")
-        insert_response = supabase.table("meetings").insert(initial_meeting_data).execute()
-
-        if not insert_response.data:
-            print(f"Failed to create initial meeting record: {insert_response.error}")
+        try:
+            inserted = await repository.insert(initial_meeting_data)
+        except Exception as insert_error:
+            print(f"Failed to create initial meeting record: {insert_error}")
             raise HTTPException(status_code=500, detail="Failed to initialize analysis process.")
             
         # Retrieve the actual ID in case default was used (though we set it)
-        meeting_id = insert_response.data[0].get('id', meeting_id) 
+        meeting_id = inserted.get('id', meeting_id) 
         print(f"Initial record created with ID: {meeting_id}")
 
-        # 3. Add the long-running task to BackgroundTasks
-        # WARNING: run_analysis_and_save MUST be synchronous or use workarounds.
-        # Pass the necessary arguments, including the Supabase client.
-        background_tasks.add_task(
-            run_analysis_and_save, 
-            main_file_path,     # Pass main file path
-            main_file_type,     # Pass main file type
-            chat_file_path,     # Pass chat file path (can be None)
-            meeting_id, 
-            supabase # Pass the dependency
-        )
-        print(f"Background task added for meeting ID: {meeting_id}")
+        # 3. Queue the long-running analysis for the job workers
+        job = await run_in_threadpool(enqueue_analysis_job, DATASET_ANALYSIS, {
+            "file_path": main_file_path,
+            "file_type": main_file_type,
+            "chat_file_path": chat_file_path, # Can be None
+            "meeting_id": str(meeting_id)
+        }, priority)
+        print(f"Analysis job {job.id} queued for meeting ID: {meeting_id}")
 
-        # 4. Return 202 Accepted with the meeting ID
-        return JSONResponse(
+        # 4. Return 202 Accepted with the meeting and job IDs
+        return JSONBytesResponse(
             content={
-                "message": "Analysis started in background.", 
-                "meeting_id": str(meeting_id)
+                "message": "Analysis queued.", 
+                "meeting_id": str(meeting_id),
+                "job_id": job.id,
+                "status_url": f"/api/jobs/{job.id}"
             },
             status_code=202
         )
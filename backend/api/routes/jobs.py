@@ -0,0 +1,120 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from db.repository import RepositoryUnavailable, get_repository
+from services.analysis_jobs import record_cancellation
+from services.job_queue import CANCELLED, FINISHED_STATES, get_job_queue
+from services.serialization import JSONBytesResponse, dumps
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["Jobs"],
+)
+
+EVENT_POLL_INTERVAL_SECONDS = 0.5 # How often the stream checks the (local) queue store for new events
+EVENT_KEEPALIVE_SECONDS = 15.0 # Comment line sent when idle, so proxies keep the connection open
+
+def _sse_message(event_id: int, event_type: str, data: dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode('utf-8'), dumps(data))
+
+@router.get("/{job_id}", summary="Get the status of a queued analysis job")
+async def get_job(job_id: str):
+    """Returns the job's state (queued, running, succeeded, failed), attempts, last error,
+    its progress events so far and, once it has succeeded, its result."""
+    queue = get_job_queue()
+    try:
+        job = await run_in_threadpool(queue.get, job_id)
+        events = await run_in_threadpool(queue.list_events, job_id) if job is not None else []
+    except Exception as e:
+        print(f"Error reading job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read job status.")
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    content = job.model_dump(exclude={"payload", "lease_owner"})
+    content["events"] = events
+    return JSONBytesResponse(content=content)
+
+@router.delete("/{job_id}", summary="Cancel a queued or running analysis job")
+async def cancel_job(job_id: str):
+    """Cancels the job. A queued job is cancelled at once (200); a running one is asked to
+    stop and does so at the pipeline's next checkpoint, within a few seconds (202; follow
+    it on /events). Cancelling a finished job is a conflict (409)."""
+    queue = get_job_queue()
+    try:
+        job = await run_in_threadpool(queue.cancel, job_id)
+    except Exception as e:
+        print(f"Error cancelling job {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to cancel job.")
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.state == CANCELLED:
+        if not job.cancel_requested: # It never ran
+            try:
+                await record_cancellation(job, await get_repository())
+            except RepositoryUnavailable as e:
+                print(f"Could not mark the meeting of cancelled job {job_id}: {e}")
+        return JSONBytesResponse(content={"job_id": job_id, "state": job.state})
+    if not job.cancel_requested:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already {job.state}.")
+    return JSONBytesResponse(status_code=202, content={"job_id": job_id, "state": job.state, "cancel_requested": True})
+
+@router.get("/{job_id}/events", summary="Stream a job's progress events (Server-Sent Events)")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None)
+):
+    """Streams the job's stage events as `text/event-stream`, starting with those already
+    recorded, and ends with an `end` event carrying the job's final state.
+
+    Each message's `id` is the event ID, so a reconnecting EventSource resumes where it left
+    off (`Last-Event-ID`); `?after=<id>` does the same for other clients.
+    """
+    queue = get_job_queue()
+    job = await run_in_threadpool(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def event_stream():
+        last_id = after
+        idle_seconds = 0.0
+        finishing = False
+        yield b"retry: 2000\n\n"
+        while True:
+            events = await run_in_threadpool(queue.list_events, job_id, last_id)
+            for event in events:
+                last_id = event["id"]
+                yield _sse_message(last_id, event["type"], event)
+            if events:
+                idle_seconds = 0.0
+                continue # There may be more than one page
+            if finishing:
+                current = await run_in_threadpool(queue.get, job_id)
+                yield _sse_message(last_id, "end", {"state": current.state if current else None,
+                                                    "result": current.result if current else None,
+                                                    "last_error": current.last_error if current else None})
+                return
+            if await request.is_disconnected():
+                return
+            current = await run_in_threadpool(queue.get, job_id)
+            if current is None or current.state in FINISHED_STATES:
+                # The worker records its last event right after the state; read once more first
+                finishing = True
+            await asyncio.sleep(EVENT_POLL_INTERVAL_SECONDS)
+            idle_seconds += EVENT_POLL_INTERVAL_SECONDS
+            if idle_seconds >= EVENT_KEEPALIVE_SECONDS:
+                idle_seconds = 0.0
+                yield b": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
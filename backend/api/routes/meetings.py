@@ -1,22 +1,36 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Request, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from typing_extensions import Annotated
 from typing import List, Union, Optional
 import os
-import shutil
-import tempfile
+import re
 import uuid
+import asyncio
+import time
 from datetime import datetime
+from pathlib import Path
 from pydantic import BaseModel
 import json
 
 from models.meeting import MeetingRecord, MeetingAnalysisJSON, SentimentAnalysisOutput, SpeakerAnalysisOutput, TopicsOutput, ParticipantStatsOutput, ReactionItemOutput, ReactionsAnalysisOutput
-from db.supabase_client import get_supabase_client
-from supabase import Client
-
-# Import the SHARED analysis pipeline function
-from services.analysis_pipeline import run_full_analysis_pipeline
-from services.pdf_generator import generate_pdf_report, generate_pdf_from_file
+from db.repository import MeetingRepository
+from db.meeting_summaries import InvalidCursor, decode_cursor, encode_cursor, normalize_date
+from api.dependencies import meeting_repository
+
+# Version stamp of the SHARED analysis pipeline (upload de-duplication)
+from services.analysis_pipeline import PIPELINE_VERSION
+from services.pdf_generator import generate_pdf_report, generate_pdf_from_file, PDF_TEMPLATE_VERSION
+from services.pdf_cache import hash_analysis, check_cache, save_to_cache
+from services.analysis_jobs import DATASET_ANALYSIS, MEETING_DATASET_ANALYSIS, enqueue_analysis_job
+from services.pdf_render_pool import get_render_pool, iter_file, RenderQueueFull, RenderTimeout
+from services.serialization import JSONBytesResponse
+from services.analysis_bundle import ANALYSIS_DATA_ROOT, load_component
+from services.meeting_versions import reconstruct_analysis
+from services.zip_stream import ZipStreamWriter
+from services.uploads import store_upload, REUSABLE_STATUSES, UPLOAD_CHUNK_SIZE
+from services.chunked_uploads import ChunkWriter, UploadError, create_session, finish_session, get_session
+from api.http_caching import make_etag, etag_matches, cache_headers, not_modified
 
 router = APIRouter(
     prefix="/api/meetings",
@@ -40,111 +54,257 @@ MEETING_ID_TO_DIRECTORY_MAP = {
 TRANSCRIPT_FILENAMES = ["transcript.vtt"] # Add other possible names like .txt, .m4a
 CHAT_FILENAME = "chat.txt" # Assuming this is the standard chat file name
 
+ALLOWED_UPLOAD_EXTENSIONS = {".vtt", ".txt", ".m4a"}
+
 class AnalyzeDatasetRequest(BaseModel):
     meetingId: str # The logical meeting ID (e.g., "zoom-dataset-1")
 
 @router.post("/analyze", summary="Upload and analyze a meeting file")
 async def analyze_meeting(
-    supabase: Annotated[Union[Client, None], Depends(get_supabase_client)],
-    file: UploadFile = File(...)
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    file: UploadFile = File(...),
+    priority: Optional[int] = Query(None, description="Queue priority; higher runs sooner")
 ):
     """
-    Accepts a meeting file (.vtt, .txt, .m4a), processes it through the AI pipeline,
-    stores the results in Supabase, and returns the analysis.
-    """
-    if supabase is None:
-        raise HTTPException(status_code=503, detail="Supabase client not available")
+    Accepts a meeting file (.vtt, .txt, .m4a) and queues it for analysis.
 
+    The upload is hashed while it is stored. If this content has already been analysed by
+    the current pipeline version (or is being analysed), that meeting is returned at once
+    (200, `deduplicated: true`) instead of running the pipeline again. Otherwise a meeting
+    record is created and the analysis queued (202); follow it at `status_url`.
+    """
     if not file.filename:
          raise HTTPException(status_code=400, detail="No filename provided")
 
     # Validate file type
     file_extension = os.path.splitext(file.filename)[1].lower()
-    allowed_extensions = {".vtt", ".txt", ".m4a"}
-    if file_extension not in allowed_extensions:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed types: {', '.join(allowed_extensions)}")
+    if file_extension not in ALLOWED_UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}")
 
-    # Save uploaded file temporarily
-    temp_dir = tempfile.mkdtemp()
-    temp_file_path = os.path.join(temp_dir, file.filename)
     try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        print(f"Temporary file saved at: {temp_file_path}")
-
-        # Run the analysis pipeline using the SHARED function
-        file_type = file_extension[1:]
-        analysis_result: MeetingAnalysisJSON = await run_full_analysis_pipeline(temp_file_path, file_type)
-
-        # TODO: Get authenticated user ID (replace with actual auth logic)
-        # user_id = uuid.uuid4() # Placeholder
-        # TODO: Replace with actual authenticated user's email from request context/token
-        user_email_placeholder = "test@example.com" 
-
-        # Prepare data for Supabase insertion
-        meeting_data_to_insert = {
-            # "user_id": str(user_id),
-            "created_by": user_email_placeholder, # Use created_by
-            "file_name": file.filename,
-            "analysis_json": analysis_result.model_dump(exclude_unset=True), 
-            # Potentially redundant fields - get from analysis_json if needed
-            # Add dummy values for required fields if not already set by defaults
-            "title": analysis_result.metadata.get("source_file", "Uploaded Meeting"), # Use filename as title default
-            "date": datetime.utcnow().isoformat(), # Format date to ISO string
-        }
-
-        # Insert into Supabase
-        try:
-            insert_response = supabase.table("meetings").insert(meeting_data_to_insert).execute()
-            
-            if not insert_response.data:
-                 # Log the error details if available in the response
-                 print("Supabase insertion error:", insert_response.error)
-                 raise HTTPException(status_code=500, detail="Failed to store analysis results in database.")
-            
-            inserted_record = insert_response.data[0]
-            print(f"Analysis results stored in Supabase with ID: {inserted_record.get('id')}")
-            
-            # Return the analysis results along with the new ID
-            return JSONResponse(content={
-                "success": True, 
-                "meeting_id": inserted_record.get('id'),
-                "analysis": analysis_result.model_dump(exclude_unset=True)
-            }, status_code=201)
+        stored_path, content_hash, size = await run_in_threadpool(store_upload, file.file, file_extension)
+    except Exception as e:
+        print(f"Error storing upload {file.filename}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error storing file: {e}")
+    print(f"Upload {file.filename} stored at {stored_path} ({size} bytes, sha256 {content_hash})")
 
-        except Exception as db_error:
-            print(f"Database insertion error: {db_error}")
-            raise HTTPException(status_code=500, detail=f"Database error: {db_error}")
+    return await _analyze_stored_upload(repository, stored_path, content_hash, file.filename, priority)
 
+async def _analyze_stored_upload(repository: MeetingRepository, stored_path: str, content_hash: str, filename: str, priority: Optional[int]):
+    """Returns the analysis of an earlier upload of the same content, or queues one."""
+    try:
+        existing = await repository.find_by_content(content_hash, PIPELINE_VERSION, REUSABLE_STATUSES)
     except Exception as e:
-        # Catch errors during file processing or analysis
-        print(f"Error during analysis process: {e}")
-        raise HTTPException(status_code=500, detail=f"Error processing file: {e}")
+        # Not finding a duplicate only costs a redundant analysis
+        print(f"Error looking up analyses of content {content_hash}: {e}")
+        existing = None
+    if existing:
+        print(f"Content {content_hash} already analysed as meeting {existing['id']} ({existing['status']})")
+        return JSONBytesResponse(content={
+            "success": True,
+            "deduplicated": True,
+            "meeting_id": existing["id"],
+            "status": existing["status"],
+            "version": existing.get("version"),
+            "job_id": (existing.get("metadata_json") or {}).get("job_id"),
+            "result_url": f"/api/meetings/{existing['id']}/result"
+        })
+
+    logical_id = f"upload-{content_hash[:16]}"
+    metadata_json = {
+        "logical_id": logical_id,
+        "content_sha256": content_hash,
+        "pipeline_version": PIPELINE_VERSION,
+        "source_file": stored_path
+    }
+    try:
+        record, created = await repository.get_or_create_by_logical_id(logical_id, {
+            "id": str(uuid.uuid4()),
+            "created_by": "test@example.com", # TODO: Replace with the authenticated user's email
+            "file_name": filename,
+            "title": filename,
+            "date": datetime.utcnow().isoformat(),
+            "status": "PROCESSING",
+            "source_type": "upload",
+            "metadata_json": metadata_json
+        }, ("id", "status"))
+        meeting_id = str(record["id"])
+        if not created:
+            # Same content analysed before, but failed or by an older pipeline: analyse it again
+            print(f"Re-analysing content {content_hash} into meeting {meeting_id} (was {record.get('status')})")
+            await repository.update(meeting_id, {"status": "PROCESSING", "error_detail": None, "metadata_json": metadata_json})
+
+        job = await run_in_threadpool(enqueue_analysis_job, DATASET_ANALYSIS, {
+            "meeting_id": meeting_id,
+            "logical_meeting_id": logical_id,
+            "file_path": stored_path,
+            "file_type": os.path.splitext(stored_path)[1][1:],
+            "chat_file_path": None,
+            "output_dir": os.path.join(ANALYSIS_DATA_ROOT, logical_id)
+        }, priority)
+        # Lets a duplicate upload arriving while this runs point at the same job
+        await repository.update(meeting_id, {"metadata_json": {**metadata_json, "job_id": job.id}})
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error queueing analysis of {filename}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue analysis: {e}")
+
+    return JSONBytesResponse(status_code=202, content={
+        "success": True,
+        "deduplicated": False,
+        "meeting_id": meeting_id,
+        "status": "PROCESSING",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/meetings/{meeting_id}/result"
+    })
+
+class UploadInitRequest(BaseModel):
+    filename: str
+    size: int # Bytes
+    chunk_size: Optional[int] = None # Bytes; the server's default if omitted
+    sha256: Optional[str] = None # Whole-file checksum, verified on completion if given
+
+@router.post("/uploads", summary="Start a resumable chunked upload")
+async def start_chunked_upload(request: UploadInitRequest):
+    """
+    Opens a resumable upload for a large meeting file (see services.chunked_uploads).
+
+    Send the file in chunks of `chunk_size` bytes with `PUT /uploads/{upload_id}?offset=N`
+    and an `X-Chunk-SHA256` header, in any order and retrying any that fail; `GET
+    /uploads/{upload_id}` lists the offsets still missing after a reconnect. `POST
+    /uploads/{upload_id}/complete` then queues the analysis like `/analyze` does.
+    """
+    file_extension = os.path.splitext(request.filename)[1].lower()
+    if file_extension not in ALLOWED_UPLOAD_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_UPLOAD_EXTENSIONS)}")
+    try:
+        session = await run_in_threadpool(create_session, request.filename, file_extension, request.size, request.chunk_size, request.sha256)
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    print(f"Chunked upload {session.upload_id} started for {request.filename} ({request.size} bytes, {session.chunk_count} chunks)")
+    return JSONBytesResponse(status_code=201, content={
+        **session.status(),
+        "upload_url": f"/api/meetings/uploads/{session.upload_id}"
+    })
+
+@router.get("/uploads/{upload_id}", summary="Get the state of a chunked upload")
+async def get_chunked_upload(upload_id: str):
+    session = await run_in_threadpool(get_session, upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    return JSONBytesResponse(content=session.status())
+
+@router.put("/uploads/{upload_id}", summary="Upload one chunk of a chunked upload")
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of the chunk; a multiple of the chunk size"),
+    chunk_sha256: str = Header(..., alias="X-Chunk-SHA256", description="SHA-256 of the chunk, hex")
+):
+    """Writes the request body in place at `offset` as it arrives. The chunk is recorded only
+    if its length and checksum match; otherwise the client sends it again. A chunk already
+    received is checked but not written again."""
+    session = await run_in_threadpool(get_session, upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    try:
+        writer = await run_in_threadpool(ChunkWriter, session, offset)
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    try:
+        buffer = bytearray()
+        async for data in request.stream():
+            buffer += data
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await run_in_threadpool(writer.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(writer.write, bytes(buffer))
+        session = await run_in_threadpool(writer.commit, chunk_sha256)
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
     finally:
-        # Clean up temporary file and directory
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        print(f"Temporary directory cleaned up: {temp_dir}")
+        writer.close()
+    return JSONBytesResponse(content=session.status())
+
+@router.post("/uploads/{upload_id}/complete", summary="Finish a chunked upload and analyze the file")
+async def complete_chunked_upload(
+    upload_id: str,
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    priority: Optional[int] = Query(None, description="Queue priority; higher runs sooner")
+):
+    """
+    Checks that every chunk arrived, moves the assembled file into the upload store (a
+    rename, not a copy) and queues its analysis, or returns an earlier analysis of the same
+    content, exactly as `/analyze` does.
+    """
+    try:
+        session, stored_path, content_hash = await run_in_threadpool(finish_session, upload_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found or expired")
+    except UploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    print(f"Chunked upload {upload_id} of {session.filename} stored at {stored_path} ({session.size} bytes, sha256 {content_hash})")
+
+    return await _analyze_stored_upload(repository, stored_path, content_hash, session.filename, priority)
 
 # TODO: Add GET endpoint to retrieve analysis by ID
 
+async def _render_cached_pdf(meeting_key: str, version: Optional[int], analysis_json_data, render_fn, render_args: tuple):
+    """The cached report's path; on a miss renders `render_fn(*render_args)` in the PDF worker
+    pool, caches it and returns the spooled result (positioned at the start).
+
+    `render_args[0]` is the analysis (as a model or as `analysis_json_data`); the other
+    arguments change the rendered report too, so they are hashed into the cache key with
+    the analysis.
+
+    Raises RenderQueueFull / RenderTimeout from the pool.
+    """
+    content_hash = await run_in_threadpool(hash_analysis, [analysis_json_data, *render_args[1:]])
+    cache_path = check_cache(meeting_key, version, content_hash)
+    if cache_path is not None:
+        return cache_path
+    spool = await get_render_pool().render(render_fn, *render_args)
+    await run_in_threadpool(save_to_cache, meeting_key, version, content_hash, spool)
+    spool.seek(0)
+    return spool
+
+async def _cached_pdf_response(meeting_key: str, version: Optional[int], analysis_json_data, render_fn, render_args: tuple, headers: dict):
+    """Streams the report from the PDF cache, or from a fresh render on a miss."""
+    try:
+        pdf_source = await _render_cached_pdf(meeting_key, version, analysis_json_data, render_fn, render_args)
+    except RenderQueueFull as queue_err:
+        print(f"PDF render queue full for meeting {meeting_key}: {queue_err}")
+        raise HTTPException(status_code=503, detail="Too many PDF reports are being generated. Try again shortly.", headers={"Retry-After": "5"})
+    except RenderTimeout as timeout_err:
+        print(f"PDF render timed out for meeting {meeting_key}: {timeout_err}")
+        raise HTTPException(status_code=504, detail=str(timeout_err))
+    if isinstance(pdf_source, Path):
+        return FileResponse(pdf_source, media_type="application/pdf", headers=headers)
+    return StreamingResponse(iter_file(pdf_source), media_type="application/pdf", headers=headers)
+
 @router.get("/download-pdf/{meeting_id}", summary="Download meeting analysis as PDF")
 async def download_pdf(
     meeting_id: str,  # Changed from uuid.UUID to str to allow logical IDs
-    supabase: Annotated[Union[Client, None], Depends(get_supabase_client)],
+    request: Request,
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
     version: Optional[int] = None
 ):
     """Fetches analysis data for a meeting ID and generates a comprehensive PDF report 
     that matches the dashboard display with metrics, summary, speakers, topics, and insights.
     
     Optionally specify a version number to get a historical version.
+    Responses carry an ETag; If-None-Match gets a 304 without re-rendering.
     """
     # Import MeetingAnalysisJSON here to ensure it's available
     from models.meeting import MeetingAnalysisJSON
     
-    if supabase is None:
-        raise HTTPException(status_code=503, detail="Supabase client not available")
-
     try:
         print(f"Fetching meeting data for PDF export: {meeting_id}, version: {version or 'latest'}")
         
@@ -157,18 +317,28 @@ async def download_pdf(
             # Not a UUID, assume it's a logical ID
             is_uuid = False
             
-        # Query based on UUID or logical ID
-        if is_uuid:
-            # Base query to get the record by UUID
-            query = supabase.table("meetings").select("id, file_name, title, analysis_json, version, previous_versions, metadata_json").eq("id", meeting_id)
-        else:
-            # Query by logical_id in metadata_json
-            query = supabase.table("meetings").select("id, file_name, title, analysis_json, version, previous_versions, metadata_json").filter("metadata_json->>'logical_id'", "eq", meeting_id)
-        
+        # Query based on UUID or logical ID (indexed)
+        async def select_meeting(columns):
+            if is_uuid:
+                return await repository.get(meeting_id, columns)
+            return await repository.get_by_logical_id(meeting_id, columns)
+
+        # Validator read first: an unchanged report is answered with 304 before anything is rendered
+        validator = await select_meeting(("id", "version", "updated_at"))
+        etag = None
+        if validator:
+            etag = make_etag(
+                "pdf", validator.get("id"), validator.get("version"),
+                validator.get("updated_at"), version, PDF_TEMPLATE_VERSION
+            )
+            if etag_matches(request, etag):
+                print(f"PDF for {meeting_id} not modified")
+                return not_modified(etag)
+
         # Execute query to get the record
-        result = query.maybe_single().execute()
+        record = await select_meeting(("id", "file_name", "title", "analysis_json", "version", "metadata_json"))
 
-        if not result or not result.data:
+        if not record:
             # If logical ID didn't work, try finding the record in the filesystem
             if not is_uuid:
                 # Try to load analysis directly from file system
@@ -177,6 +347,10 @@ async def download_pdf(
                 full_path = os.path.join(project_root, analysis_file_path)
                 
                 if os.path.exists(full_path):
+                    file_stat = os.stat(full_path)
+                    file_etag = make_etag("pdf-file", full_path, file_stat.st_mtime_ns, file_stat.st_size, version, PDF_TEMPLATE_VERSION)
+                    if etag_matches(request, file_etag):
+                        return not_modified(file_etag)
                     try:
                         # Open the file with explicit UTF-8 encoding to handle special characters
                         with open(full_path, 'r', encoding='utf-8') as f:
@@ -186,19 +360,18 @@ async def download_pdf(
                         if not "metadata" in analysis_json_data:
                             analysis_json_data["metadata"] = {}
                             
-                        # Generate PDF with error handling
+                        # Generate PDF with error handling (or serve the cached render)
                         try:
-                            pdf_buffer = generate_pdf_from_file(analysis_json_data, meeting_id, version)
-                            
                             # Create a descriptive filename
                             pdf_filename = f"meeting_analysis_{meeting_id}.pdf"
                             
-                            # Return the PDF stream
-                            return StreamingResponse(
-                                pdf_buffer, 
-                                media_type="application/pdf",
-                                headers={"Content-Disposition": f"attachment; filename=\"{pdf_filename}\""}
+                            return await _cached_pdf_response(
+                                meeting_id, version, analysis_json_data,
+                                generate_pdf_from_file, (analysis_json_data, meeting_id, version),
+                                {"Content-Disposition": f"attachment; filename=\"{pdf_filename}\"", **cache_headers(file_etag)}
                             )
+                        except HTTPException:
+                            raise
                         except Exception as pdf_err:
                             print(f"Error generating PDF from file data: {pdf_err}")
                             raise HTTPException(status_code=500, detail=f"Error generating PDF: {pdf_err}")
@@ -213,23 +386,25 @@ async def download_pdf(
                             if not "metadata" in analysis_json_data:
                                 analysis_json_data["metadata"] = {}
                                 
-                            pdf_buffer = generate_pdf_from_file(analysis_json_data, meeting_id, version)
-                            return StreamingResponse(
-                                pdf_buffer, 
-                                media_type="application/pdf",
-                                headers={"Content-Disposition": f"attachment; filename=\"meeting_analysis_{meeting_id}.pdf\""}
+                            return await _cached_pdf_response(
+                                meeting_id, version, analysis_json_data,
+                                generate_pdf_from_file, (analysis_json_data, meeting_id, version),
+                                {"Content-Disposition": f"attachment; filename=\"meeting_analysis_{meeting_id}.pdf\"", **cache_headers(file_etag)}
                             )
+                        except HTTPException:
+                            raise
                         except Exception as fallback_err:
                             print(f"Error in fallback encoding path: {fallback_err}")
                             raise HTTPException(status_code=500, detail=f"Could not process file with encoding issues: {fallback_err}")
+                    except HTTPException:
+                        raise
                     except Exception as file_err:
                         print(f"Error loading analysis from file: {file_err}")
                         
             raise HTTPException(status_code=404, detail=f"Meeting analysis not found for ID: {meeting_id}")
             
-        record = result.data
         current_version = record.get("version", 1)
-        original_filename = record.get("file_name", "meeting")
+        original_filename = record.get("file_name") or "meeting" # As the export renders it, so both share cache entries
         meeting_title = record.get("title", "Meeting Analysis")
         analysis_json_data = record.get("analysis_json")
         
@@ -243,52 +418,58 @@ async def download_pdf(
             analysis_json_data["metadata"] = {}
         
         # Check if a specific version was requested
+        is_compact = False
         if version is not None and version != current_version:
             print(f"Historical version {version} requested (current is {current_version})")
-            
-            # Check if the requested version exists in previous_versions
-            previous_versions = record.get("previous_versions", [])
-            requested_version = None
-            
-            for v in previous_versions:
-                if v.get("version") == version:
-                    requested_version = v
-                    break
-                    
+
+            # Superseded versions are rows of meeting_versions, looked up by (meeting_id, version)
+            requested_version = await repository.get_version(record["id"], version)
             if not requested_version:
                 raise HTTPException(status_code=404, detail=f"Version {version} not found for meeting ID: {meeting_id}")
-                
-            print(f"Found historical version {version} in previous_versions")
-            
-            # For historical versions, we only have compact data
-            # If full historical data is needed, you can fetch it from file storage
-            # or enhance the compact version for PDF generation
-            
-            # Extract available data from compact version
-            compact_data = {
-                "meeting_title": meeting_title,
-                "meetingId": record.get("metadata_json", {}).get("logical_id", str(meeting_id)),
-                "meetingTitle": f"{original_filename} (Version {version})",
-                "summary": requested_version.get("summary", ""),
-                "date": requested_version.get("timestamp", ""),
-                "sentiment": requested_version.get("sentiment", {"overall": 0}),
-                "topics": {"topics": [{"name": t, "percentage": 0} for t in requested_version.get("topics", [])]},
-                "action_items": requested_version.get("action_items", []),
-                "version_info": {
-                    "version": version,
-                    "is_historical": True,
-                    "current_version": current_version
+
+            # Rebuild the full historical analysis from the current one and the version deltas
+            historical_data = None
+            if requested_version.get("analysis_delta") and isinstance(analysis_json_data, dict):
+                version_rows = await repository.list_versions(record["id"], from_version=version, with_deltas=True)
+                historical_data = reconstruct_analysis(analysis_json_data, current_version, version, version_rows)
+
+            if historical_data is not None:
+                print(f"Reconstructed full analysis of historical version {version}")
+                analysis_json_data = {
+                    **historical_data,
+                    "version_info": {
+                        "version": version,
+                        "is_historical": True,
+                        "current_version": current_version
+                    }
                 }
-            }
-            
-            analysis_json_data = compact_data
-            
+            else:
+                # History kept without deltas: only the compact summary of the version exists
+                print(f"Found compact summary of historical version {version}")
+                summary = requested_version.get("summary") or {}
+                analysis_json_data = {
+                    "meeting_title": meeting_title,
+                    "meetingId": (record.get("metadata_json") or {}).get("logical_id", str(meeting_id)),
+                    "meetingTitle": f"{original_filename} (Version {version})",
+                    "summary": summary.get("summary", ""),
+                    "date": summary.get("timestamp", ""),
+                    "sentiment": summary.get("sentiment", {"overall": 0}),
+                    "topics": {"topics": [{"name": t, "percentage": 0} for t in summary.get("topics", [])]},
+                    "action_items": summary.get("action_items", []),
+                    "version_info": {
+                        "version": version,
+                        "is_historical": True,
+                        "current_version": current_version
+                    }
+                }
+                is_compact = True
+
         if not analysis_json_data:
             raise HTTPException(status_code=404, detail=f"Analysis data missing for meeting ID: {meeting_id}")
 
-        # Validate data with Pydantic model for current version
-        # For historical version, we use the compact data directly
-        if version is None or version == current_version:
+        # Validate data with Pydantic model for full analyses (current or reconstructed)
+        # For a historical version kept only as a summary, we use the compact data directly
+        if not is_compact:
             try:
                 # Add meeting title to the data if available
                 if meeting_title and not analysis_json_data.get("meeting_title"):
@@ -302,25 +483,28 @@ async def download_pdf(
             # Use compact data directly
             analysis_data = analysis_json_data
 
-        # Generate PDF
-        try:
-            pdf_buffer = generate_pdf_report(analysis_data, original_filename)
-        except Exception as pdf_error:
-             print(f"PDF generation error for meeting {meeting_id}: {pdf_error}")
-             raise HTTPException(status_code=500, detail="Failed to generate PDF report.")
-
         # Create filename for download
         pdf_filename_base = meeting_title or os.path.splitext(os.path.basename(original_filename))[0]
         pdf_filename_base = pdf_filename_base.replace(" ", "_").replace(":", "_")
         version_suffix = f"_v{version}" if version is not None else ""
         pdf_filename = f"{pdf_filename_base}_analysis{version_suffix}.pdf"
 
-        # Return PDF as a streaming response
-        return StreamingResponse(
-            pdf_buffer, 
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=\"{pdf_filename}\""}
-        )
+        headers = {"Content-Disposition": f"attachment; filename=\"{pdf_filename}\""}
+        if etag:
+            headers.update(cache_headers(etag))
+
+        # Serve the cached render if this exact content was rendered before, else generate PDF
+        try:
+            return await _cached_pdf_response(
+                str(record.get("id") or meeting_id), version or current_version, analysis_json_data,
+                generate_pdf_report, (analysis_data, original_filename),
+                headers
+            )
+        except HTTPException:
+            raise
+        except Exception as pdf_error:
+             print(f"PDF generation error for meeting {meeting_id}: {pdf_error}")
+             raise HTTPException(status_code=500, detail="Failed to generate PDF report.")
 
     except HTTPException as http_exc: # Re-raise HTTP exceptions
         raise http_exc
@@ -328,31 +512,288 @@ async def download_pdf(
         print(f"Error during PDF download process for meeting {meeting_id}: {e}")
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred during PDF generation: {e}")
 
+# --- Meeting list ---
+MAX_LIST_PAGE_SIZE = 200
+
+@router.get("", summary="List meetings with their headline metrics")
+async def list_meetings(
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    limit: int = Query(50, ge=1, le=MAX_LIST_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    sort: str = Query("date", pattern="^(date|engagement)$", description="Order by meeting date or engagement score"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    platform: Optional[str] = Query(None, description="Only meetings from this platform, e.g. 'zoom'"),
+    status: Optional[str] = Query(None, description="Only meetings with this analysis status, e.g. 'COMPLETE'"),
+    date_from: Optional[datetime] = Query(None, description="Meetings dated at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Meetings dated at or before this time"),
+    min_engagement: Optional[float] = Query(None, description="Minimum engagement score"),
+    max_engagement: Optional[float] = Query(None, description="Maximum engagement score")
+):
+    """Pages through meetings with their title, date, platform, duration, engagement,
+    overall sentiment, participant counts and status.
+
+    Served from the per-meeting summary rows (db.meeting_summaries), never from the
+    analyses. Pages are keyset-paginated: pass the previous page's `next_cursor` (with
+    the same sort and order) to get the next one; it is null on the last page. Sorting by
+    engagement lists only meetings that have an engagement score.
+    """
+    descending = order == "desc"
+    try:
+        after = decode_cursor(cursor, sort, descending) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # One row more than the page tells whether there is a next page
+        rows = await repository.list_summaries(
+            sort, descending, limit + 1, after,
+            platform=platform, status=status,
+            date_from=normalize_date(date_from), date_to=normalize_date(date_to),
+            min_engagement=min_engagement, max_engagement=max_engagement
+        )
+    except Exception as db_error:
+        print(f"Error listing meetings: {db_error}")
+        raise HTTPException(status_code=500, detail=f"Database error: {db_error}")
+
+    page = rows[:limit]
+    return JSONBytesResponse(content={
+        "meetings": page,
+        "next_cursor": encode_cursor(sort, descending, page[-1]) if len(rows) > limit else None
+    })
+
+# --- Bulk PDF Export ---
+MAX_EXPORT_MEETINGS = int(os.environ.get("MAX_EXPORT_MEETINGS", "200"))
+EXPORT_QUEUE_RETRY_SECONDS = 2.0 # Back-off while other requests have the render queue full
+# How long one meeting waits for room in the render queue before it is listed in errors.txt
+EXPORT_QUEUE_MAX_WAIT_SECONDS = float(os.environ.get("EXPORT_QUEUE_MAX_WAIT_SECONDS", "120"))
+_EXPORT_COLUMNS = ("id", "file_name", "title", "version", "status", "created_at", "logical_id")
+
+async def _select_export_meetings(repository: MeetingRepository, ids: List[str], date_from: Optional[datetime], date_to: Optional[datetime]):
+    """Meeting records to export (without analysis_json) and the requested IDs that matched none."""
+    records = {}
+    if ids:
+        uuid_ids, logical_ids = [], []
+        for meeting_id in ids:
+            try:
+                uuid_ids.append(str(uuid.UUID(meeting_id)))
+            except ValueError:
+                logical_ids.append(meeting_id)
+        for record in await repository.list_by_ids(uuid_ids, logical_ids, _EXPORT_COLUMNS):
+            records[record["id"]] = record
+        found = {str(r["id"]) for r in records.values()} | {r.get("logical_id") for r in records.values()}
+        missing = [meeting_id for meeting_id in ids if meeting_id not in found and str(meeting_id).lower() not in found]
+    else:
+        for record in await repository.list_created_between(
+            date_from.isoformat() if date_from else None, date_to.isoformat() if date_to else None,
+            MAX_EXPORT_MEETINGS + 1, _EXPORT_COLUMNS
+        ):
+            records[record["id"]] = record
+        missing = []
+    return sorted(records.values(), key=lambda r: r.get("created_at") or ""), missing
+
+def _export_filename(record: dict, used: set) -> str:
+    base = record.get("title") or os.path.splitext(os.path.basename(record.get("file_name") or "meeting"))[0]
+    base = re.sub(r'[^A-Za-z0-9._-]+', '_', base).strip('_') or "meeting"
+    name = f"{base}_analysis_v{record.get('version', 1)}.pdf"
+    if name in used:
+        name = f"{base}_{str(record['id'])[:8]}_analysis_v{record.get('version', 1)}.pdf"
+    used.add(name)
+    return name
+
+async def _export_meeting_pdf(repository: MeetingRepository, record: dict):
+    """Current-version report of one meeting, from the PDF cache or the worker pool."""
+    stored = await repository.get(record["id"], ("analysis_json",))
+    analysis_json_data = stored.get("analysis_json") if stored else None
+    if not isinstance(analysis_json_data, dict) or not analysis_json_data:
+        raise ValueError("no analysis data stored")
+
+    # Same preparation as download_pdf, so both share cache entries
+    meeting_title = record.get("title")
+    if meeting_title and not analysis_json_data.get("meeting_title"):
+        analysis_json_data["meeting_title"] = meeting_title
+    if "metadata" not in analysis_json_data:
+        analysis_json_data["metadata"] = {}
+    analysis_data = MeetingAnalysisJSON(**analysis_json_data)
+
+    give_up_at = time.monotonic() + EXPORT_QUEUE_MAX_WAIT_SECONDS
+    while True:
+        try:
+            return await _render_cached_pdf(
+                str(record["id"]), record.get("version", 1), analysis_json_data,
+                generate_pdf_report, (analysis_data, record.get("file_name") or "meeting")
+            )
+        except RenderQueueFull:
+            if time.monotonic() + EXPORT_QUEUE_RETRY_SECONDS > give_up_at:
+                raise RenderQueueFull(f"render queue stayed full for {EXPORT_QUEUE_MAX_WAIT_SECONDS:g}s")
+            await asyncio.sleep(EXPORT_QUEUE_RETRY_SECONDS)
+
+@router.get("/export", summary="Download the PDF reports of many meetings as one ZIP")
+async def export_meetings_pdf(
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    ids: Optional[str] = Query(None, description="Comma-separated meeting UUIDs and/or logical IDs"),
+    date_from: Optional[datetime] = Query(None, description="Meetings created at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Meetings created at or before this time")
+):
+    """Streams a ZIP of the meetings' current-version PDF reports.
+
+    Reports are rendered in parallel through the PDF worker pool (cached reports are reused)
+    and each is added to the archive as soon as it is ready, so the archive is never held
+    in memory. Meetings that could not be exported are listed in `errors.txt`.
+    """
+    id_list = [i.strip() for i in (ids or "").split(",") if i.strip()]
+    if not id_list and date_from is None and date_to is None:
+        raise HTTPException(status_code=400, detail="Pass 'ids' or a 'date_from'/'date_to' range.")
+    if len(id_list) > MAX_EXPORT_MEETINGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_EXPORT_MEETINGS} meetings per export.")
+
+    try:
+        records, missing = await _select_export_meetings(repository, id_list, date_from, date_to)
+    except Exception as db_error:
+        print(f"Error selecting meetings for export: {db_error}")
+        raise HTTPException(status_code=500, detail=f"Database error: {db_error}")
+    if len(records) > MAX_EXPORT_MEETINGS:
+        raise HTTPException(status_code=400, detail=f"More than {MAX_EXPORT_MEETINGS} meetings in range; narrow the dates.")
+    if not records:
+        raise HTTPException(status_code=404, detail="No meetings matched the export.")
+    print(f"Exporting {len(records)} meeting report(s)")
+
+    async def stream_zip():
+        archive = ZipStreamWriter()
+        errors = [f"{meeting_id}: meeting not found" for meeting_id in missing]
+        used_names = set()
+        concurrency = asyncio.Semaphore(get_render_pool().workers)
+
+        async def export_one(record):
+            if record.get("status") not in (None, "COMPLETE"):
+                return record, None, ValueError(f"analysis status is {record.get('status')}")
+            async with concurrency:
+                try:
+                    return record, await _export_meeting_pdf(repository, record), None
+                except Exception as e:
+                    return record, None, e
+
+        tasks = [asyncio.create_task(export_one(record)) for record in records]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                record, pdf_source, error = await next_done
+                if error is not None:
+                    print(f"Export of meeting {record['id']} failed: {error}")
+                    errors.append(f"{record.get('logical_id') or record['id']}: {error}")
+                    continue
+                try:
+                    await run_in_threadpool(archive.write_file, _export_filename(record, used_names), pdf_source)
+                finally:
+                    if not isinstance(pdf_source, Path):
+                        pdf_source.close()
+                yield archive.drain()
+            if errors:
+                archive.write_bytes("errors.txt", ("\n".join(errors) + "\n").encode('utf-8'))
+            yield archive.close()
+        finally:
+            for task in tasks: # Client went away: stop rendering
+                task.cancel()
+
+    zip_filename = f"meeting_reports_{datetime.utcnow().strftime('%Y%m%d')}.zip"
+    return StreamingResponse(
+        stream_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=\"{zip_filename}\""}
+    )
+
+# --- Result Projection & Pagination ---
+# Accepted `fields=` names (field names and their aliases) -> key stored in analysis_json
+_ANALYSIS_FIELD_KEYS = {}
+for _name, _field in MeetingAnalysisJSON.model_fields.items():
+    _ANALYSIS_FIELD_KEYS[_name] = _name
+    if _field.alias:
+        _ANALYSIS_FIELD_KEYS[_field.alias] = _name
+_JSON_PATH_SEGMENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def _parse_fields(fields: str) -> List[List[str]]:
+    """Splits `fields=` ("meetingTitle,sentiment.overall,...") into stored-key paths."""
+    paths = []
+    for raw in fields.split(","):
+        segments = [segment.strip() for segment in raw.strip().split(".")]
+        if not segments[0]:
+            continue
+        if segments[0] not in _ANALYSIS_FIELD_KEYS or not all(_JSON_PATH_SEGMENT.match(seg) for seg in segments[1:]):
+            raise HTTPException(status_code=400, detail=f"Unknown analysis field: '{raw.strip()}'")
+        paths.append([_ANALYSIS_FIELD_KEYS[segments[0]]] + segments[1:])
+    if not paths:
+        raise HTTPException(status_code=400, detail="'fields' must name at least one analysis field.")
+    return paths
+
+def _set_path(target: dict, path: List[str], value) -> None:
+    for segment in path[:-1]:
+        target = target.setdefault(segment, {})
+    target[path[-1]] = value
+
+def _keyset_page(items: List[dict], after: int, limit: int, index_key: str) -> dict:
+    """Items after index `after`, each tagged with its index, plus the cursor for the next page."""
+    start = after + 1
+    page = [{index_key: i, **item} for i, item in enumerate(items[start:start + limit], start)]
+    has_more = start + limit < len(items)
+    return {
+        "items": page,
+        "total": len(items),
+        "next_after": page[-1][index_key] if page and has_more else None
+    }
+
+async def _logical_meeting_id(repository: MeetingRepository, meeting_id: uuid.UUID) -> str:
+    """Logical meeting ID (the analysis-data directory name) of a meeting record."""
+    record = await repository.get(meeting_id, ("id", "logical_id"))
+    if not record:
+        raise HTTPException(status_code=404, detail=f"Meeting analysis record not found for ID: {meeting_id}")
+    logical_id = record.get("logical_id")
+    if not logical_id:
+        # Records created without one carry it in the analysis only
+        fields = await repository.get_analysis_fields(meeting_id, [["meetingId"]])
+        logical_id = fields["fields"][0] if fields else None
+    if not logical_id:
+        raise HTTPException(status_code=404, detail=f"No stored analysis components for meeting ID: {meeting_id}")
+    return logical_id
+
 # New endpoint to get analysis results/status
 @router.get("/{meeting_id}/result", summary="Get meeting analysis result/status")
 async def get_analysis_result(
     meeting_id: uuid.UUID,
-    supabase: Annotated[Union[Client, None], Depends(get_supabase_client)] 
+    request: Request,
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    fields: Optional[str] = Query(None, description="Comma-separated analysis fields to return, e.g. 'meetingTitle,duration,sentiment.overall,participants'")
 ):
-    """Fetches the analysis status and results for a given meeting ID."""
-    if supabase is None:
-        raise HTTPException(status_code=503, detail="Supabase client not available")
+    """Fetches the analysis status and results for a given meeting ID.
+
+    With `fields=`, only those parts of the analysis are returned; only the stored
+    components holding them are read, so the transcript and comments are never read
+    unless asked for. Captions and comments can be paged through the `/result/captions` and
+    `/result/comments` endpoints. Responses carry an ETag; If-None-Match gets a 304.
+    """
+    paths = _parse_fields(fields) if fields else None
 
     try:
         print(f"Checking analysis result for meeting ID: {meeting_id}")
-        # Fetch relevant fields: status, analysis_json, error_detail
-        result = supabase.table("meetings")\
-            .select("id, status, analysis_json, error_detail")\
-            .eq("id", str(meeting_id))\
-            .maybe_single()\
-            .execute()
-
-        if not result or not result.data:
+        # Validator read first: an unchanged analysis is answered with 304 before it is fetched
+        validator = await repository.get(meeting_id, ("id", "status", "version", "updated_at"))
+        if not validator:
+            raise HTTPException(status_code=404, detail=f"Meeting analysis record not found for ID: {meeting_id}")
+        etag = make_etag(
+            "result", meeting_id, validator.get("status"), validator.get("version"),
+            validator.get("updated_at"), ",".join(".".join(path) for path in paths or [])
+        )
+        if etag_matches(request, etag):
+            print(f"Analysis result for {meeting_id} not modified")
+            return not_modified(etag)
+
+        if paths is not None:
+            # Only the components holding the requested paths are read
+            record = await repository.get_analysis_fields(meeting_id, paths)
+        else:
+            record = await repository.get(meeting_id, ("id", "status", "analysis_json", "error_detail"))
+
+        if not record:
             raise HTTPException(status_code=404, detail=f"Meeting analysis record not found for ID: {meeting_id}")
 
-        record = result.data
         status = record.get("status", "UNKNOWN")
-        analysis_data = record.get("analysis_json")
         error = record.get("error_detail")
 
         response_payload = {
@@ -362,10 +803,18 @@ async def get_analysis_result(
             "error": error
         }
 
-        if status == "COMPLETE" and analysis_data:
+        if status == "COMPLETE" and paths is not None:
+            projected = {}
+            for path, value in zip(paths, record["fields"]):
+                if value is not None:
+                    _set_path(projected, path, value)
+            response_payload["analysis"] = projected
+            print(f"Returning COMPLETE status and {len(paths)} projected analysis fields for {meeting_id}")
+
+        elif status == "COMPLETE" and record.get("analysis_json"):
             # Validate with Pydantic before returning if needed, or assume structure is correct
             try:
-                analysis_validated = MeetingAnalysisJSON(**analysis_data)
+                analysis_validated = MeetingAnalysisJSON(**record["analysis_json"])
                 response_payload["analysis"] = analysis_validated.model_dump(exclude_unset=True)
                 print(f"Returning COMPLETE status and analysis data for {meeting_id}")
             except Exception as p_error:
@@ -384,7 +833,7 @@ async def get_analysis_result(
         else: # PENDING, UNKNOWN, etc.
             print(f"Returning status {status} for {meeting_id}")
             
-        return JSONResponse(content=response_payload, status_code=200)
+        return JSONBytesResponse(content=response_payload, status_code=200, headers=cache_headers(etag))
 
     except HTTPException as http_exc:
         raise http_exc
@@ -392,21 +841,73 @@ async def get_analysis_result(
         print(f"Error fetching analysis result for meeting {meeting_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve analysis status.")
 
+@router.get("/{meeting_id}/result/captions", summary="Page through a meeting's transcript captions")
+async def get_result_captions(
+    meeting_id: uuid.UUID,
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    after: int = Query(-1, ge=-1, description="Return captions after this caption_idx (the previous page's next_after)"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Keyset-paginated captions ({caption_idx, text, speaker, start, end}) from the
+    meeting's transcript component."""
+    try:
+        logical_id = await _logical_meeting_id(repository, meeting_id)
+        transcript = await run_in_threadpool(
+            load_component, os.path.join(ANALYSIS_DATA_ROOT, logical_id), logical_id, "transcript"
+        )
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        print(f"Error loading captions for meeting {meeting_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load transcript captions.")
+    if transcript is None:
+        raise HTTPException(status_code=404, detail=f"Transcript captions not available for meeting ID: {meeting_id}")
+
+    page = _keyset_page(transcript.get("captions", []), after, limit, "caption_idx")
+    return JSONBytesResponse(content={"meeting_id": str(meeting_id), **page})
+
+@router.get("/{meeting_id}/result/comments", summary="Page through a meeting's chat comments")
+async def get_result_comments(
+    meeting_id: uuid.UUID,
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    after: int = Query(-1, ge=-1, description="Return comments after this comment_idx (the previous page's next_after)"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Keyset-paginated chat comments, each tagged with its comment_idx."""
+    try:
+        logical_id = await _logical_meeting_id(repository, meeting_id)
+        component = await run_in_threadpool(
+            load_component, os.path.join(ANALYSIS_DATA_ROOT, logical_id), logical_id, "comments"
+        )
+        if component is not None:
+            comments = component.get("comments", [])
+        else:
+            # No component on this server: select only the comments array from the record
+            record = await repository.get_analysis_fields(meeting_id, [["comments"]])
+            comments = (record["fields"][0] if record else None) or []
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        print(f"Error loading comments for meeting {meeting_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load comments.")
+
+    page = _keyset_page(comments, after, limit, "comment_idx")
+    return JSONBytesResponse(content={"meeting_id": str(meeting_id), **page})
+
 # REMOVE: Placeholder comment for PDF download if endpoint exists above
 # TODO: Add GET endpoint for PDF download 
 
 @router.post("/analyze-dataset", summary="Analyze a pre-existing meeting dataset")
 async def analyze_dataset(
     request: AnalyzeDatasetRequest,
-    supabase: Annotated[Union[Client, None], Depends(get_supabase_client)] 
+    repository: Annotated[MeetingRepository, Depends(meeting_repository)],
+    priority: int = Query(0, description="Higher runs first")
 ):
     """
-    Analyzes a meeting dataset located in the predefined data directory structure,
-    saves results to the public analysis data folder, AND updates the Supabase record.
+    Queues analysis of a meeting dataset located in the predefined data directory structure.
+    A job worker saves results to the public analysis data folder AND updates the Supabase
+    record; the response (202) carries the job ID.
     """
-    # Check for Supabase client first
-    if supabase is None:
-        raise HTTPException(status_code=503, detail="Supabase client not available")
         
     logical_meeting_id = request.meetingId
     print(f"Received request to analyze dataset for logical ID: {logical_meeting_id}")
@@ -462,221 +963,58 @@ async def analyze_dataset(
     print(f"Output directory set to: {output_dir_absolute}")
     os.makedirs(output_dir_absolute, exist_ok=True)
 
-    # --- ADDED: Find Supabase record ID based on logical_meeting_id --- 
-    # This requires a way to map logical_meeting_id to the actual record ID.
-    # We will try finding based on logical_id in metadata_json
+    # Find the meeting record of this logical ID, or create it: one lookup on the indexed
+    # logical_id column (an insert-if-missing when the dataset was never analysed)
     supabase_record_id = None
-    current_version = 1
-    previous_versions = []
-    
+
+    title = f"Meeting Analysis: {source_directory_name}"
+    if logical_meeting_id.startswith("zoom-dataset"):
+        title = f"Zoom Meeting Analysis ({source_directory_name})"
     try:
-        print(f"Attempting to find Supabase record matching logical ID: {logical_meeting_id}")
-        
-        # Look for a record with matching logical_id in metadata_json
-        # DEBUG: First, inspect all meeting records to see what we have
-        all_meetings = supabase.table("meetings").select("id, metadata_json").execute()
-        print(f"Found {len(all_meetings.data)} meetings in database.")
-        
-        # Print the first few for debugging
-        for i, meeting in enumerate(all_meetings.data[:3]):
-            print(f"Meeting {i+1}: id={meeting.get('id')}, metadata={meeting.get('metadata_json')}")
-        
-        # Try multiple ways to search for the meeting
-        # Method 1: Filter using the -> operator (more direct PostgreSQL syntax)
-        potential_matches = supabase.table("meetings").select("id, file_name, metadata_json, version, previous_versions").filter("metadata_json->>logical_id", "eq", logical_meeting_id).execute()
-        
-        if not potential_matches.data:
-            print(f"First query found no matches. Trying alternative query...")
-            # Method 2: Filter using the ->> operator with quotes
-            potential_matches = supabase.table("meetings").select("id, file_name, metadata_json, version, previous_versions").filter("metadata_json->>'logical_id'", "eq", logical_meeting_id).execute()
-            
-        if not potential_matches.data:
-            print(f"Second query found no matches. Trying JSON contains...")
-            
-            # Method 3: Use a safer approach with jsonb_contains
-            # Instead of using the 'cs' operator which is causing syntax errors,
-            # use a more direct approach with the '->>'' operator we already know works
-            try:
-                logical_id_str = str(logical_meeting_id).replace("'", "''")  # Escape single quotes for SQL safety
-                # Use the filter method which we know works from Method 2
-                potential_matches = supabase.table("meetings").select("id, file_name, metadata_json, version, previous_versions").filter("metadata_json->>'logical_id'", "eq", logical_id_str).execute()
-                print(f"Used direct filter with escaped value: '{logical_id_str}'")
-            except Exception as query_error:
-                print(f"Error with direct query: {query_error}")
-                # Try one more fallback with just a basic select
-                try:
-                    # Just get all records and filter in Python
-                    all_records = supabase.table("meetings").select("id, file_name, metadata_json, version, previous_versions").execute()
-                    
-                    # Create an empty container for matches in case the variable doesn't exist yet
-                    if 'potential_matches' not in locals() or potential_matches is None:
-                        class EmptyResponse:
-                            def __init__(self):
-                                self.data = []
-                        potential_matches = EmptyResponse()
-                    
-                    if all_records and hasattr(all_records, 'data') and all_records.data:
-                        # Manual filtering in Python
-                        potential_matches.data = [
-                            record for record in all_records.data 
-                            if record.get('metadata_json') and record.get('metadata_json', {}).get('logical_id') == logical_meeting_id
-                        ]
-                        print(f"Fallback: Filtered {len(all_records.data)} records to {len(potential_matches.data)} matches")
-                    else:
-                        print("Fallback query returned no records")
-                        potential_matches.data = []
-                except Exception as fallback_error:
-                    print(f"Fallback query error: {fallback_error}")
-        
-        print(f"Query results: {len(potential_matches.data)} potential matches found")
-        
-        if potential_matches.data:
-            # Continue with existing logic
-            supabase_record_id = potential_matches.data[0]['id']
-            current_version = potential_matches.data[0].get('version', 1) + 1  # Increment version
-            previous_versions = potential_matches.data[0].get('previous_versions', [])
-            
-            print(f"Found matching Supabase record ID: {supabase_record_id}, current version: {current_version-1}")
-            
-            # Prepare compact version data from existing record
-            try:
-                # Get the current analysis_json to create compact version
-                current_analysis = supabase.table("meetings").select("analysis_json").eq("id", supabase_record_id).single().execute()
-                
-                if current_analysis.data and 'analysis_json' in current_analysis.data:
-                    analysis_json = current_analysis.data['analysis_json']
-                    
-                    # Create compact version with essential data
-                    compact_version = {
-                        "version": current_version - 1,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "summary": analysis_json.get("summary", ""),
-                        "sentiment": {"overall": analysis_json.get("sentiment", {}).get("overall", 0)},
-                        "topics": [t["name"] for t in analysis_json.get("topics", {}).get("topics", [])],
-                        "action_items": analysis_json.get("action_items", [])
-                    }
-                    
-                    # Append to previous versions
-                    previous_versions.append(compact_version)
-                    print(f"Created compact version of previous analysis (v{current_version-1})")
-            except Exception as compact_error:
-                print(f"Error creating compact version: {compact_error}")
-                # Continue with creating/updating record even if compact version fails
+        record, created = await repository.get_or_create_by_logical_id(logical_meeting_id, {
+            "file_name": os.path.join(source_directory_name, os.path.basename(transcript_file_path)),
+            "title": title,
+            "status": "PROCESSING",
+            "source_type": "dataset",
+            "metadata_json": {
+                "source_directory": source_directory_name,
+                "creation_note": "Auto-created during analysis"
+            },
+            "version": 1,
+            "created_at": datetime.utcnow().isoformat()
+        }, ("id", "version"))
+        supabase_record_id = record["id"]
+        if created:
+            print(f"Created new meeting record with ID: {supabase_record_id}")
         else:
-            print(f"No record found with logical_id: {logical_meeting_id}. Creating new record.")
-            
-            # Create a new record if matching fails
-            try:
-                # Create a meaningful title from the dataset
-                title = f"Meeting Analysis: {source_directory_name}"
-                if logical_meeting_id.startswith("zoom-dataset"):
-                    title = f"Zoom Meeting Analysis ({source_directory_name})"
-                
-                # Store the logical ID in a metadata_json field
-                metadata_json = {
-                    "logical_id": logical_meeting_id,
-                    "source_directory": source_directory_name,
-                    "creation_note": "Auto-created during analysis"
-                }
-                
-                current_time = datetime.utcnow().isoformat()
-                
-                insert_response = supabase.table("meetings").insert({
-                    "file_name": os.path.join(source_directory_name, os.path.basename(transcript_file_path)),
-                    "title": title,
-                    "status": "PROCESSING",
-                    "source_type": "dataset",
-                    "metadata_json": metadata_json,
-                    "version": current_version,
-                    "previous_versions": previous_versions,
-                    "created_at": current_time
-                }).execute()
-                
-                if insert_response.data:
-                    supabase_record_id = insert_response.data[0]['id']
-                    print(f"Created new Supabase record with ID: {supabase_record_id}, version: {current_version}")
-                else:
-                    print("Failed to create new Supabase record: No data returned")
-            except Exception as create_error:
-                print(f"Error creating new Supabase record: {create_error}")
+            # The job files the current analysis in the version history when it stores the new one
+            print(f"Found meeting record ID: {supabase_record_id} for {logical_meeting_id} (v{record.get('version') or 1})")
     except Exception as db_find_error:
-        print(f"Error finding Supabase record: {db_find_error}")
-    # -----------------------------------------------------------------
+        # The analysis files are still written; only the record is not updated
+        print(f"Error finding or creating the meeting record of {logical_meeting_id}: {db_find_error}")
 
-    # 5. Run the analysis pipeline
+    # 5. Queue the analysis pipeline run; job workers execute it and update the record
+    main_analysis_file = os.path.join(output_dir_relative, f"meeting-analysis-{logical_meeting_id}.json")
     try:
-        print("Starting analysis pipeline execution...")
-        analysis_result: MeetingAnalysisJSON = run_full_analysis_pipeline(
-            file_path=transcript_file_path,
-            file_type=file_type,
-            chat_file_path=chat_file_path,
-            output_dir=output_dir_absolute, 
-            meeting_id=logical_meeting_id 
-        )
-        print("Analysis pipeline finished successfully.")
-
-        # --- ADDED: Update Supabase record --- 
-        if supabase_record_id:
-            print(f"Attempting to update Supabase record ID: {supabase_record_id}")
-            try:
-                current_time = datetime.utcnow().isoformat()
-                
-                update_response = supabase.table("meetings")\
-                    .update({
-                        "analysis_json": analysis_result.model_dump(exclude_unset=True),
-                        "updated_at": current_time,
-                        "status": "COMPLETE", # Set status to COMPLETE
-                        "version": current_version,
-                        "previous_versions": previous_versions,
-                        "is_current": True
-                    })\
-                    .eq("id", supabase_record_id)\
-                    .execute()
-                
-                # Check if update was successful (PostgREST might return data or just count)
-                if update_response.data: # Check if data is returned upon success
-                    print(f"Successfully updated Supabase record ID: {supabase_record_id}")
-                else:
-                    # Check if error exists, otherwise assume success based on no error
-                    if hasattr(update_response, 'error') and update_response.error:
-                         print(f"Supabase update error for ID {supabase_record_id}: {update_response.error}")
-                         # Log error but maybe don't fail the whole request?
-                    else:
-                        # If no data and no error, it might have succeeded (check PostgREST docs)
-                         print(f"Supabase update for ID {supabase_record_id} completed (no data returned, assumed success).")
-
-            except Exception as db_update_error:
-                print(f"Error updating Supabase record {supabase_record_id}: {db_update_error}")
-                # Log the error but proceed to return success as files were saved
-        else:
-            print("Skipping Supabase update because no record ID was found.")
-        # --------------------------------------
-
-        # Respond with success and the location of the main analysis file
-        # Frontend can then fetch this file via a simple GET request or read it directly
-        main_analysis_file = os.path.join(output_dir_relative, f"meeting-analysis-{logical_meeting_id}.json")
-        return JSONResponse(content={
-            "success": True,
-            "message": f"Analysis complete for {logical_meeting_id}. Results saved.",
-            "output_directory": output_dir_relative,
-            "main_analysis_file": main_analysis_file
-        }, status_code=200)
-
+        job = await run_in_threadpool(enqueue_analysis_job, MEETING_DATASET_ANALYSIS, {
+            "logical_meeting_id": logical_meeting_id,
+            "transcript_file_path": transcript_file_path,
+            "file_type": file_type,
+            "chat_file_path": chat_file_path,
+            "output_dir": output_dir_absolute,
+            "main_analysis_file": main_analysis_file,
+            "supabase_record_id": supabase_record_id
+        }, priority)
     except Exception as e:
-        # ... (existing error handling) ...
-        # --- ADDED: Update Supabase with error status --- 
-        if supabase_record_id:
-             print(f"Attempting to update Supabase record {supabase_record_id} with error status.")
-             try:
-                 supabase.table("meetings")\
-                     .update({"status": "FAILED", "error_detail": str(e)[:500]})\
-                     .eq("id", supabase_record_id)\
-                     .execute()
-                 print(f"Updated Supabase record {supabase_record_id} to FAILED status.")
-             except Exception as db_fail_error:
-                 print(f"Failed to update Supabase record {supabase_record_id} with error status: {db_fail_error}")
-        # ---------------------------------------------
-        print(f"Error during analysis pipeline execution: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error processing dataset: {e}") 
\ No newline at end of file
+        print(f"Error queueing analysis for {logical_meeting_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error queueing dataset analysis: {e}")
+
+    # Frontend polls for the main analysis file (or the job status) until the job is done
+    return JSONBytesResponse(content={
+        "success": True,
+        "message": f"Analysis queued for {logical_meeting_id}.",
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+        "output_directory": output_dir_relative,
+        "main_analysis_file": main_analysis_file
+    }, status_code=202)
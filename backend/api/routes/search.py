@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import time
+
+from services.search_index import search_meetings
+from services.fulltext_index import search_text
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Search"],
+)
+
+@router.get("", summary="Semantic search across all analysed meetings")
+async def semantic_search(
+    q: str = Query(..., min_length=1, description="Free-text question, e.g. 'where did we discuss the budget freeze?'"),
+    k: int = Query(10, ge=1, le=100, description="Number of results to return"),
+    meeting_id: Optional[str] = Query(None, description="Restrict the search to one meeting")
+):
+    """Returns the transcript segments closest in meaning to the query, with speaker,
+    meeting ID and timestamps so the dashboard can jump straight to the moment."""
+    started = time.perf_counter()
+    try:
+        # Embedding + scoring are CPU-bound numpy/torch work; keep them off the event loop
+        hits = await run_in_threadpool(search_meetings, q, k, meeting_id)
+    except Exception as e:
+        print(f"Error during semantic search for '{q}': {e}")
+        raise HTTPException(status_code=500, detail="Semantic search failed.")
+
+    return {
+        "query": q,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": [hit.model_dump() for hit in hits]
+    }
+
+@router.get("/text", summary="Keyword search over transcripts and chat")
+async def fulltext_search(
+    q: str = Query(..., min_length=1, description="Keywords; a trailing '*' searches by prefix"),
+    limit: int = Query(20, ge=1, le=200),
+    meeting_id: Optional[str] = Query(None, description="Restrict the search to one meeting"),
+    source: str = Query("all", pattern="^(all|captions|chat)$", description="Search captions, chat or both")
+):
+    """Returns highlighted snippets with jump-to timestamps from the local FTS5 index."""
+    started = time.perf_counter()
+    try:
+        hits = await run_in_threadpool(
+            search_text, q, limit, meeting_id,
+            source in ("all", "captions"), source in ("all", "chat")
+        )
+    except Exception as e:
+        print(f"Error during full-text search for '{q}': {e}")
+        raise HTTPException(status_code=500, detail="Full-text search failed.")
+
+    return {
+        "query": q,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": [hit.model_dump() for hit in hits]
+    }
@@ -0,0 +1,84 @@
+"""
+Benchmark: GET /api/meetings pages from the meeting summary table.
+
+Seeds a temporary SQLite meetings store with N meetings (default 100,000) and their
+analysis headers, lets the store build their summary rows, then times pages of the list
+as the endpoint requests them: first page, a page deep into the keyset, filtered by
+platform, and sorted by engagement.
+
+    cd backend && python -m benchmarks.bench_meeting_list [N]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from db.analysis_components import HEADER, content_hash
+from db.sqlite_repository import SQLiteMeetingRepository
+from services.serialization import dumps
+
+DEFAULT_MEETINGS = 100_000
+PAGE_SIZE = 50
+REPEATS = 200
+PLATFORMS = ("zoom", "teams", "meet", "webex")
+
+def _seed(path: str, count: int) -> None:
+    repository = SQLiteMeetingRepository(path) # Creates the schema
+    rng = random.Random(7)
+    start = datetime(2023, 1, 1)
+    meetings, components = [], []
+    for i in range(count):
+        meeting_id = str(uuid.uuid4())
+        date = (start + timedelta(minutes=17 * i)).isoformat()
+        header = {
+            "meetingTitle": f"Meeting {i}", "date": date, "platform": rng.choice(PLATFORMS),
+            "duration": rng.uniform(600, 7200),
+            "metadata": {"engagement_score": round(rng.uniform(0, 100), 1)} if rng.random() > 0.1 else {},
+            "sentiment": {"overall": rng.uniform(0, 1)},
+            "participants": {"totalParticipants": rng.randint(2, 40), "activeParticipants": rng.randint(1, 20)},
+        }
+        meetings.append((meeting_id, f"Meeting {i}", "COMPLETE", 2, date, date))
+        components.append((meeting_id, HEADER, dumps(header), content_hash(header), date))
+    with repository._connect() as conn:
+        conn.execute("BEGIN")
+        conn.executemany("INSERT INTO meetings (id, title, status, version, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)", meetings)
+        conn.executemany("INSERT INTO meeting_components (meeting_id, component, content, content_hash, updated_at) VALUES (?, ?, ?, ?, ?)", components)
+        conn.execute("COMMIT")
+
+async def _time_page(repository, label: str, **kwargs) -> None:
+    timings = []
+    for _ in range(REPEATS):
+        began = time.perf_counter()
+        rows = await repository.list_summaries(limit=PAGE_SIZE + 1, **kwargs)
+        timings.append((time.perf_counter() - began) * 1000)
+    print(f"  {label:<34} median {statistics.median(timings):6.2f} ms  p95 {sorted(timings)[int(REPEATS * 0.95)]:6.2f} ms  ({len(rows)} rows)")
+
+async def _run(path: str) -> None:
+    repository = await SQLiteMeetingRepository.connect(path)
+    # A cursor halfway through the keyset
+    deep = (await repository.list_summaries(limit=1, descending=False, date_from="2024-06-01"))[0]
+    await _time_page(repository, "first page (date desc)")
+    await _time_page(repository, "deep page (date desc)", after=(deep["date"], deep["meeting_id"]))
+    await _time_page(repository, "platform=zoom (date desc)", platform="zoom")
+    await _time_page(repository, "deep page, platform=zoom", platform="zoom", after=(deep["date"], deep["meeting_id"]))
+    await _time_page(repository, "sort=engagement desc", sort="engagement")
+
+def main(count: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "meetings.sqlite3")
+        began = time.perf_counter()
+        _seed(path, count)
+        seeded = time.perf_counter()
+        SQLiteMeetingRepository(path) # Opening builds the missing summary rows
+        print(f"{count} meetings: seeded in {seeded - began:.1f} s, summarized in {time.perf_counter() - seeded:.1f} s")
+        asyncio.run(_run(path))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MEETINGS))
@@ -0,0 +1,65 @@
+"""
+Benchmark: stdlib json vs. the orjson serialization layer on the bundled datasets.
+
+Measures the two places analyses are serialized: writing the main analysis file
+(`.dict()` + `json.dump(indent=2)` before) and building an API response
+(`model_dump()` + `JSONResponse` before). Checks that both produce the same data.
+
+    cd backend && python -m benchmarks.bench_serialization [meeting-analysis-*.json ...]
+"""
+
+import glob
+import json
+import os
+import sys
+import timeit
+
+from fastapi.responses import JSONResponse
+
+from models.meeting import MeetingAnalysisJSON
+from services.serialization import JSONBytesResponse, dumps
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_FILES = sorted(glob.glob(os.path.join(_PROJECT_ROOT, 'public', 'analysis-data', '*', 'meeting-analysis-*.json')))
+REPEATS = 200
+
+def _best_of(fn) -> float:
+    """Best wall time of one call, in milliseconds; timeit keeps the collector out."""
+    return min(timeit.repeat(fn, number=1, repeat=REPEATS)) * 1000
+
+def main(files) -> int:
+    if not files:
+        print("No analysis files to benchmark.")
+        return 1
+    mismatches = 0
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            analysis = MeetingAnalysisJSON(**json.load(f))
+
+        def old_file():
+            # .dict() is a deprecated alias of model_dump()
+            return json.dumps(analysis.model_dump(by_alias=True, exclude_none=True), indent=2, ensure_ascii=False).encode('utf-8')
+        def new_file(compact=False):
+            return dumps(analysis.model_dump(by_alias=True, exclude_none=True), compact)
+        def old_response():
+            return JSONResponse(content={"success": True, "analysis": analysis.model_dump(exclude_unset=True)}).body
+        def new_response():
+            return JSONBytesResponse(content={"success": True, "analysis": analysis.model_dump(exclude_unset=True)}).body
+
+        if json.loads(old_file()) != json.loads(new_file()) or json.loads(old_response()) != json.loads(new_response()):
+            mismatches += 1
+            print(f"{os.path.basename(path)}: OUTPUT MISMATCH")
+
+        print(f"{os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB on disk)")
+        for label, old_fn, new_fn in (
+            ("analysis file (indent=2)", old_file, new_file),
+            ("analysis file (compact)", old_file, lambda: new_file(compact=True)),
+            ("API response", old_response, new_response),
+        ):
+            old_ms, new_ms = _best_of(old_fn), _best_of(new_fn)
+            print(f"  {label:<26} stdlib {old_ms:7.3f} ms ({len(old_fn()) / 1024:6.1f} KB)"
+                  f"  orjson {new_ms:7.3f} ms ({len(new_fn()) / 1024:6.1f} KB)  {old_ms / new_ms:5.1f}x")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or DEFAULT_FILES))
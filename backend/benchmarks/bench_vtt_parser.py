@@ -0,0 +1,80 @@
+"""
+Benchmark: streaming VTT parser vs. the previous webvtt-py based parser.
+
+Checks that both produce identical transcripts and reports the speedup.
+The reference implementation needs webvtt-py, which is no longer a runtime dependency:
+
+    pip install webvtt-py
+    cd backend && python -m benchmarks.bench_vtt_parser [file.vtt ...]
+"""
+
+import contextlib
+import glob
+import io
+import os
+import re
+import sys
+import timeit
+
+from services.vtt_parser import parse_vtt
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_FILES = sorted(glob.glob(os.path.join(_PROJECT_ROOT, 'data', 'meeting_recordings', 'ZoomW3ML', '*.transcript.vtt')))
+REPEATS = 50
+
+def reference_parse_vtt(file_path: str) -> str:
+    """Transcript as built by the webvtt-py based parser this module replaced."""
+    import webvtt
+    from pydantic import BaseModel
+
+    class VttCaption(BaseModel):
+        start: str
+        end: str
+        text: str
+        raw_text: str
+
+    transcript_parts = []
+    captions = []
+    for caption in webvtt.read(file_path):
+        raw_text = caption.text.strip()
+        speaker_match = re.match(r'^([^(]+)\((\d{2}:\d{2}:\d{2})\):', raw_text)
+        if speaker_match:
+            cleaned_text = raw_text[speaker_match.end():].strip()
+        else:
+            lines = raw_text.split('\n')
+            if lines and lines[0].endswith(':') and len(lines[0]) < 50:
+                cleaned_text = '\n'.join(lines[1:]).strip()
+            else:
+                cleaned_text = raw_text
+        if cleaned_text:
+            transcript_parts.append(cleaned_text)
+        captions.append(VttCaption(start=caption.start, end=caption.end, text=cleaned_text, raw_text=raw_text))
+    return " ".join(transcript_parts)
+
+def _best_of(fn, file_path: str) -> float:
+    """Best wall time of one call; timeit keeps the collector out of the measurement."""
+    return min(timeit.repeat(lambda: fn(file_path), number=1, repeat=REPEATS))
+
+def main(files) -> int:
+    if not files:
+        print("No VTT files to benchmark.")
+        return 1
+    failed = False
+    for file_path in files:
+        expected = reference_parse_vtt(file_path)
+        with contextlib.redirect_stdout(io.StringIO()): # parse_vtt logs every call
+            actual = parse_vtt(file_path).transcript
+            reference_s = _best_of(reference_parse_vtt, file_path)
+            streaming_s = _best_of(lambda p: parse_vtt(p).transcript, file_path)
+        identical = expected == actual
+        failed |= not identical
+
+        print(
+            f"{os.path.basename(file_path)}: webvtt-py {reference_s * 1000:.2f} ms, "
+            f"streaming {streaming_s * 1000:.2f} ms, speedup {reference_s / streaming_s:.1f}x, "
+            f"identical transcript: {identical}"
+        )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or DEFAULT_FILES))
@@ -0,0 +1,97 @@
+"""
+Per-component storage of meeting analyses.
+
+A meeting's analysis is not kept as one `analysis_json` document on the meeting row but
+as one row per component in `meeting_components`, keyed by (meeting_id, component):
+
+- `header`: duration, engagement (metadata), overall sentiment, participants, reactions
+  and the other small top-level fields;
+- `speakers`, `timeline` (the sentiment timeline), `topics`, `insights` (summary,
+  action items, insights), `transcript` and `comments`.
+
+Each row carries a hash of its content, and a write only touches the components whose
+hash changed, so a backfilled insights stage rewrites the insights and header rows and
+leaves the transcript and comments alone. Reads that need part of an analysis fetch only
+the components holding it.
+
+Repositories still take and return the whole analysis as the `analysis_json` column;
+this module splits it into components and assembles it back.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from services.serialization import dumps
+
+ANALYSIS_COLUMN = "analysis_json"
+HEADER = "header"
+TIMELINE = "timeline"
+ANALYSIS_COMPONENTS = (HEADER, "speakers", TIMELINE, "topics", "insights", "transcript", "comments")
+
+# Component -> top-level analysis keys it holds; the header holds every other key, and
+# the timeline holds sentiment.timeline
+COMPONENT_KEYS: Dict[str, Tuple[str, ...]] = {
+    "speakers": ("speakers", "last_speaker"),
+    "topics": ("topics",),
+    "insights": ("summary", "action_items", "actionItems", "insights"),
+    "transcript": ("transcript",),
+    "comments": ("comments",),
+}
+_KEY_COMPONENTS = {key: component for component, keys in COMPONENT_KEYS.items() for key in keys}
+
+def content_hash(content: Any) -> str:
+    return hashlib.sha256(dumps(content, sort_keys=True)).hexdigest()
+
+def split_analysis(analysis: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Component name -> the part of the analysis it stores; components with nothing to
+    store are left out."""
+    if not analysis:
+        return {}
+    parts: Dict[str, Dict[str, Any]] = {}
+    for key, value in analysis.items():
+        parts.setdefault(_KEY_COMPONENTS.get(key, HEADER), {})[key] = value
+    sentiment = (parts.get(HEADER) or {}).get("sentiment")
+    if isinstance(sentiment, dict) and "timeline" in sentiment:
+        parts[HEADER]["sentiment"] = {k: v for k, v in sentiment.items() if k != "timeline"}
+        parts[TIMELINE] = {"timeline": sentiment["timeline"]}
+    return parts
+
+def assemble_analysis(parts: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The analysis (or the part of it held by the given components); None without any."""
+    if not parts:
+        return None
+    analysis = dict(parts.get(HEADER) or {})
+    for component, content in parts.items():
+        if component == TIMELINE:
+            analysis["sentiment"] = {**(analysis.get("sentiment") or {}), **content}
+        elif component != HEADER:
+            analysis.update(content)
+    return analysis
+
+def components_for_paths(paths: Iterable[Sequence[str]]) -> List[str]:
+    """Components to read for the values at these analysis paths."""
+    needed: Set[str] = set()
+    for path in paths:
+        if not path:
+            needed.update(ANALYSIS_COMPONENTS)
+        elif path[0] == "sentiment":
+            if len(path) == 1:
+                needed.update((HEADER, TIMELINE))
+            else:
+                needed.add(TIMELINE if path[1] == "timeline" else HEADER)
+        else:
+            needed.add(_KEY_COMPONENTS.get(path[0], HEADER))
+    return [component for component in ANALYSIS_COMPONENTS if component in needed]
+
+def plan_component_writes(
+    analysis: Optional[Dict[str, Any]], stored_hashes: Dict[str, Optional[str]]
+) -> Tuple[List[Tuple[str, Dict[str, Any], str]], List[str]]:
+    """(component, content, hash) rows to write for `analysis` given the hashes already
+    stored, and the stored components it no longer has, to delete."""
+    parts = split_analysis(analysis)
+    writes = []
+    for component, content in parts.items():
+        digest = content_hash(content)
+        if stored_hashes.get(component) != digest:
+            writes.append((component, content, digest))
+    return writes, [component for component in stored_hashes if component not in parts]
@@ -0,0 +1,74 @@
+"""
+Cross-meeting analytics rollups, for trends that would otherwise load every analysis.
+
+Two aggregate tables hold sums, from which averages and shares are derived:
+
+- `daily_rollups`, keyed by (day, platform): meetings, and the totals (with the number
+  of meetings contributing to each) of duration, engagement score, overall sentiment and
+  participants;
+- `speaker_rollups`, keyed by (day, speaker): meetings, speaking time and the speaker's
+  sentiment total.
+
+A meeting's current analysis contributes to the day and platform it took place on
+(`meeting_contribution`). The contribution added is kept in `analytics_contributions`;
+when a new analysis is stored, the store subtracts the kept contribution and adds the
+new one in the same transaction, so the rollups always equal the sum over current
+analyses without ever being recomputed. Rows left with no meetings are removed.
+"""
+
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from db.meeting_summaries import build_summary, normalize_date
+
+DAILY_MEASURES = (
+    "meetings", "duration_total", "engagement_total", "engagement_meetings",
+    "sentiment_total", "sentiment_meetings", "participants_total", "participants_meetings"
+)
+SPEAKER_MEASURES = ("meetings", "speaking_time", "sentiment_total", "sentiment_meetings")
+
+# Contributions without a platform roll up under this key
+UNKNOWN_PLATFORM = ""
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _measure(total: str, count: str, value: Optional[float]) -> Dict[str, float]:
+    return {total: value, count: 1} if value is not None else {total: 0.0, count: 0}
+
+def meeting_contribution(record: Dict[str, Any], analysis: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """What a meeting with this record (SOURCE_COLUMNS of db.meeting_summaries) and
+    analysis adds to the rollups; None without an analysis or a date."""
+    if not analysis:
+        return None
+    summary = build_summary(record, analysis)
+    day = normalize_date(summary["date"])
+    if day is None:
+        return None
+    daily = {
+        "meetings": 1,
+        "duration_total": _number(summary["duration"]) or 0.0,
+        **_measure("engagement_total", "engagement_meetings", summary["engagement_score"]),
+        **_measure("sentiment_total", "sentiment_meetings", _number(summary["sentiment_overall"])),
+        **_measure("participants_total", "participants_meetings", _number(summary["total_participants"])),
+    }
+    speakers: Dict[str, Dict[str, float]] = {}
+    for speaker in analysis.get("speakers") or []:
+        if not isinstance(speaker, dict) or not speaker.get("name"):
+            continue
+        entry = speakers.setdefault(speaker["name"], {"meetings": 1, "speaking_time": 0.0, "sentiment_total": 0.0, "sentiment_meetings": 0})
+        entry["speaking_time"] += _number(speaker.get("speakingTime", speaker.get("speaking_time"))) or 0.0
+        sentiment = _number(speaker.get("sentiment"))
+        if sentiment is not None:
+            entry["sentiment_total"] += sentiment
+            entry["sentiment_meetings"] += 1
+    return {"day": day[:10], "platform": summary["platform"] or UNKNOWN_PLATFORM, "daily": daily, "speakers": speakers}
+
+def rollup_rows(contribution: Dict[str, Any], sign: int) -> Iterator[Tuple[str, Tuple[str, str], Dict[str, float]]]:
+    """(table, key, measures) increments that add (sign 1) or remove (sign -1) a contribution."""
+    yield "daily_rollups", (contribution["day"], contribution["platform"]), {
+        measure: sign * contribution["daily"][measure] for measure in DAILY_MEASURES
+    }
+    for speaker, measures in contribution["speakers"].items():
+        yield "speaker_rollups", (contribution["day"], speaker), {
+            measure: sign * measures[measure] for measure in SPEAKER_MEASURES
+        }
@@ -0,0 +1,95 @@
+"""
+Headline metrics of each meeting, for listing meetings without reading their analyses.
+
+`meeting_summaries` holds one small row per meeting: title, date, platform, duration,
+engagement score, overall sentiment, participant counts, status and version. Stores
+rewrite a meeting's row whenever its record or the header component of its analysis is
+written (a finished analysis, a status change), so the row never lags behind the meeting.
+
+Lists are paged by keyset: a page ends with a cursor holding the sort value and meeting
+ID of its last row, and the next page starts strictly after it. With the indexes on
+(date, meeting_id), (platform, date, meeting_id) and (engagement_score, meeting_id), a
+page is one index range read however deep it is.
+"""
+
+import base64
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from services.serialization import dumps, loads
+
+SUMMARY_FIELDS = (
+    "meeting_id", "title", "date", "platform", "duration", "engagement_score", "sentiment_overall",
+    "total_participants", "active_participants", "speaking_participants", "status", "version", "updated_at"
+)
+
+# Sort name -> summary column; ties are broken by meeting_id
+SORT_COLUMNS = {"date": "date", "engagement": "engagement_score"}
+
+# Meeting columns a summary is built from
+SOURCE_COLUMNS = ("id", "title", "date", "status", "version", "created_at", "updated_at")
+
+class InvalidCursor(ValueError):
+    """A list cursor that is malformed or was issued for another sort."""
+
+def normalize_date(value: Any) -> Optional[str]:
+    """ISO timestamp in UTC without an offset, so dates order correctly as text; None for
+    values that are not ISO dates."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+def _participant_count(participants: Dict[str, Any], name: str, alias: str) -> Optional[int]:
+    # Stored analyses use either the model's field names or its aliases
+    value = participants.get(name, participants.get(alias))
+    return value if isinstance(value, int) else None
+
+def build_summary(record: Dict[str, Any], header: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary row of a meeting from its SOURCE_COLUMNS and the header component of its
+    analysis (None before the first analysis)."""
+    header = header or {}
+    sentiment = header.get("sentiment") if isinstance(header.get("sentiment"), dict) else {}
+    metadata = header.get("metadata") if isinstance(header.get("metadata"), dict) else {}
+    participants = header.get("participants") if isinstance(header.get("participants"), dict) else {}
+    engagement = metadata.get("engagement_score")
+    return {
+        "meeting_id": str(record["id"]),
+        "title": record.get("title") or header.get("meetingTitle"),
+        # Always set, so it can order a keyset: the meeting's date, else when it was added
+        "date": (normalize_date(header.get("date")) or normalize_date(record.get("date"))
+                 or normalize_date(record.get("created_at")) or record.get("created_at")),
+        "platform": header.get("platform"),
+        "duration": header.get("duration"),
+        "engagement_score": float(engagement) if isinstance(engagement, (int, float)) else None,
+        "sentiment_overall": sentiment.get("overall"),
+        "total_participants": _participant_count(participants, "totalParticipants", "total_participants"),
+        "active_participants": _participant_count(participants, "activeParticipants", "active_participants"),
+        "speaking_participants": _participant_count(participants, "speakingParticipants", "speaking_participants"),
+        "status": record.get("status"),
+        "version": record.get("version"),
+        "updated_at": record.get("updated_at"),
+    }
+
+def encode_cursor(sort: str, descending: bool, row: Dict[str, Any]) -> str:
+    """Cursor of the page following `row` (the last row of a page)."""
+    payload = [sort, descending, row[SORT_COLUMNS[sort]], row["meeting_id"]]
+    return base64.urlsafe_b64encode(dumps(payload)).decode('ascii').rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, str]:
+    """(sort value, meeting ID) to continue after."""
+    try:
+        cursor_sort, cursor_descending, value, meeting_id = loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise InvalidCursor(f"Malformed cursor: {e}") from e
+    if cursor_sort != sort or cursor_descending != descending:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return value, meeting_id
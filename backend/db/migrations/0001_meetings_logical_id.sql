@@ -0,0 +1,33 @@
+-- Indexed logical meeting IDs.
+--
+-- A meeting's logical ID (dataset ID such as "zoom-dataset-1", or "upload-<sha256 prefix>")
+-- has lived only inside metadata_json, so finding a meeting by it filtered every row.
+-- This adds it as a stored generated column with a unique index: lookups, and the
+-- create-if-missing upsert in db/supabase_repository.py, become one index probe.
+-- The content hash of uploads gets an expression index for the duplicate-upload lookup.
+
+BEGIN;
+
+-- Older rows may share a logical ID (analyses re-run before lookups were reliable). Keep it
+-- on the most recently updated row; the others keep theirs as superseded_logical_id.
+update public.meetings m
+set metadata_json = (m.metadata_json - 'logical_id')
+    || jsonb_build_object('superseded_logical_id', m.metadata_json->>'logical_id')
+where m.id in (
+  select id from (
+    select id, row_number() over (
+      partition by metadata_json->>'logical_id' order by updated_at desc, created_at desc
+    ) as position
+    from public.meetings
+    where metadata_json->>'logical_id' is not null
+  ) ranked
+  where ranked.position > 1
+);
+
+alter table public.meetings
+  add column if not exists logical_id text generated always as (metadata_json->>'logical_id') stored;
+
+create unique index if not exists meetings_logical_id_key on public.meetings (logical_id);
+create index if not exists meetings_content_sha256_idx on public.meetings ((metadata_json->>'content_sha256'));
+
+COMMIT;
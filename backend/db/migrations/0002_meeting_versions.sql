@@ -0,0 +1,31 @@
+-- Version history in its own table.
+--
+-- Superseded analyses were kept as compact objects appended to meetings.previous_versions,
+-- so every re-analysis rewrote a row that grew with each version, and finding a version
+-- scanned the array. Each superseded version is now a row of meeting_versions keyed by
+-- (meeting_id, version); meetings.version remains the pointer to the current one.
+-- analysis_delta holds the version's full analysis as a compressed reverse delta against
+-- the next version (see backend/services/meeting_versions.py); versions moved over from
+-- previous_versions have only their summary.
+
+BEGIN;
+
+create table if not exists public.meeting_versions (
+  meeting_id uuid not null references public.meetings(id) on delete cascade,
+  version integer not null,
+  summary jsonb not null,
+  analysis_delta text,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  primary key (meeting_id, version)
+);
+
+insert into public.meeting_versions (meeting_id, version, summary, created_at)
+select m.id, (v->>'version')::integer, v, coalesce((v->>'timestamp')::timestamptz, m.updated_at)
+from public.meetings m
+cross join lateral jsonb_array_elements(coalesce(m.previous_versions, '[]'::jsonb)) as v
+where v->>'version' is not null
+on conflict (meeting_id, version) do nothing;
+
+alter table public.meetings drop column if exists previous_versions;
+
+COMMIT;
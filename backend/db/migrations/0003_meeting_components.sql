@@ -0,0 +1,57 @@
+-- Analyses stored per component.
+--
+-- The whole analysis, transcript and comments included, was one analysis_json document
+-- on the meeting row: every update rewrote all of it and every read pulled all of it
+-- back. Each component (header, speakers, timeline, topics, insights, transcript,
+-- comments) is now a row of meeting_components keyed by (meeting_id, component), written
+-- only when its content hash changes (see backend/db/analysis_components.py).
+-- Rows moved over here get no content_hash, so their first rewrite stores one.
+
+BEGIN;
+
+create table if not exists public.meeting_components (
+  meeting_id uuid not null references public.meetings(id) on delete cascade,
+  component text not null,
+  content jsonb not null,
+  content_hash text,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  primary key (meeting_id, component)
+);
+
+with analyses as (
+  select id, analysis_json as a
+  from public.meetings
+  where analysis_json is not null and jsonb_typeof(analysis_json) = 'object'
+), parts as (
+  select id, 'header' as component,
+         (a - array['speakers', 'last_speaker', 'topics', 'summary', 'action_items', 'actionItems',
+                    'insights', 'transcript', 'comments'])
+         || case when jsonb_typeof(a->'sentiment') = 'object'
+                 then jsonb_build_object('sentiment', (a->'sentiment') - 'timeline')
+                 else '{}'::jsonb end as content
+  from analyses
+  union all
+  select id, 'timeline', jsonb_build_object('timeline', a->'sentiment'->'timeline')
+  from analyses
+  where jsonb_typeof(a->'sentiment') = 'object' and (a->'sentiment') ? 'timeline'
+  union all
+  select analyses.id, c.component, (
+    select jsonb_object_agg(e.key, e.value) from jsonb_each(analyses.a) e where e.key = any(c.keys)
+  )
+  from analyses
+  cross join (values
+    ('speakers', array['speakers', 'last_speaker']),
+    ('topics', array['topics']),
+    ('insights', array['summary', 'action_items', 'actionItems', 'insights']),
+    ('transcript', array['transcript']),
+    ('comments', array['comments'])
+  ) as c(component, keys)
+  where analyses.a ?| c.keys
+)
+insert into public.meeting_components (meeting_id, component, content)
+select id, component, content from parts
+on conflict (meeting_id, component) do nothing;
+
+alter table public.meetings drop column if exists analysis_json;
+
+COMMIT;
@@ -0,0 +1,60 @@
+-- Meeting summaries for list views.
+--
+-- Listing meetings with their headline metrics meant reading every full analysis. Each
+-- meeting now has a small meeting_summaries row (title, date, platform, duration,
+-- engagement, overall sentiment, participant counts, status), rewritten by the backend
+-- whenever the meeting is written (see backend/db/meeting_summaries.py). The indexes
+-- serve GET /api/meetings' keyset pages for each sort and the platform filter.
+
+BEGIN;
+
+create table if not exists public.meeting_summaries (
+  meeting_id uuid primary key references public.meetings(id) on delete cascade,
+  title text,
+  date timestamp without time zone not null,
+  platform text,
+  duration double precision,
+  engagement_score double precision,
+  sentiment_overall double precision,
+  total_participants integer,
+  active_participants integer,
+  speaking_participants integer,
+  status text,
+  version integer,
+  updated_at timestamp with time zone
+);
+
+create index if not exists meeting_summaries_date on public.meeting_summaries (date, meeting_id);
+create index if not exists meeting_summaries_platform_date on public.meeting_summaries (platform, date, meeting_id);
+create index if not exists meeting_summaries_engagement on public.meeting_summaries (engagement_score, meeting_id);
+
+insert into public.meeting_summaries (
+  meeting_id, title, date, platform, duration, engagement_score, sentiment_overall,
+  total_participants, active_participants, speaking_participants, status, version, updated_at
+)
+select
+  m.id,
+  coalesce(m.title, h.content->>'meetingTitle'),
+  coalesce(
+    case when h.content->>'date' ~ '^\d{4}-\d{2}-\d{2}'
+         then ((h.content->>'date')::timestamptz at time zone 'utc') end,
+    m.date at time zone 'utc',
+    m.created_at at time zone 'utc'
+  ),
+  h.content->>'platform',
+  case when jsonb_typeof(h.content->'duration') = 'number' then (h.content->>'duration')::double precision end,
+  case when jsonb_typeof(h.content->'metadata'->'engagement_score') = 'number'
+       then (h.content->'metadata'->>'engagement_score')::double precision end,
+  case when jsonb_typeof(h.content->'sentiment'->'overall') = 'number'
+       then (h.content->'sentiment'->>'overall')::double precision end,
+  (coalesce(h.content->'participants'->'totalParticipants', h.content->'participants'->'total_participants'))::integer,
+  (coalesce(h.content->'participants'->'activeParticipants', h.content->'participants'->'active_participants'))::integer,
+  (coalesce(h.content->'participants'->'speakingParticipants', h.content->'participants'->'speaking_participants'))::integer,
+  m.status,
+  m.version,
+  m.updated_at
+from public.meetings m
+left join public.meeting_components h on h.meeting_id = m.id and h.component = 'header'
+on conflict (meeting_id) do nothing;
+
+COMMIT;
@@ -0,0 +1,153 @@
+-- Cross-meeting analytics rollups.
+--
+-- Trends (engagement per week, speakers' talk-time share, sentiment per platform) needed
+-- every meeting's analysis. daily_rollups (day, platform) and speaker_rollups (day,
+-- speaker) keep the sums they are derived from. Each meeting's contribution is kept in
+-- analytics_contributions; apply_analytics_contribution swaps it for a new analysis'
+-- (subtract the old, add the new) in one transaction. The backend computes contributions
+-- (see backend/db/analytics_rollups.py); this migration rolls up the existing meetings.
+
+BEGIN;
+
+create table if not exists public.analytics_contributions (
+  meeting_id uuid primary key references public.meetings(id) on delete cascade,
+  contribution jsonb not null
+);
+
+create table if not exists public.daily_rollups (
+  day date not null,
+  platform text not null,
+  meetings integer not null,
+  duration_total double precision not null,
+  engagement_total double precision not null,
+  engagement_meetings integer not null,
+  sentiment_total double precision not null,
+  sentiment_meetings integer not null,
+  participants_total double precision not null,
+  participants_meetings integer not null,
+  primary key (day, platform)
+);
+
+create table if not exists public.speaker_rollups (
+  day date not null,
+  speaker text not null,
+  meetings integer not null,
+  speaking_time double precision not null,
+  sentiment_total double precision not null,
+  sentiment_meetings integer not null,
+  primary key (day, speaker)
+);
+
+-- Adds (sign 1) or removes (sign -1) one contribution
+create or replace function public.add_analytics_contribution(c jsonb, sign integer)
+returns void language plpgsql as $$
+begin
+  insert into public.daily_rollups as r (
+    day, platform, meetings, duration_total, engagement_total, engagement_meetings,
+    sentiment_total, sentiment_meetings, participants_total, participants_meetings
+  ) values (
+    (c->>'day')::date, c->>'platform',
+    sign * (c->'daily'->>'meetings')::integer,
+    sign * (c->'daily'->>'duration_total')::double precision,
+    sign * (c->'daily'->>'engagement_total')::double precision,
+    sign * (c->'daily'->>'engagement_meetings')::integer,
+    sign * (c->'daily'->>'sentiment_total')::double precision,
+    sign * (c->'daily'->>'sentiment_meetings')::integer,
+    sign * (c->'daily'->>'participants_total')::double precision,
+    sign * (c->'daily'->>'participants_meetings')::integer
+  )
+  on conflict (day, platform) do update set
+    meetings = r.meetings + excluded.meetings,
+    duration_total = r.duration_total + excluded.duration_total,
+    engagement_total = r.engagement_total + excluded.engagement_total,
+    engagement_meetings = r.engagement_meetings + excluded.engagement_meetings,
+    sentiment_total = r.sentiment_total + excluded.sentiment_total,
+    sentiment_meetings = r.sentiment_meetings + excluded.sentiment_meetings,
+    participants_total = r.participants_total + excluded.participants_total,
+    participants_meetings = r.participants_meetings + excluded.participants_meetings;
+  delete from public.daily_rollups
+  where day = (c->>'day')::date and platform = c->>'platform' and meetings <= 0;
+
+  insert into public.speaker_rollups as r (day, speaker, meetings, speaking_time, sentiment_total, sentiment_meetings)
+  select (c->>'day')::date, s.key,
+         sign * (s.value->>'meetings')::integer,
+         sign * (s.value->>'speaking_time')::double precision,
+         sign * (s.value->>'sentiment_total')::double precision,
+         sign * (s.value->>'sentiment_meetings')::integer
+  from jsonb_each(coalesce(c->'speakers', '{}'::jsonb)) as s
+  on conflict (day, speaker) do update set
+    meetings = r.meetings + excluded.meetings,
+    speaking_time = r.speaking_time + excluded.speaking_time,
+    sentiment_total = r.sentiment_total + excluded.sentiment_total,
+    sentiment_meetings = r.sentiment_meetings + excluded.sentiment_meetings;
+  delete from public.speaker_rollups
+  where day = (c->>'day')::date
+    and speaker in (select jsonb_object_keys(coalesce(c->'speakers', '{}'::jsonb)))
+    and meetings <= 0;
+end $$;
+
+-- Replaces a meeting's contribution (null removes it); called by the backend per analysis
+create or replace function public.apply_analytics_contribution(p_meeting_id uuid, p_contribution jsonb)
+returns void language plpgsql as $$
+declare
+  previous jsonb;
+begin
+  -- Serializes writers of the same meeting, including its first contribution
+  perform pg_advisory_xact_lock(hashtext(p_meeting_id::text));
+  select contribution into previous from public.analytics_contributions where meeting_id = p_meeting_id;
+  if previous is not distinct from p_contribution then
+    return;
+  end if;
+  if previous is not null then
+    perform public.add_analytics_contribution(previous, -1);
+  end if;
+  if p_contribution is not null then
+    perform public.add_analytics_contribution(p_contribution, 1);
+    insert into public.analytics_contributions (meeting_id, contribution)
+    values (p_meeting_id, p_contribution)
+    on conflict (meeting_id) do update set contribution = excluded.contribution;
+  else
+    delete from public.analytics_contributions where meeting_id = p_meeting_id;
+  end if;
+end $$;
+
+-- Contributions of the meetings analysed so far, from their summaries and speakers
+insert into public.analytics_contributions (meeting_id, contribution)
+select s.meeting_id, jsonb_build_object(
+  'day', to_char(s.date, 'YYYY-MM-DD'),
+  'platform', coalesce(s.platform, ''),
+  'daily', jsonb_build_object(
+    'meetings', 1,
+    'duration_total', coalesce(s.duration, 0),
+    'engagement_total', coalesce(s.engagement_score, 0),
+    'engagement_meetings', (s.engagement_score is not null)::integer,
+    'sentiment_total', coalesce(s.sentiment_overall, 0),
+    'sentiment_meetings', (s.sentiment_overall is not null)::integer,
+    'participants_total', coalesce(s.total_participants, 0),
+    'participants_meetings', (s.total_participants is not null)::integer
+  ),
+  'speakers', coalesce((
+    select jsonb_object_agg(name, jsonb_build_object(
+      'meetings', 1, 'speaking_time', speaking_time,
+      'sentiment_total', sentiment_total, 'sentiment_meetings', sentiment_meetings
+    ))
+    from (
+      select e->>'name' as name,
+             sum(case when jsonb_typeof(coalesce(e->'speakingTime', e->'speaking_time')) = 'number'
+                      then coalesce(e->>'speakingTime', e->>'speaking_time')::double precision else 0 end) as speaking_time,
+             sum(case when jsonb_typeof(e->'sentiment') = 'number' then (e->>'sentiment')::double precision else 0 end) as sentiment_total,
+             count(*) filter (where jsonb_typeof(e->'sentiment') = 'number') as sentiment_meetings
+      from public.meeting_components sp, jsonb_array_elements(sp.content->'speakers') as e
+      where sp.meeting_id = s.meeting_id and sp.component = 'speakers'
+        and jsonb_typeof(sp.content->'speakers') = 'array' and coalesce(e->>'name', '') <> ''
+      group by e->>'name'
+    ) speakers
+  ), '{}'::jsonb)
+)
+from public.meeting_summaries s
+where exists (select 1 from public.meeting_components h where h.meeting_id = s.meeting_id and h.component = 'header')
+on conflict (meeting_id) do nothing;
+
+select public.add_analytics_contribution(contribution, 1) from public.analytics_contributions;
+
+COMMIT;
@@ -0,0 +1,63 @@
+-- A new analysis stored in one transaction.
+--
+-- Storing an analysis was a version-guarded update of the meeting row followed by
+-- separate requests upserting and deleting its components, so a crash in between left the
+-- version bumped over the old components, and readers could see old and new components
+-- mixed; the replaced version was filed by yet another request, so a failure there left a
+-- gap in the version history. store_meeting_analysis does the guarded update, the
+-- component writes and the filing of the replaced version in one transaction; the backend
+-- calls it for every update that replaces an analysis (see backend/db/supabase_repository.py).
+
+BEGIN;
+
+-- Applies p_changes (meeting columns) to the meeting if it is at p_expected_version (any
+-- version when null), writes the components in p_components ([{component, content,
+-- content_hash}]) whose hash changed, deletes the components not named in p_keep and
+-- files p_superseded ({version, summary, analysis_delta}, when not null) in
+-- meeting_versions. Returns the updated meeting row, or null if no meeting matched.
+create or replace function public.store_meeting_analysis(
+  p_meeting_id uuid,
+  p_changes jsonb,
+  p_expected_version integer,
+  p_components jsonb,
+  p_keep text[],
+  p_superseded jsonb default null
+)
+returns jsonb language plpgsql as $$
+declare
+  updated public.meetings;
+begin
+  update public.meetings m set
+    (title, file_name, date, created_by, status, error_detail, source_type,
+     metadata_json, version, is_current, updated_at) = (
+      select r.title, r.file_name, r.date, r.created_by, r.status, r.error_detail, r.source_type,
+             r.metadata_json, r.version, r.is_current, r.updated_at
+      from jsonb_populate_record(m, p_changes) as r
+    )
+  where m.id = p_meeting_id and (p_expected_version is null or m.version = p_expected_version)
+  returning m.* into updated;
+  if not found then
+    return null;
+  end if;
+
+  insert into public.meeting_components as c (meeting_id, component, content, content_hash, updated_at)
+  select p_meeting_id, e->>'component', e->'content', e->>'content_hash', timezone('utc'::text, now())
+  from jsonb_array_elements(coalesce(p_components, '[]'::jsonb)) as e
+  on conflict (meeting_id, component) do update set
+    content = excluded.content,
+    content_hash = excluded.content_hash,
+    updated_at = excluded.updated_at
+  where c.content_hash is distinct from excluded.content_hash;
+  delete from public.meeting_components
+  where meeting_id = p_meeting_id and component <> all(coalesce(p_keep, '{}'::text[]));
+
+  if p_superseded is not null then
+    insert into public.meeting_versions (meeting_id, version, summary, analysis_delta)
+    values (p_meeting_id, (p_superseded->>'version')::integer, p_superseded->'summary', p_superseded->>'analysis_delta')
+    on conflict (meeting_id, version) do nothing;
+  end if;
+
+  return to_jsonb(updated);
+end $$;
+
+COMMIT;
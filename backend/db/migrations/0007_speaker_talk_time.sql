@@ -0,0 +1,49 @@
+-- Speakers' talk time summed by the database.
+--
+-- GET /api/analytics/speakers read every (day, speaker) row in the range, a page of 1000
+-- at a time, to sum, filter and limit them in the backend. sum_speaker_rollups groups by
+-- speaker, filters, orders and limits in one query and returns everyone's speaking time
+-- in the range alongside, so a speaker's share can still be computed. The index serves
+-- the one-speaker filter.
+
+BEGIN;
+
+create index if not exists speaker_rollups_speaker_idx on public.speaker_rollups (speaker, day);
+
+-- {"total_speaking_time": ..., "speakers": [{speaker, meetings, speaking_time,
+-- sentiment_total, sentiment_meetings}]} over the days in [p_date_from, p_date_to] (either
+-- null for open), most speaking time first, at most p_limit speakers, only p_speaker when
+-- not null
+create or replace function public.sum_speaker_rollups(
+  p_date_from date,
+  p_date_to date,
+  p_speaker text,
+  p_limit integer
+)
+returns jsonb language sql stable as $$
+  select jsonb_build_object(
+    'total_speaking_time', (
+      select coalesce(sum(r.speaking_time), 0)
+      from public.speaker_rollups r
+      where (p_date_from is null or r.day >= p_date_from) and (p_date_to is null or r.day <= p_date_to)
+    ),
+    'speakers', coalesce((
+      select jsonb_agg(to_jsonb(t) order by t.speaking_time desc, t.speaker)
+      from (
+        select r.speaker,
+               sum(r.meetings) as meetings,
+               sum(r.speaking_time) as speaking_time,
+               sum(r.sentiment_total) as sentiment_total,
+               sum(r.sentiment_meetings) as sentiment_meetings
+        from public.speaker_rollups r
+        where (p_date_from is null or r.day >= p_date_from) and (p_date_to is null or r.day <= p_date_to)
+          and (p_speaker is null or r.speaker = p_speaker)
+        group by r.speaker
+        order by 3 desc, 1
+        limit p_limit
+      ) t
+    ), '[]'::jsonb)
+  );
+$$;
+
+COMMIT;
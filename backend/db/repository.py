@@ -0,0 +1,245 @@
+"""
+Async data access for meeting records.
+
+Routes and job handlers read and write meetings through a `MeetingRepository` rather than
+a database client, so no query blocks the event loop and the backend can run without a
+Supabase project. `DATABASE_URL` picks the store:
+
+- `supabase://` (the default when SUPABASE_URL is set): the async Supabase client, which
+  keeps a pool of keep-alive HTTP connections to PostgREST per event loop.
+- `sqlite:///relative/meetings.sqlite3` or `sqlite:////absolute/meetings.sqlite3` (the
+  default otherwise): a local file with the same columns, for local runs, tests and
+  benchmarks.
+
+Other stores implement `MeetingRepository` and register a URL scheme in
+`REPOSITORY_BACKENDS`.
+
+Superseded analyses are rows of a separate `meeting_versions` table keyed by
+(meeting_id, version); the meeting's `version` column points at the current one (see
+services.meeting_versions).
+
+`analysis_json` is a column of the interface only: stores keep an analysis as one row per
+component in `meeting_components` (db.analysis_components), write only the components
+that changed, and read only those a query needs.
+
+Every write also refreshes the meeting's row in `meeting_summaries` (db.meeting_summaries),
+the headline metrics that meeting lists are served from, and storing an analysis swaps
+the meeting's contribution to the analytics rollups (db.analytics_rollups).
+
+A record's `logical_id` (the dataset or upload ID also kept in `metadata_json`) is a
+generated column with a unique index (db/migrations/0001_meetings_logical_id.sql), so
+looking a meeting up by it, or creating it if it is missing, is one indexed query.
+
+`get_repository()` returns the repository of the running event loop. Synchronous code,
+such as the job handlers, goes through `run_sync`, which runs the operation on a
+background event loop owned by the process.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATABASE_URL = os.environ.get(
+    "DATABASE_URL",
+    "supabase://" if os.environ.get("SUPABASE_URL")
+    else f"sqlite:///{os.path.join(_BACKEND_DIR, 'cache', 'meetings.sqlite3')}"
+)
+
+# Columns of a meeting record; JSON columns are returned decoded. analysis_json is
+# assembled from the meeting's components
+MEETING_COLUMNS = (
+    "id", "title", "file_name", "date", "created_by", "status", "error_detail", "source_type",
+    "analysis_json", "metadata_json", "version", "is_current", "logical_id", "created_at", "updated_at"
+)
+JSON_COLUMNS = ("analysis_json", "metadata_json")
+SUMMARY_COLUMNS = tuple(c for c in MEETING_COLUMNS if c != "analysis_json")
+
+class RepositoryUnavailable(RuntimeError):
+    """The configured store cannot be reached or is not configured."""
+
+def extract_path(data: Any, path: Sequence[str]) -> Any:
+    """data[path[0]][path[1]]..., or None where a step is missing."""
+    for segment in path:
+        data = data.get(segment) if isinstance(data, dict) else None
+    return data
+
+class MeetingRepository:
+    """Interface every meetings store implements. All methods are coroutines; records are
+    dicts holding the requested columns."""
+
+    async def get(self, meeting_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def get_by_logical_id(self, logical_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def get_analysis_fields(self, meeting_id: str, paths: List[List[str]]) -> Optional[Dict[str, Any]]:
+        """`id`, `status` and `error_detail` of a meeting plus `fields`: the value at each
+        path into its analysis_json (None where absent), read without loading the rest of
+        the analysis where the store allows."""
+        raise NotImplementedError
+
+    async def find_by_content(self, content_hash: str, pipeline_version: int, statuses: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """The newest meeting in one of `statuses` analysed from this content by this pipeline version."""
+        raise NotImplementedError
+
+    async def list_by_ids(self, ids: Sequence[str], logical_ids: Sequence[str], columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        """Meetings whose ID is in `ids` or whose logical ID is in `logical_ids`."""
+        raise NotImplementedError
+
+    async def list_created_between(self, date_from: Optional[str], date_to: Optional[str], limit: int,
+                                   columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        """Meetings created in [date_from, date_to] (ISO timestamps, either open), oldest first."""
+        raise NotImplementedError
+
+    async def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores a new meeting; returns it as stored (with its ID and timestamps)."""
+        raise NotImplementedError
+
+    async def get_or_create_by_logical_id(self, logical_id: str, record: Dict[str, Any],
+                                          columns: Sequence[str] = SUMMARY_COLUMNS) -> Tuple[Dict[str, Any], bool]:
+        """The meeting with this logical ID, or `record` inserted as it (its metadata_json
+        gets the logical_id); also returns whether it was created. Safe against a
+        concurrent create of the same logical ID."""
+        raise NotImplementedError
+
+    async def update(self, meeting_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None,
+                     columns: Sequence[str] = ("id", "version"),
+                     superseded: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Applies `changes` to a meeting, only if it is at `expected_version` when one is
+        given; returns the updated record, or None if no meeting matched. When `changes`
+        replace the analysis, `superseded` (`version`, `summary`, `analysis_delta`) files the
+        analysis replaced in the same transaction, as `add_version` would."""
+        raise NotImplementedError
+
+    async def add_version(self, meeting_id: str, version: int, summary: Dict[str, Any], analysis_delta: Optional[str]) -> None:
+        """Files a superseded version of a meeting's analysis; a version already filed is kept."""
+        raise NotImplementedError
+
+    async def get_version(self, meeting_id: str, version: int) -> Optional[Dict[str, Any]]:
+        """`version`, `summary`, `analysis_delta` and `created_at` of one superseded version."""
+        raise NotImplementedError
+
+    async def list_versions(self, meeting_id: str, from_version: int = 1, with_deltas: bool = False) -> List[Dict[str, Any]]:
+        """A meeting's superseded versions from `from_version` up, oldest first; without
+        their deltas unless `with_deltas`."""
+        raise NotImplementedError
+
+    async def list_summaries(
+        self,
+        sort: str = "date",
+        descending: bool = True,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        platform: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        min_engagement: Optional[float] = None,
+        max_engagement: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """A page of meeting summaries (SUMMARY_FIELDS of db.meeting_summaries) ordered by
+        the `sort` column (SORT_COLUMNS) and then meeting ID, starting after the (sort value,
+        meeting ID) `after`. Sorting by engagement lists only meetings that have a score."""
+        raise NotImplementedError
+
+    async def list_daily_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                 platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """`daily_rollups` rows (day, platform and DAILY_MEASURES of db.analytics_rollups)
+        for days in [date_from, date_to] (YYYY-MM-DD, either open), by day."""
+        raise NotImplementedError
+
+    async def list_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """`speaker_rollups` rows (day, speaker and SPEAKER_MEASURES) for days in
+        [date_from, date_to], by day."""
+        raise NotImplementedError
+
+    async def sum_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                  speaker: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """Each speaker's SPEAKER_MEASURES summed over the days in [date_from, date_to],
+        most speaking time first, at most `limit` speakers (only `speaker` when given), and
+        everyone's speaking time in the range: {"total_speaking_time", "speakers": [...]}."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+# --- Store selection ---
+def _sqlite_backend():
+    from db.sqlite_repository import SQLiteMeetingRepository
+    return SQLiteMeetingRepository
+
+def _supabase_backend():
+    from db.supabase_repository import SupabaseMeetingRepository # Needs the supabase package
+    return SupabaseMeetingRepository
+
+REPOSITORY_BACKENDS: Dict[str, Callable[[], Type[MeetingRepository]]] = {
+    "sqlite": _sqlite_backend,
+    "supabase": _supabase_backend,
+}
+
+async def create_repository(url: str = DATABASE_URL) -> MeetingRepository:
+    """Opens the store named by `url` (see the module docstring)."""
+    scheme, _, location = url.partition("://")
+    backend = REPOSITORY_BACKENDS.get(scheme)
+    if backend is None:
+        raise ValueError(f"Unsupported DATABASE_URL scheme '{scheme}' (known: {', '.join(REPOSITORY_BACKENDS)})")
+    if scheme == "sqlite":
+        location = location[1:] # The third slash separates the (empty) host from the path
+    return await backend().connect(location)
+
+_repositories: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MeetingRepository]" = weakref.WeakKeyDictionary()
+
+async def get_repository() -> MeetingRepository:
+    """The repository of the running event loop, opened on first use. Connection pools
+    belong to the loop they were created on, so each loop gets its own."""
+    loop = asyncio.get_running_loop()
+    repository = _repositories.get(loop)
+    if repository is None:
+        try:
+            created = await create_repository()
+        except RepositoryUnavailable:
+            raise
+        except Exception as e:
+            raise RepositoryUnavailable(f"Could not open the meetings store: {e}") from e
+        repository = _repositories.setdefault(loop, created)
+        if repository is not created: # Another request opened it meanwhile
+            await created.close()
+    return repository
+
+async def close_repository() -> None:
+    """Closes the running loop's repository (application shutdown)."""
+    repository = _repositories.pop(asyncio.get_running_loop(), None)
+    if repository is not None:
+        await repository.close()
+
+# --- Synchronous access (job workers) ---
+T = TypeVar("T")
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_pid: Optional[int] = None
+_sync_loop_lock = threading.Lock()
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _sync_loop, _sync_loop_pid
+    with _sync_loop_lock:
+        # A forked worker inherits the loop object but not its thread
+        if _sync_loop is None or _sync_loop_pid != os.getpid():
+            _sync_loop = asyncio.new_event_loop()
+            _sync_loop_pid = os.getpid()
+            threading.Thread(target=_sync_loop.run_forever, name="repository-loop", daemon=True).start()
+        return _sync_loop
+
+def run_sync(operation: Callable[[MeetingRepository], Awaitable[T]]) -> T:
+    """Runs `operation(repository)` from synchronous code and returns its result. Must not
+    be called from a coroutine; use `await get_repository()` there."""
+    async def call() -> T:
+        return await operation(await get_repository())
+    return asyncio.run_coroutine_threadsafe(call(), _background_loop()).result()
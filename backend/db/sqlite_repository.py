@@ -0,0 +1,554 @@
+"""
+Meetings store in a local SQLite file (`DATABASE_URL=sqlite:///...`).
+
+It has the columns of the Supabase `meetings`, `meeting_versions`, `meeting_components`,
+`meeting_summaries` and analytics rollup tables, with JSON columns stored as text, and the
+same indexed `logical_id` generated column. Queries run in a thread on a connection of
+their own, like the job queue's, so they never block the event loop; a meeting row, its
+components, its summary and its rollup contribution are written in one transaction.
+"""
+
+import asyncio
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from db.analysis_components import (
+    ANALYSIS_COLUMN, HEADER, assemble_analysis, components_for_paths, plan_component_writes
+)
+from db.analytics_rollups import DAILY_MEASURES, SPEAKER_MEASURES, meeting_contribution, rollup_rows
+from db.meeting_summaries import SORT_COLUMNS, SOURCE_COLUMNS, SUMMARY_FIELDS, build_summary
+from db.repository import JSON_COLUMNS, MEETING_COLUMNS, MeetingRepository, SUMMARY_COLUMNS, extract_path
+from services.serialization import dumps, loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    file_name TEXT,
+    date TEXT,
+    created_by TEXT,
+    status TEXT,
+    error_detail TEXT,
+    source_type TEXT,
+    metadata_json TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    is_current INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    logical_id TEXT GENERATED ALWAYS AS (json_extract(metadata_json, '$.logical_id')) VIRTUAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS meetings_logical_id ON meetings (logical_id);
+CREATE INDEX IF NOT EXISTS meetings_created_at ON meetings (created_at);
+CREATE INDEX IF NOT EXISTS meetings_content_sha256 ON meetings (json_extract(metadata_json, '$.content_sha256'));
+CREATE TABLE IF NOT EXISTS meeting_versions (
+    meeting_id TEXT NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    analysis_delta TEXT,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (meeting_id, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meeting_components (
+    meeting_id TEXT NOT NULL REFERENCES meetings (id) ON DELETE CASCADE,
+    component TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (meeting_id, component)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meeting_summaries (
+    meeting_id TEXT PRIMARY KEY REFERENCES meetings (id) ON DELETE CASCADE,
+    title TEXT,
+    date TEXT NOT NULL,
+    platform TEXT,
+    duration REAL,
+    engagement_score REAL,
+    sentiment_overall REAL,
+    total_participants INTEGER,
+    active_participants INTEGER,
+    speaking_participants INTEGER,
+    status TEXT,
+    version INTEGER,
+    updated_at TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS meeting_summaries_date ON meeting_summaries (date, meeting_id);
+CREATE INDEX IF NOT EXISTS meeting_summaries_platform_date ON meeting_summaries (platform, date, meeting_id);
+CREATE INDEX IF NOT EXISTS meeting_summaries_engagement ON meeting_summaries (engagement_score, meeting_id);
+CREATE TABLE IF NOT EXISTS analytics_contributions (
+    meeting_id TEXT PRIMARY KEY REFERENCES meetings (id) ON DELETE CASCADE,
+    contribution TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    meetings INTEGER NOT NULL,
+    duration_total REAL NOT NULL,
+    engagement_total REAL NOT NULL,
+    engagement_meetings INTEGER NOT NULL,
+    sentiment_total REAL NOT NULL,
+    sentiment_meetings INTEGER NOT NULL,
+    participants_total REAL NOT NULL,
+    participants_meetings INTEGER NOT NULL,
+    PRIMARY KEY (day, platform)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS speaker_rollups (
+    day TEXT NOT NULL,
+    speaker TEXT NOT NULL,
+    meetings INTEGER NOT NULL,
+    speaking_time REAL NOT NULL,
+    sentiment_total REAL NOT NULL,
+    sentiment_meetings INTEGER NOT NULL,
+    PRIMARY KEY (day, speaker)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS speaker_rollups_speaker ON speaker_rollups (speaker, day);
+"""
+
+_ROLLUP_KEYS = {"daily_rollups": ("day", "platform"), "speaker_rollups": ("day", "speaker")}
+
+# Columns stored on the meetings row itself
+_ROW_COLUMNS = tuple(c for c in MEETING_COLUMNS if c != ANALYSIS_COLUMN)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+def _row_columns(columns: Sequence[str]) -> Tuple[List[str], bool]:
+    """The requested columns stored on the meetings row (at least `id`), and whether the
+    analysis is requested too."""
+    unknown = [c for c in columns if c not in MEETING_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown meeting column(s): {', '.join(unknown)}")
+    row_columns = [c for c in columns if c != ANALYSIS_COLUMN]
+    with_analysis = len(row_columns) != len(columns)
+    if "id" not in row_columns:
+        row_columns.append("id") # Key of the components, dropped from the result if not requested
+    return row_columns, with_analysis
+
+def _encode(record: Dict[str, Any]) -> Dict[str, Any]:
+    unknown = [c for c in record if c not in _ROW_COLUMNS or c == "logical_id"]
+    if unknown:
+        raise ValueError(f"Cannot write meeting column(s): {', '.join(unknown)}")
+    return {k: dumps(v) if k in JSON_COLUMNS and v is not None else v for k, v in record.items()}
+
+def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+    record = dict(row)
+    for column in JSON_COLUMNS:
+        if record.get(column) is not None:
+            record[column] = loads(record[column])
+    if "is_current" in record and record["is_current"] is not None:
+        record["is_current"] = bool(record["is_current"])
+    return record
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection, mode: str = "IMMEDIATE") -> Iterator[None]:
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _read_components(conn: sqlite3.Connection, meeting_ids: Sequence[str],
+                     components: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """meeting ID -> {component: content} for the given meetings (and components)."""
+    parts: Dict[str, Dict[str, Any]] = {}
+    if not meeting_ids:
+        return parts
+    sql = f"SELECT meeting_id, component, content FROM meeting_components WHERE meeting_id IN ({', '.join('?' for _ in meeting_ids)})"
+    params = list(meeting_ids)
+    if components is not None:
+        sql += f" AND component IN ({', '.join('?' for _ in components) or 'NULL'})"
+        params.extend(components)
+    for row in conn.execute(sql, params):
+        parts.setdefault(row["meeting_id"], {})[row["component"]] = loads(row["content"])
+    return parts
+
+def _write_components(conn: sqlite3.Connection, meeting_id: str, analysis: Optional[Dict[str, Any]]) -> None:
+    """Stores the analysis' components whose content changed and removes those it lacks."""
+    stored = {row["component"]: row["content_hash"] for row in conn.execute(
+        "SELECT component, content_hash FROM meeting_components WHERE meeting_id = ?", (meeting_id,)
+    )}
+    writes, deletes = plan_component_writes(analysis, stored)
+    now = _now()
+    conn.executemany(
+        "INSERT INTO meeting_components (meeting_id, component, content, content_hash, updated_at)"
+        " VALUES (?, ?, ?, ?, ?) ON CONFLICT (meeting_id, component) DO UPDATE SET"
+        " content = excluded.content, content_hash = excluded.content_hash, updated_at = excluded.updated_at",
+        [(meeting_id, component, dumps(content), digest, now) for component, content, digest in writes]
+    )
+    if deletes:
+        conn.execute(
+            f"DELETE FROM meeting_components WHERE meeting_id = ? AND component IN ({', '.join('?' for _ in deletes)})",
+            (meeting_id, *deletes)
+        )
+
+def _write_summary(conn: sqlite3.Connection, meeting_id: str) -> Optional[Dict[str, Any]]:
+    """Rebuilds the meeting's summary row from its record and analysis header; returns the
+    record it was built from."""
+    record = conn.execute(f"SELECT {', '.join(SOURCE_COLUMNS)} FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+    if record is None:
+        return None
+    header = conn.execute(
+        "SELECT content FROM meeting_components WHERE meeting_id = ? AND component = ?", (meeting_id, HEADER)
+    ).fetchone()
+    summary = build_summary(dict(record), loads(header["content"]) if header is not None else None)
+    conn.execute(
+        f"INSERT OR REPLACE INTO meeting_summaries ({', '.join(summary)}) VALUES ({', '.join('?' for _ in summary)})",
+        list(summary.values())
+    )
+    return dict(record)
+
+def _write_rollups(conn: sqlite3.Connection, meeting_id: str, contribution: Optional[Dict[str, Any]]) -> None:
+    """Replaces the meeting's contribution to the analytics rollups: subtracts the one
+    added before and adds the new one."""
+    stored = conn.execute("SELECT contribution FROM analytics_contributions WHERE meeting_id = ?", (meeting_id,)).fetchone()
+    previous = loads(stored["contribution"]) if stored is not None else None
+    if previous == contribution:
+        return # E.g. a backfill that changed no rolled-up metric
+    increments = [*(rollup_rows(previous, -1) if previous else ()), *(rollup_rows(contribution, 1) if contribution else ())]
+    for table, key, measures in increments:
+        key_columns = _ROLLUP_KEYS[table]
+        conn.execute(
+            f"INSERT INTO {table} ({', '.join(key_columns)}, {', '.join(measures)})"
+            f" VALUES ({', '.join('?' for _ in (*key, *measures))})"
+            f" ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET"
+            f" {', '.join(f'{m} = {m} + excluded.{m}' for m in measures)}",
+            (*key, *measures.values())
+        )
+        conn.execute(
+            f"DELETE FROM {table} WHERE {' AND '.join(f'{c} = ?' for c in key_columns)} AND meetings <= 0", key
+        )
+    if contribution:
+        conn.execute(
+            "INSERT OR REPLACE INTO analytics_contributions (meeting_id, contribution) VALUES (?, ?)",
+            (meeting_id, dumps(contribution))
+        )
+    else:
+        conn.execute("DELETE FROM analytics_contributions WHERE meeting_id = ?", (meeting_id,))
+
+def _file_version(conn: sqlite3.Connection, meeting_id: str, version: int, summary: Dict[str, Any],
+                  analysis_delta: Optional[str]) -> None:
+    conn.execute(
+        "INSERT INTO meeting_versions (meeting_id, version, summary, analysis_delta, created_at)"
+        " VALUES (?, ?, ?, ?, ?) ON CONFLICT (meeting_id, version) DO NOTHING",
+        (str(meeting_id), version, dumps(summary), analysis_delta, _now())
+    )
+
+def _project(record: Dict[str, Any], columns: Sequence[str], parts: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {c: assemble_analysis(parts or {}) if c == ANALYSIS_COLUMN else record.get(c) for c in columns}
+
+class SQLiteMeetingRepository(MeetingRepository):
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Moves the `previous_versions` arrays of older files into meeting_versions and
+        their `analysis_json` documents into meeting_components, and summarizes and rolls
+        up meetings that are not yet."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(meetings)")}
+        if "previous_versions" in columns:
+            with _transaction(conn):
+                conn.execute(
+                    "INSERT OR IGNORE INTO meeting_versions (meeting_id, version, summary, created_at)"
+                    " SELECT m.id, json_extract(v.value, '$.version'), v.value,"
+                    " coalesce(json_extract(v.value, '$.timestamp'), m.updated_at)"
+                    " FROM meetings m, json_each(m.previous_versions) v"
+                    " WHERE m.previous_versions IS NOT NULL AND json_extract(v.value, '$.version') IS NOT NULL"
+                    )
+                conn.execute("ALTER TABLE meetings DROP COLUMN previous_versions")
+        if ANALYSIS_COLUMN in columns:
+            with _transaction(conn):
+                for row in conn.execute(f"SELECT id, {ANALYSIS_COLUMN} FROM meetings WHERE {ANALYSIS_COLUMN} IS NOT NULL").fetchall():
+                    _write_components(conn, row["id"], loads(row[ANALYSIS_COLUMN]))
+                conn.execute(f"ALTER TABLE meetings DROP COLUMN {ANALYSIS_COLUMN}")
+        missing = conn.execute(
+            "SELECT id FROM meetings m WHERE NOT EXISTS (SELECT 1 FROM meeting_summaries s WHERE s.meeting_id = m.id)"
+        ).fetchall()
+        if missing:
+            with _transaction(conn):
+                for row in missing:
+                    _write_summary(conn, row["id"])
+        uncounted = conn.execute(
+            "SELECT c.meeting_id FROM meeting_components c WHERE c.component = 'header'"
+            " AND NOT EXISTS (SELECT 1 FROM analytics_contributions a WHERE a.meeting_id = c.meeting_id)"
+        ).fetchall()
+        if uncounted:
+            with _transaction(conn):
+                for row in uncounted:
+                    record = conn.execute(f"SELECT {', '.join(SOURCE_COLUMNS)} FROM meetings WHERE id = ?", (row["meeting_id"],)).fetchone()
+                    parts = _read_components(conn, [row["meeting_id"]], (HEADER, "speakers")).get(row["meeting_id"])
+                    if record is not None:
+                        _write_rollups(conn, row["meeting_id"], meeting_contribution(dict(record), assemble_analysis(parts or {})))
+
+    @classmethod
+    async def connect(cls, location: str) -> "SQLiteMeetingRepository":
+        return await asyncio.to_thread(cls, location)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def _fetch(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            return [_decode(row) for row in conn.execute(sql, params)]
+
+    async def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch, sql, params)
+
+    async def _query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        rows = await self._query(sql, params)
+        return rows[0] if rows else None
+
+    def _fetch_meetings(self, clauses: str, params: Sequence[Any], columns: Sequence[str]) -> List[Dict[str, Any]]:
+        """Meetings selected by `clauses` (WHERE/ORDER/LIMIT), with their analyses when asked for."""
+        row_columns, with_analysis = _row_columns(columns)
+        with self._connect() as conn, _transaction(conn, "DEFERRED"):
+            records = [_decode(row) for row in conn.execute(f"SELECT {', '.join(row_columns)} FROM meetings {clauses}", params)]
+            parts = _read_components(conn, [record["id"] for record in records]) if with_analysis else {}
+        return [_project(record, columns, parts.get(record["id"])) for record in records]
+
+    async def _query_meetings(self, clauses: str, params: Sequence[Any], columns: Sequence[str]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch_meetings, clauses, params, columns)
+
+    async def get(self, meeting_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        rows = await self._query_meetings("WHERE id = ?", (str(meeting_id),), columns)
+        return rows[0] if rows else None
+
+    async def get_by_logical_id(self, logical_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        rows = await self._query_meetings("WHERE logical_id = ?", (logical_id,), columns)
+        return rows[0] if rows else None
+
+    def _fetch_analysis_fields(self, meeting_id: str, paths: List[List[str]]) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn, _transaction(conn, "DEFERRED"):
+            row = conn.execute("SELECT id, status, error_detail FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+            if row is None:
+                return None
+            # Only the components holding the paths
+            parts = _read_components(conn, [row["id"]], components_for_paths(paths)).get(row["id"], {})
+        analysis = assemble_analysis(parts) or {}
+        return {**dict(row), "fields": [extract_path(analysis, path) for path in paths]}
+
+    async def get_analysis_fields(self, meeting_id: str, paths: List[List[str]]) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch_analysis_fields, str(meeting_id), paths)
+
+    async def find_by_content(self, content_hash: str, pipeline_version: int, statuses: Sequence[str]) -> Optional[Dict[str, Any]]:
+        return await self._query_one(
+            "SELECT id, status, version, metadata_json FROM meetings"
+            " WHERE json_extract(metadata_json, '$.content_sha256') = ?"
+            " AND json_extract(metadata_json, '$.pipeline_version') = ?"
+            f" AND status IN ({', '.join('?' for _ in statuses)})"
+            " ORDER BY created_at DESC LIMIT 1",
+            (content_hash, pipeline_version, *statuses)
+        )
+
+    async def list_by_ids(self, ids: Sequence[str], logical_ids: Sequence[str], columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        if not ids and not logical_ids:
+            return []
+        return await self._query_meetings(
+            f"WHERE id IN ({', '.join('?' for _ in ids) or 'NULL'})"
+            f" OR logical_id IN ({', '.join('?' for _ in logical_ids) or 'NULL'})",
+            (*[str(i) for i in ids], *logical_ids), columns
+        )
+
+    async def list_created_between(self, date_from: Optional[str], date_to: Optional[str], limit: int,
+                                   columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        conditions, params = [], []
+        if date_from:
+            conditions.append("created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("created_at <= ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return await self._query_meetings(f"{where}ORDER BY created_at LIMIT ?", (*params, limit), columns)
+
+    def _insert(self, record: Dict[str, Any], on_conflict: str = "") -> Optional[Dict[str, Any]]:
+        now = _now()
+        record = dict(record)
+        analysis = record.pop(ANALYSIS_COLUMN, None)
+        values = _encode({"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **record})
+        with self._connect() as conn, _transaction(conn):
+            row = conn.execute(
+                f"INSERT INTO meetings ({', '.join(values)}) VALUES ({', '.join('?' for _ in values)})"
+                f"{on_conflict} RETURNING {', '.join(_ROW_COLUMNS)}",
+                list(values.values())
+            ).fetchone()
+            if row is not None:
+                if analysis:
+                    _write_components(conn, row["id"], analysis)
+                record = _write_summary(conn, row["id"])
+                if analysis:
+                    _write_rollups(conn, row["id"], meeting_contribution(record, analysis))
+        return {**_decode(row), ANALYSIS_COLUMN: analysis} if row is not None else None
+
+    async def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        created = await asyncio.to_thread(self._insert, record)
+        return {column: created.get(column) for column in MEETING_COLUMNS}
+
+    async def get_or_create_by_logical_id(self, logical_id: str, record: Dict[str, Any],
+                                          columns: Sequence[str] = SUMMARY_COLUMNS) -> Tuple[Dict[str, Any], bool]:
+        existing = await self.get_by_logical_id(logical_id, columns)
+        if existing is not None:
+            return existing, False
+        record = {**record, "metadata_json": {**(record.get("metadata_json") or {}), "logical_id": logical_id}}
+        created = await asyncio.to_thread(self._insert, record, " ON CONFLICT (logical_id) DO NOTHING")
+        if created is None: # Created concurrently
+            return await self.get_by_logical_id(logical_id, columns), False
+        return {column: created.get(column) for column in columns}, True
+
+    def _update(self, meeting_id: str, changes: Dict[str, Any], expected_version: Optional[int],
+                columns: Sequence[str], superseded: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        changes = dict(changes)
+        replaces_analysis = ANALYSIS_COLUMN in changes
+        analysis = changes.pop(ANALYSIS_COLUMN, None)
+        values = _encode({"updated_at": _now(), **changes})
+        sql = f"UPDATE meetings SET {', '.join(f'{c} = ?' for c in values)} WHERE id = ?"
+        params = [*values.values(), str(meeting_id)]
+        if expected_version is not None:
+            sql += " AND version = ?"
+            params.append(expected_version)
+        row_columns, with_analysis = _row_columns(columns)
+        with self._connect() as conn, _transaction(conn):
+            row = conn.execute(f"{sql} RETURNING {', '.join(row_columns)}", params).fetchone()
+            if row is None:
+                return None
+            if replaces_analysis:
+                # Components whose content is unchanged are not rewritten
+                _write_components(conn, row["id"], analysis)
+                if superseded is not None:
+                    _file_version(conn, row["id"], superseded["version"], superseded["summary"], superseded["analysis_delta"])
+            record = _write_summary(conn, row["id"])
+            if replaces_analysis:
+                _write_rollups(conn, row["id"], meeting_contribution(record, analysis))
+            parts = _read_components(conn, [row["id"]]).get(row["id"]) if with_analysis else None
+        return _project(_decode(row), columns, parts)
+
+    async def update(self, meeting_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None,
+                     columns: Sequence[str] = ("id", "version"),
+                     superseded: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._update, meeting_id, changes, expected_version, columns, superseded)
+
+    async def list_summaries(
+        self,
+        sort: str = "date",
+        descending: bool = True,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        platform: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        min_engagement: Optional[float] = None,
+        max_engagement: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        column = SORT_COLUMNS[sort]
+        conditions, params = [], []
+        for condition, value in (
+            ("platform = ?", platform), ("status = ?", status),
+            ("date >= ?", date_from), ("date <= ?", date_to),
+            ("engagement_score >= ?", min_engagement), ("engagement_score <= ?", max_engagement),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        if sort == "engagement":
+            conditions.append("engagement_score IS NOT NULL")
+        if after is not None:
+            conditions.append(f"({column}, meeting_id) {'<' if descending else '>'} (?, ?)")
+            params.extend(after)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "DESC" if descending else "ASC"
+        return await self._query(
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM meeting_summaries{where}"
+            f" ORDER BY {column} {direction}, meeting_id {direction} LIMIT ?",
+            (*params, limit)
+        )
+
+    async def _list_rollups(self, table: str, key_column: str, measures: Sequence[str], date_from: Optional[str],
+                            date_to: Optional[str], key: Optional[str]) -> List[Dict[str, Any]]:
+        conditions, params = [], []
+        for condition, value in (("day >= ?", date_from), ("day <= ?", date_to), (f"{key_column} = ?", key)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return await self._query(
+            f"SELECT day, {key_column}, {', '.join(measures)} FROM {table}{where} ORDER BY day, {key_column}", params
+        )
+
+    async def list_daily_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                 platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._list_rollups("daily_rollups", "platform", DAILY_MEASURES, date_from, date_to, platform)
+
+    async def list_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._list_rollups("speaker_rollups", "speaker", SPEAKER_MEASURES, date_from, date_to, None)
+
+    def _sum_speakers(self, date_from: Optional[str], date_to: Optional[str], speaker: Optional[str],
+                      limit: int) -> Dict[str, Any]:
+        conditions, params = [], []
+        for condition, value in (("day >= ?", date_from), ("day <= ?", date_to)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        speaker_where = f" WHERE {' AND '.join([*conditions, 'speaker = ?'])}" if speaker is not None else where
+        speaker_params = [*params, speaker] if speaker is not None else params
+        sums = ", ".join(f"SUM({measure}) AS {measure}" for measure in SPEAKER_MEASURES)
+        with self._connect() as conn, _transaction(conn, "DEFERRED"):
+            total = conn.execute(f"SELECT TOTAL(speaking_time) FROM speaker_rollups{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT speaker, {sums} FROM speaker_rollups{speaker_where}"
+                f" GROUP BY speaker ORDER BY speaking_time DESC, speaker LIMIT ?", (*speaker_params, limit)
+            ).fetchall()
+        return {"total_speaking_time": total, "speakers": [dict(row) for row in rows]}
+
+    async def sum_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                  speaker: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._sum_speakers, date_from, date_to, speaker, limit)
+
+    def _add_version(self, meeting_id: str, version: int, summary: Dict[str, Any], analysis_delta: Optional[str]) -> None:
+        with self._connect() as conn:
+            _file_version(conn, meeting_id, version, summary, analysis_delta)
+
+    async def add_version(self, meeting_id: str, version: int, summary: Dict[str, Any], analysis_delta: Optional[str]) -> None:
+        await asyncio.to_thread(self._add_version, meeting_id, version, summary, analysis_delta)
+
+    def _fetch_versions(self, sql: str, params: Sequence[Any]) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params)]
+        for row in rows:
+            row["summary"] = loads(row["summary"])
+        return rows
+
+    async def get_version(self, meeting_id: str, version: int) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._fetch_versions,
+            "SELECT version, summary, analysis_delta, created_at FROM meeting_versions WHERE meeting_id = ? AND version = ?",
+            (str(meeting_id), version)
+        )
+        return rows[0] if rows else None
+
+    async def list_versions(self, meeting_id: str, from_version: int = 1, with_deltas: bool = False) -> List[Dict[str, Any]]:
+        columns = "version, summary, analysis_delta, created_at" if with_deltas else "version, summary, created_at"
+        return await asyncio.to_thread(
+            self._fetch_versions,
+            f"SELECT {columns} FROM meeting_versions WHERE meeting_id = ? AND version >= ? ORDER BY version",
+            (str(meeting_id), from_version)
+        )
@@ -0,0 +1,341 @@
+"""
+Meetings store on Supabase (`DATABASE_URL=supabase://`), through the async client.
+
+The client's PostgREST session keeps a pool of keep-alive HTTP connections, so queries
+from concurrent requests share connections instead of each opening one, and awaiting
+them leaves the event loop free. Credentials come from SUPABASE_URL and SUPABASE_KEY.
+Needs the schema changes in db/migrations/ (the `logical_id` column, `meeting_versions`,
+`meeting_components`, `meeting_summaries`, the analytics rollups). A meeting's components
+are fetched with the meeting in one request, as a resource embedded through their foreign
+key. A new analysis is stored by the `store_meeting_analysis` database function, which
+applies the version-guarded row update, the component writes and the filing of the
+version it replaces in one transaction. The
+summary row is upserted after each write, and the rollup contribution is swapped by the
+`apply_analytics_contribution` database function in one transaction.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from supabase import AsyncClient, acreate_client
+
+from db.analysis_components import (
+    ANALYSIS_COLUMN, HEADER, assemble_analysis, components_for_paths, plan_component_writes, split_analysis
+)
+from db.analytics_rollups import DAILY_MEASURES, SPEAKER_MEASURES, meeting_contribution
+from db.meeting_summaries import SORT_COLUMNS, SUMMARY_FIELDS, build_summary
+from db.repository import MEETING_COLUMNS, MeetingRepository, RepositoryUnavailable, SUMMARY_COLUMNS, extract_path
+
+_COMPONENTS_EMBED = "meeting_components(component, content)"
+_PAGE_ROWS = 1000 # PostgREST's default cap on rows per response
+
+def _data(response) -> Any:
+    # maybe_single() gives no response at all for a missing row in some client versions
+    return response.data if response is not None else None
+
+def _select_list(columns: Sequence[str]) -> str:
+    """PostgREST select for the columns; the analysis comes as the embedded components."""
+    row_columns = [c for c in columns if c != ANALYSIS_COLUMN]
+    if len(row_columns) == len(columns):
+        return ", ".join(columns)
+    return ", ".join([*row_columns, _COMPONENTS_EMBED])
+
+def _filter_value(value: Any) -> str:
+    """A value inside a PostgREST or=() filter; text is quoted as it may hold commas or dots."""
+    if isinstance(value, str):
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return str(value)
+
+def _assemble(record: Optional[Dict[str, Any]], columns: Sequence[str]) -> Optional[Dict[str, Any]]:
+    if record is None or ANALYSIS_COLUMN not in columns:
+        return record
+    parts = {row["component"]: row["content"] for row in record.pop("meeting_components", None) or []}
+    record[ANALYSIS_COLUMN] = assemble_analysis(parts)
+    return record
+
+class SupabaseMeetingRepository(MeetingRepository):
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+
+    @classmethod
+    async def connect(cls, location: str = "") -> "SupabaseMeetingRepository":
+        url, key = os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY")
+        if not url or not key:
+            raise RepositoryUnavailable("SUPABASE_URL or SUPABASE_KEY environment variables not found or empty")
+        client = await acreate_client(url, key)
+        print("Supabase async client initialized successfully.")
+        return cls(client)
+
+    def _meetings(self):
+        return self.client.table("meetings")
+
+    def _components(self):
+        return self.client.table("meeting_components")
+
+    async def get(self, meeting_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        return _assemble(_data(await self._meetings().select(_select_list(columns))
+                               .eq("id", str(meeting_id)).maybe_single().execute()), columns)
+
+    async def get_by_logical_id(self, logical_id: str, columns: Sequence[str] = SUMMARY_COLUMNS) -> Optional[Dict[str, Any]]:
+        return _assemble(_data(await self._meetings().select(_select_list(columns))
+                               .eq("logical_id", logical_id).maybe_single().execute()), columns)
+
+    async def get_analysis_fields(self, meeting_id: str, paths: List[List[str]]) -> Optional[Dict[str, Any]]:
+        # Embed only the components holding the paths
+        record = _data(await self._meetings().select(f"id, status, error_detail, {_COMPONENTS_EMBED}")
+                       .eq("id", str(meeting_id))
+                       .in_("meeting_components.component", components_for_paths(paths))
+                       .maybe_single().execute())
+        record = _assemble(record, (ANALYSIS_COLUMN,))
+        if record is None:
+            return None
+        analysis = record.pop(ANALYSIS_COLUMN, None) or {}
+        record["fields"] = [extract_path(analysis, path) for path in paths]
+        return record
+
+    async def find_by_content(self, content_hash: str, pipeline_version: int, statuses: Sequence[str]) -> Optional[Dict[str, Any]]:
+        response = await self._meetings()\
+            .select("id, status, version, metadata_json")\
+            .filter("metadata_json->>content_sha256", "eq", content_hash)\
+            .filter("metadata_json->>pipeline_version", "eq", str(pipeline_version))\
+            .in_("status", list(statuses))\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    async def list_by_ids(self, ids: Sequence[str], logical_ids: Sequence[str], columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        records: Dict[str, Dict[str, Any]] = {}
+        select = _select_list([*columns, "id"] if "id" not in columns else columns)
+        if ids:
+            for record in (await self._meetings().select(select).in_("id", [str(i) for i in ids]).execute()).data or []:
+                records[record["id"]] = record
+        if logical_ids:
+            for record in (await self._meetings().select(select).in_("logical_id", list(logical_ids)).execute()).data or []:
+                records[record["id"]] = record
+        return [{column: _assemble(record, columns).get(column) for column in columns} for record in records.values()]
+
+    async def list_created_between(self, date_from: Optional[str], date_to: Optional[str], limit: int,
+                                   columns: Sequence[str] = SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        query = self._meetings().select(_select_list(columns))
+        if date_from:
+            query = query.gte("created_at", date_from)
+        if date_to:
+            query = query.lte("created_at", date_to)
+        return [_assemble(record, columns) for record in (await query.order("created_at").limit(limit).execute()).data or []]
+
+    async def _stored_hashes(self, meeting_id: str) -> Dict[str, Optional[str]]:
+        stored = (await self._components().select("component, content_hash").eq("meeting_id", meeting_id).execute()).data or []
+        return {row["component"]: row["content_hash"] for row in stored}
+
+    async def _write_components(self, meeting_id: str, analysis: Optional[Dict[str, Any]]) -> None:
+        """Stores the analysis' components whose content changed and removes those it lacks."""
+        writes, deletes = plan_component_writes(analysis, await self._stored_hashes(meeting_id))
+        if writes:
+            await self._components().upsert([
+                {"meeting_id": meeting_id, "component": component, "content": content,
+                 "content_hash": digest, "updated_at": datetime.utcnow().isoformat()}
+                for component, content, digest in writes
+            ], on_conflict="meeting_id,component").execute()
+        if deletes:
+            await self._components().delete().eq("meeting_id", meeting_id).in_("component", deletes).execute()
+
+    async def _write_summary(self, record: Dict[str, Any], analysis: Optional[Dict[str, Any]] = None,
+                             replaces_analysis: bool = False) -> None:
+        """Rebuilds the summary row of a meeting from its just-written record (and analysis)."""
+        if replaces_analysis:
+            header = split_analysis(analysis).get(HEADER)
+        else:
+            stored = _data(await self._components().select("content").eq("meeting_id", record["id"])
+                           .eq("component", HEADER).maybe_single().execute())
+            header = stored["content"] if stored else None
+        try:
+            await self.client.table("meeting_summaries").upsert(build_summary(record, header), on_conflict="meeting_id").execute()
+        except Exception as e:
+            # The meeting itself is stored; the summary is rebuilt by its next write
+            print(f"Failed to update the summary of meeting {record['id']}: {e}")
+
+    async def _write_rollups(self, record: Dict[str, Any], analysis: Optional[Dict[str, Any]]) -> None:
+        """Swaps the meeting's contribution to the analytics rollups for this analysis'."""
+        try:
+            await self.client.rpc("apply_analytics_contribution", {
+                "p_meeting_id": record["id"],
+                "p_contribution": meeting_contribution(record, analysis)
+            }).execute()
+        except Exception as e:
+            # The meeting itself is stored; its next analysis swaps the contribution again
+            print(f"Failed to update the analytics rollups for meeting {record['id']}: {e}")
+
+    async def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        record = dict(record)
+        analysis = record.pop(ANALYSIS_COLUMN, None)
+        response = await self._meetings().insert(record).execute()
+        if not response.data:
+            raise RuntimeError("Supabase insert into meetings returned no data")
+        created = response.data[0]
+        if analysis:
+            await self._write_components(created["id"], analysis)
+            await self._write_rollups(created, analysis)
+        await self._write_summary(created, analysis, True)
+        return {**{column: created.get(column) for column in MEETING_COLUMNS}, ANALYSIS_COLUMN: analysis}
+
+    async def get_or_create_by_logical_id(self, logical_id: str, record: Dict[str, Any],
+                                          columns: Sequence[str] = SUMMARY_COLUMNS) -> Tuple[Dict[str, Any], bool]:
+        existing = await self.get_by_logical_id(logical_id, columns)
+        if existing is not None:
+            return existing, False
+        record = {**record, "metadata_json": {**(record.get("metadata_json") or {}), "logical_id": logical_id}}
+        analysis = record.pop(ANALYSIS_COLUMN, None)
+        # INSERT ... ON CONFLICT (logical_id) DO NOTHING: a concurrent create wins without an error
+        response = await self._meetings().upsert(record, on_conflict="logical_id", ignore_duplicates=True).execute()
+        if not response.data:
+            return await self.get_by_logical_id(logical_id, columns), False
+        created = {**response.data[0], ANALYSIS_COLUMN: analysis}
+        if analysis:
+            await self._write_components(created["id"], analysis)
+            await self._write_rollups(created, analysis)
+        await self._write_summary(created, analysis, True)
+        return {column: created.get(column) for column in columns}, True
+
+    async def update(self, meeting_id: str, changes: Dict[str, Any], expected_version: Optional[int] = None,
+                     columns: Sequence[str] = ("id", "version"),
+                     superseded: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        changes = dict(changes)
+        replaces_analysis = ANALYSIS_COLUMN in changes
+        analysis = changes.pop(ANALYSIS_COLUMN, None)
+        if replaces_analysis:
+            updated = await self._store_analysis(str(meeting_id), changes, analysis, expected_version, superseded)
+        else:
+            query = self._meetings().update(changes).eq("id", str(meeting_id))
+            if expected_version is not None:
+                query = query.eq("version", expected_version)
+            response = await query.execute()
+            updated = response.data[0] if response.data else None
+        if updated is None:
+            return None
+        await self._write_summary(updated, analysis, replaces_analysis)
+        if replaces_analysis:
+            await self._write_rollups(updated, analysis)
+            updated[ANALYSIS_COLUMN] = analysis
+        elif ANALYSIS_COLUMN in columns:
+            updated = await self.get(updated["id"], columns) or updated
+        return {column: updated.get(column) for column in columns}
+
+    async def _store_analysis(self, meeting_id: str, changes: Dict[str, Any], analysis: Optional[Dict[str, Any]],
+                              expected_version: Optional[int], superseded: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The guarded row update, the component writes and the filing of the superseded
+        version, in one transaction; the updated row, or None if the meeting is missing or
+        not at `expected_version`."""
+        # Under a version guard, hashes read now are still current if the update goes
+        # through (any analysis written since moved the version on), so only changed
+        # components are sent; without one, all are sent and unchanged ones left as they are
+        stored = await self._stored_hashes(meeting_id) if expected_version is not None else {}
+        writes, _ = plan_component_writes(analysis, stored)
+        response = await self.client.rpc("store_meeting_analysis", {
+            "p_meeting_id": meeting_id,
+            "p_changes": changes,
+            "p_expected_version": expected_version,
+            "p_components": [
+                {"component": component, "content": content, "content_hash": digest}
+                for component, content, digest in writes
+            ],
+            "p_keep": list(split_analysis(analysis)),
+            "p_superseded": superseded
+        }).execute()
+        return _data(response) or None
+
+    async def list_summaries(
+        self,
+        sort: str = "date",
+        descending: bool = True,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None,
+        platform: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        min_engagement: Optional[float] = None,
+        max_engagement: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        column = SORT_COLUMNS[sort]
+        query = self.client.table("meeting_summaries").select(", ".join(SUMMARY_FIELDS))
+        if platform is not None:
+            query = query.eq("platform", platform)
+        if status is not None:
+            query = query.eq("status", status)
+        if date_from is not None:
+            query = query.gte("date", date_from)
+        if date_to is not None:
+            query = query.lte("date", date_to)
+        if min_engagement is not None:
+            query = query.gte("engagement_score", min_engagement)
+        if max_engagement is not None:
+            query = query.lte("engagement_score", max_engagement)
+        if sort == "engagement":
+            query = query.not_.is_("engagement_score", "null")
+        if after is not None:
+            # (column, meeting_id) past the cursor; PostgREST has no row-value comparison
+            op = "lt" if descending else "gt"
+            value, meeting_id = _filter_value(after[0]), _filter_value(after[1])
+            query = query.or_(f"{column}.{op}.{value},and({column}.eq.{value},meeting_id.{op}.{meeting_id})")
+        response = await query.order(column, desc=descending).order("meeting_id", desc=descending).limit(limit).execute()
+        return response.data or []
+
+    async def _list_rollups(self, table: str, key_column: str, measures: Sequence[str], date_from: Optional[str],
+                            date_to: Optional[str], key: Optional[str]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = self.client.table(table).select(f"day, {key_column}, {', '.join(measures)}")
+            if date_from is not None:
+                query = query.gte("day", date_from)
+            if date_to is not None:
+                query = query.lte("day", date_to)
+            if key is not None:
+                query = query.eq(key_column, key)
+            page = (await query.order("day").order(key_column).range(len(rows), len(rows) + _PAGE_ROWS - 1).execute()).data or []
+            rows.extend(page)
+            if len(page) < _PAGE_ROWS:
+                return rows
+
+    async def list_daily_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                 platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._list_rollups("daily_rollups", "platform", DAILY_MEASURES, date_from, date_to, platform)
+
+    async def list_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._list_rollups("speaker_rollups", "speaker", SPEAKER_MEASURES, date_from, date_to, None)
+
+    async def sum_speaker_rollups(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                  speaker: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        # Grouped, ordered and limited by the database (db/migrations/0007_speaker_talk_time.sql)
+        response = await self.client.rpc("sum_speaker_rollups", {
+            "p_date_from": date_from, "p_date_to": date_to, "p_speaker": speaker, "p_limit": limit
+        }).execute()
+        return _data(response) or {"total_speaking_time": 0, "speakers": []}
+
+    async def add_version(self, meeting_id: str, version: int, summary: Dict[str, Any], analysis_delta: Optional[str]) -> None:
+        await self.client.table("meeting_versions").upsert({
+            "meeting_id": str(meeting_id),
+            "version": version,
+            "summary": summary,
+            "analysis_delta": analysis_delta
+        }, on_conflict="meeting_id,version", ignore_duplicates=True).execute()
+
+    async def get_version(self, meeting_id: str, version: int) -> Optional[Dict[str, Any]]:
+        return _data(await self.client.table("meeting_versions")
+                     .select("version, summary, analysis_delta, created_at")
+                     .eq("meeting_id", str(meeting_id)).eq("version", version)
+                     .maybe_single().execute())
+
+    async def list_versions(self, meeting_id: str, from_version: int = 1, with_deltas: bool = False) -> List[Dict[str, Any]]:
+        columns = "version, summary, analysis_delta, created_at" if with_deltas else "version, summary, created_at"
+        response = await self.client.table("meeting_versions").select(columns)\
+            .eq("meeting_id", str(meeting_id)).gte("version", from_version)\
+            .order("version").execute()
+        return response.data or []
+
+    async def close(self) -> None:
+        postgrest = getattr(self.client, "postgrest", None)
+        if postgrest is not None and hasattr(postgrest, "aclose"):
+            await postgrest.aclose()
@@ -2,10 +2,15 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from api.routes import meetings # Import the meetings router
 from api.routes import datasets # Import the datasets router
-from services.transcription import load_whisper_model # Import model loader
-from services.sentiment import load_sentiment_model # Import sentiment model loader
-from services.topic_modeling import load_topic_model # Import topic model compatibility layer
-from services.diarization import load_diarization_model # Import diarization model loader
+from api.routes import search # Import the semantic search router
+from api.routes import analysis_data # Import the component bundle shim router
+from api.routes import jobs # Import the job status router
+from api.routes import analytics # Import the cross-meeting analytics router
+from api.http_caching import CompressionMiddleware # gzip/brotli for JSON responses
+from services.embeddings import load_embedding_model # Query embeddings for semantic search
+from services.search_index import get_search_index # Import search index loader
+from services.pdf_render_pool import shutdown_render_pool # PDF worker processes
+from db.repository import close_repository # Meetings store connection pool
 
 # Lifespan context manager for loading models on startup
 @asynccontextmanager
@@ -13,14 +18,10 @@ async def lifespan(app: FastAPI):
     # Load the ML model
     print("Application startup: Loading models...")
     try:
-        load_whisper_model("small") # Load the desired model size
-        load_sentiment_model() # Load the default sentiment model
-        
-        # We maintain compatibility with the topic_modeling module,
-        # but now use Mistral 7B LLM for topic extraction instead of BERTopic
-        load_topic_model() # Initialize topic modeling compatibility layer
-        
-        load_diarization_model() # Load pyannote diarization model
+        # Analyses run in the job workers (services.job_worker), whose supervisor loads the
+        # pipeline models; the API only embeds search queries
+        load_embedding_model()
+        get_search_index() # Load the on-disk search index shards into memory
         # TODO: Load other models here (e.g., potentially Mistral if not using Ollama API externally)
         print("Models loaded successfully.")
     except Exception as e:
@@ -29,7 +30,8 @@ async def lifespan(app: FastAPI):
     yield
     # Clean up the ML models and release the resources
     print("Application shutdown: Cleaning up resources...")
-    # Add cleanup logic if needed
+    shutdown_render_pool()
+    await close_repository()
 
 app = FastAPI(
     title="PulsePoint Meeting Analysis API",
@@ -38,9 +40,16 @@ app = FastAPI(
     lifespan=lifespan # Add lifespan manager
 )
 
+# Compress JSON responses above a size threshold
+app.add_middleware(CompressionMiddleware)
+
 # Include API routers
 app.include_router(meetings.router)
 app.include_router(datasets.router) # Include the new datasets router
+app.include_router(search.router) # Include the semantic search router
+app.include_router(analysis_data.router) # Serve legacy per-component JSON paths from bundles
+app.include_router(jobs.router) # Status of queued analysis jobs
+app.include_router(analytics.router) # Trends answered from the analytics rollups
 
 @app.get("/", tags=["Root"], summary="Root endpoint for API health check")
 async def read_root():
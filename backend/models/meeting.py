@@ -54,6 +54,8 @@ class MeetingMetadata(BaseModel):
     source_file: Optional[str] = None
     file_type: Optional[str] = None
     engagement_score: Optional[float] = None # Can be float or int, use float for flexibility
+    skipped_stages: Optional[List[str]] = None # Pipeline stages left out (deadline or failure), to be backfilled
+    pipeline_version: Optional[int] = None # services.analysis_pipeline.PIPELINE_VERSION that produced it
 
 class MeetingAnalysisJSON(BaseModel):
     """Defines the overall structure for the final meeting analysis JSON output."""
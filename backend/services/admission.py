@@ -0,0 +1,82 @@
+"""
+Load-adaptive admission for analysis jobs.
+
+When a burst of meetings arrives (the Monday-morning backlog), every job would wait on
+the slow LLM stages in turn. Before a job starts, the admission controller looks at how
+many analysis jobs are waiting and how long the deferrable stages have been taking. Under
+pressure, the job runs only the fast stages (parsing, speakers, sentiment, engagement) and
+its topics and insights are left to a low-priority backfill job (see
+services.analysis_backfill), which patches the stored analysis as a new version once the
+queue has drained. The dashboard is available as soon as the fast stages are done.
+
+The queue is under pressure when either
+- at least ADMISSION_MAX_WAITING analysis jobs are waiting, or
+- the estimated time to work through them, using the recent median duration of the
+  deferrable stages, exceeds ADMISSION_MAX_BACKLOG_SECONDS.
+"""
+
+import os
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from services.job_queue import JobQueue, get_job_queue
+
+ADMISSION_MAX_WAITING = int(os.environ.get("ADMISSION_MAX_WAITING", "4")) # 0 = never defer for depth
+ADMISSION_MAX_BACKLOG_SECONDS = float(os.environ.get("ADMISSION_MAX_BACKLOG_SECONDS", "1200")) # 0 = never defer for latency
+ADMISSION_CHECK_INTERVAL_SECONDS = 10.0 # The decision is reused for this long
+DEFERRABLE_STAGES = ("topics", "insights") # Stages a backfill job can run on the stored transcript
+LATENCY_SAMPLE_SIZE = 20
+
+class AdmissionController:
+    """Decides which stages to defer for jobs of the given (analysis) types."""
+
+    def __init__(
+        self,
+        job_types: List[str],
+        concurrency: int = 1,
+        max_waiting: int = ADMISSION_MAX_WAITING,
+        max_backlog_seconds: float = ADMISSION_MAX_BACKLOG_SECONDS,
+        queue: Optional[JobQueue] = None
+    ):
+        self.job_types = list(job_types)
+        self.concurrency = max(concurrency, 1)
+        self.max_waiting = max_waiting
+        self.max_backlog_seconds = max_backlog_seconds
+        self.queue = queue
+        self._decision: Optional[Tuple[bool, str]] = None
+        self._decided_at = 0.0
+
+    def deferrable_seconds(self) -> float:
+        """Recent median time the deferrable stages took per job, in seconds."""
+        queue = self.queue or get_job_queue()
+        total = 0.0
+        for stage in DEFERRABLE_STAGES:
+            durations = queue.recent_stage_durations(stage, LATENCY_SAMPLE_SIZE)
+            if durations:
+                total += statistics.median(durations) / 1000
+        return total
+
+    def pressure(self) -> Tuple[bool, str]:
+        """(under pressure, why) from the current queue depth and stage latency."""
+        now = time.monotonic()
+        if self._decision is not None and now - self._decided_at < ADMISSION_CHECK_INTERVAL_SECONDS:
+            return self._decision
+        queue = self.queue or get_job_queue()
+        waiting = queue.count_waiting(self.job_types)
+        decision = (False, f"{waiting} job(s) waiting")
+        if self.max_waiting and waiting >= self.max_waiting:
+            decision = (True, f"{waiting} job(s) waiting (limit {self.max_waiting})")
+        elif self.max_backlog_seconds and waiting:
+            backlog = waiting * self.deferrable_seconds() / self.concurrency
+            if backlog > self.max_backlog_seconds:
+                decision = (True, f"{waiting} job(s) waiting would spend ~{backlog:.0f}s in topics/insights")
+        self._decision, self._decided_at = decision, now
+        return decision
+
+    def stages_to_defer(self) -> List[str]:
+        under_pressure, reason = self.pressure()
+        if not under_pressure:
+            return []
+        print(f"Admission: queue under pressure ({reason}); deferring {', '.join(DEFERRABLE_STAGES)}")
+        return list(DEFERRABLE_STAGES)
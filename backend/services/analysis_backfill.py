@@ -0,0 +1,73 @@
+"""
+Backfill of analysis stages that were skipped (deferred under load, out of time or failed).
+
+Topics and insights only need the transcript, which the stored analysis carries, so they
+can be produced later without re-running transcription or diarization. The result is
+patched into the stored analysis as a new version, filing the version it replaces in the
+version history like a re-analysis does (services.meeting_versions), and the on-disk
+analysis file and component bundle are updated in place.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.analysis_bundle import bundle_path, update_bundle
+from services.analysis_pipeline import calculate_topic_percentages
+from services.insights import generate_ai_insights
+from services.progress import begin_stage, stage_time_left
+from services.serialization import loads, write_json
+from services.topic_modeling import model_topics
+
+BACKFILLABLE_STAGES = ("topics", "insights")
+
+def run_backfill_stages(transcript: str, stages: List[str]) -> Dict[str, Any]:
+    """Runs the requested stages on a transcript; returns the analysis fields they produce
+    (named as in the stored analysis_json). Raises if a stage fails, so the job is retried."""
+    fields: Dict[str, Any] = {}
+    if "topics" in stages:
+        begin_stage("topics")
+        topics = calculate_topic_percentages(model_topics(re.sub(r'\s+', ' ', transcript).strip()))
+        fields["topics"] = {"topics": [t.model_dump(exclude_none=True) for t in topics]} if topics else None
+    if "insights" in stages:
+        begin_stage("insights") # Mostly waiting on the Ollama server
+        insights = generate_ai_insights(transcript, timeout=stage_time_left())
+        fields["summary"] = insights.summary
+        fields["action_items"] = insights.action_items
+        fields["insights"] = insights.other_insights
+    return fields
+
+def patch_analysis(analysis_json: Dict[str, Any], fields: Dict[str, Any], stages: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    """The analysis with the backfilled fields applied and those stages no longer marked
+    skipped; also returns the stages still skipped."""
+    patched = {**analysis_json, **fields}
+    metadata = dict(patched.get("metadata") or {})
+    remaining = [stage for stage in metadata.get("skipped_stages") or [] if stage not in stages]
+    metadata["skipped_stages"] = remaining or None
+    patched["metadata"] = metadata
+    return patched, remaining
+
+def patch_output_files(output_dir: Optional[str], meeting_id: str, fields: Dict[str, Any], remaining: List[str]) -> None:
+    """Applies the backfilled fields to the analysis file the pipeline wrote (which uses the
+    model's aliases) and to the topics component of the bundle."""
+    if not output_dir:
+        return
+    analysis_file = os.path.join(output_dir, f"meeting-analysis-{meeting_id}.json")
+    if os.path.exists(analysis_file):
+        with open(analysis_file, 'rb') as f:
+            data = loads(f.read())
+        for name, value in fields.items():
+            key = "actionItems" if name == "action_items" else name
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        metadata = data.setdefault("metadata", {})
+        if remaining:
+            metadata["skipped_stages"] = remaining
+        else:
+            metadata.pop("skipped_stages", None)
+        write_json(analysis_file, data)
+    path = bundle_path(output_dir, meeting_id)
+    if "topics" in fields and os.path.exists(path):
+        update_bundle(path, {"topics": fields["topics"]})
@@ -0,0 +1,198 @@
+"""
+Per-meeting analysis bundle: every dashboard component in one file.
+
+Layout of `components-<meeting_id>.bundle`:
+
+    b"PPB1" | index length (uint32 LE) | index (JSON) | section | section | ...
+
+The index maps each component name to [offset, length, raw_length] of its section;
+offsets are absolute. Each section is compact JSON compressed with zlib, which is also
+HTTP's `deflate` content coding, so a section can go over the wire exactly as stored.
+Reading one component is a header read plus one seek, and indexes are cached per file
+so repeat reads only do the seek. Bundles are written to a temp file and swapped in with
+`os.replace`, so readers never see a half-written bundle.
+
+The old per-component file names (`speakers-analysis-<id>.json`, `timeline-<id>.json`, ...)
+map onto sections through `component_for_filename`, which the `/analysis-data` route uses
+to keep serving those paths.
+"""
+
+import functools
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.serialization import dumps, loads
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+ANALYSIS_DATA_ROOT = os.path.join(_PROJECT_ROOT, 'public', 'analysis-data')
+
+BUNDLE_MAGIC = b"PPB1"
+_HEADER = struct.Struct("<4sI")
+CODEC = "zlib"
+COMPRESSION_LEVEL = 6
+
+# Component name -> legacy file name pattern (formatted with the meeting ID)
+COMPONENT_FILENAMES: Dict[str, str] = {
+    "participants": "participants-analysis-{}.json",
+    "reactions": "reactions-analysis-{}.json",
+    "speakers": "speakers-analysis-{}.json",
+    "sentiment": "sentiment-analysis-{}.json",
+    "topics": "topics-analysis-{}.json",
+    "comments": "comments-analysis-{}.json",
+    "transcript": "transcript-{}.json",
+    "timeline": "timeline-{}.json",
+}
+
+class BundleSection:
+    """Location of one compressed section inside a bundle."""
+    __slots__ = ("offset", "length", "raw_length")
+
+    def __init__(self, offset: int, length: int, raw_length: int):
+        self.offset = offset
+        self.length = length
+        self.raw_length = raw_length
+
+# path -> ((mtime_ns, size), sections); a replaced bundle has a new mtime/size
+_index_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, BundleSection]]] = {}
+_index_cache_lock = threading.Lock()
+
+def bundle_path(output_dir: str, meeting_id: str) -> str:
+    return os.path.join(output_dir, f"components-{meeting_id}.bundle")
+
+def component_for_filename(meeting_id: str, filename: str) -> Optional[str]:
+    """Component name stored under a legacy per-component file name, if any."""
+    for component, pattern in COMPONENT_FILENAMES.items():
+        if filename == pattern.format(meeting_id):
+            return component
+    return None
+
+def legacy_component_paths(output_dir: str, meeting_id: str) -> List[str]:
+    return [os.path.join(output_dir, pattern.format(meeting_id)) for pattern in COMPONENT_FILENAMES.values()]
+
+def _compress_component(name: str, value: Any) -> Tuple[str, bytes, int]:
+    raw = dumps(value)
+    return name, zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+def write_bundle(path: str, components: Dict[str, Any]) -> None:
+    """Writes the components (anything `services.serialization.dumps` accepts) as one bundle, atomically."""
+    _write_sections(path, [_compress_component(name, value) for name, value in components.items()])
+
+def update_bundle(path: str, changes: Dict[str, Any]) -> None:
+    """Replaces or adds the given components (None removes one); the other sections are
+    copied over still compressed."""
+    payloads: List[Tuple[str, bytes, int]] = []
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            for name, section in _read_index(f, path).items():
+                if name in changes:
+                    continue
+                f.seek(section.offset)
+                payloads.append((name, f.read(section.length), section.raw_length))
+    payloads.extend(_compress_component(name, value) for name, value in changes.items() if value is not None)
+    _write_sections(path, payloads)
+
+def _write_sections(path: str, payloads: List[Tuple[str, bytes, int]]) -> None:
+    # Offsets depend on the index length, which depends on the offsets' digits: lay the
+    # index out with zero offsets first, then grow it until it is stable
+    index_bytes = b""
+    while True:
+        offset = _HEADER.size + len(index_bytes)
+        sections = {}
+        for name, data, raw_length in payloads:
+            sections[name] = [offset, len(data), raw_length]
+            offset += len(data)
+        candidate = dumps({"codec": CODEC, "sections": sections})
+        if len(candidate) == len(index_bytes):
+            index_bytes = candidate
+            break
+        index_bytes = candidate
+
+    # A temporary file of its own, so concurrent writers of the same bundle (a backfill
+    # and a re-analysis) never write into each other's file; the last replace wins
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, len(index_bytes)))
+            f.write(index_bytes)
+            for _, data, _ in payloads:
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _read_index(f, path: str) -> Dict[str, BundleSection]:
+    stat = os.fstat(f.fileno())
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _index_cache_lock:
+        cached = _index_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    magic, index_length = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != BUNDLE_MAGIC:
+        raise ValueError(f"Not an analysis bundle: {path}")
+    index = loads(f.read(index_length))
+    if index.get("codec") != CODEC:
+        raise ValueError(f"Unsupported bundle codec '{index.get('codec')}' in {path}")
+    sections = {name: BundleSection(*location) for name, location in index["sections"].items()}
+    with _index_cache_lock:
+        _index_cache[path] = (key, sections)
+    return sections
+
+def read_component_compressed(path: str, component: str) -> Optional[bytes]:
+    """The component's section exactly as stored (zlib / HTTP deflate), or None if absent."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        section = _read_index(f, path).get(component)
+        if section is None:
+            return None
+        f.seek(section.offset)
+        return f.read(section.length)
+
+def read_component_bytes(path: str, component: str) -> Optional[bytes]:
+    """The component as UTF-8 JSON bytes, or None if absent."""
+    data = read_component_compressed(path, component)
+    return zlib.decompress(data) if data is not None else None
+
+def read_component(path: str, component: str) -> Optional[Any]:
+    """The decoded component, or None if absent."""
+    raw = read_component_bytes(path, component)
+    return loads(raw) if raw is not None else None
+
+def list_components(path: str) -> List[str]:
+    with open(path, 'rb') as f:
+        return list(_read_index(f, path))
+
+@functools.lru_cache(maxsize=32)
+def _load_component_cached(path: str, mtime_ns: int, size: int, component: str) -> Optional[Any]:
+    if path.endswith(".bundle"):
+        return read_component(path, component)
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def load_component(meeting_dir: str, meeting_id: str, component: str) -> Optional[Any]:
+    """A meeting's decoded component, from its bundle or, for meetings analysed before
+    bundles, from the per-component file. Recently used components stay decoded in memory
+    (until their file changes), so paging through one costs no re-read.
+
+    Treat the result as read-only: it is shared between callers.
+    """
+    for path in (bundle_path(meeting_dir, meeting_id),
+                 os.path.join(meeting_dir, COMPONENT_FILENAMES[component].format(meeting_id))):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        value = _load_component_cached(path, stat.st_mtime_ns, stat.st_size, component)
+        if value is not None or path.endswith(".json"):
+            return value
+    return None
@@ -0,0 +1,287 @@
+"""
+Analysis work executed by the job workers (see services.job_queue / services.job_worker).
+
+Each job type has a handler taking the claimed `Job` and returning a small result dict,
+plus its limits: how many may run at once across all workers, how many attempts a job
+gets, its default priority and its deadline (JOB_DEADLINE_<TYPE> seconds; see
+services.progress for how stages are bounded by it). A handler that raises has the
+attempt retried with backoff; on the last attempt it records the failure on the meeting
+record first. A job that is cancelled or runs out of time is not retried.
+
+When optional stages (sentiment, topics, insights, ...) were skipped to stay within the
+deadline, or failed, the analysis is stored without them: they are listed in
+`metadata.skipped_stages` and in the job's result. Under queue pressure the admission
+controller (services.admission) has topics and insights skipped up front. Either way, a
+low-priority ANALYSIS_BACKFILL job is queued for those two; it patches the stored analysis
+as a new version (services.analysis_backfill). Every analysis is stored through
+services.meeting_versions, which files the version it replaces in the version history.
+
+Handlers are synchronous; they reach the meetings store through `db.repository.run_sync`.
+"""
+
+import os
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from db.repository import MeetingRepository, run_sync
+from models.meeting import MeetingAnalysisJSON
+from services.admission import AdmissionController
+from services.analysis_backfill import (
+    BACKFILLABLE_STAGES, patch_analysis, patch_output_files, run_backfill_stages
+)
+from services.analysis_bundle import ANALYSIS_DATA_ROOT
+from services.analysis_pipeline import run_full_analysis_pipeline
+from services.job_queue import CANCELLED, Job, get_job_queue
+from services.meeting_versions import replace_analysis
+from services.progress import DeadlineExceeded, JobCancelled
+from services.pdf_cache import invalidate_meeting
+
+# Job types
+DATASET_ANALYSIS = "dataset_analysis" # POST /api/datasets/{dataset_id}/analyze
+MEETING_DATASET_ANALYSIS = "meeting_dataset_analysis" # POST /api/meetings/analyze-dataset
+ANALYSIS_BACKFILL = "analysis_backfill" # Stages skipped by one of the above
+
+BACKFILL_PRIORITY = -10 # Below any interactive or batch analysis
+
+PIPELINE_DEADLINE_SECONDS = float(os.environ.get("PIPELINE_DEADLINE_SECONDS", "5400")) # Whole analysis, all stages
+
+class JobType:
+    __slots__ = ("name", "handler", "concurrency", "max_attempts", "priority", "deadline_seconds", "on_expired")
+
+    def __init__(self, name: str, handler: Callable[[Job], Optional[Dict[str, Any]]],
+                 concurrency: int = 1, max_attempts: int = 3, priority: int = 0,
+                 deadline_seconds: float = PIPELINE_DEADLINE_SECONDS,
+                 on_expired: Optional[Callable[[Job], None]] = None):
+        self.name = name
+        self.handler = handler
+        # Called with a job whose worker died on its last attempt, or after it was cancelled
+        # (JobQueue.expire_lapsed): the handler never got to record the outcome
+        self.on_expired = on_expired
+        self.concurrency = int(os.environ.get(f"JOB_CONCURRENCY_{name.upper()}", concurrency))
+        self.max_attempts = max_attempts
+        self.priority = priority
+        self.deadline_seconds = float(os.environ.get(f"JOB_DEADLINE_{name.upper()}", deadline_seconds)) # 0 = none
+
+def _failed_changes(error: BaseException) -> Dict[str, Any]:
+    return {"status": "FAILED", "error_detail": str(error)[:500]}
+
+def _mark_failed(record_id: Optional[str], error: BaseException) -> None:
+    if not record_id:
+        return
+    try:
+        run_sync(lambda repository: repository.update(record_id, _failed_changes(error)))
+        print(f"Updated meeting record {record_id} to FAILED status.")
+    except Exception as db_fail_error:
+        print(f"Failed to update meeting record {record_id} with error status: {db_fail_error}")
+
+def _analysed_meeting_id(job: Job) -> Optional[str]:
+    return job.payload.get("meeting_id") if job.job_type == DATASET_ANALYSIS else job.payload.get("supabase_record_id")
+
+async def record_cancellation(job: Job, repository: MeetingRepository) -> None:
+    """Marks the meeting of a job cancelled before it ran (running jobs do this themselves)."""
+    record_id = _analysed_meeting_id(job)
+    if not record_id:
+        return
+    try:
+        await repository.update(record_id, _failed_changes(JobCancelled("Analysis was cancelled")))
+    except Exception as db_fail_error:
+        print(f"Failed to update meeting record {record_id} with error status: {db_fail_error}")
+
+def record_expiry(job: Job) -> None:
+    """Marks the meeting of an analysis job that ended with its worker failed, so it is not
+    left PROCESSING (and found as such by the upload dedup lookup)."""
+    if job.state == CANCELLED:
+        _mark_failed(_analysed_meeting_id(job), JobCancelled("Analysis was cancelled"))
+    else:
+        _mark_failed(_analysed_meeting_id(job), RuntimeError(job.last_error or "Worker lease expired"))
+
+_admission: Optional[AdmissionController] = None
+
+def _stages_to_defer(job: Job) -> List[str]:
+    global _admission
+    if job.payload.get("full_analysis"):
+        return []
+    if _admission is None:
+        analysis_types = [DATASET_ANALYSIS, MEETING_DATASET_ANALYSIS]
+        _admission = AdmissionController(analysis_types, sum(JOB_TYPES[t].concurrency for t in analysis_types))
+    return _admission.stages_to_defer()
+
+def _enqueue_backfill(job: Job, analysis_result: MeetingAnalysisJSON, payload: Dict[str, Any]) -> Optional[str]:
+    """Queues a backfill for the skipped stages that can be backfilled; returns its job ID."""
+    stages = [stage for stage in analysis_result.metadata.skipped_stages or [] if stage in BACKFILLABLE_STAGES]
+    if not stages:
+        return None
+    try:
+        backfill = enqueue_analysis_job(ANALYSIS_BACKFILL, {**payload, "stages": stages, "source_job_id": job.id})
+    except Exception as e:
+        # The analysis itself is stored; the stages stay marked skipped
+        print(f"[Job {job.id}] Failed to queue backfill of {', '.join(stages)}: {e}")
+        return None
+    print(f"[Job {job.id}] Queued backfill job {backfill.id} for {', '.join(stages)}")
+    return backfill.id
+
+def run_dataset_analysis(job: Job) -> Dict[str, Any]:
+    """Analyses a configured dataset or an uploaded file into the meeting record created
+    when it was enqueued."""
+    payload = job.payload
+    meeting_id = payload["meeting_id"]
+    output_dir = payload.get("output_dir") or os.path.join(ANALYSIS_DATA_ROOT, str(meeting_id))
+    print(f"[Job {job.id}] Starting analysis of {payload['file_path']} for meeting {meeting_id} (attempt {job.attempts})")
+    try:
+        analysis_result: MeetingAnalysisJSON = run_full_analysis_pipeline(
+            payload["file_path"], payload["file_type"], payload.get("chat_file_path"),
+            output_dir=output_dir,
+            meeting_id=payload.get("logical_meeting_id") or str(meeting_id),
+            defer_stages=_stages_to_defer(job)
+        )
+    except (JobCancelled, DeadlineExceeded) as stopped:
+        _mark_failed(meeting_id, stopped)
+        raise
+    except Exception as pipeline_error:
+        print(f"[Job {job.id}] Pipeline error: {pipeline_error}")
+        if job.is_last_attempt:
+            _mark_failed(meeting_id, pipeline_error)
+        raise
+
+    version = run_sync(lambda repository: replace_analysis(
+        repository, meeting_id, analysis_result.model_dump(exclude_unset=True),
+        {"status": "COMPLETE", "error_detail": None}
+    ))
+    if version is None:
+        raise RuntimeError(f"Meeting {meeting_id} not found to store its analysis")
+    invalidate_meeting(meeting_id)
+    print(f"[Job {job.id}] Analysis stored on meeting {meeting_id} as v{version}")
+    backfill_job_id = _enqueue_backfill(job, analysis_result, {
+        "supabase_record_id": meeting_id,
+        "logical_meeting_id": payload.get("logical_meeting_id") or str(meeting_id),
+        "output_dir": output_dir,
+        "version": version
+    })
+    return {
+        "meeting_id": meeting_id,
+        "skipped_stages": analysis_result.metadata.skipped_stages or [],
+        "backfill_job_id": backfill_job_id
+    }
+
+def run_meeting_dataset_analysis(job: Job) -> Dict[str, Any]:
+    """Runs the pipeline for a logical meeting ID, writes its output files and stores the
+    result as the next version of the meeting record resolved when the job was enqueued."""
+    payload = job.payload
+    logical_meeting_id = payload["logical_meeting_id"]
+    supabase_record_id = payload.get("supabase_record_id")
+    print(f"[Job {job.id}] Starting analysis pipeline for {logical_meeting_id} (attempt {job.attempts})")
+
+    try:
+        os.makedirs(payload["output_dir"], exist_ok=True)
+        analysis_result: MeetingAnalysisJSON = run_full_analysis_pipeline(
+            file_path=payload["transcript_file_path"],
+            file_type=payload["file_type"],
+            chat_file_path=payload.get("chat_file_path"),
+            output_dir=payload["output_dir"],
+            meeting_id=logical_meeting_id,
+            defer_stages=_stages_to_defer(job)
+        )
+    except (JobCancelled, DeadlineExceeded) as stopped:
+        print(f"[Job {job.id}] Analysis stopped: {stopped}")
+        _mark_failed(supabase_record_id, stopped)
+        raise
+    except Exception as e:
+        print(f"[Job {job.id}] Error during analysis pipeline execution: {e}")
+        traceback.print_exc()
+        if job.is_last_attempt:
+            _mark_failed(supabase_record_id, e)
+        raise
+    print(f"[Job {job.id}] Analysis pipeline finished successfully.")
+
+    version = None
+    if supabase_record_id:
+        print(f"Attempting to update meeting record ID: {supabase_record_id}")
+        try:
+            version = run_sync(lambda repository: replace_analysis(
+                repository, supabase_record_id, analysis_result.model_dump(exclude_unset=True),
+                {"status": "COMPLETE", "error_detail": None, "is_current": True}
+            ))
+            if version is not None:
+                print(f"Successfully updated meeting record ID: {supabase_record_id} (v{version})")
+            else:
+                print(f"Meeting record {supabase_record_id} not found; analysis kept in files only.")
+        except Exception as db_update_error:
+            # The files are saved; the record update is not worth re-running the pipeline for
+            print(f"Error updating meeting record {supabase_record_id}: {db_update_error}")
+    else:
+        print("Skipping meeting record update because no record ID was found.")
+
+    # A new version was written: drop the reports rendered from the old one
+    invalidate_meeting(supabase_record_id, logical_meeting_id)
+    backfill_job_id = _enqueue_backfill(job, analysis_result, {
+        "supabase_record_id": supabase_record_id,
+        "logical_meeting_id": logical_meeting_id,
+        "output_dir": payload["output_dir"],
+        "version": version
+    }) if version is not None else None
+    return {
+        "meeting_id": logical_meeting_id,
+        "supabase_record_id": supabase_record_id,
+        "main_analysis_file": payload.get("main_analysis_file"),
+        "skipped_stages": analysis_result.metadata.skipped_stages or [],
+        "backfill_job_id": backfill_job_id
+    }
+
+def run_analysis_backfill(job: Job) -> Dict[str, Any]:
+    """Runs skipped topics/insights stages on the stored transcript and saves the patched
+    analysis as the record's next version. If the record has moved on to a newer analysis
+    in the meantime, the backfill is dropped."""
+    payload = job.payload
+    record_id = payload["supabase_record_id"]
+    stages = payload["stages"]
+    record = run_sync(lambda repository: repository.get(record_id, ("id", "analysis_json", "version")))
+    if not record or not record.get("analysis_json"):
+        return {"supabase_record_id": record_id, "backfilled": [], "dropped": "Meeting or analysis not found"}
+    base_version = record.get("version") or 1
+    if payload.get("version") is not None and base_version != payload["version"]:
+        print(f"[Job {job.id}] Meeting {record_id} is at version {base_version}, not {payload['version']}; backfill dropped")
+        return {"supabase_record_id": record_id, "backfilled": [], "dropped": "Superseded by a newer analysis"}
+    analysis_json = record["analysis_json"]
+    transcript = analysis_json.get("transcript")
+    if not transcript:
+        return {"supabase_record_id": record_id, "backfilled": [], "dropped": "Stored analysis has no transcript"}
+
+    print(f"[Job {job.id}] Backfilling {', '.join(stages)} for meeting {record_id} (v{base_version})")
+    fields = run_backfill_stages(transcript, stages)
+    patched, remaining = patch_analysis(analysis_json, fields, stages)
+    # Only onto the version read: lost to a concurrent re-analysis otherwise
+    version = run_sync(lambda repository: replace_analysis(
+        repository, record_id, patched, base=(base_version, analysis_json)
+    ))
+    if version is None:
+        print(f"[Job {job.id}] Meeting {record_id} changed while backfilling; backfill dropped")
+        return {"supabase_record_id": record_id, "backfilled": [], "dropped": "Superseded by a newer analysis"}
+
+    meeting_key = payload.get("logical_meeting_id") or analysis_json.get("meetingId") or record_id
+    try:
+        patch_output_files(payload.get("output_dir"), meeting_key, fields, remaining)
+    except Exception as e:
+        # The record is authoritative; the files are refreshed by the next full analysis
+        print(f"[Job {job.id}] Failed to patch analysis files of {meeting_key}: {e}")
+    invalidate_meeting(record_id, payload.get("logical_meeting_id"))
+    print(f"[Job {job.id}] Meeting {record_id} is now v{version} with {', '.join(stages)}")
+    return {"supabase_record_id": record_id, "backfilled": stages, "version": version}
+
+JOB_TYPES: Dict[str, JobType] = {
+    job_type.name: job_type for job_type in (
+        JobType(DATASET_ANALYSIS, run_dataset_analysis, concurrency=1, on_expired=record_expiry),
+        JobType(MEETING_DATASET_ANALYSIS, run_meeting_dataset_analysis, concurrency=1, on_expired=record_expiry),
+        JobType(ANALYSIS_BACKFILL, run_analysis_backfill, concurrency=1, max_attempts=5, priority=BACKFILL_PRIORITY),
+    )
+}
+
+def enqueue_analysis_job(job_type: str, payload: Dict[str, Any], priority: Optional[int] = None) -> Job:
+    """Adds a job of a registered type to the durable queue (a single insert)."""
+    spec = JOB_TYPES[job_type]
+    job = get_job_queue().enqueue(
+        job_type, payload,
+        priority=spec.priority if priority is None else priority,
+        max_attempts=spec.max_attempts
+    )
+    print(f"Enqueued {job_type} job {job.id}")
+    return job
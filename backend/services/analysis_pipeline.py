@@ -3,10 +3,9 @@
 
 from fastapi import HTTPException
 import os
-from typing import List, Dict, Any, Optional
+from typing import Collection, List, Dict, Any, Optional
 import datetime
 import re
-import json # Add json import
 import uuid # Added for unique IDs
 from dateutil import parser as date_parser # For parsing dates from filenames
 import math
@@ -14,17 +13,28 @@ import math
 # Import necessary models and services
 from models.meeting import MeetingAnalysisJSON, SentimentAnalysisOutput, SpeakerAnalysisOutput, TopicsOutput, ParticipantStatsOutput, ReactionsAnalysisOutput, TopicAnalysisOutput, ReactionItemOutput, Participant, SentimentTimelineItem, MeetingMetadata
 from services.transcription import transcribe_audio, TranscriptionResult
-from services.vtt_parser import parse_vtt, VttParsingResult, VttCaption
+from services.vtt_parser import parse_vtt, VttParsingResult, VttCue
 from services.txt_parser import parse_txt, TxtParsingResult
 from services.sentiment import analyze_sentiment, SentimentResult, generate_sentiment_timeline
 from services.insights import generate_ai_insights, AIInsightsResult
 from services.duration_calculator import get_meeting_duration
 from services.diarization import diarize_audio, DiarizationResult, SpeakerTurn
-from services.chat_parser import parse_chat_file, ChatParsingResult
+from services.chat_parser import parse_chat_file, ChatParsingResult, ChatEvents
+from services.emoji import extract_emojis, emoji_sentiment
+from services.engagement_timeline import engagement_pyramid
+from services.analysis_bundle import bundle_path, write_bundle, legacy_component_paths
+from services.serialization import write_json
 from services.engagement import calculate_engagement_score
 from services.topic_modeling import model_topics, TopicModelingResult
+from services.search_index import index_meeting_segments
+from services.fulltext_index import index_meeting_text
+from services.progress import StageDeferred, StageTimeout, begin_stage, finish_stage, skip_stage, stage_time_left
 
 # --- Engagement Calculation Helper --- 
+# Bump when a change to the pipeline changes its output: uploads are only matched to earlier
+# analyses of the same content made by the same version (see services/uploads.py)
+PIPELINE_VERSION = 1
+
 def calculate_basic_engagement(
     speakers_data: Dict[str, Dict[str, Any]], 
     chat_results: Optional[ChatParsingResult]
@@ -68,6 +78,33 @@ def calculate_basic_engagement(
     return engagement_score
 # --------------------------------
 
+# --- Transcript Segments Helper ---
+def build_transcript_segments(
+    file_type: str,
+    captions_data: List[VttCue],
+    transcript_segments: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Flattens VTT captions or Whisper segments into [{text, speaker, start, end}] dicts (seconds)."""
+    segments: List[Dict[str, Any]] = []
+    if file_type == 'vtt':
+        for caption in captions_data:
+            segments.append({
+                "text": caption.utterance,
+                "speaker": caption.speaker,
+                "start": caption.start,
+                "end": caption.end
+            })
+    elif file_type == 'm4a':
+        for segment in transcript_segments:
+            segments.append({
+                "text": segment.get("text", "").strip(),
+                "speaker": None,
+                "start": float(segment.get("start", 0.0)),
+                "end": float(segment.get("end", 0.0))
+            })
+    return [s for s in segments if s["text"]]
+# --------------------------------
+
 # Helper function to extract meeting details from filename/path
 def extract_meeting_details_from_path(file_path: str, meeting_id_override: Optional[str] = None) -> Dict[str, Any]:
     """Attempts to extract meeting ID, title, and date from file path/name."""
@@ -127,10 +164,47 @@ def extract_meeting_details_from_path(file_path: str, meeting_id_override: Optio
         "platform": platform
     }
 
+def calculate_topic_percentages(topic_modeling_result: Optional[TopicModelingResult]) -> Optional[List[TopicAnalysisOutput]]:
+    """Top five topics with the share of topic-assigned sentences each received."""
+    calculated_topics_list: Optional[List[TopicAnalysisOutput]] = None
+    if topic_modeling_result and topic_modeling_result.topics:
+        print("Calculating topic percentages...")
+        topic_info_list = topic_modeling_result.topics
+        total_docs_in_topics = sum(t.count for t in topic_info_list if t.count is not None)
+        print(f"Total documents/sentences assigned to topics: {total_docs_in_topics}")
+        
+        temp_calculated_outputs = []
+        if total_docs_in_topics > 0:
+            for topic_info in topic_info_list:
+                percentage = round((topic_info.count / total_docs_in_topics) * 100, 2) if topic_info.count else 0.0
+                temp_calculated_outputs.append(
+                    TopicAnalysisOutput(
+                        name=topic_info.name, 
+                        percentage=percentage,
+                        keywords=topic_info.keywords
+                    )
+                )
+                print(f"  - Topic: {topic_info.name}, Count: {topic_info.count}, Percentage: {percentage}%")
+        else:
+            print("Warning: total_docs_in_topics is 0. Assigning 0% to all topics.")
+            temp_calculated_outputs = [
+                TopicAnalysisOutput(name=t.name, percentage=0.0, keywords=t.keywords) for t in topic_info_list
+            ]
+            
+        temp_calculated_outputs.sort(key=lambda x: x.percentage, reverse=True)
+        calculated_topics_list = temp_calculated_outputs[:5] # Limit to top 5
+        print(f"Final topics list prepared for JSON: {[t.name for t in calculated_topics_list]}")
+    return calculated_topics_list
+
 # Make pipeline synchronous
 # async def run_full_analysis_pipeline(file_path: str, file_type: str) -> MeetingAnalysisJSON:
-def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: Optional[str], output_dir: str, meeting_id: str) -> MeetingAnalysisJSON: # Add output_dir and meeting_id parameters
-    """Runs the complete analysis pipeline on a given file and saves components."""
+def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: Optional[str], output_dir: str, meeting_id: str,
+                               defer_stages: Collection[str] = ()) -> MeetingAnalysisJSON: # Add output_dir and meeting_id parameters
+    """Runs the complete analysis pipeline on a given file and saves components.
+
+    Optional stages named in `defer_stages` ("topics", "insights") are not run; like stages
+    that ran out of time, they are listed in metadata.skipped_stages for a later backfill.
+    """
     print(f"Running analysis pipeline for {file_path} ({file_type})")
     
     # Ensure output directory exists
@@ -140,11 +214,15 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     meeting_details = extract_meeting_details_from_path(file_path, meeting_id_override=meeting_id) # Pass meeting_id as override
     print(f"Extracted meeting details: {meeting_details}")
 
+    # Optional stages that produced nothing (out of time or failed); kept in the metadata for backfill
+    skipped_stages: List[str] = []
+
     # 1. Get transcript & related data
     transcript = ""
     transcript_segments = [] 
-    captions_data: List[VttCaption] = [] 
+    captions_data: List[VttCue] = [] 
     
+    begin_stage("transcription" if file_type == "m4a" else "parsing", file_type=file_type)
     if file_type == "m4a":
         try:
             # Call synchronous version
@@ -183,8 +261,18 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     if file_type == "m4a":
         # Run pyannote diarization on the audio file
         print("[Pipeline Debug] Attempting pyannote diarization...") # DEBUG
-        diarization_result = diarize_audio(file_path)
+        try:
+            begin_stage("diarization", optional=True)
+            diarization_result = diarize_audio(file_path) # None if it failed or ran out of time
+            if diarization_result is not None:
+                finish_stage()
+        except StageTimeout as e:
+            print(f"[Pipeline] Skipping diarization: {e}")
+            diarization_result = None
         print(f"[Pipeline Debug] Pyannote diarization raw result: {diarization_result}") # DEBUG
+        if diarization_result is None:
+            skip_stage("Diarization failed, was unavailable or ran out of time")
+            skipped_stages.append("diarization")
         if diarization_result:
              for turn in diarization_result.turns:
                  speaker_id = turn.speaker # e.g., SPEAKER_00
@@ -199,76 +287,28 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
             print("Skipping speaker analysis for M4A due to diarization failure/skip.")
             
     elif file_type == 'vtt' and captions_data:
+        begin_stage("speakers")
         # Speaker extraction and time aggregation from VTT
         print("Attempting VTT speaker extraction & time aggregation...")
         speakers_data = {} # Re-initialize here for clarity
         processed_speakers = set() # Track speakers found in this block
 
-        for i, caption in enumerate(captions_data):
-            speaker_name = None
-            text_content = caption.text # Usually the text without the speaker tag
-            raw_lines = caption.raw_text.split('\n')
-            
-            # --- Try extracting speaker tag --- 
-            # Check raw_lines[0] first (Common VTT format like the example)
-            if raw_lines and len(raw_lines[0]) < 70: # Increased length tolerance
-                line_zero = raw_lines[0].strip()
-                # Check for Colon format: "Speaker Name:"
-                if line_zero.endswith(':'):
-                     potential_speaker = line_zero[:-1].strip()
-                     # Basic check to avoid timestamp lines being mistaken for speakers
-                     if '-->' not in potential_speaker and len(potential_speaker) > 1:
-                         speaker_name = potential_speaker
-                         # print(f"[VTT Debug] Found speaker (Colon Format) in raw_lines[0]: '{speaker_name}'")
-               
-                # Check for Zoom format: "Speaker Name (...) :" (Handle potential space before colon)
-                if not speaker_name:
-                     zoom_match = re.match(r'^([^(]+)\s*(\(\d{2}:\d{2}:\d{2})\)\s*:', line_zero)
-                     if zoom_match:
-                         speaker_name = zoom_match.group(1).strip()
-                         # print(f"[VTT Debug] Found speaker (Zoom Format) in raw_lines[0]: '{speaker_name}'")
-
-            # Fallback: Check caption.text itself if no speaker found in raw_lines[0]
-            # Sometimes parsers might put the whole line in .text if unsure
-            if not speaker_name and len(text_content) < 70 and ':' in text_content:
-                potential_speaker = text_content.split(':', 1)[0].strip()
-                if '-->' not in potential_speaker and len(potential_speaker) > 1 and len(potential_speaker) < 50:
-                     # Check if it looks like a speaker name (avoid random colons)
-                     # This is less reliable - might need better heuristics
-                     speaker_name = potential_speaker 
-                     # print(f"[VTT Debug] Found potential speaker in caption.text: '{speaker_name}'")
-            # ----------------------------------
-
-            if speaker_name:
-                # Calculate duration of this caption
-                caption_duration = 0.0 # Default to 0
-                try:
-                    start_secs = sum(x * int(t) for x, t in zip([3600, 60, 1], caption.start.split('.')[0].split(':'))) + float('0.' + caption.start.split('.')[1])
-                    end_secs = sum(x * int(t) for x, t in zip([3600, 60, 1], caption.end.split('.')[0].split(':'))) + float('0.' + caption.end.split('.')[1])
-                    caption_duration = max(0, end_secs - start_secs) # Ensure non-negative
-                    # print(f"[VTT Duration OK] Caption {i}: {caption.start} -> {caption.end} = {caption_duration:.3f}s") # Verbose success log
-                except Exception as e:
-                    print(f"[VTT Duration ERR] Caption {i}: Failed parsing '{caption.start}' -> '{caption.end}'. Error: {e}. Using 0.0s")
-                    caption_duration = 0.0 # Use 0 if parsing fails
-                
-                # Log the calculated duration before adding
-                print(f"[VTT Speaker Time] Speaker: {speaker_name}, Caption {i}, Calculated Duration: {caption_duration:.4f}") 
-                
-                if speaker_name not in speakers_data:
-                     # Ensure the key used here matches the Pydantic model Field alias EXACTLY
-                     speakers_data[speaker_name] = {"name": speaker_name, "speakingTime": 0.0, "segments": []}
-                     print(f"[VTT Speaker Found] Adding new speaker: {speaker_name}")
-                # Only add duration if it's positive
-                if caption_duration > 0:
-                    # Ensure the key used here matches the Pydantic model Field alias EXACTLY
-                    speakers_data[speaker_name]["speakingTime"] += caption_duration
-                # Add the text *without* the speaker tag
-                cleaned_text = text_content.strip()
-                if cleaned_text:
-                     speakers_data[speaker_name]["segments"].append(cleaned_text)
-                processed_speakers.add(speaker_name)
-            # else: 
-                # print(f"[VTT Debug] No speaker found for caption {i}. Raw: {caption.raw_text[:50]}... Text: {caption.text[:50]}... "")
+        for caption in captions_data:
+            # The parser already resolved "Name (hh:mm:ss):", "Name:" and "Name: text" tags
+            speaker_name = caption.speaker
+            if not speaker_name:
+                continue
+            if speaker_name not in speakers_data:
+                 # Ensure the key used here matches the Pydantic model Field alias EXACTLY
+                 speakers_data[speaker_name] = {"name": speaker_name, "speakingTime": 0.0, "segments": []}
+                 print(f"[VTT Speaker Found] Adding new speaker: {speaker_name}")
+            # Cue times are already seconds; duration is clamped to be non-negative
+            speakers_data[speaker_name]["speakingTime"] += caption.duration
+            # Add the text *without* the speaker tag
+            cleaned_text = caption.utterance
+            if cleaned_text:
+                 speakers_data[speaker_name]["segments"].append(cleaned_text)
+            processed_speakers.add(speaker_name)
         
         print(f"Finished VTT speaker extraction. Found {len(processed_speakers)} unique speakers: {processed_speakers if processed_speakers else 'None'}")
         # Revert to dictionary unpacking - Ensure model config handles alias
@@ -295,15 +335,14 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     # --- Basic Reaction Parsing (from VTT captions) ---
     reaction_counts: Dict[str, int] = {}
     if file_type == 'vtt' and captions_data:
-        emoji_pattern = re.compile(r'[🌀-🙏🚀-🛿☀-⛿✀-➿]') # Basic emoji range
         for caption in captions_data:
-            # Check raw text for emojis
-            emojis_found = emoji_pattern.findall(caption.raw_text)
+            # Check caption text for emojis
+            _, emojis_found = extract_emojis(caption.text)
             for emoji in emojis_found:
                 reaction_counts[emoji] = reaction_counts.get(emoji, 0) + 1
 
     reactions_list: List[ReactionItemOutput] = [
-        ReactionItemOutput(name=emoji, count=count) for emoji, count in reaction_counts.items()
+        ReactionItemOutput(name=emoji, count=count, sentiment=emoji_sentiment(emoji)) for emoji, count in reaction_counts.items()
     ]
     # Sort reactions by count descending
     reactions_list.sort(key=lambda x: x.count, reverse=True)
@@ -311,6 +350,7 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     # TODO: Implement speaker-specific reaction parsing if possible
     
     # --- Parse Chat File (Reactions & Comments) ---
+    begin_stage("chat")
     chat_results: Optional[ChatParsingResult] = parse_chat_file(chat_file_path)
     comments_output = [] # Initialize as list
     speaker_reactions_output = {} # Initialize as dict for speaker reactions
@@ -320,9 +360,8 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
         # Save comments if needed (optional, could be large)
         comments_output_file = os.path.join(output_dir, f"{meeting_details['meetingId']}_comments.json")
         try:
-            with open(comments_output_file, 'w', encoding='utf-8') as f:
-                # Convert Comment object to dict for JSON serialization
-                json.dump([comment.dict() for comment in chat_results.messages], f, indent=2)
+            # ChatMessage models are encoded directly, without a dict pass per comment
+            write_json(comments_output_file, chat_results.messages)
             print(f"Saved chat comments to {comments_output_file}")
             comments_output = chat_results.messages # Store for direct inclusion if needed
         except Exception as e:
@@ -357,7 +396,7 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
              speaker_reactions_output = {} # Re-initialize as dict
              for author, reactions in chat_reactions_by_author.items(): # Use the variable
                   # Convert dict of reactions to list of dicts expected by the model
-                  formatted_reactions = [{"name": name, "count": count} for name, count in reactions.items()]
+                  formatted_reactions = [{"name": name, "count": count, "sentiment": emoji_sentiment(name)} for name, count in reactions.items()]
                   speaker_reactions_output[author] = formatted_reactions # Use author name as key
              print(f"Processed speaker reactions for {len(speaker_reactions_output)} authors.")
         else:
@@ -369,7 +408,7 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     # --- Final Reactions Output ---
     # Use reaction_counts which now contains combined counts
     reactions_list: List[ReactionItemOutput] = [
-        ReactionItemOutput(name=emoji, count=count) for emoji, count in reaction_counts.items()
+        ReactionItemOutput(name=emoji, count=count, sentiment=emoji_sentiment(emoji)) for emoji, count in reaction_counts.items()
     ]
     # Sort reactions by count descending
     reactions_list.sort(key=lambda x: x.count, reverse=True)
@@ -419,14 +458,21 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
     print("[Pipeline Debug] Checking if transcript exists for AI models...") # DEBUG
     if transcript:
         try:
+            begin_stage("sentiment", optional=True)
             sentiment_analysis_result = analyze_sentiment(transcript)
+            finish_stage() # Holds the stage to its budget; it has no checkpoints of its own
             print(f"[Pipeline Debug] Overall Sentiment Result: Label={sentiment_analysis_result.overall_label}, Score={sentiment_analysis_result.overall_score}") # DEBUG
         except Exception as e:
             print(f"[Pipeline] Sentiment Error: {e}")
             sentiment_analysis_result = None
+            skip_stage(str(e))
+            skipped_stages.append("sentiment")
 
         # --- Re-add: Run Topic Modeling ---
         try:
+            begin_stage("topics", optional=True)
+            if "topics" in defer_stages:
+                raise StageDeferred("Deferred to a backfill job")
             if not transcript:
                 print("[Pipeline] WARNING: Empty transcript. Skipping topic modeling.")
             else:
@@ -454,53 +500,35 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
                     print(f"[Pipeline] Topic modeling completed. Found {len(topic_names)} topics: {topic_names}")
                 else:
                     print("[Pipeline] Topic modeling completed but no topics were found. Using Mistral 7B insights for topics instead.")
+            finish_stage()
         except Exception as e:
             print(f"Topic modeling failed: {e}")
             topic_modeling_result = None # Ensure it's None on error
+            skip_stage(str(e))
+            skipped_stages.append("topics")
 
         # --- Run AI Insights (Handles Topic Summary/Feedback now) ---
         try:
+            begin_stage("insights", optional=True) # Mostly waiting on the Ollama server
+            if "insights" in defer_stages:
+                raise StageDeferred("Deferred to a backfill job")
             # This is where Mistral 7B generates topics and insights now, rather than using BERTopic
-            ai_insights_result = generate_ai_insights(transcript)
+            ai_insights_result = generate_ai_insights(transcript, timeout=stage_time_left())
+            finish_stage()
             print("AI insights generation completed with Mistral 7B (including topic analysis).")
         except Exception as e:
             print(f"[Pipeline] AI insights generation error: {e}")
             ai_insights_result = None
+            skip_stage(str(e))
+            skipped_stages.append("insights")
     else:
          print("Skipping AI analysis: No transcript available.")
 
     # --- Calculate Topic Percentages (Moved *before* final assembly) ---
-    calculated_topics_list: Optional[List[TopicAnalysisOutput]] = None
-    if topic_modeling_result and topic_modeling_result.topics:
-        print("Calculating topic percentages...")
-        topic_info_list = topic_modeling_result.topics
-        total_docs_in_topics = sum(t.count for t in topic_info_list if t.count is not None)
-        print(f"Total documents/sentences assigned to topics: {total_docs_in_topics}")
-        
-        temp_calculated_outputs = []
-        if total_docs_in_topics > 0:
-            for topic_info in topic_info_list:
-                percentage = round((topic_info.count / total_docs_in_topics) * 100, 2) if topic_info.count else 0.0
-                temp_calculated_outputs.append(
-                    TopicAnalysisOutput(
-                        name=topic_info.name, 
-                        percentage=percentage,
-                        keywords=topic_info.keywords
-                    )
-                )
-                print(f"  - Topic: {topic_info.name}, Count: {topic_info.count}, Percentage: {percentage}%")
-        else:
-            print("Warning: total_docs_in_topics is 0. Assigning 0% to all topics.")
-            temp_calculated_outputs = [
-                TopicAnalysisOutput(name=t.name, percentage=0.0, keywords=t.keywords) for t in topic_info_list
-            ]
-            
-        temp_calculated_outputs.sort(key=lambda x: x.percentage, reverse=True)
-        calculated_topics_list = temp_calculated_outputs[:5] # Limit to top 5
-        print(f"Final topics list prepared for JSON: {[t.name for t in calculated_topics_list]}")
-    # ---------------------------------------------------------
+    calculated_topics_list = calculate_topic_percentages(topic_modeling_result)
 
     # --- Run Sentiment per Speaker (If speaker data available) ---
+    begin_stage("metrics")
     if speakers_list and sentiment_analysis_result: # Check if sentiment model loaded
         print("Running sentiment analysis per speaker...")
         for speaker_output in speakers_list:
@@ -588,28 +616,8 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
         # Fallback: Find the speaker from the last caption *with* a speaker tag
         print("Attempting to find last speaker from VTT captions...")
         for caption in reversed(captions_data):
-            raw_text = caption.raw_text
-            # print(f"[Last Speaker Debug] Checking caption raw text: {raw_text[:100]}...") # Keep logging disabled for now
-            speaker_name_found = None
-            
-            # Try Zoom format first (Improved Regex)
-            # Look for Name, optional space, (HH:MM:SS), optional space, Colon
-            speaker_match_zoom = re.match(r'^([^(]+?)\s*\((\d{2}:\d{2}:\d{2})\)\s*:', raw_text)
-            if speaker_match_zoom:
-                speaker_name_found = speaker_match_zoom.group(1).strip()
-            else:
-                # Fallback to colon format (Improved Check)
-                lines = raw_text.split('\n')
-                # Check first non-empty line for Speaker:
-                first_line = lines[0].strip() if lines else ""
-                if first_line.endswith(':') and len(first_line) > 1 and len(first_line) < 70 and '-->' not in first_line:
-                    potential_speaker = first_line[:-1].strip()
-                    # Avoid mistaking timestamps or short fragments for names
-                    if potential_speaker and len(potential_speaker) > 1: 
-                       speaker_name_found = potential_speaker
-            
-            if speaker_name_found:
-                last_speaker_name = speaker_name_found
+            if caption.speaker:
+                last_speaker_name = caption.speaker
                 print(f"Last speaker identified from VTT: {last_speaker_name}")
                 break # Found the last speaker, stop searching
         if not last_speaker_name:
@@ -636,7 +644,9 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
         metadata=MeetingMetadata(
             source_file=os.path.basename(file_path),
             file_type=file_type,
-            engagement_score=engagement_score_percentage # Use percentage for engagement score
+            engagement_score=engagement_score_percentage, # Use percentage for engagement score
+            skipped_stages=skipped_stages or None,
+            pipeline_version=PIPELINE_VERSION
         ),
         transcript=transcript,
         duration=duration_seconds if duration_seconds else 0.0, # Use calculated duration
@@ -656,19 +666,33 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
         comments=[comment.dict() for comment in comments_output] if comments_output else [] # Convert ChatMessage objects to dictionaries
     )
 
+    # Timed speaker activity for the engagement timeline: VTT cues, or diarized turns for audio
+    speaker_activity: List[VttCue] = captions_data
+    if diarization_result and diarization_result.turns:
+        speaker_activity = [VttCue(turn.start, turn.end, turn.speaker, "") for turn in diarization_result.turns]
+
+    # Structured transcript (captions/segments with speaker + seconds) shared by the
+    # transcript component file and both search indexes
+    search_segments = build_transcript_segments(file_type, captions_data, transcript_segments)
+
     # 5. Save Final JSON
+    begin_stage("save")
     output_filename = f"meeting-analysis-{meeting_details['meetingId']}.json" # Changed to match expected dashboard filename
     output_path = os.path.join(output_dir, output_filename)
 
     try:
         # Save the main analysis file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Use by_alias=True to ensure correct field names like 'speakingTime' are used
-            json.dump(final_json_data.dict(by_alias=True, exclude_none=True), f, indent=2, ensure_ascii=False)
+        # Use by_alias=True to ensure correct field names like 'speakingTime' are used
+        write_json(output_path, final_json_data.model_dump(by_alias=True, exclude_none=True))
         print(f"Successfully saved final analysis JSON to: {output_path}")
         
         # Generate and save individual component files
-        generate_component_files(final_json_data, output_dir, meeting_details['meetingId'])
+        generate_component_files(
+            final_json_data, output_dir, meeting_details['meetingId'],
+            transcript_segments=search_segments,
+            speaker_activity=speaker_activity,
+            chat_events=chat_results.events if chat_results else None
+        )
         
     except Exception as e:
         print(f"CRITICAL: Failed to save final JSON analysis: {e}")
@@ -676,30 +700,30 @@ def run_full_analysis_pipeline(file_path: str, file_type: str, chat_file_path: O
         # For now, just print the error and return None or raise
         raise HTTPException(status_code=500, detail=f"Failed to save final JSON analysis: {e}") from e
 
+    # 6. Update the search indexes (non-fatal: the analysis itself is already saved)
+    begin_stage("indexing")
+    try:
+        index_meeting_segments(meeting_details['meetingId'], search_segments)
+    except Exception as e:
+        print(f"Warning: Failed to update semantic search index: {e}")
+    try:
+        index_meeting_text(meeting_details['meetingId'], search_segments, final_json_data.comments or [])
+    except Exception as e:
+        print(f"Warning: Failed to update full-text index: {e}")
+
+    finish_stage()
     # Return the Pydantic model instance
     return final_json_data
 
-def extract_participants(transcript: str, captions: List[VttCaption]) -> List[Participant]:
+def extract_participants(transcript: str, captions: List[VttCue]) -> List[Participant]:
     """Extracts participants from transcript and captions."""
     participants = []
     speaker_counts = {}
     
     # First pass: Count speaker occurrences
     for caption in captions:
-        raw_text = caption.raw_text
-        # Try to extract speaker from Zoom format
-        speaker_match = re.match(r'^([^(]+)\((\d{2}:\d{2}:\d{2})\):', raw_text)
-        if speaker_match:
-            speaker_name = speaker_match.group(1).strip()
-        else:
-            # Fallback to colon-based format
-            lines = raw_text.split('\n')
-            if lines and lines[0].endswith(':') and len(lines[0]) < 50:
-                speaker_name = lines[0][:-1].strip()
-            else:
-                continue
-                
-        speaker_counts[speaker_name] = speaker_counts.get(speaker_name, 0) + 1
+        if caption.speaker:
+            speaker_counts[caption.speaker] = speaker_counts.get(caption.speaker, 0) + 1
     
     # Create participants for speakers who spoke at least once
     for speaker_name, count in speaker_counts.items():
@@ -734,26 +758,12 @@ def process_transcript_file(file_path: str, meeting_id: str) -> Dict:
                 participant_word_count = 0
                 
                 for caption in captions:
-                    raw_text = caption.raw_text
-                    speaker_match = re.match(r'^([^(]+)\((\d{2}:\d{2}:\d{2})\):', raw_text)
-                    if speaker_match:
-                        speaker_name = speaker_match.group(1).strip()
-                    else:
-                        lines = raw_text.split('\n')
-                        if lines and lines[0].endswith(':') and len(lines[0]) < 50:
-                            speaker_name = lines[0][:-1].strip()
-                        else:
-                            continue
-                            
-                    if speaker_name == participant.name:
-                        # Calculate speaking time in seconds
-                        start_time = datetime.strptime(caption.start, '%H:%M:%S.%f')
-                        end_time = datetime.strptime(caption.end, '%H:%M:%S.%f')
-                        duration = (end_time - start_time).total_seconds()
-                        participant_speaking_time += duration
+                    if caption.speaker == participant.name:
+                        # Caption times are already in seconds
+                        participant_speaking_time += caption.duration
                         
                         # Count words in the caption text
-                        words = caption.text.split()
+                        words = caption.utterance.split()
                         participant_word_count += len(words)
                 
                 participant.speaking_time = participant_speaking_time
@@ -801,10 +811,21 @@ def process_transcript_file(file_path: str, meeting_id: str) -> Dict:
         print(f"Error processing transcript file: {e}")
         raise 
 
-def generate_component_files(analysis_data: MeetingAnalysisJSON, output_dir: str, meeting_id: str):
-    """Generate individual component files from the main analysis file.
-    
-    These component files are used by specific dashboard components for optimized data access.
+def generate_component_files(
+    analysis_data: MeetingAnalysisJSON,
+    output_dir: str,
+    meeting_id: str,
+    transcript_segments: Optional[List[Dict[str, Any]]] = None,
+    speaker_activity: Optional[List[VttCue]] = None,
+    chat_events: Optional[ChatEvents] = None
+):
+    """Generate the dashboard components from the main analysis and save them as one bundle.
+    
+    Each component is used by a specific dashboard component for optimized data access.
+    `transcript_segments` ({text, speaker, start, end}) are saved as the transcript component,
+    which is also the source for rebuilding the full-text index offline.
+    `speaker_activity` (timed speaker cues) and `chat_events` are the pipeline's parsed
+    artifacts, used for the engagement timeline without touching the source files again.
     """
     print(f"Generating component files for meeting: {meeting_id}")
     
@@ -825,176 +846,84 @@ def generate_component_files(analysis_data: MeetingAnalysisJSON, output_dir: str
             except Exception as e:
                 print(f"Error renaming obsolete file {obsolete_file}: {e}")
     
-    # 1. Generate participants component file
+    # Every component goes into one bundle; see services/analysis_bundle.py
+    components: Dict[str, Any] = {}
+
+    # 1. Participants component
     if analysis_data.participants:
-        participants_path = os.path.join(output_dir, f"participants-analysis-{meeting_id}.json")
-        try:
-            participants_data = analysis_data.participants.dict(by_alias=True, exclude_none=True)
-            print(f"Saving participants data: {participants_data}")
-            with open(participants_path, 'w', encoding='utf-8') as f:
-                json.dump(participants_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved participants component file: {participants_path}")
-        except Exception as e:
-            print(f"Error saving participants component file: {e}")
+        components["participants"] = analysis_data.participants.dict(by_alias=True, exclude_none=True)
     
-    # 2. Generate reactions component file
+    # 2. Reactions component
     if analysis_data.reactions:
-        reactions_path = os.path.join(output_dir, f"reactions-analysis-{meeting_id}.json")
-        try:
-            reactions_data = analysis_data.reactions.dict(by_alias=True, exclude_none=True)
-            with open(reactions_path, 'w', encoding='utf-8') as f:
-                json.dump(reactions_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved reactions component file: {reactions_path}")
-        except Exception as e:
-            print(f"Error saving reactions component file: {e}")
+        components["reactions"] = analysis_data.reactions.dict(by_alias=True, exclude_none=True)
     
-    # 3. Generate speakers component file
+    # 3. Speakers component
     if analysis_data.speakers:
-        speakers_path = os.path.join(output_dir, f"speakers-analysis-{meeting_id}.json")
-        try:
-            speakers_data = {"speakers": [s.dict(by_alias=True, exclude_none=True) for s in analysis_data.speakers]}
-            with open(speakers_path, 'w', encoding='utf-8') as f:
-                json.dump(speakers_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved speakers component file: {speakers_path}")
-        except Exception as e:
-            print(f"Error saving speakers component file: {e}")
+        components["speakers"] = {"speakers": [s.dict(by_alias=True, exclude_none=True) for s in analysis_data.speakers]}
     
-    # 4. Generate sentiment component file
+    # 4. Sentiment component
     if analysis_data.sentiment:
-        sentiment_path = os.path.join(output_dir, f"sentiment-analysis-{meeting_id}.json")
-        try:
-            sentiment_data = analysis_data.sentiment.dict(by_alias=True, exclude_none=True)
-            with open(sentiment_path, 'w', encoding='utf-8') as f:
-                json.dump(sentiment_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved sentiment component file: {sentiment_path}")
-        except Exception as e:
-            print(f"Error saving sentiment component file: {e}")
+        components["sentiment"] = analysis_data.sentiment.dict(by_alias=True, exclude_none=True)
     
-    # 5. Generate topics component file
+    # 5. Topics component
     if analysis_data.topics:
-        topics_path = os.path.join(output_dir, f"topics-analysis-{meeting_id}.json")
-        try:
-            topics_data = analysis_data.topics.dict(by_alias=True, exclude_none=True)
-            with open(topics_path, 'w', encoding='utf-8') as f:
-                json.dump(topics_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved topics component file: {topics_path}")
-        except Exception as e:
-            print(f"Error saving topics component file: {e}")
+        components["topics"] = analysis_data.topics.dict(by_alias=True, exclude_none=True)
     
-    # 6. Generate comments component file
+    # 6. Comments component
     if analysis_data.comments:
-        comments_path = os.path.join(output_dir, f"comments-analysis-{meeting_id}.json")
-        try:
-            comments_data = {"comments": analysis_data.comments}
-            with open(comments_path, 'w', encoding='utf-8') as f:
-                json.dump(comments_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved comments component file: {comments_path}")
-        except Exception as e:
-            print(f"Error saving comments component file: {e}")
+        components["comments"] = {"comments": analysis_data.comments}
+    
+    # 7. Transcript (captions) component
+    if transcript_segments:
+        components["transcript"] = {"captions": transcript_segments}
     
-    # 7. Generate timeline component file
+    # 8. Timeline component
     if analysis_data.sentiment and analysis_data.sentiment.timeline:
-        timeline_path = os.path.join(output_dir, f"timeline-{meeting_id}.json")
         try:
-            # Calculate real engagement metrics over time using raw data
-            vtt_captions = None
-            chat_data = None
-            
-            # Try to find the VTT file path from metadata
-            source_file = analysis_data.metadata.source_file if analysis_data.metadata else None
-            if source_file and '.vtt' in source_file:
-                # Get base directory from our component files output
-                base_dir = os.path.dirname(os.path.dirname(output_dir))
-                possible_dirs = [
-                    os.path.join(base_dir, 'data', 'meeting_recordings'),
-                    os.path.join(base_dir, 'data', 'meeting_recordings', 'Zoom'),
-                    os.path.join(os.path.dirname(base_dir), 'data', 'meeting_recordings'),
-                    os.path.join(os.path.dirname(base_dir), 'data', 'meeting_recordings', 'Zoom')
-                ]
-                
-                # Try to find the VTT file
-                vtt_path = None
-                for dir_path in possible_dirs:
-                    potential_path = os.path.join(dir_path, source_file)
-                    if os.path.exists(potential_path):
-                        vtt_path = potential_path
-                        break
-                
-                # If VTT found, also look for the chat txt file
-                if vtt_path:
-                    chat_path = vtt_path.replace('.vtt', 'newChat.txt')
-                    if os.path.exists(chat_path):
-                        chat_data = chat_path
-            
-            # Calculate real engagement data if possible
-            engagement_timeline = []
-            if vtt_path:
-                try:
-                    from models.transcript import VttCaption
-                    from models.chat import ChatParsingResult, ChatMessage
-                    from services.vtt_parser import parse_vtt
-                    from services.chat_parser import parse_chat_file
-                    
-                    # Parse VTT file
-                    vtt_result = parse_vtt(vtt_path)
-                    vtt_captions = vtt_result.captions if vtt_result else []
-                    
-                    # Parse chat file 
-                    chat_results = parse_chat_file(chat_path) if chat_path else None
-                    
-                    # Calculate engagement timeline
-                    engagement_timeline = calculate_engagement_over_time(
-                        vtt_captions,
-                        analysis_data.transcript or "",
-                        chat_results,
-                        analysis_data.duration or 0,
-                        interval_seconds=900  # 15-minute intervals to match sentiment
-                    )
-                except Exception as e:
-                    print(f"Error calculating real engagement timeline: {e}")
-            
-            # If real engagement calculation failed, use the overall score
-            if not engagement_timeline:
-                print("Warning: Using synthetic engagement data derived from overall score")
-                # Get the engagement score from metadata
-                overall_engagement = analysis_data.metadata.engagement_score / 100.0 if analysis_data.metadata and analysis_data.metadata.engagement_score is not None else 0.5
-                
-                # Create synthetic engagement timeline
-                engagement_timeline = []
-                
-                for item in analysis_data.sentiment.timeline:
-                    variance = ((item.sentiment - 0.5) * 0.2)  # Creates +/- 10% variance
-                    point_engagement = overall_engagement + variance
-                    # Keep engagement within 0-1 range
-                    point_engagement = max(0, min(1, point_engagement))
-                    
-                    engagement_timeline.append({
-                        "timestamp": item.timestamp,
-                        "engagement": point_engagement
-                    })
-            
-            # Combine sentiment and engagement data
+            # Engagement comes from the activity the pipeline already parsed; 1/5/15/60-minute
+            # levels feed the dashboard's resolution picker
+            engagement_resolutions = {}
+            if speaker_activity or chat_events:
+                engagement_resolutions = engagement_pyramid(
+                    speaker_activity or [], chat_events, analysis_data.duration or 0
+                )
+            else:
+                print("No timed speaker or chat activity; timeline will carry sentiment only")
+
+            # Combine sentiment and engagement data. The sentiment timeline uses
+            # 15-minute intervals, which is the 900s level of the pyramid
             timeline_data = {"timeline": []}
-            
-            # Create a mapping of timestamps to engagement scores
-            engagement_map = {str(item["timestamp"]): item["engagement"] for item in engagement_timeline}
-            
-            # Merge with sentiment timeline
+            engagement_map = {item["timestamp"]: item["engagement"] for item in engagement_resolutions.get(900, [])}
             for item in analysis_data.sentiment.timeline:
-                timestamp_key = str(item.timestamp)
-                engagement = engagement_map.get(timestamp_key, 0.5)  # Default if not found
-                
-                timeline_data["timeline"].append({
-                    "timestamp": item.timestamp,
-                    "sentiment": item.sentiment,
-                    "engagement": engagement
-                })
-            
-            with open(timeline_path, 'w', encoding='utf-8') as f:
-                json.dump(timeline_data, f, indent=2, ensure_ascii=False)
-            print(f"Successfully saved timeline component file with real engagement data: {timeline_path}")
+                point = {"timestamp": item.timestamp, "sentiment": item.sentiment}
+                engagement = engagement_map.get(item.timestamp)
+                if engagement is not None:
+                    point["engagement"] = engagement
+                timeline_data["timeline"].append(point)
+
+            if engagement_resolutions:
+                # Keyed by interval length in seconds ("60", "300", "900", "3600")
+                timeline_data["resolutions"] = {str(interval): points for interval, points in engagement_resolutions.items()}
+            components["timeline"] = timeline_data
         except Exception as e:
-            print(f"Error saving timeline component file: {e}")
+            print(f"Error building timeline component: {e}")
+
+    bundle_file = bundle_path(output_dir, meeting_id)
+    try:
+        write_bundle(bundle_file, components)
+        print(f"Successfully saved {len(components)} components to bundle: {bundle_file}")
+    except Exception as e:
+        print(f"Error saving component bundle: {e}")
+        return
+
+    # Per-component files from earlier runs would shadow the fresh bundle; the
+    # /analysis-data route serves those paths from the bundle instead
+    for legacy_path in legacy_component_paths(output_dir, meeting_id):
+        if os.path.exists(legacy_path):
+            try:
+                os.remove(legacy_path)
+            except OSError as e:
+                print(f"Error removing superseded component file {legacy_path}: {e}")
     
     print(f"Component file generation complete for meeting: {meeting_id}") 
 
@@ -1021,167 +950,12 @@ def calculate_engagement_over_time(
     if not captions_data or duration_seconds <= 0:
         print("Cannot calculate engagement timeline: Missing captions or duration")
         return []
-    
-    # Initialize time intervals
-    num_intervals = math.ceil(duration_seconds / interval_seconds)
-    intervals = []
-    
-    for i in range(num_intervals):
-        start_time = i * interval_seconds
-        end_time = min((i + 1) * interval_seconds, duration_seconds)
-        intervals.append({
-            "start": start_time,
-            "end": end_time,
-            "timestamp": start_time,  # For consistency with sentiment timeline
-            "speaker_turns": 0,
-            "unique_speakers": set(),
-            "speaking_duration": 0,
-            "comments": 0,
-            "reactions": 0,
-            "unique_reaction_types": set()
-        })
-    
-    # Calculate speaking activity metrics per interval
-    total_participants = set()
-    
-    for caption in captions_data:
-        # Extract caption time in seconds
-        try:
-            start_time_str = caption.start
-            end_time_str = caption.end
-            
-            # Convert HH:MM:SS.ms to seconds
-            start_parts = start_time_str.split(':')
-            start_seconds = (int(start_parts[0]) * 3600 + 
-                            int(start_parts[1]) * 60 + 
-                            float(start_parts[2]))
-                            
-            end_parts = end_time_str.split(':')
-            end_seconds = (int(end_parts[0]) * 3600 + 
-                          int(end_parts[1]) * 60 + 
-                          float(end_parts[2]))
-            
-            caption_duration = end_seconds - start_seconds
-            
-            # Extract speaker from caption
-            speaker_name = None
-            raw_text = caption.raw_text
-            speaker_match = re.match(r'^([^(]+?)\s*\([^)]*\)\s*:', raw_text)
-            
-            if speaker_match:
-                speaker_name = speaker_match.group(1).strip()
-            else:
-                # Try alternative format
-                lines = raw_text.split('\n')
-                if lines and lines[0].endswith(':'):
-                    speaker_name = lines[0].rstrip(':').strip()
-            
-            if speaker_name:
-                total_participants.add(speaker_name)
-                
-                # Find which interval this caption belongs to
-                interval_idx = min(int(start_seconds // interval_seconds), num_intervals - 1)
-                intervals[interval_idx]["speaker_turns"] += 1
-                intervals[interval_idx]["unique_speakers"].add(speaker_name)
-                intervals[interval_idx]["speaking_duration"] += caption_duration
-                
-        except Exception as e:
-            print(f"Error processing caption for engagement timeline: {e}")
-    
-    # Process chat data if available
-    if chat_results:
-        # Process comments
-        chat_messages = getattr(chat_results, 'messages', [])
-        for msg in chat_messages:
-            if hasattr(msg, 'timestamp') and msg.timestamp:
-                try:
-                    # Convert timestamp to seconds if needed
-                    if isinstance(msg.timestamp, str):
-                        # Assuming format like "00:14:10"
-                        time_parts = msg.timestamp.split(':')
-                        msg_seconds = (int(time_parts[0]) * 3600 + 
-                                     int(time_parts[1]) * 60 + 
-                                     int(time_parts[2]) if len(time_parts) > 2 else 0)
-                    else:
-                        msg_seconds = float(msg.timestamp)
-                    
-                    # Find the interval
-                    interval_idx = min(int(msg_seconds // interval_seconds), num_intervals - 1)
-                    intervals[interval_idx]["comments"] += 1
-                    
-                    # Add author to total participants if not already there
-                    if hasattr(msg, 'author') and msg.author:
-                        total_participants.add(msg.author)
-                        
-                except Exception as e:
-                    print(f"Error processing chat message for engagement timeline: {e}")
-        
-        # Process reactions
-        reactions_by_author = getattr(chat_results, 'reactions_by_author', {})
-        reactions_data = []
-        
-        # Flatten the reactions data with timestamps if available
-        if hasattr(chat_results, 'reactions_with_time'):
-            for reaction_info in chat_results.reactions_with_time:
-                if hasattr(reaction_info, 'timestamp') and reaction_info.timestamp:
-                    try:
-                        # Convert timestamp to seconds
-                        if isinstance(reaction_info.timestamp, str):
-                            time_parts = reaction_info.timestamp.split(':')
-                            reaction_seconds = (int(time_parts[0]) * 3600 + 
-                                              int(time_parts[1]) * 60 + 
-                                              int(time_parts[2]) if len(time_parts) > 2 else 0)
-                        else:
-                            reaction_seconds = float(reaction_info.timestamp)
-                        
-                        # Find the interval
-                        interval_idx = min(int(reaction_seconds // interval_seconds), num_intervals - 1)
-                        intervals[interval_idx]["reactions"] += 1
-                        if hasattr(reaction_info, 'reaction') and reaction_info.reaction:
-                            intervals[interval_idx]["unique_reaction_types"].add(reaction_info.reaction)
-                    except Exception as e:
-                        print(f"Error processing reaction for engagement timeline: {e}")
-    
-    # Calculate total counts across all intervals for normalization
-    total_speaker_turns = sum(interval["speaker_turns"] for interval in intervals)
-    total_comments = sum(interval["comments"] for interval in intervals)
-    total_reactions = sum(interval["reactions"] for interval in intervals)
-    max_speaking_duration = max(interval["speaking_duration"] for interval in intervals) if intervals else 1
-    total_participants_count = len(total_participants) if total_participants else 1
-    
-    # Calculate engagement scores for each interval using the formula
-    engagement_timeline = []
-    
-    for interval in intervals:
-        # Calculate normalized component scores
-        speaking_score = 0
-        if total_speaker_turns > 0 and max_speaking_duration > 0:
-            # Normalize speaker turns and speaking duration
-            turns_score = interval["speaker_turns"] / total_speaker_turns if total_speaker_turns > 0 else 0
-            duration_score = interval["speaking_duration"] / max_speaking_duration
-            participation_ratio = len(interval["unique_speakers"]) / total_participants_count
-            
-            # Combined speaking score (weighted average of turns, duration, unique speakers)
-            speaking_score = (turns_score * 0.4 + duration_score * 0.4 + participation_ratio * 0.2)
-        
-        # Comment activity score
-        comment_score = interval["comments"] / (total_comments * 2) if total_comments > 0 else 0
-        
-        # Reaction activity score
-        reaction_count_score = interval["reactions"] / (total_reactions * 2) if total_reactions > 0 else 0
-        reaction_diversity_score = len(interval["unique_reaction_types"]) / 5  # Assuming 5 reaction types is diverse
-        reaction_score = (reaction_count_score * 0.6 + reaction_diversity_score * 0.4)
-        
-        # Final weighted engagement score
-        engagement_score = (0.6 * speaking_score) + (0.2 * comment_score) + (0.2 * reaction_score)
-        
-        # Ensure between 0 and 1
-        engagement_score = min(max(engagement_score, 0), 1)
-        
-        engagement_timeline.append({
-            "timestamp": interval["timestamp"],
-            "engagement": engagement_score
-        })
-    
+
+    # Same engine as the timeline pyramid, with the requested interval as its only level
+    chat_events = getattr(chat_results, 'events', None) if chat_results else None
+    engagement_timeline = engagement_pyramid(
+        captions_data, chat_events, duration_seconds, base_seconds=interval_seconds, factors=(1,)
+    )[interval_seconds]
+
     print(f"Generated engagement timeline with {len(engagement_timeline)} points based on real activity.")
-    return engagement_timeline 
\ No newline at end of file
+    return engagement_timeline
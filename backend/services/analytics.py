@@ -0,0 +1,66 @@
+"""
+Trends across meetings, computed from the analytics rollups (db.analytics_rollups).
+
+The rollups hold per-day sums, so a trend over any range only folds the day rows into
+periods (day, ISO week starting Monday, month) and divides totals by counts; no
+analysis is read.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db.analytics_rollups import DAILY_MEASURES, UNKNOWN_PLATFORM
+
+PERIODS = ("day", "week", "month")
+
+def period_start(day: Any, period: str) -> str:
+    """First day (YYYY-MM-DD) of the period containing `day`."""
+    day = day if isinstance(day, date) else date.fromisoformat(str(day)[:10])
+    if period == "week":
+        day -= timedelta(days=day.weekday())
+    elif period == "month":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+def _average(total: float, count: int) -> Optional[float]:
+    return total / count if count else None
+
+def _sum_rows(rows: Iterable[Dict[str, Any]], key, measures) -> Dict[Any, Dict[str, float]]:
+    sums: Dict[Any, Dict[str, float]] = {}
+    for row in rows:
+        totals = sums.setdefault(key(row), dict.fromkeys(measures, 0))
+        for measure in measures:
+            totals[measure] += row[measure] or 0
+    return sums
+
+def meeting_trend(rows: Iterable[Dict[str, Any]], period: str = "week", by_platform: bool = False) -> List[Dict[str, Any]]:
+    """Per period (and platform): meetings and average duration, engagement, overall
+    sentiment and participants, from `daily_rollups` rows."""
+    def key(row) -> Tuple[str, Optional[str]]:
+        return period_start(row["day"], period), (row["platform"] or UNKNOWN_PLATFORM) if by_platform else None
+    trend = []
+    for (start, platform), totals in sorted(_sum_rows(rows, key, DAILY_MEASURES).items()):
+        point = {"period": start}
+        if by_platform:
+            point["platform"] = platform or None
+        point.update({
+            "meetings": totals["meetings"],
+            "average_duration": _average(totals["duration_total"], totals["meetings"]),
+            "average_engagement": _average(totals["engagement_total"], totals["engagement_meetings"]),
+            "average_sentiment": _average(totals["sentiment_total"], totals["sentiment_meetings"]),
+            "average_participants": _average(totals["participants_total"], totals["participants_meetings"]),
+        })
+        trend.append(point)
+    return trend
+
+def speaker_talk_time(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Each speaker's speaking time, share of all speaking time, meetings and average
+    sentiment, from the per-speaker sums of `sum_speaker_rollups` (in its order)."""
+    total_time = totals["total_speaking_time"] or 0
+    return {"total_speaking_time": total_time, "speakers": [{
+        "speaker": row["speaker"],
+        "speaking_time": row["speaking_time"],
+        "share": row["speaking_time"] / total_time if total_time else None,
+        "meetings": row["meetings"],
+        "average_sentiment": _average(row["sentiment_total"], row["sentiment_meetings"]),
+    } for row in totals["speakers"]]}
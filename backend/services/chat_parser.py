@@ -1,18 +1,193 @@
 import re
+from array import array
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator, Tuple
 import os
 
+import numpy as np
+
+from services.emoji import extract_emojis
+
+# --- Chat Event Kinds ---
+EVENT_MESSAGE = 0
+EVENT_REPLY = 1
+EVENT_REACTION = 2
+
+# Timestamped line: "HH:MM:SS<TAB>Author:<TAB>text". Any other line continues the previous event.
+_LINE_PATTERN = re.compile(r"^(\d{2}):(\d{2}):(\d{2})\t(.*?):\t(.*)$")
+_REACTION_PATTERN = re.compile(r"^Reacted to \"(.*?)\" with (.*)$")
+_REPLY_PATTERN = re.compile(r"^Replying to \"(.*)\"\s*$")
+
+class ChatEvent:
+    """One chat event as yielded by `iter_chat_events`.
+
+    `text` is the message body (continuation lines included) or, for a reaction, the emoji.
+    `target` is the quoted message a reply or reaction refers to.
+    """
+    __slots__ = ("kind", "offset", "author", "text", "target")
+
+    def __init__(self, kind: int, offset: float, author: str, text: str, target: Optional[str] = None):
+        self.kind = kind
+        self.offset = offset
+        self.author = author
+        self.text = text
+        self.target = target
+
+    def __repr__(self) -> str:
+        return f"ChatEvent(kind={self.kind}, offset={self.offset}, author={self.author!r}, text={self.text[:40]!r})"
+
+class ChatEvents:
+    """Chat events stored as compact parallel arrays.
+
+    Authors and emojis are interned, so per-event columns are small integers; `texts` and
+    `targets` stay Python lists. Emojis are moved out of the text: every occurrence (a
+    reaction, or an emoji typed in a message) is a row of `emoji_event_idx`/`emoji_ids`,
+    which is what the aggregates below run over.
+    """
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.offsets = array('d')
+        self.author_ids = array('I')
+        self.texts: List[str] = []
+        self.targets: List[Optional[str]] = []
+        self.authors: List[str] = []
+        self.emojis: List[str] = []
+        self.emoji_event_idx = array('I')
+        self.emoji_ids = array('I')
+        self._author_index: Dict[str, int] = {}
+        self._emoji_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __repr__(self) -> str:
+        return f"ChatEvents(events={len(self)}, authors={len(self.authors)}, emoji_occurrences={len(self.emoji_ids)})"
+
+    def _intern(self, value: str, index: Dict[str, int], values: List[str]) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = index[value] = len(values)
+            values.append(value)
+        return value_id
+
+    def append(self, event: ChatEvent) -> None:
+        # One pass gives both the text without emojis and the emojis themselves
+        text, emojis = extract_emojis(event.text)
+        if event.kind == EVENT_REACTION and not emojis and text:
+            emojis, text = [text], "" # Reacted with something outside the emoji table
+        event_idx = len(self.kinds)
+        self.kinds.append(event.kind)
+        self.offsets.append(event.offset)
+        self.author_ids.append(self._intern(event.author, self._author_index, self.authors))
+        self.texts.append(text.strip())
+        self.targets.append(event.target)
+        for emoji in emojis:
+            self.emoji_event_idx.append(event_idx)
+            self.emoji_ids.append(self._intern(emoji, self._emoji_index, self.emojis))
+
+    # --- Numpy views (no copies) ---
+    def kind_array(self) -> np.ndarray:
+        return np.frombuffer(self.kinds, dtype=np.uint8) if self.kinds else np.zeros(0, dtype=np.uint8)
+
+    def offset_array(self) -> np.ndarray:
+        return np.frombuffer(self.offsets, dtype=np.float64) if self.offsets else np.zeros(0, dtype=np.float64)
+
+    def author_id_array(self) -> np.ndarray:
+        return np.frombuffer(self.author_ids, dtype=np.uint32) if self.author_ids else np.zeros(0, dtype=np.uint32)
+
+    def emoji_columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(event index, emoji id) of every emoji occurrence."""
+        if not self.emoji_ids:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        return (np.frombuffer(self.emoji_event_idx, dtype=np.uint32).astype(np.intp),
+                np.frombuffer(self.emoji_ids, dtype=np.uint32).astype(np.intp))
+
+    # --- Aggregates ---
+    def reaction_counts(self) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+        """Overall and per-author emoji counts, in one pass over the emoji occurrences."""
+        event_idx, emoji_ids = self.emoji_columns()
+        if not len(emoji_ids):
+            return {}, {}
+        n_emojis = len(self.emojis)
+        summary = np.bincount(emoji_ids, minlength=n_emojis)
+        pair_keys = self.author_id_array()[event_idx].astype(np.intp) * n_emojis + emoji_ids
+        pairs, pair_counts = np.unique(pair_keys, return_counts=True)
+        by_author: Dict[str, Dict[str, int]] = {}
+        for key, count in zip(pairs.tolist(), pair_counts.tolist()):
+            author_id, emoji_id = divmod(key, n_emojis)
+            by_author.setdefault(self.authors[author_id], {})[self.emojis[emoji_id]] = count
+        return {self.emojis[i]: int(c) for i, c in enumerate(summary.tolist()) if c}, by_author
+
+    def authors_with(self, *kinds: int) -> List[str]:
+        """Distinct authors of events of the given kinds."""
+        mask = np.isin(self.kind_array(), kinds)
+        return [self.authors[i] for i in np.unique(self.author_id_array()[mask]).tolist()]
+
 class ChatMessage(BaseModel):
     timestamp: Optional[str] = None # e.g., "00:05:32" or raw line value
+    offset: Optional[float] = None # Seconds from the start of the meeting
     author: str
     message: str
+    reply_to: Optional[str] = None # Quoted message this one replies to
     reactions: List[str] = [] # Emojis found associated with this message
 
 class ChatParsingResult(BaseModel):
     messages: List[ChatMessage] = []
     reactions_summary: Dict[str, int] = {} # Overall emoji counts
     reactions_by_author: Dict[str, Dict[str, int]] = {} # Emoji counts per author
+    events: Optional[ChatEvents] = None # Every message, reply and reaction with its offset
+
+    class Config:
+        arbitrary_types_allowed = True
+
+def format_offset(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def _finish_event(offset: float, author: str, first_line: str, continuation: List[str]) -> ChatEvent:
+    """Builds the event for one timestamped line plus the untimestamped lines after it."""
+    body = '\n'.join(continuation).strip()
+    reaction_match = _REACTION_PATTERN.match(first_line)
+    if reaction_match:
+        return ChatEvent(EVENT_REACTION, offset, author, reaction_match.group(2).strip(), reaction_match.group(1))
+    reply_match = _REPLY_PATTERN.match(first_line)
+    if reply_match:
+        # Zoom writes the reply on the lines after "Replying to ..."
+        return ChatEvent(EVENT_REPLY, offset, author, body, reply_match.group(1))
+    text = f"{first_line}\n{body}" if body else first_line
+    return ChatEvent(EVENT_MESSAGE, offset, author, text)
+
+def iter_chat_events(file_path: str) -> Iterator[ChatEvent]:
+    """Streams message, reply and reaction events from a Zoom chat file (.txt).
+
+    An event is emitted once the next timestamped line (or the end of the file) shows that
+    no more continuation lines follow, so only one event is held in memory at a time.
+    """
+    pending: Optional[Tuple[float, str, str]] = None
+    continuation: List[str] = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            match = _LINE_PATTERN.match(line)
+            if match is None:
+                if pending is not None:
+                    continuation.append(line.strip())
+                continue
+            if pending is not None:
+                yield _finish_event(*pending, continuation)
+                continuation = []
+            hours, minutes, seconds, author, text = match.groups()
+            pending = (int(hours) * 3600 + int(minutes) * 60 + int(seconds), author.strip(), text.strip())
+    if pending is not None:
+        yield _finish_event(*pending, continuation)
+
+def parse_chat_events(file_path: str) -> ChatEvents:
+    """Collects the chat file's events into compact parallel arrays."""
+    events = ChatEvents()
+    for event in iter_chat_events(file_path):
+        events.append(event)
+    return events
 
 def parse_chat_file(file_path: Optional[str]) -> Optional[ChatParsingResult]:
     """Parses a Zoom chat file (.txt) to extract messages, authors, timestamps, and reactions."""
@@ -20,96 +195,36 @@ def parse_chat_file(file_path: Optional[str]) -> Optional[ChatParsingResult]:
         print(f"Chat file not found or path is invalid: {file_path}. Skipping chat parsing.")
         return None
 
-    messages: List[ChatMessage] = []
-    reactions_summary: Dict[str, int] = {}
-    reactions_by_author: Dict[str, Dict[str, int]] = {}
-    # Regex to capture timestamp, author, and message content based on TAB separation
-    line_pattern = re.compile(r"^(\d{2}:\d{2}:\d{2})\t(.*?):\t(.*)$") # New pattern
-    
-    # Reaction message pattern
-    reaction_pattern = re.compile(r"^Reacted to \".*?\" with (.*)$")
-    
-    # More comprehensive emoji pattern (includes more ranges)
-    emoji_pattern = re.compile(
-        "["
-        u"\U0001F600-\U0001F64F"  # emoticons
-        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-        u"\U0001F700-\U0001F77F"  # alchemical symbols
-        u"\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-        u"\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-        u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-        u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-        u"\U00002702-\U000027B0"  # Dingbats
-        u"\U000024C2-\U0001F251" 
-        "]+")
-
     try:
         print(f"Parsing chat file: {file_path}")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                match = line_pattern.match(line)
-                if match:
-                    timestamp, author, message_text = match.groups()
-                    author = author.strip()
-                    message_text = message_text.strip()
-                    
-                    # Check if this line is a reaction notification
-                    reaction_match = reaction_pattern.match(message_text)
-                    if reaction_match:
-                        reaction_emoji = reaction_match.group(1).strip()
-                        # print(f"[Chat Parse] Detected Reaction: Author='{author}', Emoji='{reaction_emoji}'") # Debug
-                        # Update reaction counts
-                        if author not in reactions_by_author:
-                            reactions_by_author[author] = {}
-                        # Use the single extracted emoji
-                        if reaction_emoji: # Ensure emoji exists
-                            reactions_summary[reaction_emoji] = reactions_summary.get(reaction_emoji, 0) + 1
-                            reactions_by_author[author][reaction_emoji] = reactions_by_author[author].get(reaction_emoji, 0) + 1
-                        # Skip adding reaction notifications as regular messages
-                        continue 
-                        
-                    # Check if this line is a reply notification (and skip for now)
-                    if message_text.startswith("Replying to "):
-                        # print(f"[Chat Parse] Detected Reply line, skipping as message: Author='{author}', Text='{message_text[:50]}...'") # Debug
-                        continue
-                        
-                    # --- Process as a regular message --- 
-                    # Extract emojis *from within* the regular message text
-                    emojis_in_message = emoji_pattern.findall(message_text)
-                    cleaned_message = emoji_pattern.sub('', message_text).strip() # Remove emojis from message text
-                    
-                    messages.append(ChatMessage(
-                        timestamp=timestamp,
-                        author=author,
-                        message=cleaned_message,
-                        reactions=emojis_in_message # Store emojis found *in* the message
-                    ))
-                    
-                    # print(f"[Chat Parse] Parsed Message: Author='{author}', Emojis: {emojis_in_message}, Msg: {cleaned_message[:50]}...") # Debug
-                    
-                    # Update reaction counts for emojis *found within the message text*
-                    if emojis_in_message:
-                         if author not in reactions_by_author:
-                             reactions_by_author[author] = {}
-                         for emoji in emojis_in_message:
-                             reactions_summary[emoji] = reactions_summary.get(emoji, 0) + 1
-                             reactions_by_author[author][emoji] = reactions_by_author[author].get(emoji, 0) + 1
-                         
-                # else: # DEBUG: Log lines that didn't match the main pattern
-                    # if line: # Avoid logging blank lines
-                    #      print(f"[Chat Parse] Line did not match expected format: '{line}'")
-
-                # TODO: Handle potential multi-line messages if format allows (more complex)
+        events = parse_chat_events(file_path)
+
+        # Messages and replies become comments; reactions only feed the aggregates
+        messages: List[ChatMessage] = []
+        emojis_by_event: Dict[int, List[str]] = {}
+        for event_idx, emoji_id in zip(events.emoji_event_idx, events.emoji_ids):
+            emojis_by_event.setdefault(event_idx, []).append(events.emojis[emoji_id])
+        for i, kind in enumerate(events.kinds):
+            if kind == EVENT_REACTION:
+                continue
+            messages.append(ChatMessage(
+                timestamp=format_offset(events.offsets[i]),
+                offset=events.offsets[i],
+                author=events.authors[events.author_ids[i]],
+                message=events.texts[i], # Emojis already removed by the parser
+                reply_to=events.targets[i],
+                reactions=emojis_by_event.get(i, []) # Store emojis found *in* the message
+            ))
 
+        reactions_summary, reactions_by_author = events.reaction_counts()
         print(f"Chat parsing completed. Found {len(messages)} messages and {len(reactions_summary)} unique reactions.")
         return ChatParsingResult(
             messages=messages,
             reactions_summary=reactions_summary,
-            reactions_by_author=reactions_by_author
+            reactions_by_author=reactions_by_author,
+            events=events
         )
 
     except Exception as e:
         print(f"Error parsing chat file {file_path}: {e}")
-        return None # Return None on error, allow pipeline to continue 
\ No newline at end of file
+        return None # Return None on error, allow pipeline to continue
@@ -0,0 +1,255 @@
+"""
+Resumable chunked uploads for large recordings.
+
+A client opens an upload session with the file's name and size, then sends the file in
+fixed-size chunks, each with its offset and SHA-256, in any order and over as many
+requests (and reconnections) as it needs:
+
+    POST /api/meetings/uploads                      -> upload_id, chunk_size
+    PUT  /api/meetings/uploads/{id}?offset=N        (X-Chunk-SHA256: <hex>)
+    GET  /api/meetings/uploads/{id}                 -> chunks received / missing
+    POST /api/meetings/uploads/{id}/complete        -> the meeting, deduplicated or queued
+
+The session's file is preallocated to its full size when the session opens. Each chunk
+is written in place with `os.pwrite` at its offset as the request body arrives, so
+chunks of the same upload can land concurrently and nothing is copied or reassembled
+afterwards. A chunk counts as received only when its length and checksum match; a bad
+chunk is simply sent again. A chunk sent again once received is checked but not
+written, so a resend that breaks off or is corrupted cannot damage the accepted bytes. On
+completion the file is hashed once, each chunk checked against the checksum it was
+accepted with, and renamed (not copied) into the content-addressed upload store
+(services/uploads.py).
+
+Session state lives next to the data file as JSON and is updated under an exclusive file
+lock. Sessions idle for UPLOAD_SESSION_TTL_SECONDS are removed.
+"""
+
+import fcntl
+import hashlib
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from services.serialization import dumps, loads
+from services.uploads import UPLOAD_CHUNK_SIZE, UPLOAD_DIR, upload_path
+
+INCOMING_DIR = os.path.join(UPLOAD_DIR, 'incoming')
+DEFAULT_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(4 * 1024 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_SECONDS = float(os.environ.get("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+class UploadError(Exception):
+    """A request that does not fit the upload session (bad offset, length or checksum)."""
+
+class UploadSession(BaseModel):
+    upload_id: str
+    filename: str
+    extension: str
+    size: int
+    chunk_size: int
+    sha256: Optional[str] = None # Whole-file checksum the client announced, if any
+    received: Dict[int, str] = {} # Chunk index -> its SHA-256
+    created_at: float
+    updated_at: float
+
+    @property
+    def chunk_count(self) -> int:
+        return max((self.size + self.chunk_size - 1) // self.chunk_size, 1)
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def missing(self) -> List[int]:
+        return [i for i in range(self.chunk_count) if i not in self.received]
+
+    def status(self) -> dict:
+        missing = self.missing()
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "chunk_count": self.chunk_count,
+            "received_chunks": len(self.received),
+            "missing_offsets": [i * self.chunk_size for i in missing],
+            "complete": not missing
+        }
+
+def _data_path(upload_id: str) -> str:
+    return os.path.join(INCOMING_DIR, f"{upload_id}.part")
+
+def _state_path(upload_id: str) -> str:
+    return os.path.join(INCOMING_DIR, f"{upload_id}.json")
+
+def _write_state(f, session: UploadSession) -> None:
+    f.seek(0)
+    f.truncate()
+    f.write(dumps(session.model_dump()))
+    f.flush()
+
+@contextmanager
+def _locked_session(upload_id: str) -> Iterator[Tuple[UploadSession, object]]:
+    """The session read under an exclusive lock on its state file, which stays held (and
+    writable through the yielded file) until the block ends."""
+    if not _UPLOAD_ID.match(upload_id):
+        raise KeyError(upload_id)
+    try:
+        f = open(_state_path(upload_id), 'r+b')
+    except FileNotFoundError:
+        raise KeyError(upload_id)
+    with f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        data = loads(f.read())
+        data["received"] = {int(k): v for k, v in data.get("received", {}).items()}
+        yield UploadSession(**data), f
+
+def purge_stale_sessions(max_age_seconds: float = UPLOAD_SESSION_TTL_SECONDS) -> int:
+    """Removes sessions not written to for `max_age_seconds`; returns how many."""
+    if not os.path.isdir(INCOMING_DIR):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(INCOMING_DIR):
+        path = os.path.join(INCOMING_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += name.endswith(".json")
+        except OSError:
+            pass # Finished or removed concurrently
+    return removed
+
+def create_session(filename: str, extension: str, size: int, chunk_size: Optional[int] = None,
+                   sha256: Optional[str] = None) -> UploadSession:
+    if size <= 0 or size > MAX_UPLOAD_BYTES:
+        raise UploadError(f"Upload size must be between 1 and {MAX_UPLOAD_BYTES} bytes")
+    chunk_size = min(max(chunk_size or DEFAULT_CHUNK_SIZE, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+    os.makedirs(INCOMING_DIR, exist_ok=True)
+    purge_stale_sessions()
+    now = time.time()
+    session = UploadSession(
+        upload_id=uuid.uuid4().hex, filename=filename, extension=extension, size=size,
+        chunk_size=chunk_size, sha256=sha256.lower() if sha256 else None, created_at=now, updated_at=now
+    )
+    # Reserve the whole file up front: chunks are written in place, in any order
+    fd = os.open(_data_path(session.upload_id), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size) # Sparse where the filesystem cannot preallocate
+    finally:
+        os.close(fd)
+    with open(_state_path(session.upload_id), 'wb') as f:
+        _write_state(f, session)
+    return session
+
+def get_session(upload_id: str) -> Optional[UploadSession]:
+    try:
+        with _locked_session(upload_id) as (session, _):
+            return session
+    except KeyError:
+        return None
+
+class ChunkWriter:
+    """Writes one chunk's bytes in place as they arrive and checks them at the end."""
+
+    def __init__(self, session: UploadSession, offset: int):
+        if offset < 0 or offset % session.chunk_size or offset >= session.size:
+            raise UploadError(f"Offset {offset} is not the start of a chunk (chunk size {session.chunk_size})")
+        self.upload_id = session.upload_id
+        self.index = offset // session.chunk_size
+        self.offset = offset
+        self.expected_length = session.chunk_length(self.index)
+        self.written = 0
+        self._hasher = hashlib.sha256()
+        # The accepted bytes of a received chunk are never overwritten
+        self.already_received = self.index in session.received
+        try:
+            self._fd = None if self.already_received else os.open(_data_path(self.upload_id), os.O_WRONLY)
+        except FileNotFoundError:
+            raise KeyError(self.upload_id) # Purged as stale, or finished, since it was read
+
+    def write(self, data: bytes) -> None:
+        if self.written + len(data) > self.expected_length:
+            raise UploadError(f"Chunk at offset {self.offset} is longer than {self.expected_length} bytes")
+        self._hasher.update(data)
+        if self._fd is None:
+            self.written += len(data)
+            return
+        view = memoryview(data)
+        while view:
+            n = os.pwrite(self._fd, view, self.offset + self.written)
+            self.written += n
+            view = view[n:]
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+
+    def commit(self, checksum: str) -> UploadSession:
+        """Records the chunk as received if its length and SHA-256 match."""
+        if self.written != self.expected_length:
+            raise UploadError(f"Chunk at offset {self.offset} has {self.written} bytes, expected {self.expected_length}")
+        digest = self._hasher.hexdigest()
+        if digest != checksum.lower():
+            raise UploadError(f"Checksum mismatch for chunk at offset {self.offset}")
+        if self._fd is None:
+            with _locked_session(self.upload_id) as (session, _):
+                return session
+        os.fsync(self._fd)
+        with _locked_session(self.upload_id) as (session, f):
+            session.received[self.index] = digest
+            session.updated_at = time.time()
+            _write_state(f, session)
+            return session
+
+def finish_session(upload_id: str) -> Tuple[UploadSession, str, str]:
+    """Checks that every chunk arrived intact, hashes the file and moves it into the upload
+    store. Returns (session, stored path, sha256)."""
+    with _locked_session(upload_id) as (session, f):
+        missing = session.missing()
+        if missing:
+            raise UploadError(f"{len(missing)} chunk(s) missing, first at offset {missing[0] * session.chunk_size}")
+        hasher = hashlib.sha256()
+        damaged = []
+        try:
+            data = open(_data_path(upload_id), 'rb')
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+        with data:
+            for index in range(session.chunk_count):
+                # Two requests for the same missing chunk may have raced; each chunk must
+                # still hold the bytes it was accepted with
+                chunk_hasher = hashlib.sha256()
+                remaining = session.chunk_length(index)
+                while remaining:
+                    block = data.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                    if not block:
+                        break
+                    hasher.update(block)
+                    chunk_hasher.update(block)
+                    remaining -= len(block)
+                if chunk_hasher.hexdigest() != session.received[index]:
+                    damaged.append(index)
+        if damaged:
+            for index in damaged:
+                del session.received[index]
+            _write_state(f, session)
+            raise UploadError(f"{len(damaged)} chunk(s) damaged, first at offset {damaged[0] * session.chunk_size}; send them again")
+        content_hash = hasher.hexdigest()
+        if session.sha256 and session.sha256 != content_hash:
+            raise UploadError("The assembled file does not match the announced SHA-256")
+        path = upload_path(content_hash, session.extension)
+        os.replace(_data_path(upload_id), path)
+        os.remove(_state_path(upload_id))
+    return session, path, content_hash
@@ -7,6 +7,8 @@ import time
 import ffmpeg
 import tempfile
 
+from services.progress import stage_progress
+
 # --- Model Loading ---
 # Load models during application startup via lifespan
 _diarization_pipeline = None
@@ -62,6 +64,12 @@ class DiarizationResult(BaseModel):
     turns: List[SpeakerTurn] = []
     num_speakers: int = 0
 
+def _progress_hook(step_name, step_artifact, file=None, total=None, completed=None):
+    """pyannote calls this as each step (segmentation, embeddings, ...) advances; it reports
+    the step's percentage, which is also a cancellation/deadline checkpoint."""
+    if total:
+        stage_progress(100.0 * (completed or 0) / total, step=step_name)
+
 def diarize_audio(file_path: str) -> Optional[DiarizationResult]:
     """Performs speaker diarization on an audio file."""
     pipeline = load_diarization_model()
@@ -106,7 +114,7 @@ def diarize_audio(file_path: str) -> Optional[DiarizationResult]:
         start_time = time.time()
         
         # Perform diarization using the potentially converted WAV file
-        diarization = pipeline(input_file_for_pipeline)
+        diarization = pipeline(input_file_for_pipeline, hook=_progress_hook)
         
         end_time = time.time()
         print(f"Diarization completed in {end_time - start_time:.2f} seconds.")
@@ -2,17 +2,10 @@ import os
 from mutagen.mp4 import MP4
 from mutagen import MutagenError
 from typing import List, Optional
-import datetime
 
-# Assuming VttCaption model is defined elsewhere or here
-from pydantic import BaseModel
-class VttCaption(BaseModel):
-    start: str
-    end: str
-    text: str
-    raw_text: str
+from services.vtt_parser import VttCue
 
-def get_meeting_duration(file_path: str, file_type: str, captions: Optional[List[VttCaption]] = None) -> Optional[float]:
+def get_meeting_duration(file_path: str, file_type: str, captions: Optional[List[VttCue]] = None) -> Optional[float]:
     """Calculates the duration of the meeting in seconds.
     
     Uses mutagen for M4A files, or estimates from VTT captions.
@@ -35,22 +28,9 @@ def get_meeting_duration(file_path: str, file_type: str, captions: Optional[List
             
     elif file_type == "vtt":
         if captions and len(captions) > 0:
-            try:
-                # Get the end time of the last caption
-                last_caption_end_str = captions[-1].end
-                # Parse the VTT timestamp (HH:MM:SS.fff)
-                parts = last_caption_end_str.split('.')
-                time_parts = parts[0].split(':')
-                milliseconds = int(parts[1]) if len(parts) > 1 else 0
-                hours = int(time_parts[0])
-                minutes = int(time_parts[1])
-                seconds = int(time_parts[2])
-                
-                duration_td = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds, milliseconds=milliseconds)
-                duration_seconds = duration_td.total_seconds()
-                print(f"Estimated VTT duration from last caption: {duration_seconds:.2f} seconds")
-            except Exception as e:
-                print(f"Error parsing VTT end time for duration: {e}")
+            # Cue times are already seconds; the last cue ends the meeting
+            duration_seconds = captions[-1].end
+            print(f"Estimated VTT duration from last caption: {duration_seconds:.2f} seconds")
         else:
              print("No VTT captions provided to estimate duration.")
              
@@ -75,8 +55,8 @@ def get_meeting_duration(file_path: str, file_type: str, captions: Optional[List
 
 #     # Test with VTT (requires dummy captions or a real file + parser)
 #     dummy_captions = [
-#         VttCaption(start="00:00:01.000", end="00:00:05.500", text="Hello", raw_text="Hello"),
-#         VttCaption(start="00:00:06.000", end="00:00:10.123", text="World", raw_text="World")
+#         VttCue(start=1.0, end=5.5, speaker=None, text="Hello"),
+#         VttCue(start=6.0, end=10.123, speaker=None, text="World")
 #     ]
 #     duration_vtt = get_meeting_duration("dummy.vtt", "vtt", captions=dummy_captions)
 #     print(f"VTT Test Duration: {duration_vtt}")
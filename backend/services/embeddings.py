@@ -0,0 +1,57 @@
+from typing import List
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModel
+
+# --- Model Loading ---
+# Load during application startup via lifespan, like the other models.
+# MiniLM gives 384-dim sentence embeddings and is fast enough on CPU
+# to embed a single search query in a few milliseconds.
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+_embedding_tokenizer = None
+_embedding_model = None
+
+def load_embedding_model(model_name: str = EMBEDDING_MODEL_NAME):
+    """Loads the sentence embedding model used by the semantic search index."""
+    global _embedding_tokenizer, _embedding_model
+    if _embedding_model is None:
+        try:
+            print(f"Loading sentence embedding model: {model_name}...")
+            _embedding_tokenizer = AutoTokenizer.from_pretrained(model_name)
+            _embedding_model = AutoModel.from_pretrained(model_name)
+            _embedding_model.eval()
+            print("Sentence embedding model loaded successfully.")
+        except Exception as e:
+            print(f"Error loading sentence embedding model '{model_name}': {e}")
+            raise RuntimeError(f"Failed to load embedding model: {e}")
+    return _embedding_tokenizer, _embedding_model
+
+def embed_texts(texts: List[str], batch_size: int = 64) -> np.ndarray:
+    """Embeds a list of texts into L2-normalised float32 vectors (mean pooling).
+
+    Normalised vectors let the search index use a plain dot product as cosine similarity.
+    """
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    tokenizer, model = load_embedding_model()
+    batches = []
+    with torch.inference_mode():
+        for i in range(0, len(texts), batch_size):
+            encoded = tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors="pt"
+            )
+            output = model(**encoded)
+            # Mean pooling over real tokens only
+            mask = encoded["attention_mask"].unsqueeze(-1).to(output.last_hidden_state.dtype)
+            summed = (output.last_hidden_state * mask).sum(dim=1)
+            counts = mask.sum(dim=1).clamp(min=1e-9)
+            pooled = torch.nn.functional.normalize(summed / counts, p=2, dim=1)
+            batches.append(pooled.cpu().numpy().astype(np.float32))
+    return np.vstack(batches)
@@ -0,0 +1,144 @@
+"""
+Shared emoji extraction for chat messages and captions.
+
+Emoji codepoints are looked up in a bitset over the whole Unicode range (BMP and
+supplementary planes) built once at import, instead of matching a character-class regex.
+`extract_emojis` walks only the non-ASCII runs of a text and returns the cleaned text
+together with the emojis, in one pass. Multi-codepoint emojis are kept whole: ZWJ
+sequences (👩‍💻), skin-tone and variation-selector modifiers (👍🏽, ❤️), keycaps (1️⃣)
+and flag pairs (🇫🇷).
+
+`emoji_sentiment` scores an emoji on the same 0-1 scale as the sentiment timeline
+(0 negative, 0.5 neutral, 1 positive).
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# --- Codepoint Table ---
+_EMOJI_RANGES = [
+    (0x203C, 0x203C), (0x2049, 0x2049), (0x2122, 0x2122), (0x2139, 0x2139),
+    (0x2194, 0x2199), (0x21A9, 0x21AA), (0x231A, 0x231B), (0x2328, 0x2328),
+    (0x23CF, 0x23CF), (0x23E9, 0x23F3), (0x23F8, 0x23FA), (0x24C2, 0x24C2),
+    (0x25AA, 0x25AB), (0x25B6, 0x25B6), (0x25C0, 0x25C0), (0x25FB, 0x25FE),
+    (0x2600, 0x27BF),   # Misc symbols & dingbats
+    (0x2934, 0x2935), (0x2B05, 0x2B07), (0x2B1B, 0x2B1C), (0x2B50, 0x2B50),
+    (0x2B55, 0x2B55), (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297),
+    (0x3299, 0x3299),
+    (0x1F000, 0x1F0FF), # Mahjong, domino & playing cards
+    (0x1F10D, 0x1F2FF), # Enclosed alphanumerics/ideographs incl. regional indicators
+    (0x1F300, 0x1F5FF), # Symbols & pictographs
+    (0x1F600, 0x1F64F), # Emoticons
+    (0x1F680, 0x1F6FF), # Transport & map symbols
+    (0x1F700, 0x1F8FF), # Alchemical, geometric shapes ext., supplemental arrows-C
+    (0x1F900, 0x1FAFF), # Supplemental symbols & pictographs, extended-A
+]
+
+def _build_bitset() -> bytearray:
+    bits = bytearray(0x110000 >> 3)
+    for first, last in _EMOJI_RANGES:
+        for cp in range(first, last + 1):
+            bits[cp >> 3] |= 1 << (cp & 7)
+    return bits
+
+_EMOJI_BITS = _build_bitset()
+
+ZWJ = 0x200D
+_KEYCAP = 0x20E3
+_KEYCAP_BASES = frozenset('0123456789#*')
+_REGIONAL_INDICATORS = range(0x1F1E6, 0x1F200)
+# Codepoints that extend the emoji before them
+_MODIFIERS = frozenset([0xFE0E, 0xFE0F, _KEYCAP, *range(0x1F3FB, 0x1F400), *range(0xE0020, 0xE0080)])
+_NON_ASCII_RUN = re.compile(r'[^\x00-\x7f]+')
+_FIRST_EMOJI = chr(_EMOJI_RANGES[0][0])
+
+def is_emoji_codepoint(cp: int) -> bool:
+    return bool(_EMOJI_BITS[cp >> 3] >> (cp & 7) & 1)
+
+def _emoji_end(run: str, i: int) -> int:
+    """End index of the emoji sequence starting at run[i] (which is an emoji codepoint)."""
+    n = len(run)
+    bits = _EMOJI_BITS
+    first = ord(run[i])
+    j = i + 1
+    if first in _REGIONAL_INDICATORS and j < n and ord(run[j]) in _REGIONAL_INDICATORS:
+        return j + 1 # Flag: a pair of regional indicators
+    while j < n:
+        cp = ord(run[j])
+        if cp in _MODIFIERS:
+            j += 1
+        elif cp == ZWJ and j + 1 < n and bits[ord(run[j + 1]) >> 3] >> (ord(run[j + 1]) & 7) & 1:
+            j += 2 # Joined to the next emoji
+        else:
+            break
+    return j
+
+def extract_emojis(text: str) -> Tuple[str, List[str]]:
+    """Splits `text` into (text without emojis, emojis in order of appearance)."""
+    if not text or text.isascii():
+        return text, []
+
+    bits = _EMOJI_BITS
+    emojis: List[str] = []
+    pieces: List[str] = []
+    last = 0
+    for run_match in _NON_ASCII_RUN.finditer(text):
+        run = run_match.group()
+        if max(run) < _FIRST_EMOJI and '\u20e3' not in run:
+            continue # Accents, typographic quotes, CJK below the first emoji codepoint...
+        offset = run_match.start()
+        i = 0
+        n = len(run)
+        while i < n:
+            cp = ord(run[i])
+            start = i
+            if bits[cp >> 3] >> (cp & 7) & 1:
+                end = _emoji_end(run, i)
+            elif i == 0 and offset > 0 and text[offset - 1] in _KEYCAP_BASES and _KEYCAP in map(ord, run[:2]):
+                # Keycap: ASCII digit/#/* followed by (FE0F) + U+20E3
+                start = -1
+                end = run.index(chr(_KEYCAP)) + 1
+            else:
+                i += 1
+                continue
+            emojis.append(text[offset + start:offset + end])
+            pieces.append(text[last:offset + start])
+            last = offset + end
+            i = end
+    if not emojis:
+        return text, []
+    pieces.append(text[last:])
+    return ''.join(pieces), emojis
+
+def base_emoji(emoji: str) -> str:
+    """The emoji without skin-tone or variation-selector modifiers (👍🏽 -> 👍)."""
+    return ''.join(ch for ch in emoji if ord(ch) not in _MODIFIERS or ord(ch) == _KEYCAP)
+
+# --- Sentiment Weights (0 negative, 0.5 neutral, 1 positive) ---
+NEUTRAL_SENTIMENT = 0.5
+EMOJI_SENTIMENT: Dict[str, float] = {
+    # Approval, celebration, affection
+    '👍': 0.85, '👏': 0.9, '🙌': 0.9, '🎉': 0.95, '🥳': 0.95, '🎊': 0.9, '🏆': 0.9,
+    '🔥': 0.85, '💯': 0.9, '✅': 0.8, '✔': 0.75, '👌': 0.8, '🙏': 0.8, '🫡': 0.75,
+    '💪': 0.85, '🚀': 0.85, '⭐': 0.8, '🌟': 0.85, '✨': 0.8, '🤝': 0.8, '👋': 0.65,
+    '❤': 0.95, '🧡': 0.9, '💛': 0.9, '💚': 0.9, '💙': 0.9, '💜': 0.9, '🖤': 0.7,
+    '💕': 0.95, '💖': 0.95, '😍': 0.95, '🥰': 0.95, '😘': 0.9, '🤩': 0.95,
+    # Laughter and smiles
+    '😂': 0.85, '🤣': 0.85, '😄': 0.85, '😃': 0.85, '😀': 0.8, '😁': 0.85, '😆': 0.8,
+    '😊': 0.85, '🙂': 0.7, '😉': 0.7, '😅': 0.6, '😎': 0.75, '🤗': 0.85, '😇': 0.8,
+    # Thinking, surprise, neutral
+    '🤔': 0.45, '😮': 0.55, '😯': 0.5, '😲': 0.55, '🤯': 0.6, '👀': 0.5, '😐': 0.4,
+    '😶': 0.4, '🙃': 0.5, '😬': 0.35, '🤷': 0.4, '👉': 0.5, '📌': 0.5, '💡': 0.7,
+    # Negative
+    '👎': 0.15, '😞': 0.2, '😔': 0.2, '😢': 0.2, '😭': 0.2, '😟': 0.25, '😕': 0.3,
+    '😩': 0.2, '😫': 0.2, '😤': 0.2, '😠': 0.1, '😡': 0.05, '🤬': 0.05, '💔': 0.1,
+    '😱': 0.25, '😨': 0.25, '😰': 0.25, '🙄': 0.25, '😒': 0.2, '🤦': 0.25, '❌': 0.2,
+    '⚠': 0.35, '😴': 0.3, '🥱': 0.25,
+}
+
+def emoji_sentiment(emoji: str) -> float:
+    """Sentiment weight of an emoji; modifiers are ignored and unknown emojis are neutral."""
+    weight = EMOJI_SENTIMENT.get(emoji)
+    if weight is None:
+        weight = EMOJI_SENTIMENT.get(base_emoji(emoji), NEUTRAL_SENTIMENT)
+    return weight
@@ -0,0 +1,140 @@
+"""
+Engagement over time, computed for several resolutions at once.
+
+Captions and chat events are turned into flat numpy arrays once and bucketed at the
+finest resolution (1 minute). Per-bucket counts and speaking time are `np.bincount`s;
+distinct speakers and reaction emojis per bucket come from the sorted, de-duplicated
+(bucket, id) pair keys. Coarser levels of the pyramid (5, 15, 60 minutes) are rolled up
+from the minute level in the same pass: sums are reshaped and added, distinct counts are
+re-derived from the minute-level pairs. The dashboard can then pick any resolution without
+re-running the pipeline.
+
+The score per bucket is the same formula the pipeline has always used: speaking activity
+(turns, speaking time, share of participants who spoke) 60%, comments 20%, reactions 20%.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.chat_parser import ChatEvents, EVENT_MESSAGE, EVENT_REPLY, EVENT_REACTION
+from services.vtt_parser import VttCue
+
+BASE_INTERVAL_SECONDS = 60
+PYRAMID_FACTORS = (1, 5, 15, 60) # 1, 5, 15 and 60 minute buckets
+REACTION_TYPES_FOR_FULL_DIVERSITY = 5 # Assuming 5 reaction types is diverse
+
+def _rollup_sum(values: np.ndarray, factor: int, num_buckets: int) -> np.ndarray:
+    """Sums consecutive runs of `factor` base buckets."""
+    if factor == 1:
+        return values
+    padded = np.zeros(num_buckets * factor, dtype=values.dtype)
+    padded[:len(values)] = values
+    return padded.reshape(num_buckets, factor).sum(axis=1)
+
+def _distinct_per_bucket(pair_keys: np.ndarray, num_ids: int, factor: int, num_buckets: int) -> np.ndarray:
+    """Distinct ids per bucket from unique base-level `bucket * num_ids + id` keys."""
+    if factor != 1:
+        pair_keys = np.unique((pair_keys // num_ids) // factor * num_ids + pair_keys % num_ids)
+    return np.bincount(pair_keys // num_ids, minlength=num_buckets)
+
+def _caption_arrays(captions: Sequence[VttCue]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """Start, duration and interned speaker id of every caption that has a speaker."""
+    speaker_index: Dict[str, int] = {}
+    starts: List[float] = []
+    durations: List[float] = []
+    speaker_ids: List[int] = []
+    for caption in captions:
+        speaker = caption.speaker
+        if speaker:
+            starts.append(caption.start)
+            durations.append(caption.duration)
+            speaker_ids.append(speaker_index.setdefault(speaker, len(speaker_index)))
+    return (np.array(starts, dtype=np.float64), np.array(durations, dtype=np.float64),
+            np.array(speaker_ids, dtype=np.intp), list(speaker_index))
+
+def _scores(
+    speaker_turns: np.ndarray,
+    speaking_duration: np.ndarray,
+    unique_speakers: np.ndarray,
+    comments: np.ndarray,
+    reactions: np.ndarray,
+    unique_reaction_types: np.ndarray,
+    participants_count: int
+) -> np.ndarray:
+    """Engagement score (0-1) of every bucket."""
+    total_turns = speaker_turns.sum()
+    max_duration = speaking_duration.max() if len(speaking_duration) else 0
+    speaking = np.zeros(len(speaker_turns))
+    if total_turns > 0 and max_duration > 0:
+        speaking = (speaker_turns / total_turns * 0.4
+                    + speaking_duration / max_duration * 0.4
+                    + unique_speakers / participants_count * 0.2)
+    total_comments = comments.sum()
+    comment = comments / (total_comments * 2) if total_comments > 0 else np.zeros(len(comments))
+    total_reactions = reactions.sum()
+    reaction_count = reactions / (total_reactions * 2) if total_reactions > 0 else np.zeros(len(reactions))
+    reaction = reaction_count * 0.6 + unique_reaction_types / REACTION_TYPES_FOR_FULL_DIVERSITY * 0.4
+    return np.clip(0.6 * speaking + 0.2 * comment + 0.2 * reaction, 0, 1)
+
+def engagement_pyramid(
+    captions: Sequence[VttCue],
+    chat_events: Optional[ChatEvents],
+    duration_seconds: float,
+    base_seconds: int = BASE_INTERVAL_SECONDS,
+    factors: Sequence[int] = PYRAMID_FACTORS
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Engagement timelines keyed by interval length in seconds (`base_seconds * factor`).
+
+    Each timeline is a list of {timestamp, engagement} points, one per interval starting at
+    0; activity past `duration_seconds` counts towards the last interval.
+    """
+    if duration_seconds <= 0:
+        return {}
+    num_base = math.ceil(duration_seconds / base_seconds)
+
+    # --- Base-level arrays ---
+    starts, durations, speaker_ids, speakers = _caption_arrays(captions)
+    caption_buckets = np.minimum((starts // base_seconds).astype(np.intp), num_base - 1)
+    base_turns = np.bincount(caption_buckets, minlength=num_base)
+    base_speaking = np.bincount(caption_buckets, weights=durations, minlength=num_base)
+    num_speakers = max(len(speakers), 1)
+    speaker_pairs = np.unique(caption_buckets * num_speakers + speaker_ids)
+    participants = set(speakers)
+
+    base_comments = np.zeros(num_base, dtype=np.intp)
+    base_reactions = np.zeros(num_base, dtype=np.intp)
+    num_emojis = 1
+    reaction_pairs = np.zeros(0, dtype=np.intp)
+    if chat_events is not None and len(chat_events) > 0:
+        event_buckets = np.minimum((chat_events.offset_array() // base_seconds).astype(np.intp), num_base - 1)
+        is_reaction = chat_events.kind_array() == EVENT_REACTION
+        base_comments = np.bincount(event_buckets[~is_reaction], minlength=num_base)
+        base_reactions = np.bincount(event_buckets[is_reaction], minlength=num_base)
+        event_idx, emoji_ids = chat_events.emoji_columns()
+        reaction_rows = is_reaction[event_idx]
+        num_emojis = max(len(chat_events.emojis), 1)
+        reaction_pairs = np.unique(event_buckets[event_idx[reaction_rows]] * num_emojis + emoji_ids[reaction_rows])
+        participants.update(chat_events.authors_with(EVENT_MESSAGE, EVENT_REPLY))
+    participants_count = len(participants) or 1
+
+    # --- Roll up every level from the base buckets ---
+    pyramid: Dict[int, List[Dict[str, Any]]] = {}
+    for factor in factors:
+        interval_seconds = base_seconds * factor
+        num_buckets = math.ceil(num_base / factor)
+        scores = _scores(
+            _rollup_sum(base_turns, factor, num_buckets),
+            _rollup_sum(base_speaking, factor, num_buckets),
+            _distinct_per_bucket(speaker_pairs, num_speakers, factor, num_buckets),
+            _rollup_sum(base_comments, factor, num_buckets),
+            _rollup_sum(base_reactions, factor, num_buckets),
+            _distinct_per_bucket(reaction_pairs, num_emojis, factor, num_buckets),
+            participants_count
+        )
+        pyramid[interval_seconds] = [
+            {"timestamp": i * interval_seconds, "engagement": score}
+            for i, score in enumerate(scores.tolist())
+        ]
+    return pyramid
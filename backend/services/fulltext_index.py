@@ -0,0 +1,238 @@
+"""
+Local SQLite FTS5 full-text index of meeting transcripts and chat.
+
+Caption rows (text, speaker, caption start/end) and chat rows (message, author, timestamp)
+live in ordinary tables keyed by meeting ID; two external-content FTS5 tables index them
+and are kept in sync by triggers. Re-indexing a meeting is therefore a cheap indexed
+DELETE + INSERT inside one transaction.
+
+The index is derived data: `rebuild_from_component_files` recreates it offline from the
+transcript and comments components written by the analysis pipeline (the component bundle,
+or the older `transcript-<id>.json` / `comments-analysis-<id>.json` files).
+"""
+
+import json
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from services.analysis_bundle import bundle_path, read_component
+
+# --- Index Configuration ---
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+_PROJECT_ROOT = os.path.abspath(os.path.join(_BACKEND_DIR, '..'))
+FULLTEXT_DB_PATH = Path(os.environ.get("FULLTEXT_DB_PATH", os.path.join(_BACKEND_DIR, "cache", "search", "fulltext.db")))
+ANALYSIS_DATA_ROOT = os.path.join(_PROJECT_ROOT, 'public', 'analysis-data')
+
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS caption_rows (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    caption_idx INTEGER NOT NULL,
+    speaker TEXT,
+    start REAL,
+    "end" REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS caption_rows_meeting_idx ON caption_rows(meeting_id, caption_idx);
+
+CREATE TABLE IF NOT EXISTS chat_rows (
+    id INTEGER PRIMARY KEY,
+    meeting_id TEXT NOT NULL,
+    comment_idx INTEGER NOT NULL,
+    author TEXT,
+    timestamp TEXT,
+    offset REAL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chat_rows_meeting_idx ON chat_rows(meeting_id, comment_idx);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS captions_fts USING fts5(
+    text, speaker, content='caption_rows', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chat_fts USING fts5(
+    message, author, content='chat_rows', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS caption_rows_ai AFTER INSERT ON caption_rows BEGIN
+    INSERT INTO captions_fts(rowid, text, speaker) VALUES (new.id, new.text, new.speaker);
+END;
+CREATE TRIGGER IF NOT EXISTS caption_rows_ad AFTER DELETE ON caption_rows BEGIN
+    INSERT INTO captions_fts(captions_fts, rowid, text, speaker) VALUES ('delete', old.id, old.text, old.speaker);
+END;
+CREATE TRIGGER IF NOT EXISTS chat_rows_ai AFTER INSERT ON chat_rows BEGIN
+    INSERT INTO chat_fts(rowid, message, author) VALUES (new.id, new.message, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS chat_rows_ad AFTER DELETE ON chat_rows BEGIN
+    INSERT INTO chat_fts(chat_fts, rowid, message, author) VALUES ('delete', old.id, old.message, old.author);
+END;
+"""
+
+class FullTextHit(BaseModel):
+    kind: str # "caption" or "chat"
+    meeting_id: str
+    index: int # Caption index or comment index within the meeting
+    speaker: Optional[str] = None # Caption speaker or chat author
+    start: Optional[float] = None # Jump-to offset in seconds
+    timestamp: Optional[str] = None # Raw chat timestamp (HH:MM:SS)
+    snippet: str # Highlighted excerpt
+    rank: float # bm25, lower is better
+
+_schema_ready = False
+
+def _connect() -> sqlite3.Connection:
+    global _schema_ready
+    FULLTEXT_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(FULLTEXT_DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL") # Readers never block the pipeline's writes
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if not _schema_ready or not FULLTEXT_DB_PATH.exists():
+        conn.executescript(_SCHEMA)
+        _schema_ready = True
+    return conn
+
+def _timestamp_to_seconds(timestamp: Optional[str]) -> Optional[float]:
+    if not timestamp:
+        return None
+    try:
+        seconds = 0.0
+        for part in timestamp.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    except ValueError:
+        return None
+
+def _to_match_expression(query: str) -> str:
+    """Turns free user input into a safe FTS5 query: every term quoted, terms ANDed,
+    a trailing '*' kept as a prefix search."""
+    terms = []
+    for raw in re.findall(r'\w[\w\'-]*\*?', query, flags=re.UNICODE):
+        prefix = raw.endswith('*')
+        term = raw.rstrip('*').replace('"', '""')
+        terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(terms)
+
+def index_meeting_text(
+    meeting_id: str,
+    segments: List[Dict[str, Any]],
+    comments: List[Dict[str, Any]]
+) -> None:
+    """(Re)indexes one meeting's captions ({text, speaker, start, end}) and chat comments
+    ({message, author, timestamp})."""
+    conn = _connect()
+    try:
+        with conn: # One transaction: readers see the old or the new meeting, never half
+            conn.execute("DELETE FROM caption_rows WHERE meeting_id = ?", (meeting_id,))
+            conn.execute("DELETE FROM chat_rows WHERE meeting_id = ?", (meeting_id,))
+            conn.executemany(
+                'INSERT INTO caption_rows(meeting_id, caption_idx, speaker, start, "end", text) VALUES (?, ?, ?, ?, ?, ?)',
+                [(meeting_id, i, s.get("speaker"), s.get("start"), s.get("end"), s["text"])
+                 for i, s in enumerate(segments) if s.get("text")]
+            )
+            conn.executemany(
+                "INSERT INTO chat_rows(meeting_id, comment_idx, author, timestamp, offset, message) VALUES (?, ?, ?, ?, ?, ?)",
+                [(meeting_id, i, c.get("author"), c.get("timestamp"), _timestamp_to_seconds(c.get("timestamp")), c["message"])
+                 for i, c in enumerate(comments) if c.get("message")]
+            )
+        print(f"[Full-Text Index] Indexed {len(segments)} captions and {len(comments)} comments for meeting {meeting_id}.")
+    finally:
+        conn.close()
+
+def search_text(
+    query: str,
+    limit: int = 20,
+    meeting_id: Optional[str] = None,
+    include_captions: bool = True,
+    include_chat: bool = True
+) -> List[FullTextHit]:
+    """Keyword search over captions and chat, best bm25 matches first."""
+    match = _to_match_expression(query)
+    if not match:
+        return []
+
+    meeting_filter = " AND r.meeting_id = ?" if meeting_id else ""
+    params_suffix = (meeting_id,) if meeting_id else ()
+    hits: List[FullTextHit] = []
+    conn = _connect()
+    try:
+        if include_captions:
+            rows = conn.execute(
+                f"""SELECT r.meeting_id, r.caption_idx, r.speaker, r.start,
+                           snippet(captions_fts, 0, ?, ?, '…', 16), bm25(captions_fts)
+                    FROM captions_fts JOIN caption_rows r ON r.id = captions_fts.rowid
+                    WHERE captions_fts MATCH ?{meeting_filter}
+                    ORDER BY bm25(captions_fts) LIMIT ?""",
+                (SNIPPET_OPEN, SNIPPET_CLOSE, match) + params_suffix + (limit,)
+            ).fetchall()
+            hits.extend(FullTextHit(kind="caption", meeting_id=r[0], index=r[1], speaker=r[2], start=r[3], snippet=r[4], rank=r[5])
+                        for r in rows)
+        if include_chat:
+            rows = conn.execute(
+                f"""SELECT r.meeting_id, r.comment_idx, r.author, r.offset, r.timestamp,
+                           snippet(chat_fts, 0, ?, ?, '…', 16), bm25(chat_fts)
+                    FROM chat_fts JOIN chat_rows r ON r.id = chat_fts.rowid
+                    WHERE chat_fts MATCH ?{meeting_filter}
+                    ORDER BY bm25(chat_fts) LIMIT ?""",
+                (SNIPPET_OPEN, SNIPPET_CLOSE, match) + params_suffix + (limit,)
+            ).fetchall()
+            hits.extend(FullTextHit(kind="chat", meeting_id=r[0], index=r[1], speaker=r[2], start=r[3], timestamp=r[4], snippet=r[5], rank=r[6])
+                        for r in rows)
+    finally:
+        conn.close()
+
+    hits.sort(key=lambda h: h.rank)
+    return hits[:limit]
+
+def rebuild_from_component_files(analysis_data_root: str = ANALYSIS_DATA_ROOT) -> int:
+    """Rebuilds the whole index from the per-meeting component files (works offline).
+
+    Returns the number of meetings indexed.
+    """
+    global _schema_ready
+    for suffix in ("", "-wal", "-shm"):
+        stale = Path(str(FULLTEXT_DB_PATH) + suffix)
+        if stale.exists():
+            stale.unlink()
+    _schema_ready = False
+    meeting_count = 0
+    for meeting_id in sorted(os.listdir(analysis_data_root)):
+        meeting_dir = os.path.join(analysis_data_root, meeting_id)
+        if not os.path.isdir(meeting_dir):
+            continue
+        segments: List[Dict[str, Any]] = []
+        comments: List[Dict[str, Any]] = []
+        transcript_path = os.path.join(meeting_dir, f"transcript-{meeting_id}.json")
+        comments_path = os.path.join(meeting_dir, f"comments-analysis-{meeting_id}.json")
+        bundle_file = bundle_path(meeting_dir, meeting_id)
+        try:
+            if os.path.exists(bundle_file):
+                segments = (read_component(bundle_file, "transcript") or {}).get("captions", [])
+                comments = (read_component(bundle_file, "comments") or {}).get("comments", [])
+            else:
+                # Meetings analysed before component bundles
+                if os.path.exists(transcript_path):
+                    with open(transcript_path, 'r', encoding='utf-8') as f:
+                        segments = json.load(f).get("captions", [])
+                if os.path.exists(comments_path):
+                    with open(comments_path, 'r', encoding='utf-8') as f:
+                        comments = json.load(f).get("comments", [])
+        except Exception as e:
+            print(f"[Full-Text Index] Skipping {meeting_id}: unreadable component file ({e})")
+            continue
+        if segments or comments:
+            index_meeting_text(meeting_id, segments, comments)
+            meeting_count += 1
+    print(f"[Full-Text Index] Rebuilt index for {meeting_count} meetings at {FULLTEXT_DB_PATH}")
+    return meeting_count
+
+# Offline rebuild:
+#   cd backend && python -m services.fulltext_index
+if __name__ == "__main__":
+    rebuild_from_component_files()
@@ -13,6 +13,7 @@ from pathlib import Path
 OLLAMA_API_URL = os.environ.get("OLLAMA_API_URL", "http://localhost:11434/api/generate")
 # Default model to use
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "mistral:7b-instruct")
+OLLAMA_TIMEOUT_SECONDS = float(os.environ.get("OLLAMA_TIMEOUT_SECONDS", "600")) # Upper bound on one generate call
 
 # Create a cache directory if it doesn't exist
 CACHE_DIR = Path(os.environ.get("CACHE_DIR", "backend/cache/insights"))
@@ -56,11 +57,12 @@ def save_to_cache(transcript_hash: str, result: AIInsightsResult) -> None:
     except Exception as e:
         print(f"Error saving to cache: {e}")
 
-def generate_ai_insights(transcript: str, max_length_chars=80000) -> AIInsightsResult:
+def generate_ai_insights(transcript: str, max_length_chars=80000, timeout: Optional[float] = None) -> AIInsightsResult:
     """Generates meeting summary and action items using Ollama API.
     
     Sends the transcript (potentially truncated) to the Ollama API endpoint.
     Parses the response to extract summary and action items.
+    `timeout` (seconds, capped at OLLAMA_TIMEOUT_SECONDS) bounds the wait for Ollama.
     """
     if not transcript:
         print("Skipping AI insights generation: No transcript provided.")
@@ -122,7 +124,8 @@ def generate_ai_insights(transcript: str, max_length_chars=80000) -> AIInsightsR
     try:
         print(f"Sending request to Ollama API ({OLLAMA_API_URL}) for AI insights...")
         start_time = time.time()
-        response = requests.post(OLLAMA_API_URL, json=payload)
+        read_timeout = min(timeout, OLLAMA_TIMEOUT_SECONDS) if timeout is not None else OLLAMA_TIMEOUT_SECONDS
+        response = requests.post(OLLAMA_API_URL, json=payload, timeout=(10, max(read_timeout, 1.0)))
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
         
         end_time = time.time()
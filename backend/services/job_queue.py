@@ -0,0 +1,429 @@
+"""
+Durable job queue for long-running work (meeting analyses).
+
+Jobs are rows in a store that outlives the API process, so a restart never loses one.
+Workers (`python -m services.job_worker`) claim jobs with a lease, the visibility timeout:
+
+- A claim marks the job running until `lease_expires_at`. The worker renews the lease
+  while the job runs; if the worker dies, the lease runs out and the job becomes
+  claimable again.
+- Jobs are claimed in priority order (higher first), then oldest first. A job type is
+  skipped while it already has its concurrency limit of live leases.
+- A failed attempt is retried after an exponential backoff with jitter until
+  `max_attempts` is reached; then the job is marked failed.
+- A lapsed lease on the last attempt (or of a job cancelled while it ran) is not claimed
+  again: `expire_lapsed`, which workers call as they poll, ends the job and returns it, so
+  the worker can update what the job was working on (see JobType.on_expired).
+- `cancel` ends a queued job at once. A running job only gets `cancel_requested` set;
+  its worker notices, stops at the pipeline's next checkpoint and marks it cancelled.
+
+`SQLiteJobQueue` is the local store: enqueueing is one indexed INSERT in WAL mode, and
+claims run in a `BEGIN IMMEDIATE` transaction so concurrent workers never take the same
+job. Other stores implement `JobQueue` and register a URL scheme in `QUEUE_BACKENDS`;
+`JOB_QUEUE_URL` picks one.
+
+Each job also has an append-only list of progress events (see services.progress) with
+increasing integer IDs, which `/api/jobs/{id}/events` streams to clients. Only the latest
+`stage_progress` event of a job is kept, so the list stays a few rows per stage.
+"""
+
+import os
+import random
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel
+
+from services.serialization import dumps, loads
+
+# --- Queue Configuration ---
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+JOB_QUEUE_URL = os.environ.get("JOB_QUEUE_URL", f"sqlite:///{os.path.join(_BACKEND_DIR, 'cache', 'jobs.sqlite3')}")
+DEFAULT_VISIBILITY_TIMEOUT_SECONDS = float(os.environ.get("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_BASE_SECONDS = 30.0
+RETRY_BACKOFF_MAX_SECONDS = 30 * 60.0
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+class Job(BaseModel):
+    id: str
+    job_type: str
+    payload: Dict[str, Any]
+    priority: int = 0
+    state: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    available_at: float
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: float
+    updated_at: float
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt: doubles per attempt, capped, with +-20% jitter."""
+    delay = min(RETRY_BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), RETRY_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+class JobQueue:
+    """Interface every queue store implements."""
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, delay_seconds: float = 0.0) -> Job:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, concurrency: Dict[str, int],
+              visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS) -> Optional[Job]:
+        """Leases the next runnable job of one of the types in `concurrency` (type -> limit)."""
+        raise NotImplementedError
+
+    def expire_lapsed(self) -> List[Job]:
+        """Ends the running jobs whose lease lapsed and that may not run again: failed when
+        out of attempts, cancelled when cancellation was requested. Returns them as ended."""
+        raise NotImplementedError
+
+    def extend_lease(self, job_id: str, worker_id: str,
+                     visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS) -> bool:
+        """Renews a running job's lease; False if the worker no longer holds it."""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        raise NotImplementedError
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[Job]:
+        """Records a failed attempt; the job is requeued with backoff unless it is out of attempts."""
+        raise NotImplementedError
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued job, or asks the worker running it to stop; None if there is no such job."""
+        raise NotImplementedError
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        """Records that the worker holding the job stopped it because it was cancelled."""
+        raise NotImplementedError
+
+    def count_waiting(self, job_types: List[str]) -> int:
+        """Queued jobs of these types that are due to run."""
+        raise NotImplementedError
+
+    def recent_stage_durations(self, stage: str, limit: int = 20) -> List[float]:
+        """Durations (ms) of the latest finished runs of a pipeline stage, newest first."""
+        raise NotImplementedError
+
+    def add_event(self, job_id: str, event: Dict[str, Any]) -> int:
+        """Appends a progress event to a job; returns the event's ID."""
+        raise NotImplementedError
+
+    def list_events(self, job_id: str, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """A job's events with IDs above `after_id`, oldest first, each with its "id"."""
+        raise NotImplementedError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    last_error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_runnable ON jobs (state, priority DESC, available_at);
+CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (state, job_type, lease_expires_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_by_job ON job_events (job_id, id);
+CREATE INDEX IF NOT EXISTS job_events_by_type ON job_events (event_type, id);
+"""
+
+class SQLiteJobQueue(JobQueue):
+    """Job store in a local SQLite file, shared by the API and worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Adds the columns that queue files created by older versions lack."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "cancel_requested" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per operation: cheap for SQLite, and safe across threads and forks.
+        # Autocommit; `claim` opens its own transaction.
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        data = dict(row)
+        data["payload"] = loads(data["payload"])
+        data["result"] = loads(data["result"]) if data["result"] else None
+        return Job(**data)
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], priority: int = 0,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS, delay_seconds: float = 0.0) -> Job:
+        now = time.time()
+        job = Job(
+            id=str(uuid.uuid4()), job_type=job_type, payload=payload, priority=priority,
+            max_attempts=max_attempts, available_at=now + delay_seconds, created_at=now, updated_at=now
+        )
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, job_type, payload, priority, state, attempts, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job.id, job_type, dumps(payload).decode('utf-8'), priority, QUEUED, max_attempts, job.available_at, now, now)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def claim(self, worker_id: str, concurrency: Dict[str, int],
+              visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS) -> Optional[Job]:
+        if not concurrency:
+            return None
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE") # Serializes claims across workers
+            try:
+                job = self._claim_locked(conn, worker_id, concurrency, visibility_timeout, now)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return job
+
+    def _claim_locked(self, conn: sqlite3.Connection, worker_id: str, concurrency: Dict[str, int],
+                      visibility_timeout: float, now: float) -> Optional[Job]:
+        live = dict(conn.execute(
+            "SELECT job_type, COUNT(*) FROM jobs WHERE state = ? AND lease_expires_at > ? GROUP BY job_type",
+            (RUNNING, now)
+        ).fetchall())
+        open_types = [t for t, limit in concurrency.items() if live.get(t, 0) < limit]
+        if not open_types:
+            return None
+        placeholders = ",".join("?" * len(open_types))
+        # Queued jobs that are due, and running jobs whose worker let the lease lapse with
+        # attempts left (the others are ended by expire_lapsed)
+        row = conn.execute(
+            f"SELECT id FROM jobs WHERE job_type IN ({placeholders}) AND ("
+            f" (state = ? AND available_at <= ?)"
+            f" OR (state = ? AND lease_expires_at <= ? AND cancel_requested = 0 AND attempts < max_attempts))"
+            f" ORDER BY priority DESC, available_at, created_at LIMIT 1",
+            (*open_types, QUEUED, now, RUNNING, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?, updated_at = ?"
+            " WHERE id = ?",
+            (RUNNING, worker_id, now + visibility_timeout, now, row["id"])
+        )
+        return self._to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def expire_lapsed(self) -> List[Job]:
+        # Lapsed leases of jobs that have used all their attempts are failures, not retries;
+        # those of jobs cancelled while they ran are cancellations
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE") # A job is ended, and returned, by one worker only
+            try:
+                ids = [row["id"] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE state = ? AND lease_expires_at <= ? AND (cancel_requested = 1 OR attempts >= max_attempts)",
+                    (RUNNING, now)
+                ).fetchall()]
+                conn.execute(
+                    "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?"
+                    " WHERE state = ? AND lease_expires_at <= ? AND cancel_requested = 1",
+                    (CANCELLED, now, RUNNING, now)
+                )
+                conn.execute(
+                    "UPDATE jobs SET state = ?, last_error = COALESCE(last_error, 'Worker lease expired'),"
+                    " lease_owner = NULL, lease_expires_at = NULL, updated_at = ?"
+                    " WHERE state = ? AND lease_expires_at <= ? AND attempts >= max_attempts",
+                    (FAILED, now, RUNNING, now)
+                )
+                placeholders = ",".join("?" * len(ids))
+                rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", ids).fetchall() if ids else []
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return [self._to_job(row) for row in rows]
+
+    def extend_lease(self, job_id: str, worker_id: str,
+                     visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (now + visibility_timeout, now, job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, lease_owner = NULL, lease_expires_at = NULL, updated_at = ?"
+                " WHERE id = ? AND state = ? AND lease_owner = ?",
+                (SUCCEEDED, dumps(result).decode('utf-8') if result is not None else None, now, job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.state != RUNNING or job.lease_owner != worker_id:
+            return job
+        now = time.time()
+        if retry and job.attempts < job.max_attempts:
+            state, available_at = QUEUED, now + retry_delay(job.attempts)
+        else:
+            state, available_at = FAILED, job.available_at
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, last_error = ?, lease_owner = NULL, lease_expires_at = NULL,"
+                " updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (state, available_at, error[:2000], now, job_id, worker_id)
+            )
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?",
+                (CANCELLED, now, job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND state = ?",
+                (now, job_id, RUNNING)
+            )
+        return self.get(job_id)
+
+    def mark_cancelled(self, job_id: str, worker_id: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, last_error = 'Cancelled', lease_owner = NULL, lease_expires_at = NULL,"
+                " updated_at = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+                (CANCELLED, now, job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def count_waiting(self, job_types: List[str]) -> int:
+        if not job_types:
+            return 0
+        placeholders = ",".join("?" * len(job_types))
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE state = ? AND available_at <= ? AND job_type IN ({placeholders})",
+                (QUEUED, time.time(), *job_types)
+            ).fetchone()
+        return row[0]
+
+    def recent_stage_durations(self, stage: str, limit: int = 20) -> List[float]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT json_extract(data, '$.duration_ms') FROM job_events"
+                " WHERE event_type = 'stage_finished' AND json_extract(data, '$.stage') = ?"
+                " ORDER BY id DESC LIMIT ?",
+                (stage, limit)
+            ).fetchall()
+        return [row[0] for row in rows if row[0] is not None]
+
+    def add_event(self, job_id: str, event: Dict[str, Any]) -> int:
+        event_type = event.get("type", "event")
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if event_type == "stage_progress":
+                    # A newer percentage supersedes the last one
+                    conn.execute("DELETE FROM job_events WHERE job_id = ? AND event_type = ?", (job_id, event_type))
+                cursor = conn.execute(
+                    "INSERT INTO job_events (job_id, event_type, data) VALUES (?, ?, ?)",
+                    (job_id, event_type, dumps(event).decode('utf-8'))
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return cursor.lastrowid
+
+    def list_events(self, job_id: str, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (job_id, after_id, limit)
+            ).fetchall()
+        return [{"id": row["id"], **loads(row["data"])} for row in rows]
+
+QUEUE_BACKENDS: Dict[str, Type[JobQueue]] = {
+    "sqlite": SQLiteJobQueue,
+}
+
+def create_job_queue(url: str = JOB_QUEUE_URL) -> JobQueue:
+    """Opens the queue store named by `url`: `sqlite:///relative/jobs.sqlite3` or
+    `sqlite:////absolute/jobs.sqlite3`, or a scheme registered in QUEUE_BACKENDS."""
+    scheme, _, location = url.partition("://")
+    backend = QUEUE_BACKENDS.get(scheme)
+    if backend is None:
+        raise ValueError(f"Unsupported job queue URL scheme '{scheme}' (known: {', '.join(QUEUE_BACKENDS)})")
+    if scheme == "sqlite":
+        location = location[1:] # The third slash separates the (empty) host from the path
+    return backend(location)
+
+_job_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = create_job_queue()
+    return _job_queue
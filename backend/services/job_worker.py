@@ -0,0 +1,286 @@
+"""
+Pre-forked worker processes for the durable job queue.
+
+    cd backend && python -m services.job_worker [--processes N] [--types dataset_analysis,...]
+                                                [--torch-threads T] [--max-jobs J] [--max-rss-mb M]
+
+The supervisor loads the pipeline models (Whisper, sentiment, diarization, ...) once,
+freezes the objects it has created out of the garbage collector's reach, and then forks
+its workers. The workers share the model weights copy-on-write instead of each loading a
+copy of about 2 GB. Each worker limits torch to its share of the CPU cores (`--torch-threads`,
+default cores / processes), so concurrent analyses do not oversubscribe the machine.
+
+Each worker claims jobs it has handlers for (services.analysis_jobs.JOB_TYPES) and runs
+them one at a time. While a handler runs, a heartbeat thread renews the job's lease every
+third of the visibility timeout; if the process dies, the lease lapses and another worker
+picks the job up again, or, on its last attempt, ends it and has its type record the
+failure (a meeting left PROCESSING is marked FAILED). The same thread polls for cancellation (DELETE /api/jobs/{id}),
+which the pipeline honours at its next checkpoint, and is the watchdog for the job type's
+deadline: a handler still running `JOB_DEADLINE_GRACE_SECONDS` past it (stuck in native
+code, where no checkpoint is reached) has its job failed and the worker process exits.
+
+Workers are recycled: one exits after `--max-jobs` jobs, or once its private memory (what
+it does not share with the supervisor) passes `--max-rss-mb`, and the supervisor forks a
+fresh one from the clean, preloaded image. Workers that crash are replaced the same way.
+SIGINT/SIGTERM stop claiming new jobs; running jobs finish first (a second signal exits
+at once, and those jobs are retried once their leases expire).
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import resource
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from services.analysis_jobs import JOB_TYPES, JobType
+from services.job_queue import DEFAULT_VISIBILITY_TIMEOUT_SECONDS, QUEUED, Job, JobQueue, get_job_queue
+from services.progress import DeadlineExceeded, JobCancelled, reporting_to
+
+POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+DEFAULT_WORKER_PROCESSES = int(os.environ.get("JOB_WORKER_PROCESSES", "2"))
+MAX_JOBS_PER_WORKER = int(os.environ.get("JOB_WORKER_MAX_JOBS", "25")) # 0 = never recycle by job count
+MAX_WORKER_RSS_MB = float(os.environ.get("JOB_WORKER_MAX_RSS_MB", "4096")) # 0 = no memory ceiling
+CANCEL_POLL_INTERVAL_SECONDS = 2.0 # How often a running job's cancellation flag is checked
+DEADLINE_GRACE_SECONDS = float(os.environ.get("JOB_DEADLINE_GRACE_SECONDS", "60")) # Past deadline + grace, the worker exits
+WATCHDOG_EXIT_CODE = 70
+
+def _heartbeat(queue: JobQueue, job: Job, worker_id: str, visibility_timeout: float,
+               done: threading.Event, cancelled: threading.Event, hard_deadline: Optional[float]) -> None:
+    """Renews the job's lease, watches for a cancellation request and, past the job's hard
+    deadline, gives up on the handler: the job is failed and the process exits (the
+    supervisor starts a fresh worker), because a thread stuck in native code cannot be stopped."""
+    next_renewal = time.monotonic() + visibility_timeout / 3
+    while not done.wait(CANCEL_POLL_INTERVAL_SECONDS):
+        now = time.monotonic()
+        if hard_deadline is not None and now >= hard_deadline:
+            print(f"[{worker_id}] Job {job.id} is past its deadline and did not stop; exiting worker")
+            queue.fail(job.id, worker_id, "Exceeded its deadline and was stopped", retry=False)
+            queue.add_event(job.id, {"type": "attempt_failed", "attempt": job.attempts, "retrying": False,
+                                     "error": "DeadlineExceeded: worker stopped", "at": time.time()})
+            os._exit(WATCHDOG_EXIT_CODE)
+        current = queue.get(job.id)
+        if current is not None and current.cancel_requested and not cancelled.is_set():
+            print(f"[{worker_id}] Cancellation requested for job {job.id}")
+            cancelled.set()
+        if now >= next_renewal:
+            next_renewal = now + visibility_timeout / 3
+            if not queue.extend_lease(job.id, worker_id, visibility_timeout):
+                print(f"[{worker_id}] Lost the lease on job {job.id}; another worker may re-run it")
+                return
+
+def execute_job(queue: JobQueue, job: Job, job_type: JobType, worker_id: str,
+                visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS) -> bool:
+    """Runs one claimed job and records the outcome; True if it succeeded. The handler's
+    pipeline stages are recorded as progress events on the job, and bounded by the job
+    type's deadline and by cancellation (see services.progress)."""
+    done = threading.Event()
+    cancelled = threading.Event()
+    deadline = job_type.deadline_seconds or None
+    hard_deadline = time.monotonic() + deadline + DEADLINE_GRACE_SECONDS if deadline else None
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(queue, job, worker_id, visibility_timeout, done, cancelled, hard_deadline), daemon=True
+    )
+    heartbeat.start()
+    with reporting_to(lambda event: queue.add_event(job.id, event), deadline, cancelled) as progress:
+        progress.emit("attempt_started", attempt=job.attempts, max_attempts=job.max_attempts)
+        try:
+            result = job_type.handler(job)
+        except JobCancelled:
+            progress.fail_stage(JobCancelled("Job was cancelled"))
+            queue.mark_cancelled(job.id, worker_id)
+            progress.emit("attempt_cancelled", attempt=job.attempts)
+            print(f"[{worker_id}] Job {job.id} cancelled")
+            return False
+        except (Exception, DeadlineExceeded) as e:
+            progress.fail_stage(e)
+            # Running out of time again would only waste another attempt's budget
+            updated = queue.fail(job.id, worker_id, f"{type(e).__name__}: {e}", retry=not isinstance(e, DeadlineExceeded))
+            retrying = updated is not None and updated.state == QUEUED
+            progress.emit("attempt_failed", attempt=job.attempts, error=f"{type(e).__name__}: {e}", retrying=retrying)
+            if retrying:
+                print(f"[{worker_id}] Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}); retrying later: {e}")
+            else:
+                print(f"[{worker_id}] Job {job.id} failed permanently: {e}")
+            return False
+        finally:
+            done.set()
+            heartbeat.join()
+        progress.close_stage()
+        queue.complete(job.id, worker_id, result)
+        progress.emit("attempt_succeeded", attempt=job.attempts, skipped_stages=(result or {}).get("skipped_stages", []))
+    print(f"[{worker_id}] Job {job.id} ({job.job_type}) succeeded")
+    return True
+
+def private_memory_mb() -> float:
+    """Memory this process does not share with others, in MB.
+
+    Plain RSS also counts the model pages shared with the supervisor, so it would put every
+    worker over the ceiling at once; Linux reports private pages in smaps_rollup.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            private_kb = sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean:", "Private_Dirty:")))
+        return private_kb / 1024
+    except OSError:
+        # Not Linux: peak RSS (kilobytes on Linux, bytes on macOS) is the best available proxy
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _expire_lapsed_jobs(queue: JobQueue, worker_id: str) -> None:
+    """Ends the jobs whose worker died with no attempt left, and lets their types record it."""
+    try:
+        expired = queue.expire_lapsed()
+    except Exception as e:
+        print(f"[{worker_id}] Failed to expire lapsed jobs: {e}")
+        return
+    for job in expired:
+        print(f"[{worker_id}] Job {job.id} ({job.job_type}) lost its worker and ended {job.state}")
+        job_type = JOB_TYPES.get(job.job_type)
+        if job_type is not None and job_type.on_expired is not None:
+            try:
+                job_type.on_expired(job)
+            except Exception as e:
+                print(f"[{worker_id}] Failed to record the end of job {job.id}: {e}")
+
+def run_worker(
+    worker_id: str,
+    job_types: Optional[List[str]] = None,
+    stop: Optional[threading.Event] = None,
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS,
+    max_jobs: int = 0,
+    max_rss_mb: float = 0.0
+) -> str:
+    """Claim-and-run loop of one worker process. Returns why it stopped: "stopped" once
+    `stop` is set, or "recycle" when it reached `max_jobs` or `max_rss_mb`."""
+    queue = get_job_queue()
+    handled: Dict[str, JobType] = {name: JOB_TYPES[name] for name in (job_types or JOB_TYPES)}
+    concurrency = {name: spec.concurrency for name, spec in handled.items()}
+    stop = stop or threading.Event()
+    jobs_run = 0
+    print(f"[{worker_id}] Worker started for job types: {', '.join(handled)}")
+    while not stop.is_set():
+        _expire_lapsed_jobs(queue, worker_id)
+        job = queue.claim(worker_id, concurrency, visibility_timeout)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        print(f"[{worker_id}] Claimed job {job.id} ({job.job_type}, priority {job.priority}, attempt {job.attempts})")
+        execute_job(queue, job, handled[job.job_type], worker_id, visibility_timeout)
+        jobs_run += 1
+
+        if max_jobs and jobs_run >= max_jobs:
+            print(f"[{worker_id}] Ran {jobs_run} jobs; recycling worker")
+            return "recycle"
+        if max_rss_mb:
+            memory_mb = private_memory_mb()
+            if memory_mb > max_rss_mb:
+                print(f"[{worker_id}] Private memory {memory_mb:.0f} MB exceeds {max_rss_mb:.0f} MB; recycling worker")
+                return "recycle"
+    print(f"[{worker_id}] Worker stopped")
+    return "stopped"
+
+def preload_models() -> None:
+    """Loads the pipeline models in the supervisor, before any worker is forked."""
+    from services.model_loading import load_analysis_models
+    print("Supervisor: loading models before forking workers...")
+    load_analysis_models()
+    # Objects that exist now are never collected; keeping the collector off them stops it
+    # from writing to (and so un-sharing) their pages in every worker
+    gc.freeze()
+    print(f"Supervisor: models loaded ({private_memory_mb():.0f} MB private)")
+
+def set_torch_threads(threads: int) -> None:
+    """Caps the intra-op thread pools of torch and the BLAS/OpenMP libraries below it."""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+def _worker_main(index: int, job_types: Optional[List[str]], stop, torch_threads: int,
+                 max_jobs: int, max_rss_mb: float) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # The supervisor decides when to stop
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    set_torch_threads(torch_threads)
+    run_worker(f"{socket.gethostname()}:{os.getpid()}", job_types, stop,
+               max_jobs=max_jobs, max_rss_mb=max_rss_mb)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the job queue worker supervisor.")
+    parser.add_argument("--processes", type=int, default=DEFAULT_WORKER_PROCESSES)
+    parser.add_argument("--types", default="", help=f"Comma-separated job types (default: all of {', '.join(JOB_TYPES)})")
+    parser.add_argument("--torch-threads", type=int, default=0, help="Torch threads per worker (default: cores / processes)")
+    parser.add_argument("--max-jobs", type=int, default=MAX_JOBS_PER_WORKER, help="Recycle a worker after this many jobs (0: never)")
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_WORKER_RSS_MB, help="Recycle a worker above this much private memory (0: never)")
+    parser.add_argument("--no-preload", action="store_true", help="Let each worker load models on first use instead")
+    args = parser.parse_args(argv)
+    job_types = [t.strip() for t in args.types.split(",") if t.strip()] or None
+    unknown = [t for t in job_types or [] if t not in JOB_TYPES]
+    if unknown:
+        parser.error(f"Unknown job type(s): {', '.join(unknown)}")
+    torch_threads = args.torch_threads or max(1, (os.cpu_count() or 1) // max(args.processes, 1))
+
+    # Fork shares the preloaded weights; where fork is unavailable each worker loads its own
+    fork_available = "fork" in multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if fork_available else "spawn")
+    if not args.no_preload and fork_available:
+        set_torch_threads(torch_threads) # Before torch creates its thread pool in this process
+        preload_models()
+
+    stop = context.Event()
+    workers: List[multiprocessing.Process] = []
+    signals_received = 0
+    def request_stop(*_):
+        nonlocal signals_received
+        signals_received += 1
+        stop.set()
+        if signals_received > 1:
+            print("Stopping workers immediately")
+            for process in workers:
+                if process.is_alive():
+                    process.kill()
+        else:
+            print("Stopping workers after their current jobs (signal again to stop now)")
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(
+            target=_worker_main,
+            args=(index, job_types, stop, torch_threads, args.max_jobs, args.max_rss_mb),
+            name=f"job-worker-{index}"
+        )
+        process.start()
+        return process
+
+    print(f"Supervisor: starting {args.processes} worker(s) with {torch_threads} torch thread(s) each")
+    workers.extend(start(i) for i in range(args.processes))
+    while not stop.is_set():
+        for i, process in enumerate(workers):
+            process.join(timeout=POLL_INTERVAL_SECONDS / max(len(workers), 1))
+            if not process.is_alive() and not stop.is_set():
+                if process.exitcode == 0:
+                    print(f"Supervisor: recycling {process.name}")
+                else:
+                    print(f"Supervisor: {process.name} exited with code {process.exitcode}; restarting it")
+                workers[i] = start(i)
+    for process in workers:
+        for _ in range(2):
+            try:
+                process.join()
+                break
+            except KeyboardInterrupt:
+                continue
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
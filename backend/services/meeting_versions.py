@@ -0,0 +1,137 @@
+"""
+Version history of meeting analyses.
+
+A meeting record holds only its current analysis and `version`, the pointer to the current
+version. Each version a new analysis replaces becomes a row of `meeting_versions`, keyed
+by (meeting_id, version), holding:
+
+- `summary`: the compact summary built by `compact_version` (summary, overall sentiment,
+  topic names, action items), which is enough to list and compare versions;
+- `analysis_delta` (unless VERSION_HISTORY_DELTAS=0): the full analysis of that version as
+  a zlib-compressed reverse delta against the version that replaced it. Consecutive
+  analyses of a meeting mostly share their transcript and comments, so a delta is small.
+
+A re-analysis therefore appends one small row instead of rewriting an ever-growing array
+in the meeting row, and a version is fetched by its key. The full analysis of version v
+is rebuilt from the current one by applying the deltas of versions current-1 .. v in
+that order (`reconstruct_analysis`).
+"""
+
+import base64
+import copy
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.repository import MeetingRepository
+from services.serialization import dumps, loads
+
+STORE_VERSION_DELTAS = os.environ.get("VERSION_HISTORY_DELTAS", "1") != "0"
+DELTA_COMPRESSION_LEVEL = 6
+
+def compact_version(analysis_json: Dict[str, Any], version: int) -> Dict[str, Any]:
+    """Summary of a superseded version, as kept in `meeting_versions.summary`."""
+    return {
+        "version": version,
+        "timestamp": datetime.utcnow().isoformat(),
+        "summary": analysis_json.get("summary", ""),
+        "sentiment": {"overall": (analysis_json.get("sentiment") or {}).get("overall", 0)},
+        "topics": [t["name"] for t in (analysis_json.get("topics") or {}).get("topics", [])],
+        "action_items": analysis_json.get("action_items", [])
+    }
+
+# --- Reverse deltas ---
+# A delta is a list of operations turning the newer analysis back into the older one:
+# ["s", path, value] sets the value at a key path, ["u", path] removes a key. Objects are
+# compared key by key; any other changed value (lists included) is replaced whole.
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any], path: List[str], ops: List[list]) -> None:
+    for key in new:
+        if key not in old:
+            ops.append(["u", path + [key]])
+    for key, value in old.items():
+        if key in new and isinstance(value, dict) and isinstance(new[key], dict):
+            _diff(value, new[key], path + [key], ops)
+        elif key not in new or new[key] != value:
+            ops.append(["s", path + [key], value])
+
+def encode_delta(old: Dict[str, Any], new: Dict[str, Any]) -> str:
+    """Compressed operations that turn `new` into `old` (base64 text, storable in any column)."""
+    ops: List[list] = []
+    _diff(old, new, [], ops)
+    return base64.b64encode(zlib.compress(dumps(ops), DELTA_COMPRESSION_LEVEL)).decode('ascii')
+
+def apply_delta(analysis: Dict[str, Any], delta: str) -> Dict[str, Any]:
+    """The older analysis a delta was taken against; `analysis` is left unchanged."""
+    result = copy.deepcopy(analysis)
+    for op in loads(zlib.decompress(base64.b64decode(delta))):
+        *parents, key = op[1]
+        target = result
+        for segment in parents:
+            target = target.setdefault(segment, {})
+        if op[0] == "s":
+            target[key] = op[2]
+        else:
+            target.pop(key, None)
+    return result
+
+def reconstruct_analysis(current: Dict[str, Any], current_version: int, target_version: int,
+                         versions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Full analysis of `target_version` from the current one and the version rows from
+    the target up; None if a row or its delta is missing (history kept without deltas)."""
+    by_version = {entry["version"]: entry for entry in versions}
+    analysis = current
+    for version in range(current_version - 1, target_version - 1, -1):
+        delta = (by_version.get(version) or {}).get("analysis_delta")
+        if not delta:
+            return None
+        analysis = apply_delta(analysis, delta)
+    return analysis
+
+# --- Writing a new version ---
+async def replace_analysis(
+    repository: MeetingRepository,
+    meeting_id: str,
+    analysis: Dict[str, Any],
+    changes: Optional[Dict[str, Any]] = None,
+    base: Optional[Tuple[int, Optional[Dict[str, Any]]]] = None,
+    attempts: int = 3
+) -> Optional[int]:
+    """Stores `analysis` as the meeting's current analysis (with the other column `changes`)
+    and files the analysis it replaces under its version; returns the new version number.
+
+    The meeting row is updated only if it is still at the version read, so concurrent
+    writers never lose a version: without `base` the write is retried on a conflict; with
+    `base` = (version, its analysis), as read by the caller, it is made only if the meeting
+    is still at that version, else None. None also when the meeting does not exist.
+    """
+    for _ in range(attempts):
+        if base is None:
+            record = await repository.get(meeting_id, ("id", "version", "analysis_json"))
+            if record is None:
+                return None
+            base_version, current = record.get("version") or 1, record.get("analysis_json")
+        else:
+            base_version, current = base
+        # A first analysis fills the version the record was created with
+        new_version = base_version + 1 if current else base_version
+        # Filed in the same transaction as the guarded update, so it is stored exactly when
+        # this write wins and the delta is against the version that replaced it
+        superseded = {
+            "version": base_version,
+            "summary": compact_version(current, base_version),
+            "analysis_delta": encode_delta(current, analysis) if STORE_VERSION_DELTAS else None
+        } if current else None
+        updated = await repository.update(meeting_id, {
+            **(changes or {}),
+            "analysis_json": analysis,
+            "version": new_version,
+            "updated_at": datetime.utcnow().isoformat()
+        }, expected_version=base_version, superseded=superseded)
+        if updated is None:
+            if base is not None:
+                return None
+            continue
+        return new_version
+    raise RuntimeError(f"Meeting {meeting_id} kept changing; analysis not stored after {attempts} attempts")
@@ -0,0 +1,27 @@
+"""
+Loading of the ML models used by the analysis pipeline.
+
+Analyses run only in the job workers: their supervisor loads the models once before
+forking, so the weights are shared copy-on-write between the workers. The API processes
+load none of them, only the embedding model search needs (see main.py).
+"""
+
+from services.transcription import load_whisper_model
+from services.sentiment import load_sentiment_model
+from services.topic_modeling import load_topic_model
+from services.diarization import load_diarization_model
+from services.embeddings import load_embedding_model
+
+WHISPER_MODEL_SIZE = "small"
+
+def load_analysis_models(whisper_model_size: str = WHISPER_MODEL_SIZE) -> None:
+    """Loads every pipeline model into this process (each loader is a no-op when already loaded)."""
+    load_whisper_model(whisper_model_size) # Load the desired model size
+    load_sentiment_model() # Load the default sentiment model
+
+    # We maintain compatibility with the topic_modeling module,
+    # but now use Mistral 7B LLM for topic extraction instead of BERTopic
+    load_topic_model() # Initialize topic modeling compatibility layer
+
+    load_diarization_model() # Load pyannote diarization model
+    load_embedding_model() # Load sentence embedding model for semantic search
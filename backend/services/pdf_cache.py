@@ -0,0 +1,63 @@
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Optional
+
+from services.pdf_generator import PDF_TEMPLATE_VERSION
+from services.serialization import dumps
+
+# --- Rendered PDF Cache ---
+# One directory per meeting; a file per (version, analysis content hash, template version).
+# A changed analysis or layout gets a new file name, so stale entries are never served;
+# `invalidate_meeting` removes them when the pipeline saves a new version.
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PDF_CACHE_DIR = Path(os.environ.get("PDF_CACHE_DIR", os.path.join(_BACKEND_DIR, "cache", "pdf")))
+
+def hash_analysis(analysis_data: Any) -> str:
+    """Deterministic hash of the analysis content a report is rendered from."""
+    return hashlib.sha256(dumps(analysis_data, sort_keys=True)).hexdigest()
+
+def _meeting_dir(meeting_key: str) -> Path:
+    return PDF_CACHE_DIR / re.sub(r'[^A-Za-z0-9._-]', '_', meeting_key)
+
+def get_cache_path(meeting_key: str, version: Optional[int], content_hash: str) -> Path:
+    """Path of the cached report for this meeting, version, content and template."""
+    return _meeting_dir(meeting_key) / f"v{version or 0}-{content_hash[:32]}-t{PDF_TEMPLATE_VERSION}.pdf"
+
+def check_cache(meeting_key: str, version: Optional[int], content_hash: str) -> Optional[Path]:
+    """The cached report's path, or None on a miss."""
+    cache_path = get_cache_path(meeting_key, version, content_hash)
+    if cache_path.exists():
+        print(f"Using cached PDF for meeting {meeting_key} (version {version or 'file'})")
+        return cache_path
+    return None
+
+def save_to_cache(meeting_key: str, version: Optional[int], content_hash: str, pdf_source) -> Optional[Path]:
+    """Stores a rendered report (a binary file object, read from its current position);
+    returns the cache path, or None if it could not be written."""
+    cache_path = get_cache_path(meeting_key, version, content_hash)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(pdf_source, f)
+        os.replace(tmp_path, cache_path) # Readers only ever see complete files
+        print(f"Saved PDF to cache: {cache_path}")
+        return cache_path
+    except Exception as e:
+        print(f"Error saving PDF to cache: {e}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return None
+
+def invalidate_meeting(*meeting_keys: Optional[str]) -> None:
+    """Drops every cached report of the given meetings (record IDs and/or logical IDs)."""
+    for meeting_key in meeting_keys:
+        if not meeting_key:
+            continue
+        meeting_dir = _meeting_dir(str(meeting_key))
+        if meeting_dir.exists():
+            shutil.rmtree(meeting_dir, ignore_errors=True)
+            print(f"Invalidated cached PDFs for meeting {meeting_key}")
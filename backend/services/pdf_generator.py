@@ -1,4 +1,4 @@
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, Flowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER
 from reportlab.lib.pagesizes import letter
@@ -7,16 +7,192 @@ from reportlab.lib import colors
 from io import BytesIO
 import io  # Ensure io module is imported for the new function
 import os
-from typing import Optional
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 from reportlab.graphics.shapes import Drawing, Line, Rect, String, Circle
 from reportlab.graphics import renderPDF
 from reportlab.lib.colors import Color, toColor, black, white, blue, green, HexColor
+import numpy as np
 
 from models.meeting import MeetingAnalysisJSON # Import the data model
 
-# We'll no longer define global styles to avoid conflicts
-# Instead, we'll create styles only when needed inside functions
+# Bump whenever the report layout changes, so cached copies and ETags are invalidated
+PDF_TEMPLATE_VERSION = 2
+
+MAX_CHART_POINTS = int(os.environ.get("PDF_MAX_CHART_POINTS", "150")) # Line charts are downsampled above this
+PDF_SECTION_BUDGET_MS = float(os.environ.get("PDF_SECTION_BUDGET_MS", "250")) # Per-section render time before a warning
+
+CHART_LINE_COLOR = HexColor('#3b82f6')
+BAR_COLORS = (HexColor('#60a5fa'), HexColor('#38bdf8'), HexColor('#34d399'), HexColor('#a78bfa'))
+
+# --- Shared Styles ---
+# Built once at import and shared read-only by every render: styles are never added to or
+# modified after this point, so renders cannot conflict over them.
+def _build_report_styles() -> MappingProxyType:
+    styles = getSampleStyleSheet()
+    custom_styles = [
+        ParagraphStyle(name='Title', parent=styles['Heading1'], fontSize=18, alignment=TA_CENTER, spaceAfter=10),
+        ParagraphStyle(name='Subtitle', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER, textColor=toColor('#71717a')),
+        ParagraphStyle(name='SectionTitle', parent=styles['Heading2'], fontSize=16, spaceBefore=20, spaceAfter=10, textColor=toColor('#111827')),
+        ParagraphStyle(name='SubsectionTitle', parent=styles['Heading3'], fontSize=14, spaceBefore=10, spaceAfter=5),
+        ParagraphStyle(name='ActionItem', parent=styles['Normal'], leftIndent=0.25*inch),
+        ParagraphStyle(name='CardTitle', parent=styles['Heading3'], fontSize=12, textColor=white),
+        ParagraphStyle(name='CardValue', parent=styles['Heading1'], fontSize=22, textColor=white, alignment=TA_CENTER),
+        ParagraphStyle(name='CardLabel', parent=styles['Normal'], fontSize=9, textColor=toColor('#ffffff80')),
+        ParagraphStyle(name='Summary', parent=styles['Normal'], spaceAfter=10),
+        ParagraphStyle(name='TopicItem', parent=styles['Normal'], leftIndent=0.25*inch, spaceBefore=2),
+        ParagraphStyle(name='Justify', alignment=TA_JUSTIFY),
+        ParagraphStyle(name='Center', alignment=TA_CENTER),
+        ParagraphStyle(name='MetricLabel', parent=styles['Normal'], fontSize=10, textColor=toColor('#4b5563')),
+        ParagraphStyle(name='MetricValue', parent=styles['Heading3'], fontSize=14, textColor=toColor('#111827')),
+    ]
+    # The sample sheet's own styles win over custom ones of the same name (e.g. 'Title')
+    for style in custom_styles:
+        if style.name not in styles:
+            styles.add(style)
+    return MappingProxyType(dict(styles.byName))
+
+REPORT_STYLES = _build_report_styles()
+
+@lru_cache(maxsize=None)
+def _card_table_style(background: str) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0,0), (-1,-1), toColor(background)),
+        ('LEFTPADDING', (0,0), (-1,-1), 10),
+        ('RIGHTPADDING', (0,0), (-1,-1), 10),
+        ('TOPPADDING', (0,0), (-1,-1), 10),
+        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ALIGN', (0,1), (0,1), 'CENTER'),
+    ])
+
+CARD_ROW_TABLE_STYLE = TableStyle([
+    ('LEFTPADDING', (0,0), (-1,-1), 5),
+    ('RIGHTPADDING', (0,0), (-1,-1), 5),
+    ('TOPPADDING', (0,0), (-1,-1), 5),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+])
+
+_DATA_TABLE_COMMANDS = [
+    ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
+    ('TEXTCOLOR', (0,0), (-1,0), colors.black),
+    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0,0), (-1,0), 12),
+    ('BACKGROUND', (0,1), (-1,-1), colors.white),
+    ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
+    ('BOX', (0,0), (-1,-1), 1, colors.black)
+]
+DATA_TABLE_STYLE = TableStyle(_DATA_TABLE_COMMANDS)
+TOPIC_TABLE_STYLE = TableStyle(_DATA_TABLE_COMMANDS + [
+    ('WORDWRAP', (0,0), (-1,-1), True),
+    ('ALIGN', (0,1), (0,-1), 'LEFT')
+])
+
+PARTICIPATION_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ('ALIGN', (1,0), (1,-1), 'RIGHT'),
+    ('LEFTPADDING', (0,0), (-1,-1), 0),
+    ('RIGHTPADDING', (0,0), (-1,-1), 0),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+])
+
+# --- Section Timings ---
+class _SectionMark(Flowable):
+    """Zero-size flowable that records when doc.build lays out the start of a section."""
+
+    def __init__(self, timings: "SectionTimings", name: str):
+        Flowable.__init__(self)
+        self._timings = timings
+        self._name = name
+
+    def wrap(self, availWidth, availHeight):
+        return (0, 0)
+
+    def draw(self):
+        self._timings.reached(self._name)
+
+class SectionTimings:
+    """Render time per report section, checked against a per-section budget.
+
+    A section's time is what it took to assemble its flowables plus what doc.build spent
+    laying them out and drawing them (the time between its mark and the next section's).
+    """
+
+    def __init__(self, budget_ms: float = PDF_SECTION_BUDGET_MS):
+        self.budget_ms = budget_ms
+        self._order: List[str] = []
+        self._assembly_ms: Dict[str, float] = {}
+        self._layout_started: Dict[str, float] = {}
+        self._current: Optional[str] = None
+        self._current_started = 0.0
+
+    def begin(self, name: str, story: list) -> None:
+        """Ends the current section and starts assembling `name`."""
+        self._end_assembly()
+        self._order.append(name)
+        story.append(_SectionMark(self, name))
+        self._current, self._current_started = name, time.perf_counter()
+
+    def _end_assembly(self) -> None:
+        if self._current is not None:
+            self._assembly_ms[self._current] = (time.perf_counter() - self._current_started) * 1000
+            self._current = None
+
+    def finish(self, story: list) -> None:
+        """Call before doc.build; what follows the last section is the document finish."""
+        self.begin("document finish", story)
+        self._end_assembly()
+
+    def reached(self, name: str) -> None:
+        self._layout_started.setdefault(name, time.perf_counter())
+
+    def report(self, build_finished: float) -> Dict[str, float]:
+        """Milliseconds per section (once doc.build returns); prints sections over budget."""
+        marks = sorted((started, name) for name, started in self._layout_started.items())
+        layout_ms = {}
+        for (started, name), following in zip(marks, marks[1:] + [(build_finished, None)]):
+            layout_ms[name] = (following[0] - started) * 1000
+        timings = {name: self._assembly_ms.get(name, 0.0) + layout_ms.get(name, 0.0) for name in self._order}
+        print("PDF section timings: " + ", ".join(f"{name} {ms:.1f} ms" for name, ms in timings.items()))
+        for name, ms in timings.items():
+            if ms > self.budget_ms:
+                print(f"Warning: PDF section '{name}' took {ms:.0f} ms (budget {self.budget_ms:.0f} ms)")
+        return timings
+
+# --- Charts ---
+def lttb_downsample(x: Sequence[float], y: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """Largest-Triangle-Three-Buckets downsampling of a series to `threshold` points.
+
+    Keeps the first and last points; the points in between are split into `threshold - 2`
+    buckets and each bucket keeps the point forming the largest triangle with the point
+    kept before it and the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if threshold < 3 or n <= threshold:
+        return list(x), list(y)
+    xs = np.asarray(x, dtype=float)
+    ys = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int) # Bucket i is [edges[i], edges[i+1])
+
+    kept = [0]
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+        areas = np.abs(
+            (xs[previous] - avg_x) * (ys[start:end] - ys[previous])
+            - (xs[previous] - xs[start:end]) * (avg_y - ys[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept.append(previous)
+    kept.append(n - 1)
+    return xs[kept].tolist(), ys[kept].tolist()
 
 def create_simple_line_chart(data_points, width=500, height=200, title="Chart"):
     """Create a simple line chart using ReportLab Drawing objects."""
@@ -62,6 +238,10 @@ def create_simple_line_chart(data_points, width=500, height=200, title="Chart"):
             x_values.append(point.timestamp)
             y_values.append(point.sentiment * 100)  # Convert to percentage
     
+    # Long timelines: plot a shape-preserving subset instead of every point
+    if len(x_values) > MAX_CHART_POINTS:
+        x_values, y_values = lttb_downsample(x_values, y_values, MAX_CHART_POINTS)
+    
     # Normalize x values
     if x_values:
         x_min = min(x_values)
@@ -88,16 +268,16 @@ def create_simple_line_chart(data_points, width=500, height=200, title="Chart"):
             x2 = margin_left + (plot_width * (x_values[i+1] - x_min) / x_range)
             y2 = margin_bottom + (plot_height * y_values[i+1] / 100)
             
-            drawing.add(Line(x1, y1, x2, y2, strokeColor=HexColor('#3b82f6'), strokeWidth=2))
+            drawing.add(Line(x1, y1, x2, y2, strokeColor=CHART_LINE_COLOR, strokeWidth=2))
             
             # Add dots for data points
-            drawing.add(Circle(x1, y1, 3, fillColor=HexColor('#3b82f6'), strokeColor=None))
+            drawing.add(Circle(x1, y1, 3, fillColor=CHART_LINE_COLOR, strokeColor=None))
         
         # Add the last point's dot
         if x_values:
             last_x = margin_left + (plot_width * (x_values[-1] - x_min) / x_range)
             last_y = margin_bottom + (plot_height * y_values[-1] / 100)
-            drawing.add(Circle(last_x, last_y, 3, fillColor=HexColor('#3b82f6'), strokeColor=None))
+            drawing.add(Circle(last_x, last_y, 3, fillColor=CHART_LINE_COLOR, strokeColor=None))
     
     return drawing
 
@@ -139,14 +319,13 @@ def create_simple_bar_chart(labels, values, width=500, height=200, title="Chart"
     # Draw bars
     bar_count = len(labels)
     bar_width = plot_width / (bar_count * 2)  # Space between bars
-    bar_colors = [HexColor('#60a5fa'), HexColor('#38bdf8'), HexColor('#34d399'), HexColor('#a78bfa')]
     
     for i, (label, value) in enumerate(zip(labels, values)):
         bar_height = plot_height * value / max_scale if max_scale > 0 else 0
         x_pos = margin_left + i * (plot_width / bar_count) + bar_width/2
         
         # Draw bar
-        bar_color = bar_colors[i % len(bar_colors)]  # Cycle through colors
+        bar_color = BAR_COLORS[i % len(BAR_COLORS)]  # Cycle through colors
         drawing.add(Rect(x_pos, margin_bottom, bar_width, bar_height, 
                         fillColor=bar_color, strokeColor=None))
         
@@ -183,116 +362,15 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
     Returns:
         A BytesIO buffer containing the generated PDF.
     """
-    from reportlab.lib.colors import Color, toColor, black, white
-    from reportlab.graphics.shapes import Drawing, Rect
-    from reportlab.graphics import renderPDF
-    from reportlab.lib.pagesizes import letter
-    from reportlab.graphics.charts.lineplots import LinePlot
-    from reportlab.graphics.charts.barcharts import VerticalBarChart
-    
+    timings = SectionTimings()
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter,
                         leftMargin=0.5*inch, rightMargin=0.5*inch,
                         topMargin=0.5*inch, bottomMargin=0.5*inch)
     
     story = []
-
-    # --- Create Fresh Styles ---
-    # Create a new stylesheet each time to avoid conflicts
-    styles = getSampleStyleSheet()
-    
-    # Add custom styles for our PDF
-    basic_style_dict = {
-        'Title': ParagraphStyle(
-            name='Title', 
-            parent=styles['Heading1'], 
-            fontSize=18, 
-            alignment=TA_CENTER, 
-            spaceAfter=10
-        ),
-        'Subtitle': ParagraphStyle(
-            name='Subtitle', 
-            parent=styles['Normal'], 
-            fontSize=12, 
-            alignment=TA_CENTER, 
-            textColor=toColor('#71717a')
-        ),
-        'SectionTitle': ParagraphStyle(
-            name='SectionTitle', 
-            parent=styles['Heading2'], 
-            fontSize=16, 
-            spaceBefore=20, 
-            spaceAfter=10,
-            textColor=toColor('#111827')
-        ),
-        'SubsectionTitle': ParagraphStyle(
-            name='SubsectionTitle',
-            parent=styles['Heading3'],
-            fontSize=14,
-            spaceBefore=10,
-            spaceAfter=5
-        ),
-        'ActionItem': ParagraphStyle(
-            name='ActionItem', 
-            parent=styles['Normal'], 
-            leftIndent=0.25*inch
-        ),
-        'CardTitle': ParagraphStyle(
-            name='CardTitle', 
-            parent=styles['Heading3'], 
-            fontSize=12, 
-            textColor=white
-        ),
-        'CardValue': ParagraphStyle(
-            name='CardValue', 
-            parent=styles['Heading1'], 
-            fontSize=22, 
-            textColor=white,
-            alignment=TA_CENTER
-        ),
-        'CardLabel': ParagraphStyle(
-            name='CardLabel', 
-            parent=styles['Normal'], 
-            fontSize=9, 
-            textColor=toColor('#ffffff80')
-        ),
-        'Summary': ParagraphStyle(
-            name='Summary', 
-            parent=styles['Normal'], 
-            spaceAfter=10
-        ),
-        'TopicItem': ParagraphStyle(
-            name='TopicItem', 
-            parent=styles['Normal'], 
-            leftIndent=0.25*inch, 
-            spaceBefore=2
-        ),
-        'Justify': ParagraphStyle(
-            name='Justify', 
-            alignment=TA_JUSTIFY
-        ),
-        'Center': ParagraphStyle(
-            name='Center', 
-            alignment=TA_CENTER
-        ),
-        'MetricLabel': ParagraphStyle(
-            name='MetricLabel',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=toColor('#4b5563')
-        ),
-        'MetricValue': ParagraphStyle(
-            name='MetricValue',
-            parent=styles['Heading3'],
-            fontSize=14,
-            textColor=toColor('#111827')
-        )
-    }
-    
-    # Now add each style, checking if it already exists
-    for style_name, style in basic_style_dict.items():
-        if style_name not in styles:
-            styles.add(style)
+    styles = REPORT_STYLES
+    timings.begin("header", story)
     
     # --- Extract Meeting Title from metadata ---
     meeting_title = "Meeting Analysis"
@@ -329,7 +407,6 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
     if meeting_date:
         try:
             # Try to format the date nicely if it's in ISO format
-            from datetime import datetime
             date_obj = datetime.fromisoformat(meeting_date.replace('Z', '+00:00'))
             formatted_date = date_obj.strftime("%B %d, %Y at %I:%M %p")
             story.append(Paragraph(f"Recorded on {formatted_date}", styles['Subtitle']))
@@ -367,15 +444,7 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         colWidths=[card_width-20],
         rowHeights=[20, 40, 15]
     )
-    sentiment_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,-1), toColor(card_colors['sentiment'])),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('ALIGN', (0,1), (0,1), 'CENTER'),
-    ]))
+    sentiment_table.setStyle(_card_table_style(card_colors['sentiment']))
     row1.append(sentiment_table)
     
     # --- Engagement Card ---
@@ -390,15 +459,7 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         colWidths=[card_width-20],
         rowHeights=[20, 40, 15]
     )
-    engagement_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,-1), toColor(card_colors['engagement'])),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('ALIGN', (0,1), (0,1), 'CENTER'),
-    ]))
+    engagement_table.setStyle(_card_table_style(card_colors['engagement']))
     row1.append(engagement_table)
     
     # Row 2: Speaker and Duration
@@ -423,15 +484,7 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         colWidths=[card_width-20],
         rowHeights=[20, 40, 15]
     )
-    speaker_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,-1), toColor(card_colors['speaker'])),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('ALIGN', (0,1), (0,1), 'CENTER'),
-    ]))
+    speaker_table.setStyle(_card_table_style(card_colors['speaker']))
     row2.append(speaker_table)
     
     # --- Duration Card ---
@@ -450,33 +503,15 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         colWidths=[card_width-20],
         rowHeights=[20, 40, 15]
     )
-    duration_table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,-1), toColor(card_colors['duration'])),
-        ('LEFTPADDING', (0,0), (-1,-1), 10),
-        ('RIGHTPADDING', (0,0), (-1,-1), 10),
-        ('TOPPADDING', (0,0), (-1,-1), 10),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 10),
-        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ('ALIGN', (0,1), (0,1), 'CENTER'),
-    ]))
+    duration_table.setStyle(_card_table_style(card_colors['duration']))
     row2.append(duration_table)
     
     # Create row tables
     row1_table = Table([row1], colWidths=[card_width, card_width])
-    row1_table.setStyle(TableStyle([
-        ('LEFTPADDING', (0,0), (-1,-1), 5),
-        ('RIGHTPADDING', (0,0), (-1,-1), 5),
-        ('TOPPADDING', (0,0), (-1,-1), 5),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
+    row1_table.setStyle(CARD_ROW_TABLE_STYLE)
     
     row2_table = Table([row2], colWidths=[card_width, card_width])
-    row2_table.setStyle(TableStyle([
-        ('LEFTPADDING', (0,0), (-1,-1), 5),
-        ('RIGHTPADDING', (0,0), (-1,-1), 5),
-        ('TOPPADDING', (0,0), (-1,-1), 5),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-    ]))
+    row2_table.setStyle(CARD_ROW_TABLE_STYLE)
     
     # Add metric cards to the story
     story.append(row1_table)
@@ -485,12 +520,14 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
     story.append(Spacer(1, 0.4*inch))
     
     # --- Meeting Summary --- 
+    timings.begin("summary", story)
     if analysis_data.summary:
         story.append(Paragraph("Meeting Summary", styles['SectionTitle']))
         story.append(Paragraph(analysis_data.summary, styles['Summary']))
         story.append(Spacer(1, 0.2*inch))
     
     # --- Sentiment Overview --- (Following UI order)
+    timings.begin("sentiment", story)
     if analysis_data.sentiment:
         story.append(Paragraph("Meeting Sentiment Overview", styles['SectionTitle']))
         story.append(Paragraph("Sentiment trend over time.", styles['MetricLabel']))
@@ -509,6 +546,7 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         story.append(Spacer(1, 0.2*inch))
     
     # --- Meeting Participation ---
+    timings.begin("participation", story)
     if hasattr(analysis_data, 'participants') and analysis_data.participants:
         story.append(Paragraph("Meeting Participation", styles['SectionTitle']))
         story.append(Paragraph("Participation breakdown.", styles['MetricLabel']))
@@ -557,18 +595,13 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
                 ]
                 
                 participation_metrics = Table(data, colWidths=[4*inch, 2*inch])
-                participation_metrics.setStyle(TableStyle([
-                    ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                    ('ALIGN', (1,0), (1,-1), 'RIGHT'),
-                    ('LEFTPADDING', (0,0), (-1,-1), 0),
-                    ('RIGHTPADDING', (0,0), (-1,-1), 0),
-                    ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-                ]))
+                participation_metrics.setStyle(PARTICIPATION_TABLE_STYLE)
                 story.append(participation_metrics)
         
         story.append(Spacer(1, 0.2*inch))
     
     # --- Speaker Analysis ---
+    timings.begin("speakers", story)
     if analysis_data.speakers:
         story.append(Paragraph("Speaker Analysis", styles['SectionTitle']))
         
@@ -598,22 +631,13 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
             speaker_data.append([speaker.name, speaking_time, sentiment_pct])
         
         if len(speaker_data) > 1:
-            table_style = TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                ('BACKGROUND', (0,1), (-1,-1), colors.white),
-                ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
-                ('BOX', (0,0), (-1,-1), 1, colors.black)
-            ])
             speaker_table = Table(speaker_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
-            speaker_table.setStyle(table_style)
+            speaker_table.setStyle(DATA_TABLE_STYLE)
             story.append(speaker_table)
             story.append(Spacer(1, 0.2*inch))
     
     # --- Topics Analysis --- 
+    timings.begin("topics", story)
     if analysis_data.topics and hasattr(analysis_data.topics, 'topics') and analysis_data.topics.topics:
         story.append(Paragraph("AI-Powered Topic Analysis", styles['SectionTitle']))
         
@@ -632,25 +656,13 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
             topic_data.append([topic.name, percentage_text, keywords_text])
         
         if len(topic_data) > 1:
-            table_style = TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                ('BACKGROUND', (0,1), (-1,-1), colors.white),
-                ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
-                ('BOX', (0,0), (-1,-1), 1, colors.black),
-                ('WORDWRAP', (0,0), (-1,-1), True),
-                ('ALIGN', (0,1), (0,-1), 'LEFT')
-            ])
-            
             topic_table = Table(topic_data, colWidths=[2*inch, 1*inch, 3*inch])
-            topic_table.setStyle(table_style)
+            topic_table.setStyle(TOPIC_TABLE_STYLE)
             story.append(topic_table)
         story.append(Spacer(1, 0.2*inch))
 
     # --- Action Items --- 
+    timings.begin("action items", story)
     if analysis_data.action_items:
         story.append(Paragraph("Action Items", styles['SectionTitle']))
         for item in analysis_data.action_items:
@@ -658,6 +670,7 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
         story.append(Spacer(1, 0.2*inch))
         
     # --- Reactions Analysis ---
+    timings.begin("reactions", story)
     if hasattr(analysis_data, 'reactions') and analysis_data.reactions:
         story.append(Paragraph("Meeting Reactions Analysis", styles['SectionTitle']))
         
@@ -670,32 +683,24 @@ def generate_pdf_report(analysis_data: MeetingAnalysisJSON, file_name: str) -> B
                 reactions_data.append([reaction.name, str(reaction.count)])
         
         if len(reactions_data) > 1:
-            table_style = TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                ('BACKGROUND', (0,1), (-1,-1), colors.white),
-                ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
-                ('BOX', (0,0), (-1,-1), 1, colors.black)
-            ])
-            
             reactions_table = Table(reactions_data, colWidths=[3*inch, 3*inch])
-            reactions_table.setStyle(table_style)
+            reactions_table.setStyle(DATA_TABLE_STYLE)
             story.append(reactions_table)
         story.append(Spacer(1, 0.2*inch))
         
     # --- AI Insights --- 
+    timings.begin("insights", story)
     if analysis_data.insights:
         story.append(Paragraph("Additional AI Insights", styles['SectionTitle']))
         story.append(Paragraph(analysis_data.insights, styles['Justify']))
         story.append(Spacer(1, 0.2*inch))
 
     # --- Build PDF --- 
+    timings.finish(story)
     try:
         print("Building PDF report...")
         doc.build(story)
+        timings.report(time.perf_counter())
         print("PDF report built successfully.")
         buffer.seek(0) # Rewind buffer to the beginning
         return buffer
@@ -715,9 +720,6 @@ def generate_pdf_from_file(analysis_data: dict, meeting_id: str, version: Option
     Returns:
         io.BytesIO: A buffer containing the generated PDF
     """
-    # Import at the top of the function to avoid reference errors
-    from models.meeting import MeetingAnalysisJSON
-    
     print(f"Generating PDF from file data for meeting {meeting_id}, version: {version or 'latest'}")
     
     # If version is specified, check if it exists in previous_versions
@@ -804,8 +806,6 @@ def generate_pdf_from_file(analysis_data: dict, meeting_id: str, version: Option
             print(f"Fallback also failed: {fallback_error}")
             raise RuntimeError(f"PDF generation failed: {fallback_error}")
 
-# Note: Need to import ParagraphStyle for the custom styles added
-
 # Example Usage (requires analysis_data object):
 # if __name__ == "__main__":
 #     # Create a dummy MeetingAnalysisJSON object
@@ -0,0 +1,153 @@
+"""
+PDF rendering off the event loop.
+
+ReportLab rendering is pure-Python and CPU-bound, so reports are rendered in a small pool
+of worker processes instead of inside the API's event loop:
+
+- Admission is bounded: at most PDF_RENDER_WORKERS renders run at once and
+  PDF_RENDER_QUEUE_SIZE more may wait. Anything beyond that is rejected with
+  `RenderQueueFull` instead of piling up behind a backlog.
+- Every render has a deadline (PDF_RENDER_TIMEOUT_SECONDS), measured from when it starts
+  running. A render that overruns it has the pool's worker processes terminated and the
+  pool is rebuilt, so one pathological report cannot hold a worker forever. Renders that
+  were running alongside it are retried once on the new pool.
+- The finished PDF is handed back in a spooled temp file (kept in memory up to
+  SPOOL_MAX_MEMORY, on disk beyond that) which the route streams out in chunks.
+
+Workers are started with `spawn`, so they import only the PDF generator and not the ML
+models the API process has loaded.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterator, Optional
+
+# --- Pool Configuration ---
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+PDF_RENDER_QUEUE_SIZE = int(os.environ.get("PDF_RENDER_QUEUE_SIZE", "16")) # Renders allowed to wait for a worker
+PDF_RENDER_TIMEOUT_SECONDS = float(os.environ.get("PDF_RENDER_TIMEOUT_SECONDS", "60"))
+SPOOL_MAX_MEMORY = 4 * 1024 * 1024 # Bytes held in memory before the spool moves to disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class RenderQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+class RenderTimeout(Exception):
+    """Raised when a render runs past its deadline."""
+
+def _render_in_worker(render_fn: Callable, *args: Any) -> bytes:
+    """Runs in a worker process; the generators return a BytesIO, which cannot be pickled."""
+    return render_fn(*args).getvalue()
+
+def _spool(pdf_bytes: bytes) -> tempfile.SpooledTemporaryFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    spool.write(pdf_bytes)
+    spool.seek(0)
+    return spool
+
+def iter_file(file_obj, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields a file object's contents in chunks and closes it once exhausted."""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+class PdfRenderPool:
+    """Bounded process pool for report rendering; see the module docstring."""
+
+    def __init__(
+        self,
+        workers: int = PDF_RENDER_WORKERS,
+        queue_size: int = PDF_RENDER_QUEUE_SIZE,
+        timeout_seconds: float = PDF_RENDER_TIMEOUT_SECONDS
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._admitted = 0 # Running + waiting renders
+        self._running: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                print(f"Starting PDF render pool with {self.workers} worker process(es)")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Terminates an executor's workers (a running task cannot be cancelled otherwise)."""
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self) -> int:
+        return self._admitted
+
+    async def render(self, render_fn: Callable, *args: Any) -> tempfile.SpooledTemporaryFile:
+        """Renders `render_fn(*args)` (a module-level function returning a BytesIO) in a
+        worker; returns the PDF in a spooled temp file positioned at the start."""
+        if self._admitted >= self.workers + self.queue_size:
+            raise RenderQueueFull(f"{self._admitted} PDF renders already pending")
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.workers)
+        self._admitted += 1
+        try:
+            async with self._running: # Keeps the executor's own queue empty, so the deadline covers only the render
+                pdf_bytes = await self._run(render_fn, args, retry_broken=True)
+        finally:
+            self._admitted -= 1
+        return await asyncio.to_thread(_spool, pdf_bytes)
+
+    async def _run(self, render_fn: Callable, args: tuple, retry_broken: bool) -> bytes:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_render_in_worker, render_fn, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            print(f"PDF render exceeded {self.timeout_seconds:g}s; restarting the render pool")
+            self._discard_executor(executor)
+            raise RenderTimeout(f"PDF rendering took longer than {self.timeout_seconds:g} seconds")
+        except BrokenProcessPool:
+            # Another render's timeout (or a crashed worker) took the pool down
+            self._discard_executor(executor)
+            if not retry_broken:
+                raise
+            print("PDF render pool was restarted; retrying render")
+            return await self._run(render_fn, args, retry_broken=False)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            print("PDF render pool shut down")
+
+_render_pool: Optional[PdfRenderPool] = None
+
+def get_render_pool() -> PdfRenderPool:
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = PdfRenderPool()
+    return _render_pool
+
+def shutdown_render_pool() -> None:
+    if _render_pool is not None:
+        _render_pool.shutdown()
@@ -0,0 +1,264 @@
+"""
+Structured progress events from the analysis pipeline.
+
+The pipeline marks where it is with `begin_stage("transcription")`, ..., `finish_stage()`
+and, inside long stages, `stage_progress(percent)`. Those calls go to the reporter that is
+active in the current context (`reporting_to(sink)`), which turns them into events:
+
+    {"type": "stage_started",  "stage": "transcription", "at": 1718000000.0}
+    {"type": "stage_progress", "stage": "transcription", "percent": 42.0, "at": ...}
+    {"type": "stage_finished", "stage": "transcription", "duration_ms": 81234.5, "at": ...}
+    {"type": "stage_failed",   "stage": "insights", "duration_ms": ..., "error": "...", "at": ...}
+    {"type": "stage_skipped",  "stage": "insights", "reason": "...", "at": ...}
+
+The reporter also enforces the job's time budget and cancellation, cooperatively: every
+stage boundary and every progress update is a checkpoint.
+
+- Past the job's total deadline, or when the job has been cancelled, the checkpoint raises
+  `DeadlineExceeded` or `JobCancelled`. Both derive from BaseException, so the pipeline's
+  broad `except Exception` fallbacks do not swallow them and the job ends there.
+- A stage has its own budget (STAGE_BUDGET_SECONDS). An optional stage (sentiment,
+  topics, insights, ...) that overruns it raises `StageTimeout`, an ordinary exception:
+  the pipeline drops that stage's output, marks it skipped and carries on, so the job
+  finishes with partial results. A stage with no checkpoints of its own is held to its
+  budget when it finishes: `finish_stage()` raises `StageTimeout` for an optional stage
+  that overran, and a stage still open when the next one begins is skipped instead.
+  Blocking calls with no checkpoints of their own, such as the Ollama request, take
+  `stage_time_left()` as their timeout.
+- Optional stages stop POST_PROCESSING_RESERVE_SECONDS before the job's deadline (one that
+  would start later raises `StageTimeout` straight away), so the required stages after
+  them (metrics, save, indexing) still have time to store the partial results.
+
+The job worker installs a reporter that stores each event on the job (see
+services.job_queue) and backs the time budget with a hard watchdog. With no reporter
+active, for example when the pipeline is run from a script, the calls do nothing and
+nothing is timed.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+PROGRESS_MIN_INTERVAL_SECONDS = 1.0 # Percent updates are throttled to one per interval per stage
+# Time kept free of optional stages at the end of a job, at most a quarter of its deadline
+POST_PROCESSING_RESERVE_SECONDS = float(os.environ.get("PIPELINE_POST_PROCESSING_RESERVE_SECONDS", "120"))
+
+def _parse_stage_budgets(spec: str) -> Dict[str, float]:
+    """"transcription=2400,insights=300" -> {"transcription": 2400.0, "insights": 300.0}"""
+    budgets = {}
+    for item in spec.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            budgets[name.strip()] = float(seconds)
+    return budgets
+
+# Seconds each stage may take; stages not listed are bounded only by the job's deadline.
+# Override with PIPELINE_STAGE_BUDGETS="stage=seconds,...".
+STAGE_BUDGET_SECONDS: Dict[str, float] = {
+    "transcription": 2400.0,
+    "diarization": 1200.0,
+    "sentiment": 300.0,
+    "topics": 300.0,
+    "insights": 420.0,
+    **_parse_stage_budgets(os.environ.get("PIPELINE_STAGE_BUDGETS", "")),
+}
+
+class StageTimeout(Exception):
+    """An optional stage ran past its budget; the pipeline skips it."""
+
+class StageDeferred(Exception):
+    """An optional stage was left for a backfill job (see services.admission)."""
+
+class DeadlineExceeded(BaseException):
+    """The job ran past its total deadline, or a required stage past its budget."""
+
+class JobCancelled(BaseException):
+    """The job was cancelled while it ran."""
+
+EventSink = Callable[[Dict[str, Any]], None]
+
+class ProgressReporter:
+    """Tracks the stage in progress and sends its events to a sink."""
+
+    def __init__(
+        self,
+        sink: EventSink,
+        deadline_seconds: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+        stage_budgets: Optional[Dict[str, float]] = None
+    ):
+        self.sink = sink
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        # Where optional stages stop, leaving the rest of the deadline to required ones
+        self.optional_deadline = (
+            self.deadline - min(POST_PROCESSING_RESERVE_SECONDS, deadline_seconds / 4) if self.deadline is not None else None
+        )
+        self.cancelled = cancelled
+        self.stage_budgets = STAGE_BUDGET_SECONDS if stage_budgets is None else stage_budgets
+        self.stage: Optional[str] = None
+        self.stage_optional = False
+        self._stage_started = 0.0
+        self._stage_deadline: Optional[float] = None
+        self._last_progress = 0.0
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        event = {"type": event_type, **data, "at": time.time()}
+        try:
+            self.sink(event)
+        except Exception as e:
+            # Progress is best-effort; never let it fail the analysis
+            print(f"Failed to record progress event {event_type}: {e}")
+
+    def _elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._stage_started) * 1000, 1)
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the current stage's budget or the job's deadline runs out, whichever is
+        sooner; for an optional stage, the deadline less the post-processing reserve."""
+        job_end = self.optional_deadline if self.stage_optional else self.deadline
+        ends = [end for end in (job_end, self._stage_deadline) if end is not None]
+        return max(min(ends) - time.monotonic(), 0.0) if ends else None
+
+    def _budget_overrun(self) -> Optional[str]:
+        """Why the open stage is out of time, if it is; the job's deadline is left to checkpoint()."""
+        if self.stage is None:
+            return None
+        now = time.monotonic()
+        if self._stage_deadline is not None and now >= self._stage_deadline:
+            return f"Stage {self.stage} exceeded its budget of {self.stage_budgets[self.stage]:g}s"
+        if self.stage_optional and self.optional_deadline is not None and now >= self.optional_deadline:
+            return f"Stage {self.stage} ran into the time reserved for post-processing"
+        return None
+
+    def checkpoint(self) -> None:
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise JobCancelled("Job was cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise DeadlineExceeded(f"Job deadline exceeded{f' during {self.stage}' if self.stage else ''}")
+        overrun = self._budget_overrun()
+        if overrun:
+            if self.stage_optional:
+                raise StageTimeout(overrun)
+            raise DeadlineExceeded(overrun)
+
+    def begin_stage(self, name: str, optional: bool = False, **data: Any) -> None:
+        """Starts a stage, finishing the previous one if it is still open. An open optional
+        stage that overran its budget is recorded as skipped rather than finished."""
+        overrun = self._budget_overrun() if self.stage_optional else None
+        if overrun:
+            self.skip_stage(overrun)
+        self.finish_stage()
+        if optional and self.optional_deadline is not None and time.monotonic() >= self.optional_deadline:
+            self.stage, self.stage_optional, self._stage_started = name, True, time.perf_counter()
+            raise StageTimeout("Too close to the job deadline to start the stage")
+        self.checkpoint()
+        self.stage = name
+        self.stage_optional = optional
+        self._stage_started = time.perf_counter()
+        budget = self.stage_budgets.get(name)
+        self._stage_deadline = time.monotonic() + budget if budget else None
+        self._last_progress = 0.0
+        self.emit("stage_started", stage=name, optional=optional, **data)
+
+    def finish_stage(self, **data: Any) -> None:
+        """Finishes the open stage. Raises `StageTimeout` (optional stage) or
+        `DeadlineExceeded` if it overran its budget, leaving the stage open to be skipped or failed."""
+        overrun = self._budget_overrun()
+        if overrun:
+            if self.stage_optional:
+                raise StageTimeout(overrun)
+            raise DeadlineExceeded(overrun)
+        self.close_stage(**data)
+
+    def close_stage(self, **data: Any) -> None:
+        """Finishes the open stage whatever time it took, once the job's work is done."""
+        if self.stage is None:
+            return
+        self.emit("stage_finished", stage=self.stage, duration_ms=self._elapsed_ms(), **data)
+        self._end_stage()
+
+    def _end_stage(self) -> None:
+        self.stage = None
+        self.stage_optional = False
+        self._stage_deadline = None
+
+    def skip_stage(self, reason: str) -> None:
+        """Ends the current stage without a result; it is left for a later backfill."""
+        if self.stage is None:
+            return
+        self.emit("stage_skipped", stage=self.stage, duration_ms=self._elapsed_ms(), reason=reason)
+        self._end_stage()
+
+    def fail_stage(self, error: BaseException) -> None:
+        if self.stage is None:
+            return
+        self.emit("stage_failed", stage=self.stage, duration_ms=self._elapsed_ms(), error=f"{type(error).__name__}: {error}")
+        self._end_stage()
+
+    def progress(self, percent: float, **data: Any) -> None:
+        if self.stage is None:
+            return
+        self.checkpoint()
+        now = time.monotonic()
+        if percent < 100 and now - self._last_progress < PROGRESS_MIN_INTERVAL_SECONDS:
+            return
+        self._last_progress = now
+        self.emit("stage_progress", stage=self.stage, percent=round(min(max(float(percent), 0.0), 100.0), 1), **data)
+
+_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("progress_reporter", default=None)
+
+@contextmanager
+def reporting_to(
+    sink: EventSink,
+    deadline_seconds: Optional[float] = None,
+    cancelled: Optional[threading.Event] = None
+) -> Iterator[ProgressReporter]:
+    """Sends the progress of the code run inside the block to `sink` and bounds it by
+    `deadline_seconds` and the `cancelled` event. A stage still open when the block raises
+    is reported as failed; one open at the end is closed."""
+    reporter = ProgressReporter(sink, deadline_seconds, cancelled)
+    token = _reporter.set(reporter)
+    try:
+        yield reporter
+    except BaseException as e:
+        reporter.fail_stage(e)
+        raise
+    else:
+        reporter.close_stage()
+    finally:
+        _reporter.reset(token)
+
+def is_reporting() -> bool:
+    return _reporter.get() is not None
+
+def begin_stage(name: str, optional: bool = False, **data: Any) -> None:
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.begin_stage(name, optional, **data)
+
+def skip_stage(reason: str) -> None:
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.skip_stage(reason)
+
+def checkpoint() -> None:
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.checkpoint()
+
+def stage_time_left() -> Optional[float]:
+    reporter = _reporter.get()
+    return reporter.time_left() if reporter is not None else None
+
+def finish_stage(**data: Any) -> None:
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.finish_stage(**data)
+
+def stage_progress(percent: float, **data: Any) -> None:
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter.progress(percent, **data)
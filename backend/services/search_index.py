@@ -0,0 +1,314 @@
+"""
+Semantic search over analysed meetings.
+
+Every transcript segment (a VTT caption or a Whisper segment) is embedded once when the
+analysis pipeline finishes and stored as a per-meeting shard on disk. All shards are held
+in one in-process inverted-file (IVF) index built on numpy:
+
+- Below IVF_MIN_ROWS vectors a brute-force dot product is already only a few milliseconds,
+  so no coarse quantizer is trained.
+- Above it, a spherical k-means quantizer partitions the vectors into `nlist` lists and a
+  query only scores the `nprobe` closest lists, which keeps latency in the tens of
+  milliseconds for thousands of meetings.
+
+Shards are written atomically, so the API process can pick up meetings indexed by another
+process simply by rescanning the shard directory.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from services.embeddings import EMBEDDING_DIM, embed_texts
+
+# --- Index Configuration ---
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SEARCH_INDEX_DIR = Path(os.environ.get("SEARCH_INDEX_DIR", os.path.join(_BACKEND_DIR, "cache", "search")))
+SHARDS_DIR = SEARCH_INDEX_DIR / "shards"
+CENTROIDS_PATH = SEARCH_INDEX_DIR / "centroids.npy"
+
+IVF_MIN_ROWS = int(os.environ.get("SEARCH_IVF_MIN_ROWS", "20000")) # Train the quantizer above this size
+IVF_NPROBE = int(os.environ.get("SEARCH_IVF_NPROBE", "8")) # Lists scanned per query
+RETRAIN_GROWTH_FACTOR = 4 # Retrain once the index has grown this much since the last training
+RESCAN_INTERVAL_SECONDS = 1.0 # Throttle shard directory rescans on the query path
+
+class SearchHit(BaseModel):
+    meeting_id: str
+    speaker: Optional[str] = None
+    start: Optional[float] = None # Seconds from meeting start
+    end: Optional[float] = None
+    text: str
+    score: float # Cosine similarity
+
+def _shard_name(meeting_id: str) -> str:
+    """Turns a meeting ID into a safe shard file stem."""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', meeting_id)
+
+def _write_atomic(path: Path, write_fn) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _train_spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Trains unit-norm centroids on (already normalised) vectors."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * 64, 100_000)
+    sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty lists with random sample points
+        sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+    return centroids
+
+class IvfIndex:
+    """Append-only IVF index over unit-norm float32 vectors with per-row tombstones."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.size = 0
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._shard = np.zeros(1024, dtype=np.int32) # Row -> shard slot
+        self._local = np.zeros(1024, dtype=np.int32) # Row -> position inside the shard metadata
+        self.shard_ids: List[str] = [] # Slot -> meeting ID
+        self.shard_meta: List[List[Dict[str, Any]]] = [] # Slot -> per-segment metadata
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+        self._assign = np.zeros(1024, dtype=np.int32)
+        self._list_order: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._alive)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("_vectors", "_alive", "_shard", "_local", "_assign"):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    @property
+    def alive_count(self) -> int:
+        return int(self._alive[:self.size].sum())
+
+    def add_shard(self, meeting_id: str, vectors: np.ndarray, meta: List[Dict[str, Any]]) -> None:
+        """Adds (or replaces) all vectors of one meeting."""
+        self.remove_shard(meeting_id)
+        slot = len(self.shard_ids)
+        self.shard_ids.append(meeting_id)
+        self.shard_meta.append(meta)
+
+        count = len(vectors)
+        start, end = self.size, self.size + count
+        self._grow(end)
+        self._vectors[start:end] = vectors
+        self._alive[start:end] = True
+        self._shard[start:end] = slot
+        self._local[start:end] = np.arange(count, dtype=np.int32)
+        if self.centroids is not None and count:
+            self._assign[start:end] = np.argmax(vectors @ self.centroids.T, axis=1)
+        self.size = end
+        self._list_order = None # Inverted lists are rebuilt lazily on the next query
+
+    def remove_shard(self, meeting_id: str) -> None:
+        for slot, existing_id in enumerate(self.shard_ids):
+            if existing_id == meeting_id:
+                self._alive[:self.size][self._shard[:self.size] == slot] = False
+                self.shard_ids[slot] = None
+                self.shard_meta[slot] = []
+        self._list_order = None
+
+    def needs_training(self) -> bool:
+        alive = self.alive_count
+        if alive < IVF_MIN_ROWS:
+            return False
+        return self.centroids is None or alive >= self.trained_size * RETRAIN_GROWTH_FACTOR
+
+    def train(self) -> None:
+        """(Re)trains the coarse quantizer and compacts away tombstoned rows."""
+        self.compact()
+        nlist = int(np.clip(4 * np.sqrt(self.size), 16, 4096))
+        print(f"[Search Index] Training IVF quantizer with {nlist} lists on {self.size} vectors...")
+        self.set_centroids(_train_spherical_kmeans(self._vectors[:self.size], nlist), self.size)
+
+    def set_centroids(self, centroids: np.ndarray, trained_size: int) -> None:
+        self.centroids = centroids.astype(np.float32)
+        self.trained_size = trained_size
+        if self.size:
+            self._assign[:self.size] = np.argmax(self._vectors[:self.size] @ self.centroids.T, axis=1)
+        self._list_order = None
+
+    def compact(self) -> None:
+        keep = np.flatnonzero(self._alive[:self.size])
+        live_slots = sorted({int(s) for s in self._shard[keep]})
+        slot_map = np.full(max(len(self.shard_ids), 1), -1, dtype=np.int32)
+        slot_map[live_slots] = np.arange(len(live_slots), dtype=np.int32)
+        self.shard_ids = [self.shard_ids[s] for s in live_slots]
+        self.shard_meta = [self.shard_meta[s] for s in live_slots]
+        for name in ("_vectors", "_shard", "_local", "_assign"):
+            arr = getattr(self, name)
+            arr[:len(keep)] = arr[keep]
+        self._shard[:len(keep)] = slot_map[self._shard[:len(keep)]]
+        self._alive[:] = False
+        self._alive[:len(keep)] = True
+        self.size = len(keep)
+        self._list_order = None
+
+    def _ensure_lists(self) -> None:
+        if self._list_order is not None or self.centroids is None:
+            return
+        assign = self._assign[:self.size]
+        self._list_order = np.argsort(assign, kind="stable").astype(np.int32)
+        counts = np.bincount(assign, minlength=len(self.centroids))
+        self._list_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def search(self, query: np.ndarray, k: int, meeting_id: Optional[str] = None, nprobe: int = IVF_NPROBE):
+        """Returns [(row, score)] for the top-k rows by cosine similarity."""
+        if self.size == 0:
+            return []
+
+        if meeting_id is not None:
+            # Scoped to one meeting: scanning its rows exactly is cheaper than probing lists
+            slots = [slot for slot, mid in enumerate(self.shard_ids) if mid == meeting_id]
+            candidates = np.flatnonzero(self._alive[:self.size] & np.isin(self._shard[:self.size], slots))
+        elif self.centroids is None:
+            candidates = np.flatnonzero(self._alive[:self.size])
+        else:
+            self._ensure_lists()
+            centroid_scores = self.centroids @ query
+            nprobe = min(nprobe, len(self.centroids))
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            candidates = np.concatenate([
+                self._list_order[self._list_offsets[c]:self._list_offsets[c + 1]] for c in probe
+            ])
+            candidates = candidates[self._alive[candidates]]
+
+        if len(candidates) == 0:
+            return []
+
+        scores = self._vectors[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def hit_for_row(self, row: int, score: float) -> SearchHit:
+        slot = int(self._shard[row])
+        meta = self.shard_meta[slot][int(self._local[row])]
+        return SearchHit(meeting_id=self.shard_ids[slot], score=score, **meta)
+
+# --- Shared Index Instance ---
+_index: Optional[IvfIndex] = None
+_index_lock = threading.Lock()
+_shard_mtimes: Dict[str, float] = {} # Shard stem -> mtime of the loaded version
+_last_rescan = 0.0
+
+def _load_shard(path: Path):
+    with np.load(path) as data:
+        vectors = data["vectors"].astype(np.float32)
+    with open(path.with_suffix(".json"), 'r', encoding='utf-8') as f:
+        shard = json.load(f)
+    return shard["meeting_id"], vectors, shard["segments"]
+
+def _rescan_shards(index: IvfIndex, force: bool = False) -> None:
+    """Loads shards written (or rewritten) since the last scan, e.g. by a worker process."""
+    global _last_rescan
+    now = time.monotonic()
+    if not force and now - _last_rescan < RESCAN_INTERVAL_SECONDS:
+        return
+    _last_rescan = now
+    if not SHARDS_DIR.exists():
+        return
+
+    changed = False
+    for entry in os.scandir(SHARDS_DIR):
+        if not entry.name.endswith(".npz"):
+            continue
+        mtime = entry.stat().st_mtime
+        stem = entry.name[:-4]
+        if _shard_mtimes.get(stem) == mtime:
+            continue
+        try:
+            meeting_id, vectors, meta = _load_shard(Path(entry.path))
+            index.add_shard(meeting_id, vectors, meta)
+            _shard_mtimes[stem] = mtime
+            changed = True
+        except Exception as e:
+            print(f"[Search Index] Skipping unreadable shard {entry.name}: {e}")
+
+    if changed and index.needs_training():
+        index.train()
+        _write_atomic(CENTROIDS_PATH, lambda f: np.save(f, index.centroids))
+
+def get_search_index() -> IvfIndex:
+    """Returns the process-wide index, loading shards and centroids from disk on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = IvfIndex(EMBEDDING_DIM)
+            SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+            _rescan_shards(_index, force=True)
+            if _index.centroids is None and CENTROIDS_PATH.exists() and _index.alive_count >= IVF_MIN_ROWS:
+                _index.set_centroids(np.load(CENTROIDS_PATH), _index.alive_count)
+            print(f"[Search Index] Loaded {_index.alive_count} vectors from {len(_shard_mtimes)} meetings.")
+        return _index
+
+def index_meeting_segments(meeting_id: str, segments: List[Dict[str, Any]]) -> int:
+    """Embeds and (re)indexes the transcript segments of one meeting.
+
+    Each segment is a dict with 'text' and optionally 'speaker', 'start', 'end' (seconds).
+    Returns the number of indexed segments.
+    """
+    segments = [s for s in segments if s.get("text", "").strip()]
+    meta = [{
+        "speaker": s.get("speaker"),
+        "start": s.get("start"),
+        "end": s.get("end"),
+        "text": s["text"].strip()
+    } for s in segments]
+    vectors = embed_texts([m["text"] for m in meta])
+
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    stem = _shard_name(meeting_id)
+    shard_path = SHARDS_DIR / f"{stem}.npz"
+    # Metadata first: a reader only picks up a shard once its .npz exists
+    _write_atomic(shard_path.with_suffix(".json"),
+                  lambda f: f.write(json.dumps({"meeting_id": meeting_id, "segments": meta}, ensure_ascii=False).encode("utf-8")))
+    _write_atomic(shard_path, lambda f: np.savez(f, vectors=vectors))
+
+    index = get_search_index()
+    with _index_lock:
+        index.add_shard(meeting_id, vectors, meta)
+        _shard_mtimes[stem] = shard_path.stat().st_mtime
+        if index.needs_training():
+            index.train()
+            _write_atomic(CENTROIDS_PATH, lambda f: np.save(f, index.centroids))
+    print(f"[Search Index] Indexed {len(meta)} segments for meeting {meeting_id}.")
+    return len(meta)
+
+def search_meetings(query: str, k: int = 10, meeting_id: Optional[str] = None) -> List[SearchHit]:
+    """Returns the top-k transcript segments across all meetings for a free-text query."""
+    query_vector = embed_texts([query])[0]
+    index = get_search_index()
+    with _index_lock:
+        _rescan_shards(index)
+        return [index.hit_for_row(row, score) for row, score in index.search(query_vector, k, meeting_id)]
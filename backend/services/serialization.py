@@ -0,0 +1,69 @@
+"""
+JSON serialization shared by the API routes and the analysis pipeline's output files.
+
+Everything is encoded straight to UTF-8 bytes with orjson: pydantic models are dumped
+once to plain data and encoded in one call, with no intermediate `str` and no second
+encoding pass. Responses are compact; files written to disk keep the two-space indent
+the dashboard's JSON has always had unless `COMPACT_JSON_FILES=1` (or `compact=True`).
+"""
+
+import os
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+COMPACT_JSON_FILES = os.environ.get("COMPACT_JSON_FILES", "0") == "1"
+
+_BASE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(value: Any) -> Any:
+    """Fallback for types orjson does not know natively."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "dict"):
+        return value.dict() # Slotted parser records (VttCue, ...)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data: Any, compact: bool = True, sort_keys: bool = False) -> bytes:
+    """Encodes `data` as UTF-8 JSON; `compact=False` indents by two spaces, `sort_keys`
+    makes the output canonical (for content hashes)."""
+    options = _BASE_OPTIONS if compact else _BASE_OPTIONS | orjson.OPT_INDENT_2
+    if sort_keys:
+        options |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(data, default=_default, option=options)
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data)
+
+def dump_model(
+    model: BaseModel,
+    compact: bool = True,
+    by_alias: bool = False,
+    exclude_none: bool = False,
+    exclude_unset: bool = False
+) -> bytes:
+    """Encodes a pydantic model with the same field selection as `model_dump`."""
+    return dumps(model.model_dump(by_alias=by_alias, exclude_none=exclude_none, exclude_unset=exclude_unset), compact)
+
+def write_json(path: str, data: Any, compact: Optional[bool] = None) -> int:
+    """Writes `data` (plain data or a pydantic model) to `path`; returns the byte count.
+
+    `compact` defaults to `COMPACT_JSON_FILES`.
+    """
+    payload = dumps(data, COMPACT_JSON_FILES if compact is None else compact)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return len(payload)
+
+class JSONBytesResponse(Response):
+    """JSON response encoded with `dumps` (compact), instead of the stdlib encoder."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content # Already encoded, e.g. by dump_model
+        return dumps(content)
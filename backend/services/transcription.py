@@ -1,6 +1,12 @@
 import whisper
+import importlib
 import os
+import threading
+from contextlib import contextmanager
 from pydantic import BaseModel, Field
+import tqdm
+
+from services.progress import is_reporting, stage_progress
 
 # --- Whisper Model Loading ---
 # Consider loading the model once when the application starts
@@ -37,6 +43,38 @@ class TranscriptionResult(BaseModel):
     segments: list = Field(default_factory=list) # List of segment dictionaries
     # Add other relevant fields from Whisper output if needed
 
+# --- Progress Reporting ---
+# whisper.transcribe() has no progress callback; it only advances a tqdm bar over the audio
+# frames it has decoded. While a progress reporter is active, that bar is swapped for one
+# that also reports the percentage (see services.progress).
+
+_whisper_transcribe_module = importlib.import_module("whisper.transcribe") # `whisper.transcribe` is the function
+_progress_bar_lock = threading.Lock() # The swap is process-wide
+
+class _ProgressBar(tqdm.tqdm):
+    def update(self, n=1):
+        displayed = super().update(n)
+        if self.total:
+            stage_progress(100.0 * self.n / self.total, frames=self.n, total_frames=self.total)
+        return displayed
+
+class _TqdmWithProgress:
+    """Stands in for the `tqdm` module inside whisper.transcribe."""
+    tqdm = _ProgressBar
+
+@contextmanager
+def _reporting_transcription_progress():
+    if not is_reporting():
+        yield
+        return
+    with _progress_bar_lock:
+        original = _whisper_transcribe_module.tqdm
+        _whisper_transcribe_module.tqdm = _TqdmWithProgress
+        try:
+            yield
+        finally:
+            _whisper_transcribe_module.tqdm = original
+
 # Make function synchronous for BackgroundTasks compatibility
 # async def transcribe_audio(file_path: str) -> TranscriptionResult:
 def transcribe_audio(file_path: str) -> TranscriptionResult:
@@ -52,7 +90,8 @@ def transcribe_audio(file_path: str) -> TranscriptionResult:
         print(f"Starting transcription for: {file_path}")
         # Use verbose=False unless debugging, add language detection/setting if needed
         # No await needed for model.transcribe
-        result = model.transcribe(file_path, verbose=False) 
+        with _reporting_transcription_progress():
+            result = model.transcribe(file_path, verbose=False)
         print("Transcription completed.")
         
         # Extract relevant data
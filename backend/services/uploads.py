@@ -0,0 +1,49 @@
+"""
+Storage of uploaded meeting files, addressed by content.
+
+An upload is copied to UPLOAD_DIR in chunks and hashed (SHA-256) in the same loop, so the
+hash costs no second read of the file. The file is then stored as `<sha256><ext>`: the same
+content uploaded twice is kept once. With the pipeline version, the hash identifies an
+analysis: the upload route looks up an earlier one for the same bytes
+(`MeetingRepository.find_by_content`) and hands it back instead of analysing the file again.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Tuple
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+UPLOAD_DIR = os.environ.get("UPLOAD_DIR", os.path.join(_PROJECT_ROOT, 'data', 'uploads'))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Meeting statuses whose analysis (finished or on its way) can stand in for a new run
+REUSABLE_STATUSES = ("COMPLETE", "PROCESSING")
+
+def upload_path(content_hash: str, extension: str) -> str:
+    return os.path.join(UPLOAD_DIR, f"{content_hash}{extension}")
+
+def store_upload(source: BinaryIO, extension: str) -> Tuple[str, str, int]:
+    """Copies a file object into the upload store, hashing it on the way; returns
+    (path, sha256 hex digest, size in bytes)."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as dest:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                dest.write(chunk)
+                size += len(chunk)
+        content_hash = hasher.hexdigest()
+        path = upload_path(content_hash, extension)
+        os.replace(tmp_path, path) # Same content, same bytes: replacing an existing copy is harmless
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path, content_hash, size
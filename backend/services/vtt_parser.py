@@ -1,92 +1,203 @@
-import webvtt
+"""
+Streaming WebVTT parser for Zoom transcripts and closed captions.
+
+The file is read line by line and every cue is yielded as a small slotted `VttCue`
+(start/end in float seconds, speaker, text), so the pipeline never builds per-cue
+timestamp strings or pydantic objects. `iter_vtt_cues` keeps memory bounded by the
+longest cue; `parse_vtt` materialises the cues plus the joined transcript.
+
+Speaker tags are recognised by one compiled pattern covering Zoom's
+`Name (hh:mm:ss): text` form and the plain `Name: text` / `Name:` header-line forms.
+Cue text is cleaned exactly as the previous webvtt-py based parser did, so transcripts
+are byte-for-byte identical.
+"""
+
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator
 import os
 import re
 
-class VttCaption(BaseModel):
-    start: str
-    end: str
-    text: str
-    raw_text: str # Keep original text for potential speaker/reaction parsing
+import numpy as np
+
+# Speaker tag at the start of a cue, in one pattern for every form Zoom writes:
+#   "Name (hh:mm:ss): text"   group 2 holds the stamp
+#   "Name:" + newline         header line (group 3), the words follow on the next lines
+#   "Name: text"              inline tag
+_SPEAKER_PATTERN = re.compile(r'([^(:\n]{1,50})(?:(\(\d{2}:\d{2}:\d{2}\)):|:(\n|\Z)|:(?=\s))')
+_NOT_IN_INLINE_NAMES = frozenset(',?!') # "So, the point is: ..." is not a speaker tag
+_BLANK_LINE_PATTERN = re.compile(r'\n[ \t]*\n') # Cue separator; whitespace-only lines count as blank
+_TAG_PATTERN = re.compile(r'<.*?>')
+CHUNK_SIZE = 1 << 20 # Characters read per step by the streaming iterator
+
+class VttCue:
+    """One caption cue. Times are seconds from the start of the recording.
+
+    `text` is the cue text with a Zoom "(hh:mm:ss)" tag or a header-line speaker
+    removed; an inline "Name: text" tag is kept in `text` (the transcript has always
+    carried it) and `utterance` gives the words alone.
+    """
+    __slots__ = ("start", "end", "speaker", "text")
+
+    def __init__(self, start: float, end: float, speaker: Optional[str], text: str):
+        self.start = start
+        self.end = end
+        self.speaker = speaker
+        self.text = text
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+    @property
+    def utterance(self) -> str:
+        """Cue text without any speaker tag."""
+        speaker = self.speaker
+        text = self.text
+        if speaker and text.startswith(speaker):
+            match = _SPEAKER_PATTERN.match(text)
+            if match and match.group(2) is None and match.group(3) is None:
+                return text[match.end():].strip()
+        return text
+
+    def dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "speaker": self.speaker, "text": self.text}
+
+    def __repr__(self) -> str:
+        return f"VttCue({self.start:.3f} --> {self.end:.3f}, speaker={self.speaker!r}, text={self.text[:40]!r})"
 
 class VttParsingResult(BaseModel):
     transcript: str
-    captions: List[VttCaption]
+    captions: List[VttCue]
     metadata: Dict[str, Any] = {}
 
+    class Config:
+        arbitrary_types_allowed = True
+
+# Column weights (in milliseconds) of the characters of a fixed-width "HH:MM:SS.mmm"
+_TIMESTAMP_WEIGHTS_MS = np.array([36000000, 3600000, 0, 600000, 60000, 0, 10000, 1000, 0, 100, 10, 1], dtype=np.int64)
+_DIGIT_COLUMNS = np.flatnonzero(_TIMESTAMP_WEIGHTS_MS)
+_SEPARATOR_COLUMNS = np.array([2, 5, 8])
+_SEPARATOR_CODES = np.array([ord(':'), ord(':'), ord('.')], dtype=np.uint32)
+
+def parse_timestamp(value: str) -> float:
+    """Converts a VTT timestamp ("HH:MM:SS.mmm" or "MM:SS.mmm") to seconds."""
+    try:
+        minutes, _, seconds = value.rpartition(':')
+        total = 0
+        for part in minutes.split(':') if minutes else ():
+            total = total * 60 + int(part)
+        return total * 60 + float(seconds)
+    except ValueError:
+        raise ValueError(f"Invalid VTT file format: bad timestamp '{value}'")
+
+def _timestamps_to_seconds(values: List[str]) -> List[float]:
+    """Converts timestamp tokens to seconds in one vectorised pass.
+
+    Tokens that are not plain "HH:MM:SS.mmm" (short "MM:SS.mmm" stamps, a cue identifier
+    or cue settings caught in the slice) fall back to `parse_timestamp`.
+    """
+    if not values:
+        return []
+    codes = np.array(values, dtype='<U12').view(np.uint32).reshape(len(values), 12)
+    digits = codes - np.uint32(ord('0')) # Wraps around below '0', so one "< 10" test per digit
+    well_formed = ((codes[:, _SEPARATOR_COLUMNS] == _SEPARATOR_CODES).all(axis=1)
+                   & (digits[:, _DIGIT_COLUMNS] < 10).all(axis=1))
+    seconds = ((digits.astype(np.int64) @ _TIMESTAMP_WEIGHTS_MS) / 1000.0).tolist()
+    if not well_formed.all():
+        for i in np.flatnonzero(~well_formed).tolist():
+            token = values[i].rpartition('\n')[2].split()
+            seconds[i] = parse_timestamp(token[0] if token else values[i])
+    return seconds
+
+def _parse_block(block: str) -> List[VttCue]:
+    """Parses a run of VTT text that ends on a cue boundary.
+
+    This is the hot loop: cues are split on blank lines and the timing arrow with one
+    regex split and plain string operations, timestamps are converted for the whole block at once, and the
+    speaker tag costs one regex match per cue.
+    """
+    starts: List[str] = []
+    ends: List[str] = []
+    speakers: List[Optional[str]] = []
+    texts: List[str] = []
+    add_start, add_end, add_speaker, add_text = starts.append, ends.append, speakers.append, texts.append
+    speaker_match = _SPEAKER_PATTERN.match
+    strip_tags = _TAG_PATTERN.sub
+    not_in_inline_names = _NOT_IN_INLINE_NAMES.isdisjoint
+    for chunk in _BLANK_LINE_PATTERN.split(block):
+        head, sep, tail = chunk.partition(' --> ')
+        if not sep:
+            continue # Header, NOTE/STYLE/REGION block or stray blank lines
+        end_str, _, payload = tail.partition('\n')
+        add_start(head[-12:])
+        add_end(end_str[:12])
+
+        if '<' in payload:
+            payload = strip_tags('', payload)
+        text = payload.strip()
+        speaker = None
+        match = speaker_match(text) if ':' in text else None
+        if match:
+            name, stamp, header = match.groups()
+            if stamp is not None or (header is not None and len(name) < 49):
+                # Zoom stamp or "Name:" header line: the tag is not part of the text
+                speaker = name.strip() or None
+                text = text[match.end():].strip()
+            elif header is None and not_in_inline_names(name):
+                # Inline "Name: text" - the tag stays in the transcript text
+                speaker = name.strip() or None
+        add_speaker(speaker)
+        add_text(text)
+    return list(map(VttCue, _timestamps_to_seconds(starts), _timestamps_to_seconds(ends), speakers, texts))
+
+def _iter_blocks(file_path: str, chunk_size: int) -> Iterator[str]:
+    """Reads a VTT file in chunks, each cut after the last complete cue it holds."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"VTT file not found at: {file_path}")
+
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        pending = f.read(chunk_size)
+        if not pending.startswith('WEBVTT'):
+            raise ValueError("Invalid VTT file format: missing WEBVTT header")
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            # The cue after the last blank line may still be incomplete
+            boundary = pending.rfind('\n\n')
+            if boundary == -1:
+                continue
+            yield pending[:boundary + 1]
+            pending = pending[boundary + 1:]
+        yield pending
+
+def iter_vtt_cues(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[VttCue]:
+    """Yields the cues of a VTT file one at a time.
+
+    Memory stays bounded by `chunk_size` plus the longest cue, whatever the file size.
+    """
+    for block in _iter_blocks(file_path, chunk_size):
+        yield from _parse_block(block)
+
 def parse_vtt(file_path: str) -> VttParsingResult:
     """Parses a VTT file to extract transcript, captions, and metadata."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"VTT file not found at: {file_path}")
 
-    transcript_parts = []
-    parsed_captions: List[VttCaption] = []
-    metadata = {}
-
+    print(f"Parsing VTT file: {file_path}")
     try:
-        print(f"Parsing VTT file: {file_path}")
-        vtt = webvtt.read(file_path)
-        
-        for caption in vtt:
-            raw_text = caption.text.strip()
-            # Zoom VTT format: Look for speaker info in the raw text
-            # Example: "Speaker Name (00:00:00): Text"
-            speaker_match = re.match(r'^([^(]+)\((\d{2}:\d{2}:\d{2})\):', raw_text)
-            if speaker_match:
-                speaker_name = speaker_match.group(1).strip()
-                cleaned_text = raw_text[speaker_match.end():].strip()
-            else:
-                # Fallback: Look for colon-based speaker tags
-                lines = raw_text.split('\n')
-                if lines and lines[0].endswith(':') and len(lines[0]) < 50:
-                    speaker_name = lines[0][:-1].strip()
-                    cleaned_text = '\n'.join(lines[1:]).strip()
-                else:
-                    speaker_name = None
-                    cleaned_text = raw_text
-            
-            # Only add non-empty cleaned text to the main transcript parts
-            if cleaned_text:
-                transcript_parts.append(cleaned_text)
-            
-            parsed_captions.append(VttCaption(
-                start=caption.start,
-                end=caption.end,
-                text=cleaned_text,
-                raw_text=raw_text
-            ))
-
-        # Join parts with space for a more readable transcript
-        full_transcript = " ".join(transcript_parts)
-        print(f"VTT parsing completed. Found {len(parsed_captions)} captions.")
-        
-        return VttParsingResult(
-            transcript=full_transcript,
-            captions=parsed_captions,
-            metadata=metadata
-        )
-
-    except webvtt.errors.MalformedFileError as e:
+        captions: List[VttCue] = []
+        for block in _iter_blocks(file_path, CHUNK_SIZE):
+            captions.extend(_parse_block(block))
+    except ValueError as e:
         print(f"Malformed VTT file {file_path}: {e}")
-        raise ValueError(f"Invalid VTT file format: {e}")
+        raise
     except Exception as e:
         print(f"Error parsing VTT file {file_path}: {e}")
         raise RuntimeError(f"VTT parsing failed: {e}")
 
-# Example Usage (add to bottom of file for testing):
-# if __name__ == "__main__":
-#     test_vtt_file = "path/to/your/test_meeting.vtt" # Replace with a real VTT file path
-#     if os.path.exists(test_vtt_file):
-#         try:
-#             result = parse_vtt(test_vtt_file)
-#             print("\nVTT Parsing Result:")
-#             print(f"Metadata: {result.metadata}")
-#             print(f"Transcript (first 500 chars):\n{result.transcript[:500]}...")
-#             print(f"\nFirst 3 Captions:")
-#             for cap in result.captions[:3]:
-#                 print(f" - {cap.start} --> {cap.end}: Raw: '{cap.raw_text}' | Cleaned: '{cap.text}'")
-#         except Exception as e:
-#             print(f"Test failed: {e}")
-#     else:
-#         print(f"Test VTT file not found: {test_vtt_file}") 
\ No newline at end of file
+    # Join parts with space for a more readable transcript
+    full_transcript = " ".join(cue.text for cue in captions if cue.text)
+    print(f"VTT parsing completed. Found {len(captions)} captions.")
+    return VttParsingResult(transcript=full_transcript, captions=captions, metadata={})
@@ -0,0 +1,69 @@
+"""
+ZIP archives built incrementally for streaming responses.
+
+`zipfile` can write to an unseekable stream: it then puts each entry's CRC and sizes in a
+data descriptor after the entry's data, instead of seeking back to patch the local
+header. `ZipStreamWriter` hands it a sink that only collects the bytes written so far.
+`drain()` passes those bytes to the response as each entry is added, so only the entry
+being written is ever held in memory, never the whole archive.
+"""
+
+import io
+import os
+import shutil
+import time
+import zipfile
+from typing import List, Union
+
+COPY_CHUNK_SIZE = 256 * 1024
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream that buffers what is written until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ZipStreamWriter:
+    """Builds a ZIP archive entry by entry; `drain()` returns the bytes produced since the last call."""
+
+    def __init__(self, compression: int = zipfile.ZIP_STORED):
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=compression)
+
+    def _entry_info(self, arcname: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = self._zip.compression
+        info.external_attr = 0o644 << 16 # rw-r--r-- when extracted on Unix
+        return info
+
+    def write_file(self, arcname: str, source: Union[str, os.PathLike, io.IOBase]) -> None:
+        """Adds a file, given as a path or a binary file object read from its current position."""
+        with self._zip.open(self._entry_info(arcname), mode="w") as dest:
+            if isinstance(source, (str, os.PathLike)):
+                with open(source, 'rb') as src:
+                    shutil.copyfileobj(src, dest, COPY_CHUNK_SIZE)
+            else:
+                shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+
+    def write_bytes(self, arcname: str, data: bytes) -> None:
+        self._zip.writestr(self._entry_info(arcname), data)
+
+    def drain(self) -> bytes:
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Writes the central directory; returns the archive's remaining bytes."""
+        self._zip.close()
+        return self._sink.drain()
@@ -7,6 +7,11 @@ const nextConfig = {
         source: '/api/fastapi/:path*',
         destination: 'http://localhost:8000/api/:path*',
       },
+      {
+        // Components live in one bundle per meeting; files not on disk are served from it
+        source: '/analysis-data/:meetingId/:file',
+        destination: 'http://localhost:8000/analysis-data/:meetingId/:file',
+      },
     ]
   },
 };
@@ -20,6 +20,21 @@ import { analysisExists, getAnalysisResults } from '@/lib/analysis';
 // Define the backend endpoint URL (ensure this matches your backend setup)
 // Use environment variable or configuration for flexibility
 const BACKEND_ANALYZE_URL = process.env.BACKEND_URL ? `${process.env.BACKEND_URL}/api/meetings/analyze-dataset` : 'http://localhost:8000/api/meetings/analyze-dataset'; // Default if not set
+const BACKEND_BASE_URL = process.env.BACKEND_URL || 'http://localhost:8000';
+
+/**
+ * Reads one analysis component. Older analyses have a JSON file per component on disk;
+ * newer ones keep every component in a single bundle, which the backend serves under the
+ * same per-component path.
+ */
+async function readComponentFile(outputDir: string, logicalMeetingId: string, fileName: string): Promise<any | null> {
+  const filePath = path.join(outputDir, fileName);
+  if (fs.existsSync(filePath)) {
+    return JSON.parse(fs.readFileSync(filePath, 'utf-8'));
+  }
+  const response = await fetch(`${BACKEND_BASE_URL}/analysis-data/${encodeURIComponent(logicalMeetingId)}/${encodeURIComponent(fileName)}`);
+  return response.ok ? response.json() : null;
+}
 
 export async function POST(
   request: NextRequest,
@@ -67,6 +82,7 @@ export async function POST(
       success: true,
       message: backendResult.message || 'Analysis triggered successfully.',
       meetingId: logicalMeetingId,
+      jobId: backendResult.job_id, // Queued analysis job; status at /api/jobs/{jobId}, live stage events at /api/jobs/{jobId}/events
       // Optionally include paths if needed by frontend immediately
       // outputPath: backendResult.output_directory, 
       // mainAnalysisFile: backendResult.main_analysis_file
@@ -116,44 +132,34 @@ export async function GET(
       const analysisData = JSON.parse(fileContent);
       
       // --- Read Component Files (Comments & Reactions) ---
-      // Read comments if file exists
+      // Read comments if available
       let commentsData = null;
-      const commentsFilePath = path.join(outputDir, `comments-analysis-${logicalMeetingId}.json`);
-      if (fs.existsSync(commentsFilePath)) {
-        try {
-          const commentsContent = fs.readFileSync(commentsFilePath, 'utf-8');
-          commentsData = JSON.parse(commentsContent).comments; // Assuming structure { "comments": [...] }
-          console.log(`[API - GET /analyze] Comments file found and parsed for ${logicalMeetingId}.`);
-        } catch (e) {
-          console.warn(`[API - GET /analyze] Error reading/parsing comments file ${commentsFilePath}:`, e);
+      try {
+        const commentsComponent = await readComponentFile(outputDir, logicalMeetingId, `comments-analysis-${logicalMeetingId}.json`);
+        if (commentsComponent) {
+          commentsData = commentsComponent.comments; // Assuming structure { "comments": [...] }
+          console.log(`[API - GET /analyze] Comments component found and parsed for ${logicalMeetingId}.`);
+        } else {
+          console.log(`[API - GET /analyze] Comments component not found for ${logicalMeetingId}.`);
         }
-      } else {
-        console.log(`[API - GET /analyze] Comments file not found for ${logicalMeetingId}.`);
+      } catch (e) {
+        console.warn(`[API - GET /analyze] Error reading/parsing comments component for ${logicalMeetingId}:`, e);
       }
 
-      // Read reactions if file exists
+      // Read reactions if available
       let reactionsData = null;
-      const reactionsFilePath = path.join(outputDir, `reactions-analysis-${logicalMeetingId}.json`);
-      if (fs.existsSync(reactionsFilePath)) {
-        try {
-          const reactionsContent = fs.readFileSync(reactionsFilePath, 'utf-8');
-          reactionsData = JSON.parse(reactionsContent); // Assuming structure { "reactions": [...], "speakerReactions": {...} }
-          console.log(`[API - GET /analyze] Reactions file found and parsed for ${logicalMeetingId}.`);
-        } catch (e) {
-          console.warn(`[API - GET /analyze] Error reading/parsing reactions file ${reactionsFilePath}:`, e);
-        }
-      } else {
-        console.log(`[API - GET /analyze] Reactions file not found for ${logicalMeetingId}.`);
+      try {
+        reactionsData = await readComponentFile(outputDir, logicalMeetingId, `reactions-analysis-${logicalMeetingId}.json`); // Assuming structure { "reactions": [...], "speakerReactions": {...} }
+        console.log(`[API - GET /analyze] Reactions component ${reactionsData ? 'found and parsed' : 'not found'} for ${logicalMeetingId}.`);
+      } catch (e) {
+        console.warn(`[API - GET /analyze] Error reading/parsing reactions component for ${logicalMeetingId}:`, e);
       }
 
-      // Read participants if file exists
+      // Read participants if available
       let participantsData = null;
-      const participantsFilePath = path.join(outputDir, `participants-analysis-${logicalMeetingId}.json`);
-      if (fs.existsSync(participantsFilePath)) {
-        try {
-          const participantsContent = fs.readFileSync(participantsFilePath, 'utf-8');
-          const rawParticipantsData = JSON.parse(participantsContent);
-          
+      try {
+        const rawParticipantsData = await readComponentFile(outputDir, logicalMeetingId, `participants-analysis-${logicalMeetingId}.json`);
+        if (rawParticipantsData) {
           // Map snake_case field names to camelCase for the frontend
           participantsData = {
             totalParticipants: rawParticipantsData.total_participants,
@@ -161,44 +167,27 @@ export async function GET(
             speakingParticipants: rawParticipantsData.speaking_participants,
             reactingParticipants: rawParticipantsData.reacting_participants
           };
-          console.log(`[API - GET /analyze] Participants file found and parsed for ${logicalMeetingId}.`);
+          console.log(`[API - GET /analyze] Participants component found and parsed for ${logicalMeetingId}.`);
           console.log(`[API - GET /analyze] Mapped participants data: `, participantsData);
-        } catch (e) {
-          console.warn(`[API - GET /analyze] Error reading/parsing participants file ${participantsFilePath}:`, e);
+        } else {
+          console.log(`[API - GET /analyze] Participants component not found for ${logicalMeetingId}.`);
         }
-      } else {
-        console.log(`[API - GET /analyze] Participants file not found for ${logicalMeetingId}.`);
+      } catch (e) {
+        console.warn(`[API - GET /analyze] Error reading/parsing participants component for ${logicalMeetingId}:`, e);
       }
       
-      // Read timeline data if file exists (consistent naming format)
+      // Read timeline data if available (consistent naming format)
       let timelineData = null;
-      const timelineFilePath = path.join(outputDir, `timeline-${logicalMeetingId}.json`);
-      if (fs.existsSync(timelineFilePath)) {
-        try {
-          const timelineContent = fs.readFileSync(timelineFilePath, 'utf-8');
-          timelineData = JSON.parse(timelineContent).timeline; // Assuming structure { "timeline": [...] }
-          console.log(`[API - GET /analyze] Timeline file found and parsed for ${logicalMeetingId}.`);
-        } catch (e) {
-          console.warn(`[API - GET /analyze] Error reading/parsing timeline file ${timelineFilePath}:`, e);
-        }
-      } else {
-        console.log(`[API - GET /analyze] Timeline file not found for ${logicalMeetingId}.`);
-      }
-      
-      // Read comments from standardized comments file if it exists
-      if (!commentsData) {
-        const standardCommentsFilePath = path.join(outputDir, `comments-analysis-${logicalMeetingId}.json`);
-        if (fs.existsSync(standardCommentsFilePath)) {
-          try {
-            const standardCommentsContent = fs.readFileSync(standardCommentsFilePath, 'utf-8');
-            commentsData = JSON.parse(standardCommentsContent).comments;
-            console.log(`[API - GET /analyze] Standardized comments file found and parsed for ${logicalMeetingId}.`);
-          } catch (e) {
-            console.warn(`[API - GET /analyze] Error reading/parsing standardized comments file ${standardCommentsFilePath}:`, e);
-          }
+      try {
+        const timelineComponent = await readComponentFile(outputDir, logicalMeetingId, `timeline-${logicalMeetingId}.json`);
+        if (timelineComponent) {
+          timelineData = timelineComponent.timeline; // Assuming structure { "timeline": [...] }
+          console.log(`[API - GET /analyze] Timeline component found and parsed for ${logicalMeetingId}.`);
         } else {
-          console.log(`[API - GET /analyze] Standardized comments file not found for ${logicalMeetingId}.`);
+          console.log(`[API - GET /analyze] Timeline component not found for ${logicalMeetingId}.`);
         }
+      } catch (e) {
+        console.warn(`[API - GET /analyze] Error reading/parsing timeline component for ${logicalMeetingId}:`, e);
       }
       // -----------------------------------------------------
 
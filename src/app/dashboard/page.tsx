@@ -246,12 +246,14 @@ export default function Dashboard() {
               return null;
             });
           
-          if (timelineData && timelineData.timeline && timelineData.timeline.length > 0) {
+          // Points carry engagement only where the pipeline had timed activity to measure
+          const engagementPoints = timelineData?.timeline?.filter((point: any) => typeof point.engagement === 'number') ?? [];
+          if (engagementPoints.length > 0) {
             // Calculate average engagement from all timeline points
-            const sum = timelineData.timeline.reduce((acc: number, point: any) => 
-              acc + (point.engagement || 0), 0);
-            engagementScore = Math.round((sum / timelineData.timeline.length) * 100);
-            console.log(`Calculated average engagement from timeline (${timelineData.timeline.length} points): ${engagementScore}%`);
+            const sum = engagementPoints.reduce((acc: number, point: any) => 
+              acc + point.engagement, 0);
+            engagementScore = Math.round((sum / engagementPoints.length) * 100);
+            console.log(`Calculated average engagement from timeline (${engagementPoints.length} points): ${engagementScore}%`);
           } else {
             console.log(`No timeline data available, falling back to metadata engagement score`);
             // Fall back to metadata engagement score if timeline isn't available